@@ -1,5 +1,6 @@
 package com.linkedin.feathr.offline.config.datasource
 
+import com.linkedin.feathr.offline.generation.outputProcessor.RedisOutputUtils
 import org.apache.spark.SparkConf
 
 private[feathr]  class RedisResourceInfoSetter extends ResourceInfoSetter() {
@@ -7,19 +8,24 @@ private[feathr]  class RedisResourceInfoSetter extends ResourceInfoSetter() {
   val REDIS_PORT = "REDIS_PORT"
   val REDIS_SSL_ENABLED = "REDIS_SSL_ENABLED"
   val REDIS_PASSWORD = "REDIS_PASSWORD"
+  val REDIS_HASH_TAG_ENABLED = "REDIS_HASH_TAG_ENABLED"
 
-  override val params = List(REDIS_HOST, REDIS_PORT, REDIS_SSL_ENABLED, REDIS_PASSWORD)
+  override val params = List(REDIS_HOST, REDIS_PORT, REDIS_SSL_ENABLED, REDIS_PASSWORD, REDIS_HASH_TAG_ENABLED)
 
   def setupSparkConf(sparkConf: SparkConf, context: Option[DataSourceConfig], resource: Option[Resource]): Unit = {
     val host = getAuthStr(REDIS_HOST, context, resource)
     val port = getAuthStr(REDIS_PORT, context, resource)
     val sslEnabled = getAuthStr(REDIS_SSL_ENABLED, context, resource)
     val auth = getAuthStr(REDIS_PASSWORD, context, resource)
+    val hashTagEnabled = getAuthStr(REDIS_HASH_TAG_ENABLED, context, resource)
 
     sparkConf.set("spark.redis.host", host)
     sparkConf.set("spark.redis.port", port)
     sparkConf.set("spark.redis.ssl", sslEnabled)
     sparkConf.set("spark.redis.auth", auth)
+    if (hashTagEnabled.nonEmpty) {
+      sparkConf.set(RedisOutputUtils.HASH_TAG_ENABLED_CONF, hashTagEnabled)
+    }
   }
 
   def getAuthFromConfig(str: String, resource: Resource): String = {
@@ -3,7 +3,7 @@ package com.linkedin.feathr.offline.generation.outputProcessor
 import com.linkedin.feathr.common.types.protobuf.FeatureValueOuterClass
 import org.apache.spark.sql.catalyst.encoders.RowEncoder
 import org.apache.spark.sql.catalyst.expressions.GenericRowWithSchema
-import org.apache.spark.sql.functions.{concat_ws, expr, when}
+import org.apache.spark.sql.functions.{concat, concat_ws, expr, lit, when}
 import org.apache.spark.sql.types._
 import org.apache.spark.sql.{DataFrame, Row, SaveMode, SparkSession}
 
@@ -12,13 +12,18 @@ import scala.collection.JavaConverters._
 import scala.collection.mutable
 
 object RedisOutputUtils {
+  // If true, keys are written as `table:{key}` so that all the features of an entity stay on one Redis Cluster shard
+  val HASH_TAG_ENABLED_CONF = "spark.feathr.redis.hashTag.enabled"
+
   def writeToRedis(ss: SparkSession, df: DataFrame, tableName: String, keyColumns: Seq[String], allFeatureCols: Set[String], saveMode: SaveMode): Unit = {
     val nullElementGuardString = "_null_"
-    val newColExpr = concat_ws("#", keyColumns.map(c => {
+    val keyColExpr = concat_ws("#", keyColumns.map(c => {
       val casted = expr(s"CAST (${c} as string)")
       // If any key in the keys is null, replace with special value and remove the row later
       when(casted.isNull, nullElementGuardString).otherwise(casted)
     }): _*)
+    val hashTagEnabled = ss.conf.getOption(HASH_TAG_ENABLED_CONF).exists(_.equalsIgnoreCase("true"))
+    val newColExpr = if (hashTagEnabled) concat(lit("{"), keyColExpr, lit("}")) else keyColExpr
     val encodedDf = encodeDataFrame(allFeatureCols, df)
 
     val outputKeyColumnName = "feature_key"
@@ -1,5 +1,6 @@
 from .client import FeathrClient
 from .spark_provider.feathr_configurations import SparkExecutionConfiguration
+from .spark_provider.feathr_job import FeathrJob, as_completed, wait_all
 from .definition.feature_derivations import *
 from .definition.anchor import *
 from .definition.feature import *
@@ -17,6 +18,10 @@ from .definition.aggregation import *
 from .definition.settings import *
 from .utils.job_utils import *
 from .utils.feature_printer import *
+from .utils.materialization_ledger import MaterializationLedger
+from .online_store.cache import OnlineFeatureCache
+from .online_store.columnar import OnlineFeatureColumns
+from .online_store.derived import OnlineDerivedFeatures
 from .version import __version__
 
 # skipped class as they are internal methods:
@@ -75,5 +80,12 @@ __all__ = [
     'ObservationSettings',
     'FeaturePrinter',
     'SparkExecutionConfiguration',
+    'MaterializationLedger',
+    'FeathrJob',
+    'as_completed',
+    'wait_all',
+    'OnlineFeatureCache',
+    'OnlineFeatureColumns',
+    'OnlineDerivedFeatures',
     __version__,
  ]
@@ -1,23 +1,34 @@
-import base64
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import copy
+from datetime import datetime
+import functools
 import json
 import logging
 import os
 import tempfile
-from typing import Any, Dict, List, Tuple, Union, Set
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union, Set
 
 from azure.identity import DefaultAzureCredential
 from jinja2 import Template
 from loguru import logger
+import pandas as pd
 from pyhocon import ConfigFactory
 import redis
+import redis.asyncio
+import redis.asyncio.cluster
+import redis.cluster
 
 from feathr.constants import *
 from feathr.definition._materialization_utils import _to_materialization_config
 from feathr.definition.anchor import FeatureAnchor
 from feathr.definition.config_helper import FeathrConfigHelper
+from feathr.definition.dtype import FeatureType
 from feathr.definition.feature import FeatureBase
 from feathr.definition.feature_derivations import DerivedFeature
+from feathr.definition.lookup_feature import LookupFeature
 from feathr.definition.materialization_settings import MaterializationSettings
 from feathr.definition.monitoring_settings import MonitoringSettings
 from feathr.definition.query_feature_list import FeatureQuery
@@ -26,17 +37,37 @@ from feathr.definition.sink import HdfsSink, Sink
 from feathr.definition.source import InputContext
 from feathr.definition.transformation import WindowAggTransformation
 from feathr.definition.typed_key import TypedKey
+from feathr.online_store.analyzer import OnlineStoreAnalyzer, OnlineStoreReport
+from feathr.online_store.cache import OnlineFeatureCache
+from feathr.online_store.columnar import OnlineFeatureColumns, decode_columns
+from feathr.online_store.deadline import (MISSED_DEADLINE, SERVED_BY_PRIMARY, HedgingPolicy, OnlineFeatureDict,
+                                          OnlineFeatureList, arun_with_deadline, run_with_deadline)
+from feathr.online_store.decode_plan import OnlineDecodePlan
+from feathr.online_store.derived import OnlineDerivedFeatures
+from feathr.online_store.lookup import OnlineLookupFeatures
+from feathr.online_store.metrics import MetricsSink, PrometheusMetricsSink
+from feathr.online_store.maintenance import (BulkOperationReport, expire_command, hdel_command, run_bulk_operation,
+                                             unlink_command)
+from feathr.online_store._feature_value import (VALUE_ENCODINGS, decode_feature_value, encode_column,
+                                               infer_oneof_field, oneof_field_of_feature_type,
+                                               serialized_feature_value)
+from feathr.online_store._redis_pipeline import aexecute_hmgets, execute_hmgets, execute_hsets, hash_tag
 from feathr.protobuf.featureValue_pb2 import FeatureValue
 from feathr.registry._feathr_registry_client import _FeatureRegistry, derived_feature_to_def, feature_to_def
 from feathr.registry._feature_registry_purview import _PurviewRegistry
 from feathr.spark_provider._databricks_submission import _FeathrDatabricksJobLauncher
+from feathr.spark_provider._localpandas_submission import _FeathrLocalPandasJobLauncher
 from feathr.spark_provider._localspark_submission import _FeathrLocalSparkJobLauncher
+from feathr.spark_provider._spark_dependencies import CONNECTORS_CONF, required_connectors
 from feathr.spark_provider._synapse_submission import _FeathrSynapseJobLauncher
 from feathr.spark_provider.feathr_configurations import SparkExecutionConfiguration
+from feathr.spark_provider.feathr_job import FeathrJob
 from feathr.udf._preprocessing_pyudf_manager import _PreprocessingPyudfManager
 from feathr.utils._env_config_reader import EnvConfigReader
 from feathr.utils._file_utils import write_to_file
+from feathr.utils.backfill import FAILED, SUCCEEDED, BackfillScheduler, BackfillWindow
 from feathr.utils.feature_printer import FeaturePrinter
+from feathr.utils.materialization_ledger import materialization_fingerprint, sink_id
 from feathr.utils.spark_job_params import FeatureGenerationJobParams, FeatureJoinJobParams
 from feathr.version import get_version
 import importlib.util
@@ -82,6 +113,22 @@ class FeathrClient(object):
         # Redis key separator
         self._KEY_SEPARATOR = ':'
         self._COMPOSITE_KEY_SEPARATOR = '#'
+        # Optional in-process cache in front of the online store, see `enable_online_feature_cache`
+        self.online_feature_cache = None
+        # Optional metrics of the online reads, see `enable_online_metrics`
+        self.online_metrics = None
+        # Optional hedged reads to replicas, see `enable_online_hedging`
+        self.online_hedging = None
+        # Runs the reads that have a deadline or are hedged, so that the caller can stop waiting for them
+        self._online_deadline_executor = None
+        # Derived features evaluated at serving time, compiled once per distinct list of derived features
+        self._online_derived_features = {}
+        # Declared types of the features read online, and decode plans built once per list of requested features,
+        # see `_online_decode_plan`. At most `online_decode_plans_max_size` plans are kept, in LRU order.
+        self.online_decode_plans_max_size = 1024
+        self._online_feature_types = None
+        self._online_decode_plans_lock = threading.Lock()
+        self._reset_online_decode_plans()
         self.env_config = EnvConfigReader(config_path=config_path)
         if local_workspace_dir:
             self.local_workspace_dir = local_workspace_dir
@@ -100,6 +147,23 @@ class FeathrClient(object):
         self.project_name = self.env_config.get( 
             'project_config__project_name')
 
+        # Online read settings, see `_execute_hmgets`. They are read even if Redis host is not configured, since the
+        # online store clients can be set afterwards, e.g. by `feathr serve --in-memory`.
+        self.redis_cluster_enabled = self._str_to_bool(self.env_config.get(
+            'online_store__redis__cluster_enabled') or False, "cluster_enabled")
+        self.redis_read_from_replicas = self._str_to_bool(self.env_config.get(
+            'online_store__redis__read_from_replicas') or False, "read_from_replicas")
+        # Store keys as `feature_table:{key}` so that all the features of an entity stay on one cluster shard
+        self.redis_hash_tag_enabled = self._str_to_bool(self.env_config.get(
+            'online_store__redis__hash_tag_enabled') or False, "hash_tag_enabled")
+        # Batch reads are split into pipelines of at most this many keys, sent over up to
+        # `pipeline_concurrency` pooled connections at once
+        self.redis_max_keys_per_pipeline = int(self.env_config.get(
+            'online_store__redis__max_keys_per_pipeline') or 1000)
+        pipeline_concurrency = self.env_config.get('online_store__redis__pipeline_concurrency')
+        self.redis_pipeline_concurrency = int(pipeline_concurrency) if pipeline_concurrency else None
+        self._redis_pipeline_executor = None
+
         # Redis configs. This is optional unless users have configured Redis host.
         if self.env_config.get('online_store__redis__host'):
             # For illustrative purposes.
@@ -112,6 +176,9 @@ class FeathrClient(object):
                 'online_store__redis__port')
             self.redis_ssl_enabled = self.env_config.get(
                 'online_store__redis__ssl_enabled')
+            # Upper bound of pooled connections, per client and per cluster node. Unbounded if not set.
+            self.redis_max_connections = self.env_config.get(
+                'online_store__redis__max_connections')
             self._construct_redis_client()
 
         # Offline store enabled configs; false by default
@@ -140,9 +207,9 @@ class FeathrClient(object):
             'spark_config__spark_cluster')
 
         self.credential = credential
-        if self.spark_runtime not in {'azure_synapse', 'databricks', 'local'}:
+        if self.spark_runtime not in {'azure_synapse', 'databricks', 'local', 'local_pandas'}:
             raise RuntimeError(
-                f'{self.spark_runtime} is not supported. Only \'azure_synapse\', \'databricks\' and \'local\' are currently supported.')
+                f'{self.spark_runtime} is not supported. Only \'azure_synapse\', \'databricks\', \'local\' and \'local_pandas\' are currently supported.')
         elif self.spark_runtime == 'azure_synapse':
             # Feathr is a spark-based application so the feathr jar compiled from source code will be used in the
             # Spark job submission. The feathr jar hosted in cloud saves the time users needed to upload the jar from
@@ -193,8 +260,17 @@ class FeathrClient(object):
                 workspace_path = self.env_config.get('spark_config__local__workspace'),
                 master = self.env_config.get('spark_config__local__master'),
                 dfs_prefix = self.env_config.get('spark_config__local__dfs_prefix'),
-                dfs_workspace = self.env_config.get('spark_config__local__dfs_workspace')
+                dfs_workspace = self.env_config.get('spark_config__local__dfs_workspace'),
+                warm_session = self._str_to_bool(self.env_config.get('spark_config__local__warm_session') or False,
+                                                 "warm_session"),
+                jar_cache_dir = self.env_config.get('spark_config__local__jar_cache_dir'),
+                dependency_jar = self.env_config.get('spark_config__local__dependency_jar'),
                 )
+        elif self.spark_runtime == 'local_pandas':
+            # Feature joins run in process with pandas, so there is no Spark job nor jar
+            self._FEATHR_JOB_JAR_PATH = None
+            self.feathr_spark_launcher = _FeathrLocalPandasJobLauncher(
+                workspace_path=self.env_config.get('spark_config__local__workspace'))
 
 
         self.secret_names = []
@@ -272,6 +348,9 @@ class FeathrClient(object):
         self.config_helper.save_to_feature_config_from_context(anchor_list, derived_feature_list, self.local_workspace_dir)
         self.anchor_list = anchor_list
         self.derived_feature_list = derived_feature_list
+        # Decode plans of the online reads are rebuilt with the new feature types
+        self._online_feature_types = None
+        self._reset_online_decode_plans()
 
         # Check if data source used by every anchor requires additional system properties to be set
         props = []
@@ -323,7 +402,8 @@ class FeathrClient(object):
         """
         return self.registry._get_registry_client()
 
-    def get_online_features(self, feature_table: str, key: Any, feature_names: List[str]):
+    def get_online_features(self, feature_table: str, key: Any, feature_names: List[str],
+                            deadline_ms: Optional[float] = None, partial_results: bool = False):
         """Fetches feature value for a certain key from a online feature table.
 
         Args:
@@ -332,6 +412,10 @@ class FeathrClient(object):
                  for key list, please make sure the order is consistent with the one in feature's definition;
                  the order can be found by 'get_features_from_registry'.
             feature_names: list of feature names to fetch
+            deadline_ms (optional): maximum time to wait for the online store, in milliseconds. A `TimeoutError` is
+                raised if it's missed, unless `partial_results` is set.
+            partial_results (optional): if the deadline is missed, return None for the features instead of raising.
+                The features served degraded are listed in `degraded_features` of the result.
 
         Return:
             A list of feature values for this entity. It's ordered by the requested feature names.
@@ -341,12 +425,18 @@ class FeathrClient(object):
             [None, None, None, None].
             If a feature doesn't exist, then a None is returned for that feature. For example:
             [None, b'4.0', b'31.0', b'23.0'].
+            The list is an `OnlineFeatureList`, whose `degraded_features` maps the features that missed the deadline
+            ("deadline") or were read from a replica by a hedged read ("replica") to the reason.
             """
-        redis_key = self._construct_redis_key(feature_table, key)
-        res = self.redis_client.hmget(redis_key, *feature_names)
-        return self._decode_proto(res)
-
-    def multi_get_online_features(self, feature_table: str, keys: List[Any], feature_names: List[str]):
+        degraded = {}
+        res = self._fetch_online_features(feature_table, [key], feature_names, deadline_ms, partial_results, degraded)[0]
+        return OnlineFeatureList(self._decode_rows(feature_table, [res], feature_names)[0],
+                                 self._degraded_features(degraded, [feature_names]))
+
+    def multi_get_online_features(self, feature_table: str, keys: List[Any], feature_names: List[str],
+                                  output_format: str = "dict", default_values: Dict[str, Any] = None,
+                                  derived_features: Union[List[DerivedFeature], OnlineDerivedFeatures] = None,
+                                  deadline_ms: Optional[float] = None, partial_results: bool = False):
         """Fetches feature value for a list of keys from a online feature table. This is the batch version of the get API.
 
         Args:
@@ -355,6 +445,17 @@ class FeathrClient(object):
                   for composite keys, please make sure each order of them is consistent with the one in feature's definition;
                   the order can be found by 'get_features_from_registry'.
             feature_names: list of feature names to fetch
+            output_format (optional): "dict" (default) for the result described below, "numpy" for an
+                `OnlineFeatureColumns` holding one numpy array (or CSR matrix for sparse features) per feature, or
+                "arrow" for a pyarrow Table. The columnar formats decode the whole batch at once, which is much cheaper
+                for large batches.
+            default_values (optional): feature name -> value to fill in for missing values. Only used by the columnar
+                formats; missing values are always reported in `OnlineFeatureColumns.null_masks`.
+            derived_features (optional): derived features to evaluate at serving time instead of reading them from the
+                online store, see `OnlineDerivedFeatures`. Requested feature names that are one of them are computed
+                from their input features, which are fetched in the same round trip.
+            deadline_ms (optional): maximum time to wait for the online store, see `get_online_features`.
+            partial_results (optional): return None for the features that missed the deadline instead of raising.
 
         Return:
             A list of feature values for the requested entities. It's ordered by the requested feature names. For
@@ -364,73 +465,781 @@ class FeathrClient(object):
             are returned. For example, {'12': [None, None, None, None], '24': [None, None, None, None]} If a feature
             doesn't exist, then a None is returned for that feature. For example: {'12': [None, b'4.0', b'31.0',
             b'23.0'], '24': [b'true', b'4.0', b'31.0', b'23.0']}.
+            The features served degraded are listed in `degraded_features` of the result, see `get_online_features`.
+            For the "arrow" format, they're in the `feathr.degraded_features` schema metadata, as JSON.
+        """
+        self._check_online_output_format(output_format)
+        degraded = {}
+        derived = self._get_online_derived_features(derived_features)
+        if derived is not None:
+            fetched_names = derived.required_features(feature_names)
+            pipeline_result = self._fetch_online_features(feature_table, keys, fetched_names, deadline_ms,
+                                                          partial_results, degraded)
+            return self._with_degraded_features(
+                self._evaluate_online_derived_features(derived, feature_table, keys, pipeline_result, fetched_names,
+                                                       feature_names, output_format, default_values),
+                self._degraded_features(degraded, [feature_names]))
+        pipeline_result = self._fetch_online_features(feature_table, keys, feature_names, deadline_ms, partial_results,
+                                                      degraded)
+
+        if output_format != "dict":
+            return self._with_degraded_features(
+                self._to_columnar_result(keys, pipeline_result, feature_names, output_format, default_values,
+                                         feature_table),
+                self._degraded_features(degraded, [feature_names]))
+
+        decoded_pipeline_result = self._decode_rows(feature_table, pipeline_result, feature_names)
+        return OnlineFeatureDict(zip(self._join_composite_keys(keys), decoded_pipeline_result),
+                                 self._degraded_features(degraded, [feature_names]))
+
+    async def aget_online_features(self, feature_table: str, key: Any, feature_names: List[str],
+                                   deadline_ms: Optional[float] = None, partial_results: bool = False):
+        """Asyncio version of `get_online_features`. Fetches feature value for a certain key from a online feature
+        table without blocking the event loop, so many lookups can be in flight concurrently.
+
+        Args:
+            feature_table: the name of the feature table.
+            key: the key/key list of the entity;
+                 for key list, please make sure the order is consistent with the one in feature's definition;
+                 the order can be found by 'get_features_from_registry'.
+            feature_names: list of feature names to fetch
+            deadline_ms (optional): maximum time to wait for the online store, see `get_online_features`.
+            partial_results (optional): return None for the features that missed the deadline instead of raising.
+
+        Return:
+            A list of feature values for this entity, same as `get_online_features`.
+        """
+        degraded = {}
+        res = (await self._afetch_online_features(feature_table, [key], feature_names, deadline_ms, partial_results,
+                                                  degraded))[0]
+        return OnlineFeatureList(self._decode_rows(feature_table, [res], feature_names)[0],
+                                 self._degraded_features(degraded, [feature_names]))
+
+    async def amulti_get_online_features(self, feature_table: str, keys: List[Any], feature_names: List[str],
+                                         output_format: str = "dict", default_values: Dict[str, Any] = None,
+                                         derived_features: Union[List[DerivedFeature], OnlineDerivedFeatures] = None,
+                                         deadline_ms: Optional[float] = None, partial_results: bool = False):
+        """Asyncio version of `multi_get_online_features`. Fetches feature value for a list of keys from a online
+        feature table in one pipeline, without blocking the event loop.
+
+        Args:
+            feature_table: the name of the feature table.
+            keys: list of keys/composite keys for the entities;
+                  for composite keys, please make sure each order of them is consistent with the one in feature's definition;
+                  the order can be found by 'get_features_from_registry'.
+            feature_names: list of feature names to fetch
+            output_format (optional): "dict", "numpy" or "arrow", same as `multi_get_online_features`.
+            default_values (optional): feature name -> value to fill in for missing values in the columnar formats.
+            derived_features (optional): derived features to evaluate at serving time, same as
+                `multi_get_online_features`.
+            deadline_ms (optional): maximum time to wait for the online store, see `get_online_features`.
+            partial_results (optional): return None for the features that missed the deadline instead of raising.
+
+        Return:
+            The feature values for the requested entities, same as `multi_get_online_features`.
+        """
+        self._check_online_output_format(output_format)
+        degraded = {}
+        derived = self._get_online_derived_features(derived_features)
+        if derived is not None:
+            fetched_names = derived.required_features(feature_names)
+            pipeline_result = await self._afetch_online_features(feature_table, keys, fetched_names, deadline_ms,
+                                                                 partial_results, degraded)
+            return self._with_degraded_features(
+                self._evaluate_online_derived_features(derived, feature_table, keys, pipeline_result, fetched_names,
+                                                       feature_names, output_format, default_values),
+                self._degraded_features(degraded, [feature_names]))
+        pipeline_result = await self._afetch_online_features(feature_table, keys, feature_names, deadline_ms,
+                                                             partial_results, degraded)
+
+        if output_format != "dict":
+            return self._with_degraded_features(
+                self._to_columnar_result(keys, pipeline_result, feature_names, output_format, default_values,
+                                         feature_table),
+                self._degraded_features(degraded, [feature_names]))
+        return OnlineFeatureDict(zip(self._join_composite_keys(keys),
+                                     self._decode_rows(feature_table, pipeline_result, feature_names)),
+                                 self._degraded_features(degraded, [feature_names]))
+
+    def multi_table_get_online_features(self, table_features: Dict[str, List[str]], keys: List[Any],
+                                        key_mapping: Dict[str, List[int]] = None, output_format: str = "dict",
+                                        default_values: Dict[str, Any] = None, deadline_ms: Optional[float] = None,
+                                        partial_results: bool = False):
+        """Fetches the features of a list of entities from several online feature tables in one round trip. The
+        HMGETs of all the tables are sent together, in one pipeline (or one per shard in Redis Cluster mode), instead
+        of one `multi_get_online_features` call per table.
+
+        Args:
+            table_features: feature table -> list of feature names to fetch from it.
+            keys: list of keys/composite keys for the entities.
+            key_mapping (optional): feature table -> positions, in the composite keys, of the key parts of this table.
+                For example, with keys = [['u1', 'i1']], key_mapping = {'user_features': [0], 'user_item_features':
+                [0, 1]} reads 'user_features:u1' and 'user_item_features:u1#i1'. Tables that are not in the mapping
+                use the whole key.
+            output_format (optional): "dict", "numpy" or "arrow", same as `multi_get_online_features`.
+            default_values (optional): feature name -> value to fill in for missing values in the columnar formats.
+            deadline_ms (optional): maximum time to wait for the online store, see `get_online_features`. Each
+                feature table is read on its own, so only the features of the tables that missed the deadline are
+                served degraded.
+            partial_results (optional): return None for the features that missed the deadline instead of raising.
+
+        Return:
+            The joined feature values for the requested entities, ordered by the feature tables then by the feature
+            names of each table. For example, table_features = {'t1': ['f1', 'f2'], 't2': ['f3']} and keys = [12, 24]
+            returns {'12': [f1, f2, f3], '24': [f1, f2, f3]} in the "dict" format. The features served degraded are
+            listed in `degraded_features` of the result, see `multi_get_online_features`.
+        """
+        self._check_online_output_format(output_format)
+        table_requests, feature_names = self._build_table_requests(table_features, keys, key_mapping)
+        degraded = {}
+        table_results = self._fetch_online_features_of_tables(table_requests, deadline_ms, partial_results, degraded)
+        return self._with_degraded_features(
+            self._join_table_results(keys, table_results, feature_names, output_format, default_values,
+                                     ",".join(table_features)),
+            self._degraded_features(degraded, list(table_features.values())))
+
+    async def amulti_table_get_online_features(self, table_features: Dict[str, List[str]], keys: List[Any],
+                                               key_mapping: Dict[str, List[int]] = None, output_format: str = "dict",
+                                               default_values: Dict[str, Any] = None,
+                                               deadline_ms: Optional[float] = None, partial_results: bool = False):
+        """Asyncio version of `multi_table_get_online_features`."""
+        self._check_online_output_format(output_format)
+        table_requests, feature_names = self._build_table_requests(table_features, keys, key_mapping)
+        degraded = {}
+        table_results = await self._afetch_online_features_of_tables(table_requests, deadline_ms, partial_results,
+                                                                     degraded)
+        return self._with_degraded_features(
+            self._join_table_results(keys, table_results, feature_names, output_format, default_values,
+                                     ",".join(table_features)),
+            self._degraded_features(degraded, list(table_features.values())))
+
+    def _build_table_requests(self, table_features: Dict[str, List[str]], keys: List[Any], key_mapping: Dict[str, List[int]] = None):
+        key_mapping = key_mapping or {}
+        unknown_tables = set(key_mapping) - set(table_features)
+        if unknown_tables:
+            raise RuntimeError(f'Key mapping is set for feature tables {unknown_tables} that are not requested.')
+        feature_names = [name for names in table_features.values() for name in names]
+        if len(set(feature_names)) != len(feature_names):
+            raise RuntimeError(f'Feature names should be unique across the feature tables, but got {feature_names}.')
+        table_requests = []
+        for feature_table, table_feature_names in table_features.items():
+            table_keys = keys
+            if feature_table in key_mapping:
+                positions = key_mapping[feature_table]
+                table_keys = [key[positions[0]] if len(positions) == 1 else [key[p] for p in positions] for key in keys]
+            table_requests.append((feature_table, table_keys, table_feature_names))
+        return table_requests, feature_names
+
+    def _join_table_results(self, keys: List[Any], table_results: List[List[List[Any]]], feature_names: List[str],
+                            output_format: str, default_values: Dict[str, Any] = None, feature_table: str = None):
+        # Row i of the joined result is row i of every table, one after another
+        pipeline_result = [[value for table_row in rows for value in table_row] for rows in zip(*table_results)]
+        if output_format != "dict":
+            return self._to_columnar_result(keys, pipeline_result, feature_names, output_format, default_values,
+                                            feature_table)
+        return dict(zip(self._join_composite_keys(keys), self._decode_rows(feature_table, pipeline_result, feature_names)))
+
+    def multi_get_online_lookup_features(self, lookup_features: List[LookupFeature], keys: List[Any],
+                                         feature_tables: Dict[str, str]):
+        """Resolves lookup features for a list of keys at serving time, see `OnlineLookupFeatures`. The base features of
+        all the keys are fetched in one round trip, then the expansion features of all the de-duplicated expansion keys
+        in a second one, and the looked up values are aggregated with the aggregation of each lookup feature.
+
+        Args:
+            lookup_features: the lookup features to resolve.
+            keys: list of keys/composite keys for the entities, i.e. the keys of the base features.
+            feature_tables: feature name -> online feature table storing it, for all the base and expansion features.
+
+        Return:
+            The lookup feature values for the requested entities, ordered by the lookup features. For example,
+            {'12': [23.5, 3], '24': [None, 0]}. If no expansion value is found for a key, None is returned.
+        """
+        lookup = OnlineLookupFeatures(lookup_features, feature_tables)
+        base_requests = lookup.base_requests(keys)
+        base_values = self._decode_table_results(base_requests, self._fetch_online_features_of_tables(base_requests))
+        expansion_requests = lookup.expansion_requests(base_values)
+        expansion_values = self._decode_table_results(expansion_requests,
+                                                      self._fetch_online_features_of_tables(expansion_requests),
+                                                      by_key=True)
+        return dict(zip(self._join_composite_keys(keys), lookup.aggregate(base_values, expansion_values)))
+
+    async def amulti_get_online_lookup_features(self, lookup_features: List[LookupFeature], keys: List[Any],
+                                                feature_tables: Dict[str, str]):
+        """Asyncio version of `multi_get_online_lookup_features`."""
+        lookup = OnlineLookupFeatures(lookup_features, feature_tables)
+        base_requests = lookup.base_requests(keys)
+        base_values = self._decode_table_results(base_requests, await self._afetch_online_features_of_tables(base_requests))
+        expansion_requests = lookup.expansion_requests(base_values)
+        expansion_values = self._decode_table_results(expansion_requests,
+                                                      await self._afetch_online_features_of_tables(expansion_requests),
+                                                      by_key=True)
+        return dict(zip(self._join_composite_keys(keys), lookup.aggregate(base_values, expansion_values)))
+
+    def _decode_table_results(self, table_requests, table_results, by_key: bool = False) -> Dict[str, Any]:
+        """Decode the results of `_fetch_online_features_of_tables` into feature name -> decoded value of each key, or
+        feature name -> key -> decoded value if `by_key` is set."""
+        decoded = {}
+        for (feature_table, keys, feature_names), rows in zip(table_requests, table_results):
+            decoded_rows = self._decode_rows(feature_table, rows, feature_names)
+            for j, feature_name in enumerate(feature_names):
+                values = [row[j] for row in decoded_rows]
+                decoded.setdefault(feature_name, {} if by_key else [])
+                if by_key:
+                    decoded[feature_name].update(zip(keys, values))
+                else:
+                    decoded[feature_name] = values
+        return decoded
+
+    def enable_online_feature_cache(self,
+                                    max_size: int = 100000,
+                                    ttl_sec: float = 60,
+                                    table_ttl_sec: Dict[str, float] = None,
+                                    negative_ttl_sec: Optional[float] = None,
+                                    invalidate_on_keyspace_events: bool = False,
+                                    invalidation_tables: List[str] = None) -> OnlineFeatureCache:
+        """Put a bounded in-process cache in front of the online store. Once enabled, the online APIs only send the
+        (key, feature) pairs that are not cached to Redis.
+
+        Args:
+            max_size: maximum number of cached (key, feature name) entries, evicted in LRU order.
+            ttl_sec: default time to live of the cached values, in seconds.
+            table_ttl_sec (optional): feature table -> time to live in seconds, overriding `ttl_sec` for that table.
+            negative_ttl_sec (optional): time to live of cached missing values. Default to the TTL of the table, set it
+                to 0 to disable negative caching.
+            invalidate_on_keyspace_events: if True, drop cached values as soon as their Redis key changes, using Redis
+                keyspace notifications. `notify-keyspace-events` must be enabled on the server, e.g. "Khgxe". In Redis
+                Cluster mode, every primary node is subscribed to and must have it enabled.
+            invalidation_tables (optional): only listen to the keyspace notifications of these feature tables. Default
+                to all the keys.
+
+        Return:
+            The `OnlineFeatureCache`, which exposes hit/miss/eviction counters via `stats()`.
+        """
+        self.disable_online_feature_cache()
+        self.online_feature_cache = OnlineFeatureCache(max_size=max_size,
+                                                       ttl_sec=ttl_sec,
+                                                       table_ttl_sec=table_ttl_sec,
+                                                       negative_ttl_sec=negative_ttl_sec,
+                                                       key_separator=self._KEY_SEPARATOR)
+        if invalidate_on_keyspace_events:
+            self.online_feature_cache.start_keyspace_invalidation(self.redis_client, feature_tables=invalidation_tables)
+        return self.online_feature_cache
+
+    def disable_online_feature_cache(self):
+        """Remove the in-process cache in front of the online store, if any."""
+        if self.online_feature_cache is not None:
+            self.online_feature_cache.stop_keyspace_invalidation()
+        self.online_feature_cache = None
+
+    def enable_online_metrics(self, sink: Optional[MetricsSink] = None) -> MetricsSink:
+        """Record latency and volume metrics of the online reads, per feature table: Redis round trip time, client
+        side decode time, keys per call, number of values and missing values, and bytes read. Tail latency can then be
+        attributed to the store or to the decoding.
+
+        Args:
+            sink (optional): receives the metrics. Default to a `PrometheusMetricsSink`, whose `exposition()` renders
+                them in the Prometheus text format. Use a `CallbackMetricsSink` to forward them to another system.
+
+        Return:
+            The metrics sink.
+        """
+        self.online_metrics = sink if sink is not None else PrometheusMetricsSink()
+        return self.online_metrics
+
+    def disable_online_metrics(self):
+        """Stop recording the metrics of the online reads."""
+        self.online_metrics = None
+
+    def enable_online_hedging(self, replica_client=None, async_replica_client=None, percentile: float = 95.0,
+                              min_delay_ms: float = 1.0, initial_delay_ms: float = 5.0) -> HedgingPolicy:
+        """Hedge the online reads: a read that the primary hasn't answered within a delay is sent again to a replica,
+        and the first answer is used. The delay is the `percentile` of the recent primary latencies, so only the
+        slowest reads are hedged. Each feature table of a read is hedged on its own. Features read from a replica are
+        listed as "replica" in `degraded_features` of the results, since replicas may lag behind.
+
+        Args:
+            replica_client (optional): Redis client reading from a replica. Default, in Redis Cluster mode, to a
+                cluster client load balancing the reads over the primaries and replicas of each shard. Required
+                otherwise.
+            async_replica_client (optional): asyncio Redis client reading from a replica, used by the async APIs.
+                Async reads are not hedged if there is none.
+            percentile: percentile of the primary latencies used as hedging delay.
+            min_delay_ms: minimum hedging delay.
+            initial_delay_ms: hedging delay until enough primary latencies are recorded.
+
+        Return:
+            The `HedgingPolicy`, whose `stats()` give the number of hedged reads and of reads won by a replica.
+        """
+        if replica_client is None:
+            if not self.redis_cluster_enabled or not hasattr(self, "redis_host"):
+                raise RuntimeError("A replica client is required to hedge online reads, unless Redis Cluster is "
+                                   "configured as online store.")
+            password = self.env_config.get_from_env_or_akv(REDIS_PASSWORD)
+            ssl = self._str_to_bool(self.redis_ssl_enabled, "ssl_enabled")
+            replica_client = redis.cluster.RedisCluster(host=self.redis_host, port=self.redis_port, password=password,
+                                                        ssl=ssl, read_from_replicas=True)
+            if async_replica_client is None:
+                async_replica_client = redis.asyncio.cluster.RedisCluster(
+                    host=self.redis_host, port=self.redis_port, password=password, ssl=ssl, read_from_replicas=True)
+        self.online_hedging = HedgingPolicy(replica_client, async_replica_client, percentile=percentile,
+                                            min_delay_ms=min_delay_ms, initial_delay_ms=initial_delay_ms)
+        return self.online_hedging
+
+    def disable_online_hedging(self):
+        """Stop hedging the online reads."""
+        self.online_hedging = None
+
+    def _fetch_online_features(self, feature_table: str, keys: List[Any], feature_names: List[str],
+                               deadline_ms: Optional[float] = None, partial_results: bool = False,
+                               degraded: Dict[int, str] = None) -> List[List[Any]]:
+        """Fetch the raw (encoded) feature values of a batch of keys, one list per key ordered by feature_names.
+        Values are served from the online feature cache when enabled, only the misses are sent to Redis.
+        """
+        return self._fetch_online_features_of_tables([(feature_table, keys, feature_names)], deadline_ms,
+                                                     partial_results, degraded)[0]
+
+    async def _afetch_online_features(self, feature_table: str, keys: List[Any], feature_names: List[str],
+                                      deadline_ms: Optional[float] = None, partial_results: bool = False,
+                                      degraded: Dict[int, str] = None) -> List[List[Any]]:
+        """Asyncio version of `_fetch_online_features`."""
+        return (await self._afetch_online_features_of_tables([(feature_table, keys, feature_names)], deadline_ms,
+                                                             partial_results, degraded))[0]
+
+    def _fetch_online_features_of_tables(self, table_requests: List[Tuple[str, List[Any], List[str]]],
+                                         deadline_ms: Optional[float] = None, partial_results: bool = False,
+                                         degraded: Dict[int, str] = None) -> List[List[List[Any]]]:
+        """Fetch the raw feature values of several (feature table, keys, feature names), with the HMGETs of all the
+        tables sent together, see `_execute_hmgets`. Returns one `_fetch_online_features` result per table.
+
+        With a deadline or hedged reads, the HMGETs of each table are sent on their own instead, see
+        `_execute_hmgets_with_deadline`, and `degraded` is filled with the index of each table served degraded ->
+        "deadline" or "replica". Values of the tables that missed the deadline are None, and a `TimeoutError` is
+        raised unless `partial_results` is set.
+        """
+        plans, hmget_requests = self._plan_online_fetch(table_requests)
+        start = time.perf_counter()
+        served_by = {}
+        if not hmget_requests:
+            fetched = []
+        elif deadline_ms is None and self.online_hedging is None:
+            fetched = self._execute_hmgets(hmget_requests)
+        else:
+            slices, primaries, hedges = self._split_online_fetch(plans, hmget_requests, self._execute_hmgets,
+                                                                 self._execute_replica_hmgets)
+            outcomes = run_with_deadline(self._get_online_deadline_executor(), primaries,
+                                         deadline_ms / 1000 if deadline_ms is not None else None, self.online_hedging,
+                                         hedges)
+            fetched, served_by = self._merge_deadline_outcomes(hmget_requests, slices, outcomes)
+        redis_sec = time.perf_counter() - start if hmget_requests else None
+        return self._finish_online_fetch(table_requests, plans, fetched, served_by, redis_sec, deadline_ms,
+                                         partial_results, degraded)
+
+    async def _afetch_online_features_of_tables(self, table_requests: List[Tuple[str, List[Any], List[str]]],
+                                                deadline_ms: Optional[float] = None, partial_results: bool = False,
+                                                degraded: Dict[int, str] = None) -> List[List[List[Any]]]:
+        """Asyncio version of `_fetch_online_features_of_tables`. Reads are only hedged if the hedging policy has an
+        asyncio replica client."""
+        plans, hmget_requests = self._plan_online_fetch(table_requests)
+        start = time.perf_counter()
+        served_by = {}
+        hedging = self.online_hedging if self.online_hedging is not None and \
+            self.online_hedging.async_replica_client is not None else None
+        if not hmget_requests:
+            fetched = []
+        elif deadline_ms is None and hedging is None:
+            fetched = await self._aexecute_hmgets(hmget_requests)
+        else:
+            slices, primaries, hedges = self._split_online_fetch(plans, hmget_requests, self._aexecute_hmgets,
+                                                                 self._aexecute_replica_hmgets)
+            outcomes = await arun_with_deadline(primaries, deadline_ms / 1000 if deadline_ms is not None else None,
+                                                hedging, hedges)
+            fetched, served_by = self._merge_deadline_outcomes(hmget_requests, slices, outcomes)
+        redis_sec = time.perf_counter() - start if hmget_requests else None
+        return self._finish_online_fetch(table_requests, plans, fetched, served_by, redis_sec, deadline_ms,
+                                         partial_results, degraded)
+
+    def _split_online_fetch(self, plans, hmget_requests, execute, execute_replica):
+        """Split the HMGETs of a fetch into one read per feature table, and its hedged read to a replica."""
+        slices = []
+        offset = 0
+        for p, (_, redis_keys, _, values, misses, _) in enumerate(plans):
+            num_requests = len(redis_keys) if values is None else len(misses)
+            if num_requests:
+                slices.append((p, offset, offset + num_requests))
+            offset += num_requests
+        primaries = [functools.partial(execute, hmget_requests[begin:end]) for _, begin, end in slices]
+        hedges = [functools.partial(execute_replica, hmget_requests[begin:end]) for _, begin, end in slices]
+        return slices, primaries, hedges
+
+    def _merge_deadline_outcomes(self, hmget_requests, slices, outcomes):
+        fetched = [None] * len(hmget_requests)
+        served_by = {}
+        for (p, begin, end), (result, how) in zip(slices, outcomes):
+            served_by[p] = how
+            if how == MISSED_DEADLINE:
+                result = [[None] * len(feature_names) for _, feature_names in hmget_requests[begin:end]]
+            fetched[begin:end] = result
+        return fetched, served_by
+
+    def _finish_online_fetch(self, table_requests, plans, fetched, served_by: Dict[int, str], redis_sec: Optional[float],
+                             deadline_ms: Optional[float], partial_results: bool, degraded: Dict[int, str] = None):
+        missed = [table_requests[p][0] for p, how in served_by.items() if how == MISSED_DEADLINE]
+        if missed and not partial_results:
+            if self.online_metrics is not None:
+                self._record_online_fetch_metrics(table_requests, None, redis_sec, served_by)
+            raise TimeoutError(f"Online read of feature tables {missed} missed the deadline of {deadline_ms} ms.")
+        results = self._merge_online_fetch(plans, fetched, served_by)
+        if degraded is not None:
+            degraded.update((p, how) for p, how in served_by.items() if how != SERVED_BY_PRIMARY)
+        if self.online_metrics is not None:
+            self._record_online_fetch_metrics(table_requests, results, redis_sec, served_by)
+        return results
+
+    def _record_online_fetch_metrics(self, table_requests, results, redis_sec: Optional[float],
+                                     served_by: Dict[int, str] = None):
+        """Record the metrics of a fetch. The Redis round trip is shared by all the tables of the fetch, and is not
+        recorded if everything was served from the online feature cache. Only the deadline misses are recorded if the
+        fetch failed with a missed deadline, i.e. `results` is None."""
+        metrics = self.online_metrics
+        served_by = served_by or {}
+        for p, (feature_table, keys, feature_names) in enumerate(table_requests):
+            if served_by.get(p) == MISSED_DEADLINE:
+                metrics.increment("feathr_online_deadline_misses_total", feature_table, 1)
+            elif served_by.get(p, SERVED_BY_PRIMARY) != SERVED_BY_PRIMARY:
+                metrics.increment("feathr_online_replica_reads_total", feature_table, 1)
+            if results is None:
+                continue
+            rows = results[p]
+            if redis_sec is not None:
+                metrics.observe("feathr_online_redis_seconds", feature_table, redis_sec)
+            metrics.observe("feathr_online_keys_per_call", feature_table, len(keys))
+            present = [value for row in rows for value in row if value is not None]
+            metrics.increment("feathr_online_values_total", feature_table, len(keys) * len(feature_names))
+            metrics.increment("feathr_online_missing_values_total", feature_table,
+                              len(keys) * len(feature_names) - len(present))
+            metrics.increment("feathr_online_bytes_read_total", feature_table, sum(len(value) for value in present))
+
+    def _plan_online_fetch(self, table_requests):
+        """Look up the online feature cache, and list the HMGETs needed for whatever is not cached."""
+        plans = []
+        hmget_requests = []
+        for feature_table, keys, feature_names in table_requests:
+            redis_keys = [self._construct_redis_key(feature_table, key) for key in keys]
+            if self.online_feature_cache is None:
+                values, misses, generation = None, None, None
+                hmget_requests.extend((redis_key, feature_names) for redis_key in redis_keys)
+            else:
+                # Read before the fetch, so values of keys written in the meantime are not cached
+                generation = self.online_feature_cache.generation()
+                values, misses = self.online_feature_cache.get_many(redis_keys, feature_names)
+                hmget_requests.extend((redis_keys[i], [feature_names[j] for j in js]) for i, js in misses)
+            plans.append((feature_table, redis_keys, feature_names, values, misses, generation))
+        return plans, hmget_requests
+
+    def _merge_online_fetch(self, plans, fetched, served_by: Dict[int, str] = None):
+        results = []
+        offset = 0
+        for p, (feature_table, redis_keys, feature_names, values, misses, generation) in enumerate(plans):
+            if values is None:
+                results.append(fetched[offset:offset + len(redis_keys)])
+                offset += len(redis_keys)
+                continue
+            if misses:
+                # Values of a table that missed the deadline are unknown, so they're not cached as missing
+                self._merge_cache_misses(feature_table, redis_keys, feature_names, values, misses,
+                                         fetched[offset:offset + len(misses)],
+                                         cache=(served_by or {}).get(p) != MISSED_DEADLINE, generation=generation)
+                offset += len(misses)
+            results.append(values)
+        return results
+
+    def _merge_cache_misses(self, feature_table, redis_keys, feature_names, values, misses, fetched, cache: bool = True,
+                            generation: Optional[int] = None):
+        entries = []
+        for (i, js), fetched_values in zip(misses, fetched):
+            for j, value in zip(js, fetched_values):
+                values[i][j] = value
+                entries.append((redis_keys[i], feature_names[j], value))
+        if cache:
+            self.online_feature_cache.put_many(feature_table, entries, generation)
+
+    def _execute_hmgets(self, requests: List[Tuple[str, List[str]]]) -> List[List[Any]]:
+        """Run a batch of HMGET (redis key, feature names) requests, in pipelines of at most
+        `redis_max_keys_per_pipeline` keys. In Redis Cluster mode, there is at least one pipeline per shard."""
+        return execute_hmgets(self.redis_client, requests, self.redis_cluster_enabled, self._redis_pipeline_executor,
+                              self.redis_max_keys_per_pipeline)
+
+    async def _aexecute_hmgets(self, requests: List[Tuple[str, List[str]]]) -> List[List[Any]]:
+        """Asyncio version of `_execute_hmgets`."""
+        return await aexecute_hmgets(self.async_redis_client, requests, self.redis_max_keys_per_pipeline,
+                                     self.redis_pipeline_concurrency)
+
+    def _execute_replica_hmgets(self, requests: List[Tuple[str, List[str]]]) -> List[List[Any]]:
+        """Hedged version of `_execute_hmgets`, reading from the replica client of `online_hedging`."""
+        return execute_hmgets(self.online_hedging.replica_client, requests, self.redis_cluster_enabled,
+                              self._redis_pipeline_executor, self.redis_max_keys_per_pipeline)
+
+    async def _aexecute_replica_hmgets(self, requests: List[Tuple[str, List[str]]]) -> List[List[Any]]:
+        return await aexecute_hmgets(self.online_hedging.async_replica_client, requests,
+                                     self.redis_max_keys_per_pipeline, self.redis_pipeline_concurrency)
+
+    def _get_online_deadline_executor(self) -> ThreadPoolExecutor:
+        if self._online_deadline_executor is None:
+            # Reads that missed their deadline keep a thread until they're done, hence more threads than the pipelines
+            self._online_deadline_executor = ThreadPoolExecutor(
+                max_workers=4 * (self.redis_pipeline_concurrency or 8), thread_name_prefix="feathr-redis-deadline")
+        return self._online_deadline_executor
+
+    def _degraded_features(self, degraded: Dict[int, str], table_feature_names: List[List[str]]) -> Dict[str, str]:
+        """Expand the degraded tables of a fetch into feature name -> why it was served degraded."""
+        return {name: how for p, how in degraded.items() for name in table_feature_names[p]}
+
+    def _with_degraded_features(self, result, degraded_features: Dict[str, str]):
+        """Attach the features served degraded to a result of the online APIs, in any output format."""
+        if isinstance(result, dict):
+            return OnlineFeatureDict(result, degraded_features)
+        if isinstance(result, OnlineFeatureColumns):
+            result.degraded_features = degraded_features
+            return result
+        if degraded_features:
+            metadata = {**(result.schema.metadata or {}), b"feathr.degraded_features": json.dumps(degraded_features)}
+            return result.replace_schema_metadata(metadata)
+        return result
+
+    def _check_online_output_format(self, output_format: str):
+        if output_format not in {"dict", "numpy", "arrow"}:
+            raise RuntimeError(f'{output_format} is not supported. Only \'dict\', \'numpy\' and \'arrow\' are currently supported.')
+
+    def _to_columnar_result(self, keys: List[Any], pipeline_result: List[List[Any]], feature_names: List[str],
+                            output_format: str, default_values: Dict[str, Any] = None, feature_table: str = None):
+        """Decode a whole pipeline result into per-feature columns, see `OnlineFeatureColumns`. Unexpected values are
+        counted in the decode plan of the requested features, as with `_decode_rows`."""
+        plan = self._online_decode_plan(feature_names)
+        start = time.perf_counter()
+        num_type_mismatches = plan.num_type_mismatches
+        columns = decode_columns(self._join_composite_keys(keys), pipeline_result, feature_names, default_values, plan)
+        if self.online_metrics is not None:
+            self.online_metrics.observe("feathr_online_decode_seconds", feature_table, time.perf_counter() - start)
+            if plan.num_type_mismatches != num_type_mismatches:
+                self.online_metrics.increment("feathr_online_type_mismatches_total", feature_table,
+                                              plan.num_type_mismatches - num_type_mismatches)
+        return columns if output_format == "numpy" else columns.to_arrow()
+
+    def _get_online_derived_features(self, derived_features) -> Optional[OnlineDerivedFeatures]:
+        """Compile the derived features evaluated at serving time, once per distinct list of derived features."""
+        if not derived_features or isinstance(derived_features, OnlineDerivedFeatures):
+            return derived_features or None
+        signature = tuple((f.name, str(getattr(f.transform, 'expr', f.transform)), tuple(i.name for i in f.input_features))
+                          for f in derived_features)
+        derived = self._online_derived_features.get(signature)
+        if derived is None:
+            derived = self._online_derived_features[signature] = OnlineDerivedFeatures(derived_features)
+        return derived
+
+    def _evaluate_online_derived_features(self, derived: OnlineDerivedFeatures, feature_table: str, keys: List[Any],
+                                          pipeline_result: List[List[Any]], fetched_names: List[str],
+                                          feature_names: List[str], output_format: str,
+                                          default_values: Dict[str, Any] = None):
+        """Evaluate the requested derived features from the fetched values of their inputs, and return the requested
+        features in the given output format."""
+        if output_format != "dict":
+            fetched = self._to_columnar_result(keys, pipeline_result, fetched_names, "numpy", default_values, feature_table)
+            columns = derived.evaluate_columns(fetched, feature_names, default_values)
+            return columns if output_format == "numpy" else columns.to_arrow()
+        decoded_rows = self._decode_rows(feature_table, pipeline_result, fetched_names)
+        rows = derived.evaluate_rows(decoded_rows, fetched_names, feature_names)
+        return dict(zip(self._join_composite_keys(keys), rows))
+
+    def _decode_rows(self, feature_table: str, pipeline_result: List[List[Any]], feature_names: List[str]) -> List[List[Any]]:
+        """Decode the raw values of a batch of keys with the decode plan of the requested features, timing the whole
+        batch if metrics are enabled."""
+        plan = self._online_decode_plan(feature_names)
+        if self.online_metrics is None:
+            return plan.decode_rows(pipeline_result)
+        start = time.perf_counter()
+        num_type_mismatches = plan.num_type_mismatches
+        decoded = plan.decode_rows(pipeline_result)
+        self.online_metrics.observe("feathr_online_decode_seconds", feature_table, time.perf_counter() - start)
+        if plan.num_type_mismatches != num_type_mismatches:
+            self.online_metrics.increment("feathr_online_type_mismatches_total", feature_table,
+                                          plan.num_type_mismatches - num_type_mismatches)
+        return decoded
+
+    def _online_decode_plan(self, feature_names: List[str]) -> OnlineDecodePlan:
+        plan_key = tuple(feature_names)
+        with self._online_decode_plans_lock:
+            plan = self._online_decode_plans.get(plan_key)
+            if plan is not None:
+                self._online_decode_plans.move_to_end(plan_key)
+                return plan
+        if self._online_feature_types is None:
+            self.load_online_feature_types()
+        plan = OnlineDecodePlan(feature_names, self._online_feature_types)
+        with self._online_decode_plans_lock:
+            plan = self._online_decode_plans.setdefault(plan_key, plan)
+            while len(self._online_decode_plans) > self.online_decode_plans_max_size:
+                # The counters of the evicted plans are kept for `get_online_decode_stats`
+                _, evicted = self._online_decode_plans.popitem(last=False)
+                evicted.add_stats_to(self._evicted_online_decode_stats)
+        return plan
+
+    def _reset_online_decode_plans(self):
+        with self._online_decode_plans_lock:
+            self._online_decode_plans = OrderedDict()
+            self._evicted_online_decode_stats = {"type_mismatches": {}, "unknown_values": {}}
+
+    def load_online_feature_types(self, from_registry: bool = False) -> Dict[str, FeatureType]:
+        """Load the declared types of the features read online, used to decode the online values with one type check
+        per value (see `OnlineDecodePlan`). They're loaded from the built features (`build_features` or
+        `get_features_from_registry`) on the first online read, or from the registry of the project if
+        `from_registry` is set, e.g. in a serving process that doesn't build the features.
+
+        Return:
+            Feature name -> declared FeatureType.
         """
-        with self.redis_client.pipeline() as redis_pipeline:
-            for key in keys:
-                redis_key = self._construct_redis_key(feature_table, key)
-                redis_pipeline.hmget(redis_key, *feature_names)
-            pipeline_result = redis_pipeline.execute()
-
-        decoded_pipeline_result = []
-        for feature_list in pipeline_result:
-            decoded_pipeline_result.append(self._decode_proto(feature_list))
-        for i in range(len(keys)):
-            if isinstance(keys[i], List):
-                keys[i] = self._COMPOSITE_KEY_SEPARATOR.join(keys[i])
-        return dict(zip(keys, decoded_pipeline_result))
+        if from_registry:
+            anchor_list, derived_feature_list = self.registry.get_features_from_registry(self.project_name)
+        else:
+            anchor_list = getattr(self, "anchor_list", [])
+            derived_feature_list = getattr(self, "derived_feature_list", [])
+        features = [feature for anchor in anchor_list for feature in anchor.features] + list(derived_feature_list)
+        self._online_feature_types = {feature.name: feature.feature_type for feature in features}
+        self._reset_online_decode_plans()
+        return self._online_feature_types
+
+    def get_online_decode_stats(self) -> Dict[str, Dict[str, int]]:
+        """Get the number of online values that didn't match the declared type of their feature, and of values of a
+        type unknown to this client version, e.g. {"type_mismatches": {"f_trips": 3}, "unknown_values": {}}."""
+        with self._online_decode_plans_lock:
+            stats = copy.deepcopy(self._evicted_online_decode_stats)
+            plans = list(self._online_decode_plans.values())
+        for plan in plans:
+            plan.add_stats_to(stats)
+        return stats
 
     def _decode_proto(self, feature_list):
-        """Decode the bytes(in string form) via base64 decoder. For dense array, it will be returned as Python List.
+        """Decode the raw values, either base64 encoded or raw FeatureValue messages (see `push_online_features`),
+        without declared types. For dense array, it will be returned as Python List.
         For sparse array, it will be returned as tuple of index array and value array. The order of elements in the
-        arrays won't be changed.
+        arrays won't be changed. Values of a type unknown to this client version are decoded as None.
         """
-        typed_result = []
-        for raw_feature in feature_list:
-            if raw_feature:
-                feature_value = FeatureValue()
-                decoded = base64.b64decode(raw_feature)
-                feature_value.ParseFromString(decoded)
-                if feature_value.WhichOneof('FeatureValueOneOf') == 'boolean_value':
-                    typed_result.append(feature_value.boolean_value)
-                elif feature_value.WhichOneof('FeatureValueOneOf') == 'string_value':
-                    typed_result.append(feature_value.string_value)
-                elif feature_value.WhichOneof('FeatureValueOneOf') == 'float_value':
-                    typed_result.append(feature_value.float_value)
-                elif feature_value.WhichOneof('FeatureValueOneOf') == 'double_value':
-                    typed_result.append(feature_value.double_value)
-                elif feature_value.WhichOneof('FeatureValueOneOf') == 'int_value':
-                    typed_result.append(feature_value.int_value)
-                elif feature_value.WhichOneof('FeatureValueOneOf') == 'long_value':
-                    typed_result.append(feature_value.long_value)
-                elif feature_value.WhichOneof('FeatureValueOneOf') == 'int_array':
-                    typed_result.append(feature_value.int_array.integers)
-                elif feature_value.WhichOneof('FeatureValueOneOf') == 'string_array':
-                    typed_result.append(feature_value.string_array.strings)
-                elif feature_value.WhichOneof('FeatureValueOneOf') == 'float_array':
-                    typed_result.append(feature_value.float_array.floats)
-                elif feature_value.WhichOneof('FeatureValueOneOf') == 'double_array':
-                    typed_result.append(feature_value.double_array.doubles)
-                elif feature_value.WhichOneof('FeatureValueOneOf') == 'boolean_array':
-                    typed_result.append(feature_value.boolean_array.booleans)
-                elif feature_value.WhichOneof('FeatureValueOneOf') == 'sparse_string_array':
-                    typed_result.append((feature_value.sparse_string_array.index_integers, feature_value.sparse_string_array.value_strings))
-                elif feature_value.WhichOneof('FeatureValueOneOf') == 'sparse_bool_array':
-                    typed_result.append((feature_value.sparse_bool_array.index_integers, feature_value.sparse_bool_array.value_booleans))
-                elif feature_value.WhichOneof('FeatureValueOneOf') == 'sparse_float_array':
-                    typed_result.append((feature_value.sparse_float_array.index_integers, feature_value.sparse_float_array.value_floats))
-                elif feature_value.WhichOneof('FeatureValueOneOf') == 'sparse_double_array':
-                    typed_result.append((feature_value.sparse_double_array.index_integers, feature_value.sparse_double_array.value_doubles))
-                elif feature_value.WhichOneof('FeatureValueOneOf') == 'sparse_long_array':
-                    typed_result.append((feature_value.sparse_long_array.index_integers, feature_value.sparse_long_array.value_longs))
-                else:
-                    self.logger.debug("Fail to load the feature type. Maybe a new type that is not supported by this "
-                                      "client version")
-                    self.logger.debug(f"The raw feature is {raw_feature}.")
-                    self.logger.debug(f"The loaded feature is {feature_value}")
-                    typed_result.append(None)
+        return [decode_feature_value(FeatureValue.FromString(serialized_feature_value(raw_feature))) if raw_feature
+                else raw_feature for raw_feature in feature_list]
+
+    def push_online_features(self,
+                             feature_table: str,
+                             df: pd.DataFrame,
+                             key_columns: List[str],
+                             feature_types: Optional[Dict[str, FeatureType]] = None,
+                             ttl_sec: Optional[Union[float, str]] = None,
+                             max_keys_per_pipeline: Optional[int] = None,
+                             concurrency: int = 4,
+                             value_encoding: str = "base64") -> int:
+        """Write feature values from a pandas DataFrame directly into the online store, without a Spark
+        `materialize_features` job. Meant for small feature tables, e.g. a few million rows.
+
+        Values are encoded into the same FeatureValue protobuf layout as the Spark Redis sink, one column at a
+        time (numeric scalars are encoded with numpy, without building protobuf messages), and written with pipelined
+        HSET in chunks of `max_keys_per_pipeline` keys, `concurrency` chunks at a time over pooled connections.
+
+        Args:
+            feature_table: the name of the feature table.
+            df: one row per entity, with the key columns and the feature columns.
+            key_columns: key columns, in the order of the composite keys used at lookup time.
+            feature_types (optional): feature name -> FeatureType. Only these features are written if it's set, all
+                the other columns otherwise, with their type inferred from the column like the Spark Redis sink does.
+            ttl_sec (optional): time to live of the written keys in seconds, either one value for all the keys or the
+                name of a column holding the TTL of each key (null for no TTL).
+            max_keys_per_pipeline (optional): default to `redis_max_keys_per_pipeline`.
+            concurrency: number of chunks written in parallel, if no pipeline executor is configured for the client.
+            value_encoding: "base64" (default) to base64 encode the messages like the Spark Redis sink, or "raw" to
+                store them as raw bytes, which takes less memory and network and skips the base64 decoding on read.
+                Readers detect the encoding of each value, so a table can be migrated by pushing it again.
+
+        Return:
+            The number of written keys. Missing values (None or NaN) are not written, and rows without any value are
+            skipped.
+        """
+        if value_encoding not in VALUE_ENCODINGS:
+            raise RuntimeError(f"Unsupported value encoding {value_encoding}, should be one of {list(VALUE_ENCODINGS)}.")
+        missing_columns = [column for column in key_columns if column not in df.columns]
+        if missing_columns:
+            raise RuntimeError(f"Key columns {missing_columns} are not in the DataFrame.")
+        ttl_column = ttl_sec if isinstance(ttl_sec, str) else None
+        if ttl_column is not None and ttl_column not in df.columns:
+            raise RuntimeError(f"TTL column {ttl_column} is not in the DataFrame.")
+        if feature_types:
+            feature_names = list(feature_types)
+        else:
+            feature_names = [column for column in df.columns if column not in key_columns and column != ttl_column]
+        missing_columns = [name for name in feature_names if name not in df.columns]
+        if missing_columns:
+            raise RuntimeError(f"Features {missing_columns} are not in the DataFrame.")
+
+        encoded_columns = []
+        for feature_name in feature_names:
+            column = df[feature_name]
+            if feature_types:
+                which = oneof_field_of_feature_type(feature_types[feature_name])
             else:
-                typed_result.append(raw_feature)
-        return typed_result
+                which = infer_oneof_field(column.to_numpy(), column.dtype)
+            if which is None:
+                continue
+            encoded_columns.append((feature_name, encode_column(column.to_numpy(), which, column.isna().to_numpy(),
+                                                                 value_encoding)))
+
+        keys = [self._COMPOSITE_KEY_SEPARATOR.join(str(v) for v in row) for row in zip(*(df[c] for c in key_columns))]
+        if ttl_column is not None:
+            ttls = [None if pd.isna(ttl) else float(ttl) for ttl in df[ttl_column]]
+        else:
+            ttls = [ttl_sec] * len(keys)
+        requests = []
+        for i, key in enumerate(keys):
+            mapping = {feature_name: encoded[i] for feature_name, encoded in encoded_columns if encoded[i] is not None}
+            if mapping:
+                requests.append((self._construct_redis_key(feature_table, key), mapping, ttls[i]))
+        if not requests:
+            return 0
+
+        executor = self._redis_pipeline_executor
+        own_executor = executor is None and concurrency > 1
+        if own_executor:
+            executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="feathr-redis-push")
+        try:
+            written = execute_hsets(self.redis_client, requests, self.redis_cluster_enabled, executor,
+                                    max_keys_per_pipeline or self.redis_max_keys_per_pipeline)
+        finally:
+            if own_executor:
+                executor.shutdown()
+        if self.online_feature_cache is not None:
+            for redis_key, _, _ in requests:
+                self.online_feature_cache.invalidate(redis_key)
+        logger.info(f"{written} keys written to online feature table {feature_table}.")
+        return written
+
+    def analyze_online_store(self, feature_tables: List[str], sample_size: int = 1000,
+                             scan_count: int = 1000) -> OnlineStoreReport:
+        """Analyze the memory and key space used by feature tables in the online store, e.g. to size the Redis
+        cluster or find bloated features. See `OnlineStoreAnalyzer`.
+
+        The keys of each table are counted with SCAN (every shard in Redis Cluster mode), tables and shards in parallel,
+        and up to `sample_size` of them, sampled uniformly, are inspected with `MEMORY USAGE`, `HGETALL` and `TTL` to estimate the memory used by
+        the table, the number of fields per key, the value size histogram of each feature and the TTL distribution.
+
+        Args:
+            feature_tables: the feature tables to analyze.
+            sample_size: maximum number of keys inspected per feature table.
+            scan_count: COUNT hint of each SCAN call.
+
+        Return:
+            An `OnlineStoreReport`. Use `to_dict()` for a JSON serializable report, or `format()` for a readable one.
+        """
+        analyzer = OnlineStoreAnalyzer(self.redis_client,
+                                       cluster_enabled=self.redis_cluster_enabled,
+                                       sample_size=sample_size,
+                                       scan_count=scan_count,
+                                       key_separator=self._KEY_SEPARATOR)
+        return analyzer.analyze(feature_tables)
 
     def delete_feature_from_redis(self, feature_table, key, feature_name) -> None:
         """
@@ -443,12 +1252,90 @@ class FeathrClient(object):
         """
 
         redis_key = self._construct_redis_key(feature_table, key)
-        if self.redis_client.hexists(redis_key, feature_name):
-            self.redis_client.delete(redis_key, feature_name)
+        # HDEL only removes the field, the other features of the key are kept
+        if self.redis_client.hdel(redis_key, feature_name):
+            if self.online_feature_cache is not None:
+                self.online_feature_cache.invalidate(redis_key, feature_name)
             print(f'Deletion successful. {feature_name} is deleted from Redis.')
         else:
             raise RuntimeError(f'Deletion failed. {feature_name} not found in Redis.')
 
+    def drop_online_feature_table(self,
+                                  feature_table: str,
+                                  max_concurrency: int = 4,
+                                  batch_size: int = 1000,
+                                  progress_callback: Optional[Callable[[BulkOperationReport], None]] = None
+                                  ) -> BulkOperationReport:
+        """Delete all the keys of a feature table from the online store.
+
+        Keys are listed with SCAN and unlinked in pipelined batches of about `batch_size` keys, at most
+        `max_concurrency` batches at a time. UNLINK frees the memory in the background, so Redis is never blocked by a
+        long command, even for huge tables.
+
+        Args:
+            feature_table: the name of the feature table.
+            max_concurrency: maximum number of batches in flight.
+            batch_size: approximate number of keys per batch, i.e. the COUNT hint of SCAN.
+            progress_callback (optional): called with the `BulkOperationReport` after each batch.
+
+        Return:
+            A `BulkOperationReport`, with the number of deleted keys in `affected_keys`.
+        """
+        report = self._run_bulk_operation(feature_table, "drop_table", unlink_command, max_concurrency, batch_size,
+                                          progress_callback)
+        if self.online_feature_cache is not None:
+            self.online_feature_cache.invalidate_table(feature_table)
+        return report
+
+    def drop_online_features(self,
+                             feature_table: str,
+                             feature_names: List[str],
+                             max_concurrency: int = 4,
+                             batch_size: int = 1000,
+                             progress_callback: Optional[Callable[[BulkOperationReport], None]] = None
+                             ) -> BulkOperationReport:
+        """Delete some features from all the keys of a feature table, e.g. to retire a feature. The other features of
+        the keys are kept, and keys left without any feature are removed by Redis.
+
+        Runs pipelined batches of HDEL the same way as `drop_online_feature_table`.
+
+        Return:
+            A `BulkOperationReport`, with the number of keys that had at least one of the features in `affected_keys`.
+        """
+        if not feature_names:
+            raise RuntimeError("At least one feature name should be given.")
+        report = self._run_bulk_operation(feature_table, "drop_features", hdel_command(feature_names), max_concurrency,
+                                          batch_size, progress_callback)
+        if self.online_feature_cache is not None:
+            self.online_feature_cache.invalidate_table(feature_table)
+        return report
+
+    def expire_online_feature_table(self,
+                                    feature_table: str,
+                                    ttl_sec: Optional[float],
+                                    max_concurrency: int = 4,
+                                    batch_size: int = 1000,
+                                    progress_callback: Optional[Callable[[BulkOperationReport], None]] = None
+                                    ) -> BulkOperationReport:
+        """Set the time to live of all the keys of a feature table, or remove it if `ttl_sec` is None.
+
+        Runs pipelined batches of EXPIRE (or PERSIST) the same way as `drop_online_feature_table`.
+
+        Return:
+            A `BulkOperationReport`, with the number of keys whose TTL was changed in `affected_keys`.
+        """
+        return self._run_bulk_operation(feature_table, "expire_table", expire_command(ttl_sec), max_concurrency,
+                                        batch_size, progress_callback)
+
+    def _run_bulk_operation(self, feature_table: str, operation: str, add_command, max_concurrency: int,
+                            batch_size: int, progress_callback) -> BulkOperationReport:
+        return run_bulk_operation(self.redis_client, feature_table, operation, add_command,
+                                  cluster_enabled=self.redis_cluster_enabled,
+                                  max_concurrency=max_concurrency,
+                                  scan_count=batch_size,
+                                  key_separator=self._KEY_SEPARATOR,
+                                  progress_callback=progress_callback)
+
     def _clean_test_data(self, feature_table):
         """
         WARNING: THIS IS ONLY USED FOR TESTING
@@ -458,18 +1345,18 @@ class FeathrClient(object):
         Args:
           feature_table: str, feature_table i.e your prefix before the separator in the Redis database.
         """
-        cursor = '0'
-        ns_keys = feature_table + '*'
-        while cursor != 0:
-            # 5000 count at a scan seems reasonable faster for our testing data
-            cursor, keys = self.redis_client.scan(
-                cursor=cursor, match=ns_keys, count=5000)
-            if keys:
-                self.redis_client.delete(*keys)
+        # 5000 count at a scan seems reasonable faster for our testing data
+        self.drop_online_feature_table(feature_table, batch_size=5000)
+
+    def _join_composite_keys(self, keys: List[Any]) -> List[Any]:
+        """Join composite keys into the keys of the online results, without modifying the caller's list."""
+        return [self._COMPOSITE_KEY_SEPARATOR.join(key) if isinstance(key, List) else key for key in keys]
 
     def _construct_redis_key(self, feature_table, key):
         if isinstance(key, List):
             key = self._COMPOSITE_KEY_SEPARATOR.join(key)
+        if self.redis_hash_tag_enabled:
+            key = hash_tag(key)
         return feature_table + self._KEY_SEPARATOR + key
 
     def _str_to_bool(self, s: str, variable_name = None):
@@ -491,11 +1378,52 @@ class FeathrClient(object):
         host = self.redis_host
         port = self.redis_port
         ssl_enabled = self.redis_ssl_enabled
-        self.redis_client = redis.Redis(
-            host=host,
-            port=port,
-            password=password,
-            ssl=self._str_to_bool(ssl_enabled, "ssl_enabled"))
+        ssl = self._str_to_bool(ssl_enabled, "ssl_enabled")
+        max_connections = int(self.redis_max_connections) if self.redis_max_connections else None
+        # Pipelines are sent in parallel if there are more than one, see `_execute_hmgets`. By default, only the
+        # pipelines of different cluster shards are.
+        self._redis_pipeline_executor = None
+        if self.redis_pipeline_concurrency is not None and self.redis_pipeline_concurrency > 1:
+            # Each pipeline holds a pooled connection while it runs, so don't run more than the pool can hold
+            self._redis_pipeline_executor = ThreadPoolExecutor(
+                max_workers=min(self.redis_pipeline_concurrency, max_connections or self.redis_pipeline_concurrency),
+                thread_name_prefix="feathr-redis")
+        if self.redis_cluster_enabled:
+            cluster_pool_kwargs = {'max_connections': max_connections} if max_connections else {}
+            # The cluster clients discover all the shards from the configured host, and keep one connection pool per
+            # node. Reads are load balanced over the replicas of a shard when read_from_replicas is enabled.
+            self.redis_client = redis.cluster.RedisCluster(
+                host=host,
+                port=port,
+                password=password,
+                ssl=ssl,
+                read_from_replicas=self.redis_read_from_replicas,
+                **cluster_pool_kwargs)
+            self.async_redis_client = redis.asyncio.cluster.RedisCluster(
+                host=host,
+                port=port,
+                password=password,
+                ssl=ssl,
+                read_from_replicas=self.redis_read_from_replicas,
+                **cluster_pool_kwargs)
+            if self.redis_pipeline_concurrency is None:
+                self._redis_pipeline_executor = ThreadPoolExecutor(
+                    max_workers=max_connections or None, thread_name_prefix="feathr-redis")
+        else:
+            self.redis_client = redis.Redis(
+                host=host,
+                port=port,
+                password=password,
+                ssl=ssl,
+                max_connections=max_connections)
+            # The asyncio client keeps its own connection pool. Connections are opened lazily on first use, within
+            # whichever event loop awaits the online APIs.
+            self.async_redis_client = redis.asyncio.Redis(
+                host=host,
+                port=port,
+                password=password,
+                ssl=ssl,
+                max_connections=max_connections)
         self.logger.info('Redis connection is successful and completed.')
 
     def get_offline_features(self,
@@ -516,6 +1444,12 @@ class FeathrClient(object):
             execution_configurations: a dict that will be passed to spark job when the job starts up, i.e. the "spark configurations". Note that not all of the configuration will be honored since some of the configurations are managed by the Spark platform, such as Databricks or Azure Synapse. Refer to the [spark documentation](https://spark.apache.org/docs/latest/configuration.html) for a complete list of spark configurations.
             config_file_name: the name of the config file that will be passed to the spark job. The config file is used to configure the spark job. The default value is "feature_join_conf/feature_join.conf".
             dataset_column_names: column names of observation data set. Will be used to check conflicts with feature names if cannot get real column names from observation data set.
+
+        Returns:
+            FeathrJob: handle of the submitted job, e.g. to wait for it while other jobs run. With the `local_pandas`
+                Spark runtime, features are joined in process with pandas instead, and the returned job is already
+                completed, with the joined pandas DataFrame in its `result`. See `_PandasFeatureJoiner` for the
+                supported features and sources.
         """
         feature_queries = feature_query if isinstance(feature_query, List) else [feature_query]
         feature_names = []
@@ -523,6 +1457,10 @@ class FeathrClient(object):
             for feature_name in feature_query.feature_list:
                 feature_names.append(feature_name)
         print("------------", feature_names);
+
+        if self.spark_runtime == 'local_pandas':
+            return self._get_offline_features_with_pandas(observation_settings, feature_queries, output_path,
+                                                          execution_configurations, verbose)
         
         if len(feature_names) > 0 and observation_settings.conflicts_auto_correction is None:
             import feathr.utils.job_utils as job_utils
@@ -568,11 +1506,55 @@ class FeathrClient(object):
             FeaturePrinter.pretty_print_feature_query(feature_query)
 
         write_to_file(content=config, full_file_name=config_file_path)
+        execution_configurations = self._with_local_spark_connectors(
+            execution_configurations,
+            sinks=[output_path] if isinstance(output_path, Sink) else [],
+            paths=[observation_settings.observation_path] + ([output_path] if isinstance(output_path, str) else []))
         return self._get_offline_features_with_config(config_file_path,
                                                       output_path=output_path,
                                                       execution_configurations=execution_configurations,
                                                       udf_files=udf_files)
 
+    def _with_local_spark_connectors(self,
+                                     execution_configurations: Dict[str, str],
+                                     sinks: List[Sink] = [],
+                                     paths: List[str] = []) -> Dict[str, str]:
+        """Set the connectors used by the sources, sinks and paths of a local Spark job, so that it only gets the Maven
+        packages of Feathr core and of these connectors instead of all the connectors. Packages set by the user in
+        `spark.jars.packages` are added to them by the launcher.
+        """
+        if self.spark_runtime != 'local' or CONNECTORS_CONF in (execution_configurations or {}):
+            return execution_configurations
+        connectors = required_connectors(getattr(self, 'anchor_list', []), sinks, paths)
+        return {**(execution_configurations or {}), CONNECTORS_CONF: ",".join(sorted(connectors))}
+
+    def _get_offline_features_with_pandas(self,
+                                          observation_settings: ObservationSettings,
+                                          feature_queries: List[FeatureQuery],
+                                          output_path: Union[str, Sink],
+                                          execution_configurations: Dict[str, str] = {},
+                                          verbose: bool = False) -> FeathrJob:
+        """Joins the features to the observation dataset in process, for the `local_pandas` Spark runtime. Name
+        conflicts between features and observation columns are checked on the loaded observation data."""
+        if 'anchor_list' not in dir(self) or 'derived_feature_list' not in dir(self):
+            raise RuntimeError("Please call FeathrClient.build_features() first in order to get offline features")
+        if verbose:
+            for feature_query in feature_queries:
+                FeaturePrinter.pretty_print_feature_query(feature_query)
+        output_format = "avro"
+        if execution_configurations is not None and OUTPUT_FORMAT in execution_configurations:
+            output_format = execution_configurations[OUTPUT_FORMAT]
+        job_output_path = output_path.output_path if isinstance(output_path, HdfsSink) else output_path
+        return self.feathr_spark_launcher.submit_feature_join(
+            job_name=self.project_name + '_feathr_feature_join_job',
+            observation_settings=observation_settings,
+            feature_queries=feature_queries,
+            anchors=self.anchor_list,
+            derived_features=self.derived_feature_list,
+            output_path=output_path,
+            output_format=output_format,
+            job_tags={OUTPUT_PATH_TAG: job_output_path, OUTPUT_FORMAT: output_format})
+
     def _get_offline_features_with_config(self,
                                           feature_join_conf_path='feature_join_conf/feature_join.conf',
                                           output_path: Union[str, Sink] = "",
@@ -648,27 +1630,36 @@ class FeathrClient(object):
             arguments.append(self._get_snowflake_config_str())
         return arguments
 
-    def get_job_result_uri(self, block=True, timeout_sec=300) -> str:
+    def get_job_result_uri(self, block=True, timeout_sec=300, job: FeathrJob = None) -> str:
         """Gets the job output URI
+
+        Args:
+            job: handle of the job returned by `get_offline_features` or `materialize_features`, the latest job by
+                default.
         """
+        job = job if job is not None else self.feathr_spark_launcher
         if not block:
-            return self.feathr_spark_launcher.get_job_result_uri()
+            return job.get_job_result_uri()
         # Block the API by pooling the job status and wait for complete
-        if self.feathr_spark_launcher.wait_for_completion(timeout_sec):
-            return self.feathr_spark_launcher.get_job_result_uri()
+        if job.wait_for_completion(timeout_sec):
+            return job.get_job_result_uri()
         else:
             raise RuntimeError(
                 'Spark job failed so output cannot be retrieved.')
 
-    def get_job_tags(self) -> Dict[str, str]:
-        """Gets the job tags
+    def get_job_tags(self, job: FeathrJob = None) -> Dict[str, str]:
+        """Gets the job tags of `job`, the latest job by default
         """
-        return self.feathr_spark_launcher.get_job_tags()
+        return (job if job is not None else self.feathr_spark_launcher).get_job_tags()
 
-    def wait_job_to_finish(self, timeout_sec: int = 300):
+    def wait_job_to_finish(self, timeout_sec: int = 300, job: FeathrJob = None):
         """Waits for the job to finish in a blocking way unless it times out
+
+        Args:
+            job: handle of the job returned by `get_offline_features` or `materialize_features`, the latest job by
+                default. Use `wait_all` or `as_completed` to wait for many jobs.
         """
-        if self.feathr_spark_launcher.wait_for_completion(timeout_sec):
+        if (job if job is not None else self.feathr_spark_launcher).wait_for_completion(timeout_sec):
             return
         else:
             raise RuntimeError('Spark job failed.')
@@ -725,13 +1716,23 @@ class FeathrClient(object):
                         return False
         return True
 
-    def materialize_features(self, settings: MaterializationSettings, execution_configurations: Union[SparkExecutionConfiguration ,Dict[str,str]] = {}, verbose: bool = False, allow_materialize_non_agg_feature: bool = False):
+    def materialize_features(self, settings: MaterializationSettings, execution_configurations: Union[SparkExecutionConfiguration ,Dict[str,str]] = {}, verbose: bool = False, allow_materialize_non_agg_feature: bool = False,
+                             max_concurrency: Optional[int] = None, max_retries: int = 0, progress_callback: Optional[Callable[[BackfillWindow], None]] = None, timeout_sec: Optional[int] = None):
         """Materialize feature data
 
         Args:
             settings: Feature materialization settings
             execution_configurations: a dict that will be passed to spark job when the job starts up, i.e. the "spark configurations". Note that not all of the configuration will be honored since some of the configurations are managed by the Spark platform, such as Databricks or Azure Synapse. Refer to the [spark documentation](https://spark.apache.org/docs/latest/configuration.html) for a complete list of spark configurations.
             allow_materialize_non_agg_feature: Materializing non-aggregated features (the features without WindowAggTransformation) doesn't output meaningful results so it's by default set to False, but if you really want to materialize non-aggregated features, set this to True.
+            max_concurrency: run the jobs of the backfill cutoff times with a `BackfillScheduler`, at most this many at a time, and wait for them. By default, the jobs are all submitted at once and not waited for.
+            max_retries: number of times the job of a failed backfill cutoff time is submitted again. Waits for the jobs like `max_concurrency`.
+            progress_callback: called with the `BackfillWindow` of each backfill cutoff time whose status changes. Waits for the jobs like `max_concurrency`.
+            With a `ledger` in the settings, only the backfill cutoff times which are not materialized yet with the current feature definitions are submitted, and the jobs are waited for like `max_concurrency` to record the succeeded ones.
+            timeout_sec: cancel the jobs and raise TimeoutError if they are still running after it, when waiting for the jobs.
+
+        Returns:
+            List[FeathrJob]: handles of the submitted jobs, one per backfill cutoff time. When waiting for the jobs,
+            the latest job of each cutoff time, and RuntimeError is raised if some of them failed.
         """
         feature_list = settings.feature_names
         if len(feature_list) > 0:
@@ -767,24 +1768,23 @@ class FeathrClient(object):
                 # Note, for now we only cache one output path from one of HdfsSinks (if one passed multiple sinks).
                 output_path = sink.output_path
 
-        results = []
-        # produce materialization config
-        for end in settings.get_backfill_cutoff_time():
-            settings.backfill_time.end = end
-            config = _to_materialization_config(settings)
+        execution_configurations = self._with_local_spark_connectors(execution_configurations, sinks=settings.sinks)
+
+        # make sure `FeathrClient.build_features()` is called before getting offline features/materialize features in the python SDK
+        # otherwise users will be confused on what are the available features
+        # in build_features it will assign anchor_list and derived_feature_list variable, hence we are checking if those two variables exist to make sure the above condition is met
+        if 'anchor_list' in dir(self) and 'derived_feature_list' in dir(self):
+            self.config_helper.save_to_feature_config_from_context(self.anchor_list, self.derived_feature_list, self.local_workspace_dir)
+        else:
+            raise RuntimeError("Please call FeathrClient.build_features() first in order to materialize the features")
+        udf_files = _PreprocessingPyudfManager.prepare_pyspark_udf_files(settings.feature_names, self.local_workspace_dir)
+
+        def submit_window(end: datetime) -> FeathrJob:
+            # produce materialization config of the backfill cutoff time, `settings` is left untouched
+            config = _to_materialization_config(settings, end)
             config_file_name = "feature_gen_conf/auto_gen_config_{}.conf".format(end.timestamp())
             config_file_path = os.path.join(self.local_workspace_dir, config_file_name)
             write_to_file(content=config, full_file_name=config_file_path)
-
-            # make sure `FeathrClient.build_features()` is called before getting offline features/materialize features in the python SDK
-            # otherwise users will be confused on what are the available features
-            # in build_features it will assign anchor_list and derived_feature_list variable, hence we are checking if those two variables exist to make sure the above condition is met
-            if 'anchor_list' in dir(self) and 'derived_feature_list' in dir(self):
-                self.config_helper.save_to_feature_config_from_context(self.anchor_list, self.derived_feature_list, self.local_workspace_dir)
-            else:
-                raise RuntimeError("Please call FeathrClient.build_features() first in order to materialize the features")
-
-            udf_files = _PreprocessingPyudfManager.prepare_pyspark_udf_files(settings.feature_names, self.local_workspace_dir)
             # CLI will directly call this so the experience won't be broken
             result = self._materialize_features_with_config(
                 feature_gen_conf_path=config_file_path,
@@ -795,7 +1795,37 @@ class FeathrClient(object):
             )
             if os.path.exists(config_file_path) and self.spark_runtime != 'local':
                 os.remove(config_file_path)
-            results.append(result)
+            return result
+
+        fingerprint = None
+        if settings.ledger is not None:
+            fingerprint = materialization_fingerprint(self.anchor_list, settings.feature_names, settings.resolution,
+                                                      self.derived_feature_list)
+        cutoff_times = settings.get_backfill_cutoff_time(fingerprint)
+        if not cutoff_times:
+            logger.info(f"All the backfill windows of {settings.name} are already materialized.")
+            results = []
+        elif max_concurrency is None and max_retries == 0 and progress_callback is None and settings.ledger is None:
+            results = [submit_window(end) for end in cutoff_times]
+        else:
+            sink_ids = [sink_id(sink) for sink in settings.sinks]
+
+            def on_progress(window: BackfillWindow):
+                # Windows are recorded once their job succeeded, so a failed backfill resumes from the failed ones
+                if settings.ledger is not None and window.status == SUCCEEDED:
+                    settings.ledger.record(settings.name, sink_ids, window.cutoff_time, fingerprint)
+                if progress_callback is not None:
+                    progress_callback(window)
+
+            scheduler = BackfillScheduler(submit_window,
+                                          max_concurrency=max_concurrency or len(cutoff_times),
+                                          max_retries=max_retries,
+                                          progress_callback=on_progress)
+            windows = scheduler.run(cutoff_times, timeout_seconds=timeout_sec)
+            failed = [window.cutoff_time for window in windows if window.status == FAILED]
+            if failed:
+                raise RuntimeError(f"Materialization of {settings.name} failed for backfill cutoff times {failed}.")
+            results = [window.job for window in windows]
 
         # Pretty print feature_names of materialized features
         if verbose and settings:
@@ -874,14 +1904,6 @@ class FeathrClient(object):
             properties=self._collect_secrets(secrets)
         )
 
-    def wait_job_to_finish(self, timeout_sec: int = 300):
-        """Waits for the job to finish in a blocking way unless it times out
-        """
-        if self.feathr_spark_launcher.wait_for_completion(timeout_sec):
-            return
-        else:
-            raise RuntimeError('Spark job failed.')
-
     def _getRedisConfigStr(self):
         """Construct the Redis config string. The host, port, credential and other parameters can be set via environment
         variables."""
@@ -894,7 +1916,9 @@ class FeathrClient(object):
         REDIS_HOST: "{REDIS_HOST}"
         REDIS_PORT: {REDIS_PORT}
         REDIS_SSL_ENABLED: {REDIS_SSL_ENABLED}
-        """.format(REDIS_PASSWORD=password, REDIS_HOST=host, REDIS_PORT=port, REDIS_SSL_ENABLED=str(ssl_enabled))
+        REDIS_HASH_TAG_ENABLED: {REDIS_HASH_TAG_ENABLED}
+        """.format(REDIS_PASSWORD=password, REDIS_HOST=host, REDIS_PORT=port, REDIS_SSL_ENABLED=str(ssl_enabled),
+                   REDIS_HASH_TAG_ENABLED=str(self.redis_hash_tag_enabled).lower())
         return self._reshape_config_str(config_str)
 
     def _get_s3_config_str(self):
@@ -1,13 +1,16 @@
+from datetime import datetime
+from typing import Optional
+
 from jinja2 import Template 
 from feathr.definition.materialization_settings import MaterializationSettings
 
 
-def _to_materialization_config(settings: MaterializationSettings):
-    # produce materialization config
+def _to_materialization_config(settings: MaterializationSettings, end: Optional[datetime] = None):
+    # produce materialization config, of the backfill cutoff time `end` if set instead of `settings.backfill_time.end`
     tm = Template("""
             operational: {
             name: {{ settings.name }}
-            endTime: "{{ settings.backfill_time.end.strftime('%Y-%m-%d %H:%M:%S') }}"
+            endTime: "{{ end.strftime('%Y-%m-%d %H:%M:%S') }}"
             endTimeFormat: "yyyy-MM-dd HH:mm:ss"
             resolution: {{ settings.resolution }}
             {% if settings.has_hdfs_sink == True %}
@@ -21,5 +24,5 @@ def _to_materialization_config(settings: MaterializationSettings):
             }
         features: [{{','.join(settings.feature_names)}}]
     """)
-    msg = tm.render(settings=settings)
+    msg = tm.render(settings=settings, end=end or settings.backfill_time.end)
     return msg
\ No newline at end of file
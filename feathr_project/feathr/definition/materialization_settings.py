@@ -1,6 +1,9 @@
 from datetime import datetime, timedelta
 from typing import List, Optional
+from loguru import logger
+
 from feathr.definition.sink import HdfsSink, RedisSink, Sink
+from feathr.utils.materialization_ledger import MaterializationLedger, sink_id
 import math
 
 
@@ -29,8 +32,9 @@ class MaterializationSettings:
         resolution: time interval for output directories. Only support 'DAILY' and 'HOURLY' for now (DAILY by default).
                     If 'DAILY', output paths should be: yyyy/MM/dd;
                     Otherwise would be: yyyy/MM/dd/HH
+        ledger: record of the materialized backfill windows, to only materialize the missing or stale ones. See `MaterializationLedger`.
     """
-    def __init__(self, name: str, sinks: List[Sink], feature_names: List[str], backfill_time: Optional[BackfillTime] = None, resolution: str = "DAILY"):
+    def __init__(self, name: str, sinks: List[Sink], feature_names: List[str], backfill_time: Optional[BackfillTime] = None, resolution: str = "DAILY", ledger: Optional[MaterializationLedger] = None):
         if resolution not in ["DAILY", "HOURLY"]:
             raise RuntimeError(
                 f'{resolution} is not supported. Only \'DAILY\' and \'HOURLY\' are currently supported.')
@@ -46,13 +50,17 @@ class MaterializationSettings:
                 sink.aggregation_features = feature_names
         self.sinks = sinks
         self.feature_names = feature_names
+        self.ledger = ledger
 
-    def get_backfill_cutoff_time(self) -> List[datetime]:
+    def get_backfill_cutoff_time(self, fingerprint: Optional[str] = None) -> List[datetime]:
         """Get the backfill cutoff time points for materialization. 
         E.g. for `BackfillTime(start=datetime(2022, 3, 1), end=datetime(2022, 3, 5), step=timedelta(days=1))`, 
         it returns cutoff time list as `[2022-3-1, 2022-3-2, 2022-3-3, 2022-3-4, 2022-3-5]`, 
         for `BackfillTime(start=datetime(2022, 3, 1, 1), end=datetime(2022, 3, 1, 5), step=timedelta(hours=1))`, 
         it returns cutoff time list as `[2022-3-1 01:00:00, 2022-3-1 02:00:00, 2022-3-1 03:00:00, 2022-3-1 04:00:00, 2022-3-1 05:00:00]`
+
+        With a `ledger` and the `fingerprint` of the features (see `materialization_fingerprint`), only the cutoff
+        times which are not materialized yet into all the sinks with the same fingerprint are returned.
         """        
 
         start_time = self.backfill_time.start
@@ -62,4 +70,10 @@ class MaterializationSettings:
         assert step_in_seconds > 0, "Step in time range should be greater than 0, but got {}".format(step_in_seconds)
         num_delta = (self.backfill_time.end - self.backfill_time.start).total_seconds() / step_in_seconds
         num_delta = math.floor(num_delta) + 1
-        return [end_time - timedelta(seconds=n*step_in_seconds) for n in reversed(range(num_delta))]
\ No newline at end of file
+        cutoff_times = [end_time - timedelta(seconds=n*step_in_seconds) for n in reversed(range(num_delta))]
+        if self.ledger is None or fingerprint is None:
+            return cutoff_times
+        missing = self.ledger.missing_windows(self.name, [sink_id(sink) for sink in self.sinks], cutoff_times, fingerprint)
+        if len(missing) < len(cutoff_times):
+            logger.info(f"{len(cutoff_times) - len(missing)} of {len(cutoff_times)} backfill windows of {self.name} are already materialized, skipping them.")
+        return missing
\ No newline at end of file
@@ -0,0 +1,29 @@
+"""Utilities for reading features from, and managing, the online store"""
+
+from feathr.online_store.analyzer import OnlineStoreAnalyzer, OnlineStoreReport
+from feathr.online_store.batcher import OnlineFeatureBatcher
+from feathr.online_store.cache import OnlineFeatureCache
+from feathr.online_store.columnar import OnlineFeatureColumns
+from feathr.online_store.deadline import HedgingPolicy, OnlineFeatureDict, OnlineFeatureList
+from feathr.online_store.derived import OnlineDerivedFeatures
+from feathr.online_store.embedded import EmbeddedOnlineStore, build_embedded_online_store
+from feathr.online_store.lookup import OnlineLookupFeatures
+from feathr.online_store.metrics import CallbackMetricsSink, MetricsSink, PrometheusMetricsSink
+
+__all__ = [
+    "EmbeddedOnlineStore",
+    "build_embedded_online_store",
+    "OnlineStoreAnalyzer",
+    "OnlineStoreReport",
+    "OnlineFeatureBatcher",
+    "OnlineFeatureCache",
+    "OnlineFeatureColumns",
+    "OnlineFeatureList",
+    "OnlineFeatureDict",
+    "HedgingPolicy",
+    "OnlineDerivedFeatures",
+    "OnlineLookupFeatures",
+    "MetricsSink",
+    "CallbackMetricsSink",
+    "PrometheusMetricsSink",
+]
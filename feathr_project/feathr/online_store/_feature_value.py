@@ -0,0 +1,309 @@
+import base64
+from operator import attrgetter
+from typing import Any, List, Optional, Sequence
+
+import numpy as np
+
+# Name of the `oneof` group in the FeatureValue protobuf message. See featureValue.proto in feathr-impl.
+FEATURE_VALUE_ONEOF = 'FeatureValueOneOf'
+
+# Encodings of the values in the online store:
+#   - "base64": base64 encoded FeatureValue message, as written by the Spark Redis sink.
+#   - "raw": `RAW_VALUE_MARKER` followed by the FeatureValue message, about 25% smaller and without the base64 decoding.
+# Readers detect the encoding of each value, so both can be mixed in one table.
+VALUE_ENCODINGS = ('base64', 'raw')
+# Never part of a base64 string, and not a valid first byte of a FeatureValue message (field number 0)
+RAW_VALUE_MARKER = b'\x00'
+
+# oneof field name -> numpy dtype of the scalar value
+SCALAR_FIELDS = {
+    'boolean_value': np.bool_,
+    'string_value': object,
+    'float_value': np.float32,
+    'double_value': np.float64,
+    'int_value': np.int32,
+    'long_value': np.int64,
+}
+
+# oneof field name -> (repeated field holding the values, numpy dtype of the elements)
+DENSE_ARRAY_FIELDS = {
+    'boolean_array': ('booleans', np.bool_),
+    'string_array': ('strings', object),
+    'float_array': ('floats', np.float32),
+    'double_array': ('doubles', np.float64),
+    'int_array': ('integers', np.int32),
+    'long_array': ('longs', np.int64),
+    'byte_array': ('bytes', object),
+}
+
+# oneof field name -> (repeated field holding the values, numpy dtype of the elements).
+# The indices are always stored in `index_integers`.
+SPARSE_ARRAY_FIELDS = {
+    'sparse_string_array': ('value_strings', object),
+    'sparse_bool_array': ('value_booleans', np.bool_),
+    'sparse_integer_array': ('value_integers', np.int32),
+    'sparse_long_array': ('value_longs', np.int64),
+    'sparse_double_array': ('value_doubles', np.float64),
+    'sparse_float_array': ('value_floats', np.float32),
+}
+
+# oneof field name -> getter of the decoded value of a parsed FeatureValue: scalars as Python values, dense arrays as
+# repeated fields and sparse arrays as (indices, values) tuples
+VALUE_GETTERS = {
+    **{which: attrgetter(which) for which in SCALAR_FIELDS},
+    **{which: attrgetter(f'{which}.{field}') for which, (field, _) in DENSE_ARRAY_FIELDS.items()},
+    **{which: attrgetter(f'{which}.index_integers', f'{which}.{field}') for which, (field, _) in SPARSE_ARRAY_FIELDS.items()},
+}
+
+# numpy dtype kind/size of a scalar column -> oneof field, same as the Spark type -> field mapping of RedisOutputUtils
+_SCALAR_FIELD_BY_DTYPE = {
+    np.dtype(np.bool_): 'boolean_value',
+    np.dtype(np.int8): 'int_value',
+    np.dtype(np.int16): 'int_value',
+    np.dtype(np.int32): 'int_value',
+    np.dtype(np.int64): 'long_value',
+    np.dtype(np.float32): 'float_value',
+    np.dtype(np.float64): 'double_value',
+}
+_DENSE_FIELD_BY_SCALAR_FIELD = {
+    'boolean_value': 'boolean_array',
+    'string_value': 'string_array',
+    'float_value': 'float_array',
+    'double_value': 'double_array',
+    'int_value': 'int_array',
+    'long_value': 'long_array',
+}
+_SPARSE_FIELD_BY_SCALAR_FIELD = {
+    'boolean_value': 'sparse_bool_array',
+    'string_value': 'sparse_string_array',
+    'float_value': 'sparse_float_array',
+    'double_value': 'sparse_double_array',
+    'int_value': 'sparse_integer_array',
+    'long_value': 'sparse_long_array',
+}
+
+
+def decode_feature_value(feature_value) -> Any:
+    """Decode a parsed FeatureValue the same way as `FeathrClient.get_online_features`: scalars as Python values, dense
+    arrays as lists and sparse arrays as (indices, values) tuples. Returns None for an empty or unknown value."""
+    getter = VALUE_GETTERS.get(feature_value.WhichOneof(FEATURE_VALUE_ONEOF))
+    return getter(feature_value) if getter is not None else None
+
+
+def infer_oneof_field(values: Sequence[Any], dtype: np.dtype = None) -> Optional[str]:
+    """Infer the oneof field of a column of feature values, from its dtype or its first non null value.
+
+    Same as the Spark materialization: int32 becomes `int_value`, int64 `long_value`, float32 `float_value`, float64
+    `double_value`, lists/arrays the dense array of their element type, and {"indices0": [...], "values": [...]}
+    structs (or (indices, values) tuples) the sparse array of their value type. Python ints and floats are 64 bits.
+    Returns None if all the values are null.
+    """
+    if dtype is not None and dtype in _SCALAR_FIELD_BY_DTYPE:
+        return _SCALAR_FIELD_BY_DTYPE[dtype]
+    for value in values:
+        if _is_null(value):
+            continue
+        if isinstance(value, (dict, tuple)):
+            indices, elements = _sparse_parts(value)
+            element_field = _element_field(elements)
+            return _SPARSE_FIELD_BY_SCALAR_FIELD[element_field] if element_field else None
+        if isinstance(value, (list, np.ndarray)):
+            element_field = _element_field(value)
+            return _DENSE_FIELD_BY_SCALAR_FIELD[element_field] if element_field else None
+        return _scalar_field(value)
+    return None
+
+
+def to_feature_value(value: Any, which: str):
+    """Build the FeatureValue protobuf message of one value, None if the value is null.
+
+    Args:
+        value: scalar, list/array, or {"indices0": [...], "values": [...]}/(indices, values) for sparse arrays.
+        which: oneof field to set, see `infer_oneof_field`.
+    """
+    from feathr.protobuf.featureValue_pb2 import FeatureValue
+    if _is_null(value):
+        return None
+    feature_value = FeatureValue()
+    if which in SCALAR_FIELDS:
+        setattr(feature_value, which, value.item() if isinstance(value, np.generic) else value)
+    elif which in DENSE_ARRAY_FIELDS:
+        field, dtype = DENSE_ARRAY_FIELDS[which]
+        getattr(getattr(feature_value, which), field).extend(_to_list(value, dtype))
+    elif which in SPARSE_ARRAY_FIELDS:
+        field, dtype = SPARSE_ARRAY_FIELDS[which]
+        indices, elements = _sparse_parts(value)
+        sparse = getattr(feature_value, which)
+        sparse.index_integers.extend(_to_list(indices, np.int32))
+        getattr(sparse, field).extend(_to_list(elements, dtype))
+    else:
+        raise NotImplementedError(f"Feature values of type {which} can't be encoded.")
+    return feature_value
+
+
+def _is_null(value: Any) -> bool:
+    if value is None:
+        return True
+    return isinstance(value, (float, np.floating)) and np.isnan(value)
+
+
+def _sparse_parts(value: Any):
+    if isinstance(value, dict):
+        return value["indices0"], value["values"]
+    return value
+
+
+def _element_field(elements: Any) -> Optional[str]:
+    if isinstance(elements, np.ndarray) and elements.dtype in _SCALAR_FIELD_BY_DTYPE:
+        return _SCALAR_FIELD_BY_DTYPE[elements.dtype]
+    for element in elements:
+        if not _is_null(element):
+            return _scalar_field(element)
+    return None
+
+
+def _scalar_field(value: Any) -> str:
+    if isinstance(value, np.generic) and value.dtype in _SCALAR_FIELD_BY_DTYPE:
+        return _SCALAR_FIELD_BY_DTYPE[value.dtype]
+    if isinstance(value, (bool, np.bool_)):
+        return 'boolean_value'
+    if isinstance(value, (int, np.integer)):
+        return 'long_value'
+    if isinstance(value, (float, np.floating)):
+        return 'double_value'
+    if isinstance(value, str):
+        return 'string_value'
+    raise NotImplementedError(f"Feature values of type {type(value).__name__} can't be encoded.")
+
+
+def _to_list(values: Any, dtype) -> List[Any]:
+    if dtype is object:
+        return list(values)
+    return np.asarray(values, dtype=dtype).tolist()
+
+
+# Protobuf tags (field number << 3 | wire type) of the fixed width and varint scalar fields, see featureValue.proto
+_VARINT_TAGS = {'boolean_value': 0x08, 'int_value': 0x28, 'long_value': 0x30}
+_FIXED_TAGS = {'float_value': (0x1D, '<f4'), 'double_value': (0x21, '<f8')}
+
+_FIELDS_BY_VALUE_TYPE = {
+    # value type name -> (scalar, dense array, sparse array) oneof fields
+    'BOOL': ('boolean_value', 'boolean_array', 'sparse_bool_array'),
+    'INT32': ('int_value', 'int_array', 'sparse_integer_array'),
+    'INT64': ('long_value', 'long_array', 'sparse_long_array'),
+    'FLOAT': ('float_value', 'float_array', 'sparse_float_array'),
+    'DOUBLE': ('double_value', 'double_array', 'sparse_double_array'),
+    'STRING': ('string_value', 'string_array', 'sparse_string_array'),
+}
+
+
+def serialized_feature_value(raw_value: bytes) -> bytes:
+    """Get the serialized FeatureValue message of a value read from the online store, in either of the
+    `VALUE_ENCODINGS`."""
+    if isinstance(raw_value, (bytes, bytearray)) and raw_value[:1] == RAW_VALUE_MARKER:
+        return raw_value[1:]
+    return base64.b64decode(raw_value)
+
+
+def oneof_field_of_feature_type(feature_type) -> str:
+    """Get the oneof field storing values of a `FeatureType`, e.g. `float_array` for FLOAT_VECTOR."""
+    fields = _FIELDS_BY_VALUE_TYPE.get(feature_type.val_type.name)
+    if fields is None:
+        raise NotImplementedError(f"Features of value type {feature_type.val_type.name} can't be stored online.")
+    if not feature_type.dimension_type:
+        return fields[0]
+    return fields[2] if feature_type.tensor_category == "SPARSE" else fields[1]
+
+
+def encode_column(values: Sequence[Any], which: str, null_mask: np.ndarray = None,
+                  value_encoding: str = 'base64') -> List[Optional[bytes]]:
+    """Encode a column of feature values into FeatureValue messages, as read by `FeathrClient._decode_proto`.
+
+    Numeric and boolean scalars are encoded for the whole column at once with numpy, without building protobuf
+    messages. Other values are encoded one by one.
+
+    Args:
+        values: the feature values, e.g. a numpy array or a pandas Series.
+        which: oneof field to set, see `infer_oneof_field` and `oneof_field_of_feature_type`.
+        null_mask (optional): True where the value is missing. Default to None and NaN values.
+        value_encoding: one of `VALUE_ENCODINGS`.
+
+    Returns:
+        The encoded message of each value, None where the value is missing.
+    """
+    if value_encoding not in VALUE_ENCODINGS:
+        raise RuntimeError(f"Unsupported value encoding {value_encoding}, should be one of {list(VALUE_ENCODINGS)}.")
+    values = np.asarray(values)
+    if null_mask is None:
+        null_mask = np.array([_is_null(v) for v in values], dtype=np.bool_) if values.dtype == object \
+            else (np.isnan(values) if values.dtype.kind == 'f' else np.zeros(len(values), dtype=np.bool_))
+    present = np.flatnonzero(~null_mask)
+    encoded = [None] * len(values)
+    if which in _FIXED_TAGS or which in _VARINT_TAGS:
+        rows = _encode_scalars(values[present], which, value_encoding)
+    elif value_encoding == 'raw':
+        rows = [RAW_VALUE_MARKER + to_feature_value(v, which).SerializeToString() for v in values[present]]
+    else:
+        rows = [base64.b64encode(to_feature_value(v, which).SerializeToString()) for v in values[present]]
+    for i, row in zip(present.tolist(), rows):
+        encoded[i] = row
+    return encoded
+
+
+def _encode_scalars(values: np.ndarray, which: str, value_encoding: str = 'base64') -> List[bytes]:
+    if which in _FIXED_TAGS:
+        tag, dtype = _FIXED_TAGS[which]
+        raw = np.empty((len(values), 1 + np.dtype(dtype).itemsize), dtype=np.uint8)
+        raw[:, 0] = tag
+        raw[:, 1:] = np.ascontiguousarray(values, dtype=dtype).view(np.uint8).reshape(len(values), -1)
+        return _encode_rows(raw, value_encoding)
+
+    # Varints hold 7 bits per byte, the high bit marks that more bytes follow. Negative int32 and int64 values are
+    # encoded as their 64 bits two's complement, so on 10 bytes.
+    if which == 'boolean_value':
+        unsigned = np.asarray(values, dtype=np.bool_).astype(np.uint64)
+    else:
+        unsigned = np.asarray(values, dtype=np.int64).view(np.uint64)
+    groups = np.stack([(unsigned >> np.uint64(7 * k)) & np.uint64(0x7F) for k in range(10)], axis=1).astype(np.uint8)
+    lengths = np.ones(len(values), dtype=np.int64)
+    for k in range(1, 10):
+        lengths += (unsigned >> np.uint64(7 * k)) != 0
+    continuation = np.arange(10)[None, :] < (lengths - 1)[:, None]
+    groups[continuation] |= 0x80
+
+    rows = [None] * len(values)
+    for length in np.unique(lengths).tolist():
+        indices = np.flatnonzero(lengths == length)
+        raw = np.empty((len(indices), 1 + length), dtype=np.uint8)
+        raw[:, 0] = _VARINT_TAGS[which]
+        raw[:, 1:] = groups[indices, :length]
+        for i, row in zip(indices.tolist(), _encode_rows(raw, value_encoding)):
+            rows[i] = row
+    return rows
+
+
+def _encode_rows(raw: np.ndarray, value_encoding: str) -> List[bytes]:
+    """Encode each row of a 2-D uint8 array of serialized messages."""
+    if value_encoding == 'raw':
+        marked = np.empty((raw.shape[0], raw.shape[1] + 1), dtype=np.uint8)
+        marked[:, 0] = RAW_VALUE_MARKER[0]
+        marked[:, 1:] = raw
+        return [row.tobytes() for row in marked]
+    return _b64encode_rows(raw)
+
+
+def _b64encode_rows(raw: np.ndarray) -> List[bytes]:
+    """Base64 encode each row of a 2-D uint8 array, with one `b64encode` call for the whole array.
+
+    Rows are zero padded to a multiple of 3 bytes so they're encoded independently, then the characters encoding the
+    padding are replaced by '=', which gives the same result as encoding each row on its own.
+    """
+    num_rows, length = raw.shape
+    padding = -length % 3
+    if padding:
+        raw = np.concatenate([raw, np.zeros((num_rows, padding), dtype=np.uint8)], axis=1)
+    encoded = np.frombuffer(base64.b64encode(np.ascontiguousarray(raw).tobytes()), dtype=np.uint8)
+    encoded = encoded.reshape(num_rows, -1).copy()
+    if padding:
+        encoded[:, -padding:] = ord('=')
+    return [row.tobytes() for row in encoded]
@@ -0,0 +1,129 @@
+import asyncio
+from concurrent.futures import Executor
+from typing import Any, Dict, List, Optional, Tuple
+
+# (redis key, feature names) to read with one HMGET
+HmgetRequest = Tuple[str, List[str]]
+# (redis key, feature name -> encoded value, TTL in seconds or None) to write with one HSET
+HsetRequest = Tuple[str, Dict[str, bytes], Optional[float]]
+
+
+def hash_tag(key: str) -> str:
+    """Wrap a key into a Redis Cluster hash tag, so only the key (and not the feature table prefix) decides its slot."""
+    return "{" + key + "}"
+
+
+def group_by_shard(redis_client, requests: List[Tuple[str, Any]]) -> List[List[int]]:
+    """Group the indices of HMGET or HSET requests by the cluster shard owning their key, in order of first appearance.
+
+    Keys are grouped by hash slot first, so the node lookup is done once per slot instead of once per key.
+    """
+    shard_by_slot = {}
+    groups: Dict[str, List[int]] = {}
+    for i, (redis_key, *_) in enumerate(requests):
+        slot = redis_client.keyslot(redis_key)
+        shard = shard_by_slot.get(slot)
+        if shard is None:
+            # Group by primary node, replica routing is left to the cluster pipeline
+            shard = shard_by_slot[slot] = redis_client.nodes_manager.get_node_from_slot(slot).name
+        groups.setdefault(shard, []).append(i)
+    return list(groups.values())
+
+
+def chunk_indices(indices: List[int], max_keys_per_pipeline: Optional[int]) -> List[List[int]]:
+    """Split indices into chunks of at most `max_keys_per_pipeline`. No split if it's not set."""
+    if not max_keys_per_pipeline or len(indices) <= max_keys_per_pipeline:
+        return [indices]
+    return [indices[i:i + max_keys_per_pipeline] for i in range(0, len(indices), max_keys_per_pipeline)]
+
+
+def execute_hmgets(redis_client, requests: List[HmgetRequest], cluster_enabled: bool = False,
+                   executor: Optional[Executor] = None, max_keys_per_pipeline: Optional[int] = None) -> List[List[Any]]:
+    """Run a batch of HMGET requests and return the results in the order of `requests`.
+
+    Requests are sent in pipelines of at most `max_keys_per_pipeline` keys, so a huge batch doesn't build one huge
+    response buffer on the server. Against a Redis Cluster, each pipeline only holds keys of one shard. Pipelines run
+    in parallel on `executor` (each on its own pooled connection) if it's set, sequentially otherwise.
+    """
+    if len(requests) == 1:
+        redis_key, feature_names = requests[0]
+        return [redis_client.hmget(redis_key, *feature_names)]
+
+    groups = group_by_shard(redis_client, requests) if cluster_enabled else [list(range(len(requests)))]
+    chunks = [chunk for group in groups for chunk in chunk_indices(group, max_keys_per_pipeline)]
+
+    def _run(chunk: List[int]) -> List[List[Any]]:
+        # Cluster pipelines don't support transactions
+        with redis_client.pipeline(**({'transaction': False} if cluster_enabled else {})) as redis_pipeline:
+            for i in chunk:
+                redis_key, feature_names = requests[i]
+                redis_pipeline.hmget(redis_key, *feature_names)
+            return redis_pipeline.execute()
+
+    if len(chunks) == 1:
+        return _run(chunks[0])
+    if executor is None:
+        chunk_results = [_run(chunk) for chunk in chunks]
+    else:
+        chunk_results = list(executor.map(_run, chunks))
+    return _merge_chunk_results(len(requests), chunks, chunk_results)
+
+
+def execute_hsets(redis_client, requests: List[HsetRequest], cluster_enabled: bool = False,
+                  executor: Optional[Executor] = None, max_keys_per_pipeline: Optional[int] = None) -> int:
+    """Run a batch of HSET requests, followed by an EXPIRE for the keys with a TTL, chunked and parallelized the same
+    way as `execute_hmgets`. Returns the number of written keys."""
+    groups = group_by_shard(redis_client, requests) if cluster_enabled else [list(range(len(requests)))]
+    chunks = [chunk for group in groups for chunk in chunk_indices(group, max_keys_per_pipeline)]
+
+    def _run(chunk: List[int]) -> int:
+        with redis_client.pipeline(transaction=False) as redis_pipeline:
+            for i in chunk:
+                redis_key, mapping, ttl_sec = requests[i]
+                redis_pipeline.hset(redis_key, mapping=mapping)
+                if ttl_sec is not None:
+                    redis_pipeline.expire(redis_key, max(int(ttl_sec), 1))
+            redis_pipeline.execute()
+        return len(chunk)
+
+    if executor is None or len(chunks) == 1:
+        return sum(_run(chunk) for chunk in chunks)
+    return sum(executor.map(_run, chunks))
+
+
+async def aexecute_hmgets(redis_client, requests: List[HmgetRequest], max_keys_per_pipeline: Optional[int] = None,
+                          max_concurrency: Optional[int] = None) -> List[List[Any]]:
+    """Asyncio version of `execute_hmgets`. Chunks are sent concurrently, at most `max_concurrency` at a time.
+
+    The asyncio cluster pipeline already sends one pipeline per node concurrently, so both standalone and cluster
+    clients are handled the same way.
+    """
+    if len(requests) == 1:
+        redis_key, feature_names = requests[0]
+        return [await redis_client.hmget(redis_key, *feature_names)]
+
+    chunks = chunk_indices(list(range(len(requests))), max_keys_per_pipeline)
+    semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+
+    async def _run(chunk: List[int]) -> List[List[Any]]:
+        async with redis_client.pipeline(transaction=False) as redis_pipeline:
+            for i in chunk:
+                redis_key, feature_names = requests[i]
+                redis_pipeline.hmget(redis_key, *feature_names)
+            if semaphore is None:
+                return await redis_pipeline.execute()
+            async with semaphore:
+                return await redis_pipeline.execute()
+
+    if len(chunks) == 1:
+        return await _run(chunks[0])
+    chunk_results = await asyncio.gather(*(_run(chunk) for chunk in chunks))
+    return _merge_chunk_results(len(requests), chunks, chunk_results)
+
+
+def _merge_chunk_results(num_requests: int, chunks: List[List[int]], chunk_results: List[List[Any]]) -> List[List[Any]]:
+    results = [None] * num_requests
+    for chunk, results_of_chunk in zip(chunks, chunk_results):
+        for i, result in zip(chunk, results_of_chunk):
+            results[i] = result
+    return results
@@ -0,0 +1,320 @@
+from concurrent.futures import Executor, ThreadPoolExecutor
+import random
+import re
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from loguru import logger
+import numpy as np
+import redis
+
+from feathr.online_store._feature_value import RAW_VALUE_MARKER
+from feathr.online_store._redis_pipeline import chunk_indices
+
+# Upper bounds (inclusive) of the value size histogram buckets, in bytes
+_SIZE_BUCKETS = [16, 64, 256, 1024, 4096, 16384, 65536]
+# Upper bounds (exclusive) of the TTL histogram buckets, in seconds
+_TTL_BUCKETS = [("<1h", 3600), ("<1d", 86400), ("<7d", 7 * 86400), ("<30d", 30 * 86400)]
+
+
+def feature_table_pattern(feature_table: str, key_separator: str = ':') -> str:
+    """SCAN pattern matching the keys of one feature table only, i.e. `<feature_table>:*` with glob characters of the
+    feature table name escaped."""
+    return re.sub(r'([*?\[\]\\])', r'\\\1', feature_table + key_separator) + '*'
+
+
+def scan_feature_table_keys(redis_client, feature_table: str, cluster_enabled: bool = False, count: int = 1000,
+                            key_separator: str = ':') -> Iterator[List[bytes]]:
+    """Iterate over the keys of a feature table, one SCAN page at a time. In Redis Cluster mode, every primary node is
+    scanned in turn, since a SCAN cursor is only valid on one node. `OnlineStoreAnalyzer` scans the nodes in parallel
+    instead."""
+    match = feature_table_pattern(feature_table, key_separator)
+    for node_client in _node_clients(redis_client, cluster_enabled):
+        yield from _scan_node(node_client, match, count)
+
+
+def _node_clients(redis_client, cluster_enabled: bool) -> List[Any]:
+    """Clients of the nodes to scan, i.e. every primary node in Redis Cluster mode."""
+    if cluster_enabled:
+        return [redis_client.get_redis_connection(node) for node in redis_client.get_primaries()]
+    return [redis_client]
+
+
+def _scan_node(node_client, match: str, count: int) -> Iterator[List[bytes]]:
+    cursor = 0
+    while True:
+        cursor, keys = node_client.scan(cursor=cursor, match=match, count=count)
+        if keys:
+            yield keys
+        if cursor == 0:
+            break
+
+
+class FeatureStats:
+    """Value sizes of one feature name in the sampled keys of a feature table.
+
+    Attributes:
+        feature_name: the feature name, i.e. the hash field.
+        num_sampled: number of sampled keys holding this feature.
+        value_sizes: size in bytes of each sampled value, as stored in Redis.
+        num_raw: number of sampled values stored with the "raw" value encoding, see `FeathrClient.push_online_features`.
+    """
+    def __init__(self, feature_name: str):
+        self.feature_name = feature_name
+        self.num_sampled = 0
+        self.num_raw = 0
+        self.value_sizes: List[int] = []
+
+    def to_dict(self, num_sampled_keys: int, num_keys: int) -> Dict[str, Any]:
+        sizes = np.array(self.value_sizes, dtype=np.int64)
+        presence = self.num_sampled / num_sampled_keys if num_sampled_keys else 0.0
+        return {
+            "feature_name": self.feature_name,
+            "presence": presence,
+            "raw_encoded": self.num_raw / self.num_sampled if self.num_sampled else 0.0,
+            "mean_bytes": float(sizes.mean()) if len(sizes) else 0.0,
+            "p50_bytes": float(np.percentile(sizes, 50)) if len(sizes) else 0.0,
+            "p95_bytes": float(np.percentile(sizes, 95)) if len(sizes) else 0.0,
+            "max_bytes": int(sizes.max()) if len(sizes) else 0,
+            # Estimated for the whole table, from the sample
+            "estimated_total_bytes": float(sizes.mean() * presence * num_keys) if len(sizes) else 0.0,
+            "size_histogram": _size_histogram(sizes),
+        }
+
+
+class FeatureTableStats:
+    """Key space and memory usage of one feature table, estimated from a uniform sample of its keys.
+
+    Attributes:
+        feature_table: the feature table.
+        num_keys: number of keys of the table, counted exactly with SCAN.
+        memory_bytes: `MEMORY USAGE` of each sampled key. Empty if the server doesn't support the command, in which case
+            the memory is estimated from the size of the keys, field names and values.
+        payload_bytes: size of the key, field names and values of each sampled key.
+        field_counts: number of fields (features) of each sampled key.
+        ttls: TTL of each sampled key in seconds, -1 if the key doesn't expire.
+        features: feature name -> `FeatureStats`.
+    """
+    def __init__(self, feature_table: str):
+        self.feature_table = feature_table
+        self.num_keys = 0
+        self.memory_bytes: List[int] = []
+        self.payload_bytes: List[int] = []
+        self.field_counts: List[int] = []
+        self.ttls: List[int] = []
+        self.features: Dict[str, FeatureStats] = {}
+
+    @property
+    def num_sampled(self) -> int:
+        return len(self.field_counts)
+
+    @property
+    def memory_estimated(self) -> bool:
+        """True if `MEMORY USAGE` is not available and the memory is estimated from the payload sizes instead."""
+        return len(self.memory_bytes) < self.num_sampled
+
+    @property
+    def estimated_memory_bytes(self) -> float:
+        """Estimated memory used by the whole table."""
+        sizes = self.payload_bytes if self.memory_estimated else self.memory_bytes
+        return float(np.mean(sizes)) * self.num_keys if sizes else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        field_counts = np.array(self.field_counts, dtype=np.int64)
+        ttls = np.array(self.ttls, dtype=np.int64)
+        expiring = ttls[ttls >= 0]
+        features = [f.to_dict(self.num_sampled, self.num_keys) for f in self.features.values()]
+        return {
+            "feature_table": self.feature_table,
+            "num_keys": self.num_keys,
+            "num_sampled": self.num_sampled,
+            "estimated_memory_bytes": self.estimated_memory_bytes,
+            "memory_estimated": self.memory_estimated,
+            "mean_fields_per_key": float(field_counts.mean()) if len(field_counts) else 0.0,
+            "max_fields_per_key": int(field_counts.max()) if len(field_counts) else 0,
+            "ttl": {
+                "no_ttl": int((ttls < 0).sum()),
+                **_ttl_histogram(expiring),
+                "p50_sec": float(np.percentile(expiring, 50)) if len(expiring) else None,
+            },
+            # Largest features first, to find the bloated ones
+            "features": sorted(features, key=lambda f: f["estimated_total_bytes"], reverse=True),
+        }
+
+
+class OnlineStoreReport:
+    """Memory and key space report of the online store, see `FeathrClient.analyze_online_store`.
+
+    Attributes:
+        tables: feature table -> `FeatureTableStats`.
+    """
+    def __init__(self, tables: Dict[str, FeatureTableStats]):
+        self.tables = tables
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The report as a JSON serializable dict, largest tables first."""
+        tables = sorted((t.to_dict() for t in self.tables.values()), key=lambda t: t["estimated_memory_bytes"], reverse=True)
+        return {"total_estimated_memory_bytes": sum(t["estimated_memory_bytes"] for t in tables), "tables": tables}
+
+    def format(self, top_features: int = 5) -> str:
+        """Human readable report, with the largest features of each table."""
+        report = self.to_dict()
+        lines = [f"Estimated online store memory: {_format_bytes(report['total_estimated_memory_bytes'])}"]
+        for table in report["tables"]:
+            lines.append(f"{table['feature_table']}: {table['num_keys']} keys, "
+                         f"~{_format_bytes(table['estimated_memory_bytes'])}"
+                         f"{' (estimated from payload sizes)' if table['memory_estimated'] else ''}, "
+                         f"{table['mean_fields_per_key']:.1f} fields per key, "
+                         f"{table['ttl']['no_ttl']}/{table['num_sampled']} sampled keys without TTL")
+            for feature in table["features"][:top_features]:
+                lines.append(f"    {feature['feature_name']}: ~{_format_bytes(feature['estimated_total_bytes'])}, "
+                             f"{feature['presence']:.0%} of keys, p50 {feature['p50_bytes']:.0f} B, "
+                             f"p95 {feature['p95_bytes']:.0f} B, max {feature['max_bytes']} B")
+        return "\n".join(lines)
+
+
+class OnlineStoreAnalyzer:
+    """Analyzes the memory and key space of the feature tables of the online store.
+
+    The keys of each feature table are counted with SCAN, and a uniform sample of them (reservoir sampling) is
+    inspected with pipelined `MEMORY USAGE`, `HGETALL` and `TTL`. `analyze` scans every feature table, and every shard
+    of it in Redis Cluster mode, in parallel on `executor`. The samples of the shards are then merged into a uniform
+    sample of the table.
+
+    Attributes:
+        redis_client: the Redis client of the online store.
+        cluster_enabled: whether the client is a Redis Cluster client.
+        executor (optional): runs the scans and inspections in parallel. Default to a pool of `max_workers` threads
+            created for each `analyze` call.
+        max_workers: number of threads of the default executor.
+        sample_size: maximum number of keys inspected per feature table.
+        scan_count: COUNT hint of each SCAN call.
+        max_keys_per_pipeline: maximum number of sampled keys inspected in one pipeline.
+        key_separator: separator between the feature table and the key in the Redis keys.
+    """
+    def __init__(self, redis_client, cluster_enabled: bool = False, executor: Optional[Executor] = None,
+                 sample_size: int = 1000, scan_count: int = 1000, max_keys_per_pipeline: int = 100,
+                 key_separator: str = ':', seed: int = 0, max_workers: int = 8):
+        self.redis_client = redis_client
+        self.cluster_enabled = cluster_enabled
+        self.executor = executor
+        self.max_workers = max_workers
+        self.sample_size = sample_size
+        self.scan_count = scan_count
+        self.max_keys_per_pipeline = max_keys_per_pipeline
+        self.key_separator = key_separator
+        self.seed = seed
+
+    def analyze(self, feature_tables: List[str]) -> OnlineStoreReport:
+        executor = self.executor if self.executor is not None else ThreadPoolExecutor(self.max_workers)
+        try:
+            node_clients = _node_clients(self.redis_client, self.cluster_enabled)
+            # All the (table, shard) scans are submitted before waiting for any, so none of them waits for a worker
+            scans = [[executor.submit(self._sample_node, node_client, feature_table, i)
+                      for i, node_client in enumerate(node_clients)] for feature_table in feature_tables]
+            samples = [[scan.result() for scan in table_scans] for table_scans in scans]
+            stats = list(executor.map(self._inspect_table, feature_tables, samples))
+        finally:
+            if executor is not self.executor:
+                executor.shutdown()
+        return OnlineStoreReport({s.feature_table: s for s in stats})
+
+    def analyze_table(self, feature_table: str) -> FeatureTableStats:
+        """Analyze one feature table, scanning its shards in turn in the calling thread."""
+        node_clients = _node_clients(self.redis_client, self.cluster_enabled)
+        return self._inspect_table(feature_table, [self._sample_node(node_client, feature_table, i)
+                                                   for i, node_client in enumerate(node_clients)])
+
+    def _sample_node(self, node_client, feature_table: str, node_index: int) -> Tuple[int, List[bytes]]:
+        """Count the keys of a feature table on one node, and sample up to `sample_size` of them uniformly."""
+        rng = random.Random(f"{self.seed}:{node_index}")
+        num_keys = 0
+        sample = []
+        for keys in _scan_node(node_client, feature_table_pattern(feature_table, self.key_separator), self.scan_count):
+            for key in keys:
+                num_keys += 1
+                if len(sample) < self.sample_size:
+                    sample.append(key)
+                else:
+                    i = rng.randrange(num_keys)
+                    if i < self.sample_size:
+                        sample[i] = key
+        return num_keys, sample
+
+    def _merge_samples(self, node_samples: List[Tuple[int, List[bytes]]]) -> Tuple[int, List[bytes]]:
+        """Uniform sample of the keys of all the nodes, from the key count and the uniform sample of each node. Each key
+        is drawn from a node with a probability proportional to its keys not drawn yet."""
+        rng = random.Random(self.seed)
+        remaining = [num_keys for num_keys, _ in node_samples]
+        pools = [list(sample) for _, sample in node_samples]
+        for pool in pools:
+            rng.shuffle(pool)
+        num_keys = sum(remaining)
+        sample = []
+        while len(sample) < min(self.sample_size, num_keys):
+            r = rng.randrange(sum(remaining))
+            node = 0
+            while r >= remaining[node]:
+                r -= remaining[node]
+                node += 1
+            remaining[node] -= 1
+            sample.append(pools[node].pop())
+        return num_keys, sample
+
+    def _inspect_table(self, feature_table: str, node_samples: List[Tuple[int, List[bytes]]]) -> FeatureTableStats:
+        stats = FeatureTableStats(feature_table)
+        stats.num_keys, sample = self._merge_samples(node_samples)
+        for chunk in chunk_indices(list(range(len(sample))), self.max_keys_per_pipeline):
+            self._inspect(stats, [sample[i] for i in chunk])
+        logger.info(f"Analyzed feature table {feature_table}: {stats.num_keys} keys, {stats.num_sampled} sampled.")
+        return stats
+
+    def _inspect(self, stats: FeatureTableStats, keys: List[bytes]):
+        with self.redis_client.pipeline(transaction=False) as redis_pipeline:
+            for key in keys:
+                redis_pipeline.memory_usage(key, samples=0)
+                redis_pipeline.hgetall(key)
+                redis_pipeline.ttl(key)
+            results = redis_pipeline.execute(raise_on_error=False)
+        for i, key in enumerate(keys):
+            memory, fields, ttl = results[3 * i:3 * i + 3]
+            if isinstance(fields, Exception) or not fields:
+                # Deleted since the scan, or not a hash
+                continue
+            if not isinstance(memory, redis.RedisError) and memory is not None:
+                stats.memory_bytes.append(int(memory))
+            stats.payload_bytes.append(len(key) + sum(len(name) + len(value) for name, value in fields.items()))
+            stats.field_counts.append(len(fields))
+            stats.ttls.append(-1 if isinstance(ttl, Exception) or ttl is None or ttl < 0 else int(ttl))
+            for name, value in fields.items():
+                name = name.decode("utf-8") if isinstance(name, bytes) else name
+                feature = stats.features.get(name)
+                if feature is None:
+                    feature = stats.features[name] = FeatureStats(name)
+                feature.num_sampled += 1
+                feature.value_sizes.append(len(value))
+                if value[:1] == RAW_VALUE_MARKER:
+                    feature.num_raw += 1
+
+
+def _size_histogram(sizes: np.ndarray) -> Dict[str, int]:
+    counts = np.histogram(sizes, bins=[0] + [b + 1 for b in _SIZE_BUCKETS] + [np.iinfo(np.int64).max])[0]
+    labels = [f"<={b}B" for b in _SIZE_BUCKETS] + [f">{_SIZE_BUCKETS[-1]}B"]
+    return {label: int(count) for label, count in zip(labels, counts)}
+
+
+def _ttl_histogram(ttls: np.ndarray) -> Dict[str, int]:
+    histogram = {}
+    lower = 0
+    for label, upper in _TTL_BUCKETS:
+        histogram[label] = int(((ttls >= lower) & (ttls < upper)).sum())
+        lower = upper
+    histogram[f">={_TTL_BUCKETS[-1][0][1:]}"] = int((ttls >= lower).sum())
+    return histogram
+
+
+def _format_bytes(size: float) -> str:
+    for unit in ["B", "KB", "MB", "GB"]:
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
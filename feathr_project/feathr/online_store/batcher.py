@@ -0,0 +1,113 @@
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+
+class _PendingKey:
+    """Features requested for one (feature table, key), shared by all the requests of this key in one batch."""
+    __slots__ = ("feature_names", "future")
+
+    def __init__(self, future: asyncio.Future):
+        self.feature_names = set()
+        # Resolves to feature name -> raw (encoded) value
+        self.future = future
+
+
+class OnlineFeatureBatcher:
+    """Coalesces concurrent single-entity online reads into shared Redis pipelines.
+
+    Requests that arrive within `max_wait_ms` of each other are sent together, all feature tables in one round trip
+    (see `FeathrClient.amulti_table_get_online_features`). Identical keys are only fetched once: requests for a key that
+    is already waiting for the next batch are merged into it, and requests for a key whose batch is in flight reuse
+    its result if it covers the requested features.
+
+    Attributes:
+        client: the FeathrClient whose online store is read.
+        max_batch_size: a batch is sent as soon as it holds this many distinct keys.
+        max_wait_ms: maximum time a request waits for other requests to join its batch, in milliseconds.
+    """
+    def __init__(self, client, max_batch_size: int = 1000, max_wait_ms: float = 2.0):
+        if max_batch_size <= 0:
+            raise RuntimeError(f"max_batch_size should be greater than 0, but got {max_batch_size}")
+        self.client = client
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._pending: Dict[Tuple[str, str], _PendingKey] = {}
+        self._in_flight: Dict[Tuple[str, str], _PendingKey] = {}
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self.num_requests = 0
+        self.num_batches = 0
+        self.num_deduplicated = 0
+
+    async def get(self, feature_table: str, key: Any, feature_names: List[str]) -> List[Any]:
+        """Fetch the features of one key, same as `FeathrClient.aget_online_features`, sharing the Redis round trip
+        with the other requests of the batch."""
+        self.num_requests += 1
+        batch_key = (feature_table, self.client._join_composite_keys([key])[0])
+        entry = self._in_flight.get(batch_key)
+        if entry is not None and entry.feature_names.issuperset(feature_names):
+            self.num_deduplicated += 1
+        else:
+            entry = self._pending.get(batch_key)
+            if entry is None:
+                entry = self._pending[batch_key] = _PendingKey(asyncio.get_running_loop().create_future())
+            else:
+                self.num_deduplicated += 1
+            entry.feature_names.update(feature_names)
+            self._schedule_flush()
+        # Shielded, so that a cancelled request doesn't cancel the result shared with the other requests
+        raw_values = await asyncio.shield(entry.future)
+        return self.client._decode_rows(feature_table, [[raw_values[feature_name] for feature_name in feature_names]],
+                                       feature_names)[0]
+
+    def stats(self) -> Dict[str, int]:
+        """Get the batcher counters, i.e. the number of requests, batches sent and requests served by another one."""
+        return {
+            "requests": self.num_requests,
+            "batches": self.num_batches,
+            "deduplicated": self.num_deduplicated,
+        }
+
+    def _schedule_flush(self):
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.max_wait_ms / 1000, self._flush)
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._pending:
+            return
+        batch = self._pending
+        self._pending = {}
+        self._in_flight.update(batch)
+        self.num_batches += 1
+        asyncio.get_running_loop().create_task(self._fetch(batch))
+
+    async def _fetch(self, batch: Dict[Tuple[str, str], _PendingKey]):
+        # One request per feature table, reading the union of the features requested for its keys
+        tables = {}
+        for (feature_table, key), entry in batch.items():
+            keys, entries, feature_names = tables.setdefault(feature_table, ([], [], set()))
+            keys.append(key)
+            entries.append(entry)
+            feature_names.update(entry.feature_names)
+        table_requests = [(feature_table, keys, sorted(feature_names))
+                          for feature_table, (keys, _, feature_names) in tables.items()]
+        try:
+            table_results = await self.client._afetch_online_features_of_tables(table_requests)
+            for (_, entries, _), (_, _, feature_names), rows in zip(tables.values(), table_requests, table_results):
+                for entry, row in zip(entries, rows):
+                    entry.future.set_result(dict(zip(feature_names, row)))
+        except Exception as e:
+            logger.error(f"Fail to fetch a batch of {len(batch)} online feature keys: {e}")
+            for entry in batch.values():
+                if not entry.future.done():
+                    entry.future.set_exception(e)
+        finally:
+            for batch_key, entry in batch.items():
+                if self._in_flight.get(batch_key) is entry:
+                    del self._in_flight[batch_key]
@@ -0,0 +1,250 @@
+from concurrent.futures import ThreadPoolExecutor
+import time
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+import pandas as pd
+
+from feathr.definition.dtype import (BOOLEAN, DOUBLE, FLOAT, FLOAT_VECTOR, INT32_VECTOR, INT64, STRING, FeatureType,
+                                     ValueType)
+from feathr.online_store.analyzer import OnlineStoreAnalyzer
+from feathr.online_store.columnar import decode_columns
+
+# Synthetic feature tables covering the scalar, dense array and sparse array encodings of FeatureValue
+BENCHMARK_TABLES: Dict[str, Dict[str, FeatureType]] = {
+    "feathr_bench_scalar": {
+        "f_float": FLOAT,
+        "f_double": DOUBLE,
+        "f_long": INT64,
+        "f_bool": BOOLEAN,
+        "f_string": STRING,
+    },
+    "feathr_bench_dense": {
+        "f_float_vector": FLOAT_VECTOR,
+        "f_int_vector": INT32_VECTOR,
+    },
+    "feathr_bench_sparse": {
+        "f_sparse_float": FeatureType(val_type=ValueType.FLOAT, dimension_type=[ValueType.INT32], tensor_category="SPARSE"),
+        "f_sparse_string": FeatureType(val_type=ValueType.STRING, dimension_type=[ValueType.INT32], tensor_category="SPARSE"),
+    },
+}
+
+
+class OnlineBenchmarkResult:
+    """Measurements of one benchmark case, i.e. one feature table read at one concurrency level and batch size.
+
+    Attributes:
+        feature_table: the feature table read.
+        concurrency: number of threads sending requests.
+        batch_size: number of keys per request. 1 uses `get_online_features`, more `multi_get_online_features`.
+        num_requests: number of measured requests.
+        latencies_ms: latency of each request in milliseconds.
+        wall_time_sec: wall time of the whole case.
+        cpu_time_sec: CPU time of the process during the case. With an in-process stand-in for Redis, it includes the
+            time spent in the stand-in.
+        num_values: number of decoded feature values.
+    """
+    def __init__(self, feature_table: str, concurrency: int, batch_size: int, num_requests: int,
+                 latencies_ms: List[float], wall_time_sec: float, cpu_time_sec: float, num_values: int):
+        self.feature_table = feature_table
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.num_requests = num_requests
+        self.latencies_ms = latencies_ms
+        self.wall_time_sec = wall_time_sec
+        self.cpu_time_sec = cpu_time_sec
+        self.num_values = num_values
+
+    def percentile_ms(self, q: float) -> float:
+        return float(np.percentile(self.latencies_ms, q))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Summary of the case, e.g. to be saved as JSON and compared between releases."""
+        return {
+            "feature_table": self.feature_table,
+            "concurrency": self.concurrency,
+            "batch_size": self.batch_size,
+            "num_requests": self.num_requests,
+            "requests_per_sec": self.num_requests / self.wall_time_sec,
+            "values_per_sec": self.num_values / self.wall_time_sec,
+            "p50_ms": self.percentile_ms(50),
+            "p95_ms": self.percentile_ms(95),
+            "p99_ms": self.percentile_ms(99),
+            "cpu_us_per_value": self.cpu_time_sec * 1e6 / self.num_values,
+        }
+
+
+def populate_benchmark_tables(client, num_keys: int = 10000, vector_size: int = 32, sparse_size: int = 8,
+                              seed: int = 0, value_encoding: str = "base64", table_suffix: str = "") -> Dict[str, List[str]]:
+    """Fill the online store of a FeathrClient with the synthetic `BENCHMARK_TABLES`, keyed by "0" to
+    `num_keys - 1`, in the FeatureValue encoding written by the Spark Redis sink.
+
+    Args:
+        value_encoding: value encoding of `FeathrClient.push_online_features`.
+        table_suffix: appended to the names of the feature tables, e.g. to hold the same data in another encoding.
+
+    Returns:
+        Feature table -> feature names.
+    """
+    rng = np.random.default_rng(seed)
+    words = np.array([f"value_{i}" for i in range(100)], dtype=object)
+    keys = np.arange(num_keys)
+
+    def _sparse(values: np.ndarray) -> List[Dict[str, Any]]:
+        return [{"indices0": np.sort(rng.choice(vector_size * 4, sparse_size, replace=False)).astype(np.int32),
+                 "values": row} for row in values]
+
+    columns = {
+        "f_float": rng.random(num_keys, dtype=np.float32),
+        "f_double": rng.random(num_keys),
+        "f_long": rng.integers(0, 2 ** 40, num_keys),
+        "f_bool": rng.random(num_keys) < 0.5,
+        "f_string": rng.choice(words, num_keys),
+        "f_float_vector": list(rng.random((num_keys, vector_size), dtype=np.float32)),
+        "f_int_vector": list(rng.integers(0, 10000, (num_keys, vector_size), dtype=np.int32)),
+        "f_sparse_float": _sparse(rng.random((num_keys, sparse_size), dtype=np.float32)),
+        "f_sparse_string": _sparse(rng.choice(words, (num_keys, sparse_size))),
+    }
+    for feature_table, feature_types in BENCHMARK_TABLES.items():
+        df = pd.DataFrame({"key": keys, **{name: columns[name] for name in feature_types}})
+        client.push_online_features(feature_table + table_suffix, df, ["key"], feature_types=feature_types,
+                                    value_encoding=value_encoding)
+    return {feature_table + table_suffix: list(feature_types) for feature_table, feature_types in BENCHMARK_TABLES.items()}
+
+
+def run_online_benchmark(client,
+                         feature_tables: Dict[str, List[str]],
+                         num_keys: int,
+                         concurrency_levels: Sequence[int] = (1, 8),
+                         batch_sizes: Sequence[int] = (1, 100),
+                         num_requests: int = 1000,
+                         warmup_requests: int = 20,
+                         seed: int = 0) -> List[OnlineBenchmarkResult]:
+    """Drive the online read path of a FeathrClient and measure it, for every feature table, concurrency level and
+    batch size. Keys are drawn uniformly from "0" to `num_keys - 1`, see `populate_benchmark_tables`.
+
+    Args:
+        client: the FeathrClient whose online store is read.
+        feature_tables: feature table -> feature names to read.
+        num_keys: number of keys of the tables.
+        concurrency_levels: numbers of threads sending requests at the same time.
+        batch_sizes: numbers of keys per request.
+        num_requests: number of measured requests of each case.
+        warmup_requests: number of requests sent before measuring each case.
+    """
+    rng = np.random.default_rng(seed)
+    results = []
+    for feature_table, feature_names in feature_tables.items():
+        for concurrency in concurrency_levels:
+            for batch_size in batch_sizes:
+                batches = [[str(k) for k in rng.integers(0, num_keys, batch_size)]
+                           for _ in range(num_requests + warmup_requests)]
+
+                def _request(keys: List[str]) -> float:
+                    start = time.perf_counter()
+                    if batch_size == 1:
+                        client.get_online_features(feature_table, keys[0], feature_names)
+                    else:
+                        client.multi_get_online_features(feature_table, keys, feature_names)
+                    return (time.perf_counter() - start) * 1000
+
+                with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                    list(executor.map(_request, batches[:warmup_requests]))
+                    cpu_start = time.process_time()
+                    wall_start = time.perf_counter()
+                    latencies_ms = list(executor.map(_request, batches[warmup_requests:]))
+                    wall_time_sec = time.perf_counter() - wall_start
+                    cpu_time_sec = time.process_time() - cpu_start
+                results.append(OnlineBenchmarkResult(feature_table, concurrency, batch_size, num_requests, latencies_ms,
+                                                     wall_time_sec, cpu_time_sec,
+                                                     num_requests * batch_size * len(feature_names)))
+    return results
+
+
+def benchmark_decode(client, feature_tables: Dict[str, List[str]], num_keys: int, num_rows: int = 10000,
+                     seed: int = 0) -> Dict[str, Dict[str, float]]:
+    """Measure the client side of the read path alone, i.e. Redis key construction and decoding, on raw values
+    fetched once from the online store. Unlike `run_online_benchmark`, it doesn't depend on the network or the server.
+
+    Returns:
+        Feature table -> {"key_ns": time to construct one Redis key, "decode_ns_per_value": time to decode one value}.
+    """
+    rng = np.random.default_rng(seed)
+    results = {}
+    for feature_table, feature_names in feature_tables.items():
+        keys = [str(k) for k in rng.integers(0, num_keys, num_rows)]
+        start = time.perf_counter()
+        redis_keys = [client._construct_redis_key(feature_table, key) for key in keys]
+        key_ns = (time.perf_counter() - start) * 1e9 / num_rows
+        raw_rows = client._execute_hmgets([(redis_key, feature_names) for redis_key in redis_keys])
+        start = time.perf_counter()
+        client._decode_rows(feature_table, raw_rows, feature_names)
+        decode_ns = (time.perf_counter() - start) * 1e9 / (num_rows * len(feature_names))
+        results[feature_table] = {"key_ns": key_ns, "decode_ns_per_value": decode_ns}
+    return results
+
+
+def benchmark_value_encodings(client, num_keys: int = 10000, num_rows: int = 10000, sample_size: int = 1000,
+                              seed: int = 0) -> Dict[str, Dict[str, Dict[str, float]]]:
+    """Compare the "base64" and "raw" value encodings of the online store: the synthetic `BENCHMARK_TABLES` are
+    written in both encodings (the "raw" tables get a "_raw" suffix), then the Redis memory of each table is estimated
+    with `OnlineStoreAnalyzer` and the same rows are decoded with the decode plans of the client and `decode_columns`.
+
+    Returns:
+        Feature table -> encoding -> {"memory_bytes": estimated Redis memory of the table, "value_bytes": mean size
+        of a value, "decode_ns_per_value": decoding time per value, "columnar_decode_ns_per_value":
+        `decode_columns` time per value}.
+    """
+    rng = np.random.default_rng(seed)
+    encodings = {"base64": "", "raw": "_raw"}
+    for value_encoding, table_suffix in encodings.items():
+        populate_benchmark_tables(client, num_keys=num_keys, seed=seed, value_encoding=value_encoding,
+                                  table_suffix=table_suffix)
+    analyzer = OnlineStoreAnalyzer(client.redis_client, client.redis_cluster_enabled, sample_size=sample_size,
+                                   key_separator=client._KEY_SEPARATOR, seed=seed)
+    keys = [str(k) for k in rng.integers(0, num_keys, num_rows)]
+    results = {}
+    for feature_table, feature_types in BENCHMARK_TABLES.items():
+        feature_names = list(feature_types)
+        results[feature_table] = {}
+        for value_encoding, table_suffix in encodings.items():
+            stats = analyzer.analyze_table(feature_table + table_suffix)
+            raw_rows = client._execute_hmgets([(client._construct_redis_key(feature_table + table_suffix, key),
+                                                feature_names) for key in keys])
+            num_values = num_rows * len(feature_names)
+            start = time.perf_counter()
+            client._decode_rows(feature_table, raw_rows, feature_names)
+            decode_ns = (time.perf_counter() - start) * 1e9 / num_values
+            start = time.perf_counter()
+            decode_columns(keys, raw_rows, feature_names)
+            columnar_decode_ns = (time.perf_counter() - start) * 1e9 / num_values
+            results[feature_table][value_encoding] = {
+                "memory_bytes": stats.estimated_memory_bytes,
+                "value_bytes": float(np.mean([len(value) for raw_row in raw_rows for value in raw_row if value])),
+                "decode_ns_per_value": decode_ns,
+                "columnar_decode_ns_per_value": columnar_decode_ns,
+            }
+    return results
+
+
+def drop_benchmark_tables(client):
+    """Delete the synthetic `BENCHMARK_TABLES` written by `populate_benchmark_tables` and `benchmark_value_encodings`
+    from the online store."""
+    for feature_table in BENCHMARK_TABLES:
+        for table_suffix in ["", "_raw"]:
+            client.drop_online_feature_table(feature_table + table_suffix)
+
+
+def format_benchmark_results(results: List[OnlineBenchmarkResult]) -> str:
+    """Format benchmark results as a text table."""
+    header = ["feature_table", "concurrency", "batch_size", "req/s", "values/s", "p50_ms", "p95_ms", "p99_ms",
+              "cpu_us/value"]
+    rows = []
+    for result in results:
+        summary = result.to_dict()
+        rows.append([result.feature_table, str(result.concurrency), str(result.batch_size),
+                     f"{summary['requests_per_sec']:.0f}", f"{summary['values_per_sec']:.0f}",
+                     f"{summary['p50_ms']:.3f}", f"{summary['p95_ms']:.3f}", f"{summary['p99_ms']:.3f}",
+                     f"{summary['cpu_us_per_value']:.2f}"])
+    widths = [max(len(row[i]) for row in [header] + rows) for i in range(len(header))]
+    return "\n".join("  ".join(cell.rjust(width) for cell, width in zip(row, widths)) for row in [header] + rows)
@@ -0,0 +1,236 @@
+from collections import OrderedDict
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from loguru import logger
+from redis.cluster import RedisCluster
+
+# Marks a (key, feature) pair that is not in the cache, as opposed to a cached missing value (None).
+_NOT_CACHED = object()
+
+
+class OnlineFeatureCache:
+    """Bounded in-process cache in front of the online store, for hot entities that are read over and over.
+
+    Entries are raw feature values as stored in Redis, cached per (feature table, key, feature name), so every output
+    format of the online APIs can be served from the cache. Missing values are cached too (negative caching) so that
+    lookups for unknown entities don't always go to Redis.
+
+    Every invalidation bumps a generation counter. Values fetched from Redis are put with the generation read before
+    the fetch, and the ones of keys invalidated since then are dropped, so a write racing with a read doesn't leave a
+    stale value in the cache.
+
+    Attributes:
+        max_size: maximum number of cached (key, feature name) entries. The least recently used entry is evicted when
+            the cache is full.
+        ttl_sec: default time to live of an entry in seconds.
+        table_ttl_sec: feature table -> time to live in seconds, overriding `ttl_sec` for that table.
+        negative_ttl_sec: time to live of a cached missing value. Default to the TTL of its table. Set it to 0 to
+            disable negative caching.
+    """
+    def __init__(self,
+                 max_size: int = 100000,
+                 ttl_sec: float = 60,
+                 table_ttl_sec: Dict[str, float] = None,
+                 negative_ttl_sec: Optional[float] = None,
+                 key_separator: str = ':'):
+        if max_size <= 0:
+            raise RuntimeError(f"max_size of the online feature cache should be greater than 0, but got {max_size}")
+        self.max_size = max_size
+        self.ttl_sec = ttl_sec
+        self.table_ttl_sec = table_ttl_sec or {}
+        self.negative_ttl_sec = negative_ttl_sec
+        self._key_separator = key_separator
+        # (redis key, feature name) -> (expire time, raw value), in LRU order
+        self._entries = OrderedDict()
+        # redis key -> cached feature names, used to invalidate all the features of a key at once
+        self._features_by_key = {}
+        # redis key -> generation of its latest invalidation, bounded by max_size. Puts older than the floor are
+        # dropped, since the invalidations before it are forgotten.
+        self._generation = 0
+        self._invalidated_at = OrderedDict()
+        self._invalidated_floor = 0
+        self._lock = threading.Lock()
+        self._pubsub_threads = []
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get_many(self, redis_keys: List[str], feature_names: List[str]) -> Tuple[List[List[Any]], List[Tuple[int, List[int]]]]:
+        """Look up the features of a batch of keys.
+
+        Returns:
+            A tuple of (cached values, misses). Cached values has one list per key, ordered by feature_names, with
+            uncached cells left as None. Misses is a list of (key index, feature indices) that need to be fetched.
+        """
+        now = time.monotonic()
+        values = []
+        misses = []
+        with self._lock:
+            for i, redis_key in enumerate(redis_keys):
+                row = [None] * len(feature_names)
+                missed_features = []
+                for j, feature_name in enumerate(feature_names):
+                    value = self._get(redis_key, feature_name, now)
+                    if value is _NOT_CACHED:
+                        missed_features.append(j)
+                    else:
+                        row[j] = value
+                values.append(row)
+                if missed_features:
+                    misses.append((i, missed_features))
+            num_missed = sum(len(missed_features) for _, missed_features in misses)
+            self.misses += num_missed
+            self.hits += len(redis_keys) * len(feature_names) - num_missed
+        return values, misses
+
+    def generation(self) -> int:
+        """Get the current invalidation generation, to be read before fetching the values passed to `put_many`."""
+        with self._lock:
+            return self._generation
+
+    def put_many(self, feature_table: str, entries: List[Tuple[str, str, Any]], generation: Optional[int] = None):
+        """Cache a batch of (redis key, feature name, raw value) fetched from the online store.
+
+        Args:
+            feature_table: feature table of the entries
+            entries: (redis key, feature name, raw value) fetched from the online store
+            generation (optional): `generation()` read before the fetch. Entries of keys invalidated since then are
+                not cached.
+        """
+        now = time.monotonic()
+        ttl = self.table_ttl_sec.get(feature_table, self.ttl_sec)
+        negative_ttl = ttl if self.negative_ttl_sec is None else self.negative_ttl_sec
+        with self._lock:
+            if generation is not None and generation < self._invalidated_floor:
+                return
+            for redis_key, feature_name, value in entries:
+                if generation is not None and self._invalidated_at.get(redis_key, -1) > generation:
+                    continue
+                entry_ttl = ttl if value is not None else negative_ttl
+                if entry_ttl <= 0:
+                    continue
+                entry_key = (redis_key, feature_name)
+                self._entries[entry_key] = (now + entry_ttl, value)
+                self._entries.move_to_end(entry_key)
+                self._features_by_key.setdefault(redis_key, set()).add(feature_name)
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, redis_key: str, feature_name: Optional[str] = None):
+        """Drop the cached features of a key, or only one feature of it if `feature_name` is set."""
+        with self._lock:
+            self._generation += 1
+            self._invalidated_at[redis_key] = self._generation
+            self._invalidated_at.move_to_end(redis_key)
+            while len(self._invalidated_at) > self.max_size:
+                _, self._invalidated_floor = self._invalidated_at.popitem(last=False)
+            feature_names = [feature_name] if feature_name else list(self._features_by_key.get(redis_key, []))
+            for name in feature_names:
+                if (redis_key, name) in self._entries:
+                    self._remove((redis_key, name))
+                    self.invalidations += 1
+
+    def invalidate_table(self, feature_table: str):
+        """Drop all the cached features of a feature table."""
+        prefix = feature_table + self._key_separator
+        with self._lock:
+            self._bump_floor()
+            for entry_key in [k for k in self._entries if k[0].startswith(prefix)]:
+                self._remove(entry_key)
+                self.invalidations += 1
+
+    def clear(self):
+        """Drop all the cached entries. Counters are kept."""
+        with self._lock:
+            self._bump_floor()
+            self._entries.clear()
+            self._features_by_key.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Get the cache counters, i.e. hits, misses, evictions, expirations, invalidations and the current size."""
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+    def start_keyspace_invalidation(self, redis_client, feature_tables: List[str] = None, db: int = 0,
+                                    configure_server: bool = False, sleep_time: float = 0.1):
+        """Invalidate cached entries when their Redis key is written, deleted, expired or evicted, using Redis
+        keyspace notifications. The notifications are consumed by a background daemon thread.
+
+        In Redis Cluster mode, notifications are only published by the node owning the key: one subscription (and
+        thread) is opened per primary node, and CONFIG SET is run on every primary.
+
+        Args:
+            redis_client: Redis client used to subscribe to the notifications, or a `RedisCluster` client.
+            feature_tables (optional): only listen to the keys of these feature tables. Default to all the keys.
+            db: Redis database number. Default to 0.
+            configure_server: if True, enable keyspace notifications for hash and generic commands on the server
+                via CONFIG SET. Otherwise `notify-keyspace-events` needs to be configured beforehand (e.g. "Khgxe").
+            sleep_time: polling interval of the background thread, in seconds.
+        """
+        if isinstance(redis_client, RedisCluster):
+            node_clients = [redis_client.get_redis_connection(node) for node in redis_client.get_primaries()]
+        else:
+            node_clients = [redis_client]
+        if configure_server:
+            for node_client in node_clients:
+                node_client.config_set("notify-keyspace-events", "Khgxe")
+        channel_prefix = f"__keyspace@{db}__:"
+        patterns = [channel_prefix + table + self._key_separator + "*" for table in feature_tables] if feature_tables else [channel_prefix + "*"]
+
+        def _handler(message):
+            channel = message["channel"]
+            if isinstance(channel, bytes):
+                channel = channel.decode()
+            self.invalidate(channel[len(channel_prefix):])
+
+        self.stop_keyspace_invalidation()
+        for node_client in node_clients:
+            pubsub = node_client.pubsub(ignore_subscribe_messages=True)
+            pubsub.psubscribe(**{pattern: _handler for pattern in patterns})
+            self._pubsub_threads.append(pubsub.run_in_thread(sleep_time=sleep_time, daemon=True))
+        logger.info(f"Online feature cache is listening to keyspace notifications of {patterns} on {len(node_clients)} node(s).")
+
+    def stop_keyspace_invalidation(self):
+        """Stop listening to Redis keyspace notifications."""
+        for pubsub_thread in self._pubsub_threads:
+            pubsub_thread.stop()
+        self._pubsub_threads = []
+
+    def _bump_floor(self):
+        # Drop all the values being fetched, the invalidated keys are not tracked one by one
+        self._generation += 1
+        self._invalidated_floor = self._generation
+        self._invalidated_at.clear()
+
+    def _get(self, redis_key: str, feature_name: str, now: float):
+        entry_key = (redis_key, feature_name)
+        entry = self._entries.get(entry_key)
+        if entry is None:
+            return _NOT_CACHED
+        expire_at, value = entry
+        if expire_at <= now:
+            self._remove(entry_key)
+            self.expirations += 1
+            return _NOT_CACHED
+        self._entries.move_to_end(entry_key)
+        return value
+
+    def _remove(self, entry_key: Tuple[str, str]):
+        del self._entries[entry_key]
+        redis_key, feature_name = entry_key
+        feature_names = self._features_by_key.get(redis_key)
+        if feature_names is not None:
+            feature_names.discard(feature_name)
+            if not feature_names:
+                del self._features_by_key[redis_key]
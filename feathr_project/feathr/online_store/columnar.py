@@ -0,0 +1,280 @@
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pyarrow as pa
+
+from feathr.online_store._feature_value import (
+    DENSE_ARRAY_FIELDS,
+    FEATURE_VALUE_ONEOF,
+    SCALAR_FIELDS,
+    SPARSE_ARRAY_FIELDS,
+    VALUE_GETTERS,
+    serialized_feature_value,
+)
+from feathr.online_store.decode_plan import OnlineDecodePlan
+from feathr.protobuf.featureValue_pb2 import FeatureValue
+
+
+class OnlineFeatureColumns:
+    """Columnar result of a batch online read, i.e. `multi_get_online_features(..., output_format="numpy")`.
+
+    Each feature is decoded into a single column instead of one Python object per cell:
+        - scalar features are 1-D numpy arrays, e.g. float32 for `float_value`. String features use an object array.
+        - dense `*_array` features with a fixed length are one contiguous 2-D numpy array of shape (num_keys, length).
+          If the arrays have different lengths, an object array of 1-D numpy arrays is returned instead.
+        - sparse `sparse_*_array` features are `scipy.sparse.csr_matrix` of shape (num_keys, max_index + 1).
+          `sparse_string_array` cannot be stored in a CSR matrix, so it's kept as an object array of
+          (index array, value array) tuples.
+
+    Attributes:
+        keys: the entity keys, in the requested order. Composite keys are joined the same way as the dict output.
+        columns: feature name -> decoded column.
+        null_masks: feature name -> boolean numpy array, True where the feature value is missing.
+        default_values: feature name -> value used to fill the missing cells, for the features whose missing cells
+            were filled. Missing rows of sparse matrices are empty rows, they are not filled.
+        degraded_features: feature name -> why it was served degraded, i.e. "replica" if it was read from a replica
+            or "deadline" if it missed the deadline of the read.
+    """
+    def __init__(self, keys: List[str], columns: Dict[str, Any], null_masks: Dict[str, np.ndarray], default_values: Dict[str, Any] = None):
+        self.keys = keys
+        self.columns = columns
+        self.null_masks = null_masks
+        self.default_values = default_values or {}
+        self.degraded_features = {}
+
+    def __getitem__(self, feature_name: str):
+        return self.columns[feature_name]
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def to_arrow(self, key_column_name: str = "key") -> pa.Table:
+        """Convert the columns into a pyarrow Table. Missing values are nulls unless a default value was given.
+        Dense arrays become fixed size lists and sparse arrays become a struct of `indices` and `values` lists.
+
+        Args:
+            key_column_name: name of the column holding the entity keys. Default to "key".
+        """
+        arrays = [pa.array(self.keys)]
+        names = [key_column_name]
+        for feature_name, column in self.columns.items():
+            null_mask = self.null_masks[feature_name]
+            if feature_name in self.default_values:
+                # Missing cells have been filled with the default value, so they are valid values now
+                null_mask = np.zeros(len(self.keys), dtype=np.bool_)
+            arrays.append(_column_to_arrow(column, null_mask))
+            names.append(feature_name)
+        return pa.Table.from_arrays(arrays, names=names)
+
+
+def decode_columns(keys: List[str], pipeline_result: List[List[Optional[bytes]]], feature_names: List[str],
+                   default_values: Dict[str, Any] = None, plan: OnlineDecodePlan = None) -> OnlineFeatureColumns:
+    """Decode the raw HMGET results of a whole pipeline into per-feature columns.
+
+    Args:
+        keys: entity keys, one per HMGET in the pipeline.
+        pipeline_result: raw (encoded) values returned by the pipeline, one list per key, ordered by feature_names.
+        feature_names: requested feature names.
+        default_values (optional): feature name -> value to fill in where the feature is missing.
+        plan (optional): decode plan of the request. A feature with a declared type is decoded as that type, and the
+            values of an unknown or unexpected type are counted in the plan's stats. They are missing in the columns.
+    """
+    default_values = default_values or {}
+    plan = plan or OnlineDecodePlan(feature_names)
+    columns = {}
+    null_masks = {}
+    filled = {}
+    for j, feature_name in enumerate(feature_names):
+        raw_values = [feature_list[j] for feature_list in pipeline_result]
+        default_value = default_values.get(feature_name)
+        columns[feature_name], null_masks[feature_name] = _decode_column(raw_values, plan, j, default_value)
+        # Sparse matrices have no cell to fill, their missing rows are empty rows
+        if default_value is not None and not hasattr(columns[feature_name], "indptr"):
+            filled[feature_name] = default_value
+    return OnlineFeatureColumns(keys, columns, null_masks, filled)
+
+
+def _decode_column(raw_values: List[Optional[bytes]], plan: OnlineDecodePlan, j: int, default_value: Any = None):
+    num_rows = len(raw_values)
+    null_mask = np.ones(num_rows, dtype=np.bool_)
+    feature_name = plan.feature_names[j]
+    # One protobuf message is reused for the whole column, `ParseFromString` clears it before parsing.
+    feature_value = FeatureValue()
+    # The column type is the declared one, or the type of the first value if the feature type is not declared
+    value_type = plan.expected_fields[j]
+    builder = None
+    for i, raw_feature in enumerate(raw_values):
+        if not raw_feature:
+            continue
+        feature_value.ParseFromString(serialized_feature_value(raw_feature))
+        which = feature_value.WhichOneof(FEATURE_VALUE_ONEOF)
+        if which != value_type and value_type is not None:
+            if which not in VALUE_GETTERS:
+                plan.count_unknown_value(feature_name)
+            else:
+                plan.count_type_mismatch(feature_name)
+            continue
+        if builder is None:
+            builder = _column_builder(which, num_rows, feature_value)
+            if builder is None:
+                plan.count_unknown_value(feature_name)
+                continue
+            value_type = which
+        builder.set(i, feature_value)
+        null_mask[i] = False
+
+    if builder is None:
+        column = np.empty(num_rows, dtype=object)
+        column[:] = [default_value] * num_rows
+        return column, null_mask
+    return builder.finish(null_mask, default_value), null_mask
+
+
+def _column_builder(which: str, num_rows: int, feature_value: FeatureValue):
+    if which in SCALAR_FIELDS:
+        return _ScalarColumnBuilder(which, SCALAR_FIELDS[which], num_rows)
+    if which in DENSE_ARRAY_FIELDS:
+        field, dtype = DENSE_ARRAY_FIELDS[which]
+        return _DenseColumnBuilder(which, field, dtype, num_rows, len(getattr(getattr(feature_value, which), field)))
+    if which in SPARSE_ARRAY_FIELDS:
+        field, dtype = SPARSE_ARRAY_FIELDS[which]
+        if dtype is object:
+            return _RaggedSparseColumnBuilder(which, field, num_rows)
+        return _SparseColumnBuilder(which, field, dtype, num_rows)
+    return None
+
+
+class _ScalarColumnBuilder:
+    def __init__(self, which: str, dtype, num_rows: int):
+        self.which = which
+        self.column = np.zeros(num_rows, dtype=dtype)
+
+    def set(self, i: int, feature_value: FeatureValue):
+        self.column[i] = getattr(feature_value, self.which)
+
+    def finish(self, null_mask: np.ndarray, default_value: Any):
+        if default_value is not None:
+            self.column[null_mask] = default_value
+        elif self.column.dtype == object:
+            self.column[null_mask] = None
+        elif np.issubdtype(self.column.dtype, np.floating):
+            self.column[null_mask] = np.nan
+        return self.column
+
+
+class _DenseColumnBuilder:
+    def __init__(self, which: str, field: str, dtype, num_rows: int, length: int):
+        self.which = which
+        self.field = field
+        self.dtype = dtype
+        self.ragged = dtype is object
+        if self.ragged:
+            self.column = np.empty(num_rows, dtype=object)
+        else:
+            self.column = np.zeros((num_rows, length), dtype=dtype)
+
+    def set(self, i: int, feature_value: FeatureValue):
+        values = getattr(getattr(feature_value, self.which), self.field)
+        if not self.ragged and len(values) != self.column.shape[1]:
+            self._to_ragged(i)
+        if self.ragged:
+            self.column[i] = np.array(values, dtype=self.dtype)
+        else:
+            self.column[i, :] = values
+
+    def _to_ragged(self, num_filled: int):
+        # Arrays of different length cannot share one 2-D array, keep one 1-D array per row instead
+        ragged = np.empty(self.column.shape[0], dtype=object)
+        for i in range(num_filled):
+            ragged[i] = self.column[i]
+        self.column = ragged
+        self.ragged = True
+
+    def finish(self, null_mask: np.ndarray, default_value: Any):
+        if self.ragged:
+            for i in np.flatnonzero(null_mask):
+                self.column[i] = None if default_value is None else np.array(default_value, dtype=self.dtype)
+            return self.column
+        if default_value is not None:
+            self.column[null_mask] = default_value
+        elif np.issubdtype(self.column.dtype, np.floating):
+            self.column[null_mask] = np.nan
+        return self.column
+
+
+class _SparseColumnBuilder:
+    def __init__(self, which: str, field: str, dtype, num_rows: int):
+        self.which = which
+        self.field = field
+        self.dtype = dtype
+        self.row_lengths = np.zeros(num_rows + 1, dtype=np.int64)
+        self.indices = []
+        self.data = []
+
+    def set(self, i: int, feature_value: FeatureValue):
+        sparse_array = getattr(feature_value, self.which)
+        self.indices.extend(sparse_array.index_integers)
+        self.data.extend(getattr(sparse_array, self.field))
+        self.row_lengths[i + 1] = len(sparse_array.index_integers)
+
+    def finish(self, null_mask: np.ndarray, default_value: Any):
+        # Missing rows are empty rows in the sparse matrix, the default value is not applicable here.
+        try:
+            from scipy.sparse import csr_matrix
+        except ImportError:
+            raise RuntimeError("scipy is required to decode sparse features into CSR matrices. Install the package using \"pip install scipy\".")
+        indices = np.array(self.indices, dtype=np.int32)
+        indptr = np.cumsum(self.row_lengths)
+        num_columns = int(indices.max()) + 1 if len(indices) else 0
+        return csr_matrix((np.array(self.data, dtype=self.dtype), indices, indptr),
+                          shape=(len(self.row_lengths) - 1, num_columns))
+
+
+class _RaggedSparseColumnBuilder:
+    def __init__(self, which: str, field: str, num_rows: int):
+        self.which = which
+        self.field = field
+        self.column = np.empty(num_rows, dtype=object)
+
+    def set(self, i: int, feature_value: FeatureValue):
+        sparse_array = getattr(feature_value, self.which)
+        self.column[i] = (np.array(sparse_array.index_integers, dtype=np.int32),
+                          np.array(getattr(sparse_array, self.field), dtype=object))
+
+    def finish(self, null_mask: np.ndarray, default_value: Any):
+        for i in np.flatnonzero(null_mask):
+            self.column[i] = default_value
+        return self.column
+
+
+def _validity_buffer(null_mask: np.ndarray):
+    if not null_mask.any():
+        return None
+    return pa.py_buffer(np.packbits(~null_mask, bitorder='little'))
+
+
+def _cell_to_python(cell: Any):
+    if isinstance(cell, np.ndarray):
+        return cell.tolist()
+    if isinstance(cell, tuple):
+        # (index array, value array) of a sparse string array
+        return {"indices": cell[0].tolist(), "values": cell[1].tolist()}
+    return cell
+
+
+def _column_to_arrow(column: Any, null_mask: np.ndarray) -> pa.Array:
+    num_rows = len(null_mask)
+    if hasattr(column, "indptr"):
+        # CSR matrix -> struct<indices: list<int32>, values: list<T>>
+        offsets = pa.array(column.indptr.astype(np.int32))
+        indices = pa.ListArray.from_arrays(offsets, pa.array(column.indices.astype(np.int32)))
+        values = pa.ListArray.from_arrays(offsets, pa.array(column.data))
+        struct_type = pa.struct([("indices", indices.type), ("values", values.type)])
+        return pa.Array.from_buffers(struct_type, num_rows, [_validity_buffer(null_mask)], children=[indices, values])
+    if column.ndim == 2:
+        values = pa.array(column.ravel())
+        list_type = pa.list_(values.type, column.shape[1])
+        return pa.Array.from_buffers(list_type, num_rows, [_validity_buffer(null_mask)], children=[values])
+    if column.dtype == object:
+        return pa.array([None if is_null else _cell_to_python(cell) for cell, is_null in zip(column, null_mask)])
+    return pa.array(column, mask=null_mask)
@@ -0,0 +1,218 @@
+import asyncio
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, wait
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Why a feature was served degraded, see `degraded_features` of the online results
+DEGRADED_DEADLINE = "deadline"
+DEGRADED_REPLICA = "replica"
+
+# How a read was served: by the primary, by the hedged read to a replica, or not before the deadline
+SERVED_BY_PRIMARY = "primary"
+SERVED_BY_REPLICA = DEGRADED_REPLICA
+MISSED_DEADLINE = DEGRADED_DEADLINE
+
+
+class OnlineFeatureList(list):
+    """Feature values of one key, as returned by `FeathrClient.get_online_features`.
+
+    Attributes:
+        degraded_features: feature name -> why it was served degraded: "deadline" if its feature table missed the
+            deadline of the call (the value is None), "replica" if it was read by a hedged read from a replica (the
+            value may be stale).
+    """
+    def __init__(self, values=(), degraded_features: Dict[str, str] = None):
+        super().__init__(values)
+        self.degraded_features = degraded_features or {}
+
+
+class OnlineFeatureDict(dict):
+    """Feature values of several keys, as returned by `FeathrClient.multi_get_online_features`. See
+    `OnlineFeatureList` for `degraded_features`."""
+    def __init__(self, values=(), degraded_features: Dict[str, str] = None):
+        super().__init__(values)
+        self.degraded_features = degraded_features or {}
+
+
+class HedgingPolicy:
+    """When and where to send hedged online reads, see `FeathrClient.enable_online_hedging`.
+
+    A read that the primary hasn't answered after `delay_sec()` is sent again to a replica, and the first answer wins.
+    The delay is the `percentile` of the recent latencies of the primary, so only the slowest reads are hedged and the
+    extra load on the replicas stays around `100 - percentile` percent.
+
+    Attributes:
+        replica_client: Redis client reading from a replica, used by the sync online APIs.
+        async_replica_client (optional): asyncio Redis client reading from a replica, used by the async online APIs.
+            Async reads are not hedged if it's not set.
+        percentile: percentile of the primary latencies used as hedging delay.
+        min_delay_ms: lower bound of the delay, so a fast primary doesn't get every read hedged.
+        initial_delay_ms: delay used until `min_samples` latencies are recorded.
+        window: number of recent primary latencies kept.
+        num_hedged: number of hedged reads sent.
+        num_replica_wins: number of hedged reads that answered first.
+    """
+    def __init__(self, replica_client, async_replica_client=None, percentile: float = 95.0, min_delay_ms: float = 1.0,
+                 initial_delay_ms: float = 5.0, window: int = 1000, min_samples: int = 20):
+        if not 0 < percentile < 100:
+            raise RuntimeError(f"percentile of the hedging delay should be between 0 and 100, but got {percentile}")
+        self.replica_client = replica_client
+        self.async_replica_client = async_replica_client
+        self.percentile = percentile
+        self.min_delay_ms = min_delay_ms
+        self.initial_delay_ms = initial_delay_ms
+        self.min_samples = min_samples
+        self.num_hedged = 0
+        self.num_replica_wins = 0
+        self._latencies = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, latency_sec: float):
+        """Record the latency of a read answered by the primary, including the ones that lost to a hedged read."""
+        with self._lock:
+            self._latencies.append(latency_sec)
+
+    def delay_sec(self) -> float:
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return self.initial_delay_ms / 1000
+            latencies = np.fromiter(self._latencies, dtype=np.float64, count=len(self._latencies))
+        return max(float(np.percentile(latencies, self.percentile)), self.min_delay_ms / 1000)
+
+    def stats(self) -> Dict[str, float]:
+        return {"hedged": self.num_hedged, "replica_wins": self.num_replica_wins, "delay_ms": self.delay_sec() * 1000}
+
+    def _count_hedged(self):
+        with self._lock:
+            self.num_hedged += 1
+
+    def _count_replica_win(self):
+        with self._lock:
+            self.num_replica_wins += 1
+
+
+def run_with_deadline(executor: Executor, primaries: List[Callable[[], Any]], timeout_sec: Optional[float] = None,
+                      hedging: Optional[HedgingPolicy] = None,
+                      hedges: Optional[List[Callable[[], Any]]] = None) -> List[Tuple[Any, str]]:
+    """Run independent reads concurrently on `executor`, each hedged with the read of `hedges` at the same position if
+    `hedging` is set, and wait for them at most `timeout_sec`.
+
+    Returns:
+        (result, how it was served) of each read, i.e. `SERVED_BY_PRIMARY`, `SERVED_BY_REPLICA`, or
+        (None, `MISSED_DEADLINE`). Reads still running at the deadline are left to finish in the background, and their
+        results are dropped. If a primary read fails, its hedged read is sent right away, and the error of the primary
+        is raised if both fail.
+    """
+    start = time.perf_counter()
+    hedge_delay_sec = hedging.delay_sec() if hedging is not None and hedges is not None else None
+    futures: Dict[Future, Tuple[int, str]] = {}
+    for i, primary in enumerate(primaries):
+        future = executor.submit(primary)
+        if hedging is not None:
+            future.add_done_callback(lambda f: f.exception() is None and hedging.record(time.perf_counter() - start))
+        futures[future] = (i, SERVED_BY_PRIMARY)
+    state = _ReadsState(len(primaries), hedge_delay_sec is not None)
+    while state.pending:
+        elapsed = time.perf_counter() - start
+        if timeout_sec is not None and elapsed >= timeout_sec:
+            break
+        wait_sec = state.wait_sec(elapsed, timeout_sec, hedge_delay_sec)
+        done, _ = wait(list(futures), timeout=max(wait_sec, 0) if wait_sec is not None else None,
+                       return_when=FIRST_COMPLETED)
+        for future in done:
+            i, served_by = futures.pop(future)
+            state.complete(i, served_by, future.exception(), None if future.exception() else future.result(), hedging)
+        for i in state.to_hedge(time.perf_counter() - start, hedge_delay_sec):
+            hedging._count_hedged()
+            futures[executor.submit(hedges[i])] = (i, SERVED_BY_REPLICA)
+        state.raise_failed(i for i, _ in futures.values())
+    return state.results
+
+
+async def arun_with_deadline(primaries: List[Callable[[], Awaitable[Any]]], timeout_sec: Optional[float] = None,
+                             hedging: Optional[HedgingPolicy] = None,
+                             hedges: Optional[List[Callable[[], Awaitable[Any]]]] = None) -> List[Tuple[Any, str]]:
+    """Asyncio version of `run_with_deadline`. Reads still running when it returns are cancelled, except the primary
+    reads if hedging is enabled, so their latency is recorded."""
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    hedge_delay_sec = hedging.delay_sec() if hedging is not None and hedges is not None else None
+    tasks: Dict[asyncio.Future, Tuple[int, str]] = {}
+    for i, primary in enumerate(primaries):
+        task = asyncio.ensure_future(primary())
+        if hedging is not None:
+            task.add_done_callback(
+                lambda t: not t.cancelled() and t.exception() is None and hedging.record(loop.time() - start))
+        tasks[task] = (i, SERVED_BY_PRIMARY)
+    state = _ReadsState(len(primaries), hedge_delay_sec is not None)
+    try:
+        while state.pending:
+            elapsed = loop.time() - start
+            if timeout_sec is not None and elapsed >= timeout_sec:
+                break
+            wait_sec = state.wait_sec(elapsed, timeout_sec, hedge_delay_sec)
+            done, _ = await asyncio.wait(list(tasks), timeout=max(wait_sec, 0) if wait_sec is not None else None,
+                                         return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                i, served_by = tasks.pop(task)
+                state.complete(i, served_by, task.exception(), None if task.exception() else task.result(), hedging)
+            for i in state.to_hedge(loop.time() - start, hedge_delay_sec):
+                hedging._count_hedged()
+                tasks[asyncio.ensure_future(hedges[i]())] = (i, SERVED_BY_REPLICA)
+            state.raise_failed(i for i, _ in tasks.values())
+        return state.results
+    finally:
+        for task, (_, served_by) in tasks.items():
+            if served_by == SERVED_BY_REPLICA or hedging is None:
+                task.cancel()
+
+
+class _ReadsState:
+    """Bookkeeping of `run_with_deadline` and `arun_with_deadline`."""
+    def __init__(self, num_reads: int, hedged: bool):
+        self.results: List[Tuple[Any, str]] = [(None, MISSED_DEADLINE)] * num_reads
+        self.pending = set(range(num_reads))
+        self.errors: Dict[int, BaseException] = {}
+        self.hedge_sent = [not hedged] * num_reads
+
+    def wait_sec(self, elapsed: float, timeout_sec: Optional[float], hedge_delay_sec: Optional[float]) -> Optional[float]:
+        """How long to wait for the next read to complete: until the deadline, or the hedging delay if some pending
+        reads are not hedged yet."""
+        wait_sec = None if timeout_sec is None else timeout_sec - elapsed
+        if any(not self.hedge_sent[i] for i in self.pending):
+            hedge_in = hedge_delay_sec - elapsed
+            wait_sec = hedge_in if wait_sec is None else min(hedge_in, wait_sec)
+        return wait_sec
+
+    def complete(self, i: int, served_by: str, error: Optional[BaseException], result: Any,
+                 hedging: Optional[HedgingPolicy]):
+        if i not in self.pending:
+            # The other read of the pair already answered
+            return
+        if error is not None:
+            # Keep the error of the primary read if both fail
+            self.errors.setdefault(i, error)
+            return
+        self.results[i] = (result, served_by)
+        self.pending.discard(i)
+        if served_by == SERVED_BY_REPLICA:
+            hedging._count_replica_win()
+
+    def to_hedge(self, elapsed: float, hedge_delay_sec: Optional[float]) -> List[int]:
+        """Pending reads to hedge now: the ones whose primary failed or is slower than the hedging delay."""
+        to_hedge = [i for i in self.pending
+                    if not self.hedge_sent[i] and (i in self.errors or elapsed >= hedge_delay_sec)]
+        for i in to_hedge:
+            self.hedge_sent[i] = True
+        return to_hedge
+
+    def raise_failed(self, running):
+        """Raise the error of a pending read that has no other read running."""
+        running = set(running)
+        for i in self.pending:
+            if i in self.errors and i not in running:
+                raise self.errors[i]
@@ -0,0 +1,98 @@
+import threading
+from typing import Any, Dict, List, Optional
+
+from feathr.definition.dtype import FeatureType
+from feathr.online_store._feature_value import (FEATURE_VALUE_ONEOF, VALUE_GETTERS, oneof_field_of_feature_type,
+                                                serialized_feature_value)
+from feathr.protobuf.featureValue_pb2 import FeatureValue
+
+
+class OnlineDecodePlan:
+    """Decodes the raw online values of a fixed list of features, built once per list of requested features by
+    `FeathrClient.get_online_features` and the other online read APIs.
+
+    The oneof field of each feature is resolved from its declared `FeatureType` when the plan is built, so a value is
+    decoded with a single `WhichOneof` call and a pre-bound getter. A value stored with another field than the declared
+    type is still decoded from its actual field, and counted in `type_mismatches`. Features without a declared type are
+    decoded from their actual field. Values of fields unknown to this client version are decoded as None and counted in
+    `unknown_values`.
+
+    Attributes:
+        feature_names: the decoded features, in the order of the raw values.
+        expected_fields: oneof field of each feature, None if its type is not declared.
+        type_mismatches: feature name -> number of values that don't match the declared type.
+        unknown_values: feature name -> number of values of an unknown field.
+        num_type_mismatches: total of `type_mismatches`.
+    """
+    def __init__(self, feature_names: List[str], feature_types: Dict[str, FeatureType] = None):
+        feature_types = feature_types or {}
+        self.feature_names = list(feature_names)
+        self.expected_fields = [_expected_field(feature_types.get(name)) for name in self.feature_names]
+        self._getters = [VALUE_GETTERS.get(which) for which in self.expected_fields]
+        self.type_mismatches: Dict[str, int] = {}
+        self.unknown_values: Dict[str, int] = {}
+        self.num_type_mismatches = 0
+        self._lock = threading.Lock()
+
+    def decode(self, raw_values: List[Optional[bytes]]) -> List[Any]:
+        """Decode the raw values of one key, ordered by `feature_names`."""
+        return self.decode_rows([raw_values])[0]
+
+    def decode_rows(self, rows: List[List[Optional[bytes]]]) -> List[List[Any]]:
+        """Decode the raw values of several keys, one list of raw values per key ordered by `feature_names`."""
+        expected_fields = self.expected_fields
+        getters = self._getters
+        decoded = []
+        for raw_values in rows:
+            row = []
+            for i, raw_value in enumerate(raw_values):
+                if not raw_value:
+                    row.append(raw_value)
+                    continue
+                feature_value = FeatureValue.FromString(serialized_feature_value(raw_value))
+                which = feature_value.WhichOneof(FEATURE_VALUE_ONEOF)
+                if which == expected_fields[i]:
+                    row.append(getters[i](feature_value))
+                else:
+                    row.append(self._decode_unexpected(i, which, feature_value))
+            decoded.append(row)
+        return decoded
+
+    def add_stats_to(self, stats: Dict[str, Dict[str, int]]):
+        """Add the counters of the plan to `stats`, i.e. {"type_mismatches": {...}, "unknown_values": {...}}."""
+        with self._lock:
+            for name, counters in (("type_mismatches", self.type_mismatches), ("unknown_values", self.unknown_values)):
+                for feature_name, count in counters.items():
+                    stats[name][feature_name] = stats[name].get(feature_name, 0) + count
+
+    def count_type_mismatch(self, feature_name: str):
+        """Count a value of `feature_name` that doesn't match its type, e.g. when it's decoded by `decode_columns`."""
+        self._count(self.type_mismatches, feature_name)
+
+    def count_unknown_value(self, feature_name: str):
+        """Count a value of `feature_name` of a field unknown to this client version."""
+        self._count(self.unknown_values, feature_name)
+
+    def _decode_unexpected(self, i: int, which: Optional[str], feature_value: FeatureValue) -> Any:
+        getter = VALUE_GETTERS.get(which)
+        if getter is None:
+            self.count_unknown_value(self.feature_names[i])
+            return None
+        if self.expected_fields[i] is not None:
+            self.count_type_mismatch(self.feature_names[i])
+        return getter(feature_value)
+
+    def _count(self, counters: Dict[str, int], feature_name: str):
+        with self._lock:
+            counters[feature_name] = counters.get(feature_name, 0) + 1
+            if counters is self.type_mismatches:
+                self.num_type_mismatches += 1
+
+
+def _expected_field(feature_type: Optional[FeatureType]) -> Optional[str]:
+    if feature_type is None:
+        return None
+    try:
+        return oneof_field_of_feature_type(feature_type)
+    except NotImplementedError:
+        return None
@@ -0,0 +1,269 @@
+from graphlib import CycleError, TopologicalSorter
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+from feathr.definition.dtype import ValueType
+from feathr.definition.feature_derivations import DerivedFeature
+from feathr.definition.transformation import ExpressionTransformation
+from feathr.online_store.columnar import OnlineFeatureColumns
+from feathr.utils.dsl.dsl_generator import AtomOp, FuncOp, Operator, parse
+
+# A compiled expression takes the input columns (feature alias -> float64 array) and returns the output column
+_Column = np.ndarray
+_CompiledExpr = Callable[[Dict[str, _Column]], _Column]
+
+
+def _divide(a: _Column, b: _Column) -> _Column:
+    # Same as Spark SQL, dividing by zero gives null instead of inf
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(b == 0, np.nan, np.true_divide(a, b))
+
+
+def _mod(a: _Column, b: _Column) -> _Column:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(b == 0, np.nan, np.fmod(a, b))
+
+
+def _log(*args: _Column) -> _Column:
+    # log(x) is the natural logarithm, log(base, x) the logarithm of x in base `base`
+    with np.errstate(divide="ignore", invalid="ignore"):
+        res = np.log(args[0]) if len(args) == 1 else np.log(args[1]) / np.log(args[0])
+    return np.where(np.isfinite(res), res, np.nan)
+
+
+def _if(condition: _Column, then: _Column, otherwise: _Column) -> _Column:
+    return np.where(np.isnan(condition), np.nan, np.where(condition != 0, then, otherwise))
+
+
+def _coalesce(*args: _Column) -> _Column:
+    res = args[0]
+    for arg in args[1:]:
+        res = np.where(np.isnan(res), arg, res)
+    return res
+
+
+_OPERATORS = {
+    (Operator.plus.value, 1): lambda a: a,
+    (Operator.minus.value, 1): np.negative,
+    (Operator.plus.value, 2): np.add,
+    (Operator.minus.value, 2): np.subtract,
+    (Operator.multiply.value, 2): np.multiply,
+    (Operator.divide.value, 2): _divide,
+    (Operator.mod.value, 2): _mod,
+    (Operator.power.value, 2): np.power,
+}
+
+# Spark SQL functions (see `feathr.utils.dsl.functions`) that have a vectorized numpy equivalent
+_FUNCTIONS = {
+    "abs": np.abs,
+    "cbrt": np.cbrt,
+    "ceil": np.ceil,
+    "coalesce": _coalesce,
+    "cos": np.cos,
+    "exp": np.exp,
+    "floor": np.floor,
+    "greatest": lambda *args: np.fmax.reduce(args),
+    "if": _if,
+    "isnull": lambda a: np.isnan(a).astype(np.float64),
+    "least": lambda *args: np.fmin.reduce(args),
+    "ln": _log,
+    "log": _log,
+    "log10": lambda a: _log(np.full_like(a, 10.0), a),
+    "log2": lambda a: _log(np.full_like(a, 2.0), a),
+    "nvl": _coalesce,
+    "pow": np.power,
+    "power": np.power,
+    # Spark SQL rounds half away from zero, while np.round rounds half to even
+    "round": lambda a: np.sign(a) * np.floor(np.abs(a) + 0.5),
+    "sign": np.sign,
+    "signum": np.sign,
+    "sin": np.sin,
+    "sqrt": lambda a: np.sqrt(np.where(a < 0, np.nan, a)),
+    "tan": np.tan,
+}
+
+
+class _CompiledFeature:
+    def __init__(self, feature: DerivedFeature):
+        self.name = feature.name
+        self.val_type = feature.feature_type.val_type
+        # The expression refers to its inputs by alias, while the values are stored under the feature names
+        self.inputs = {input_feature.feature_alias: input_feature.name for input_feature in feature.input_features}
+        transform = feature.transform
+        expr = transform.expr if isinstance(transform, ExpressionTransformation) else transform
+        if not isinstance(expr, str):
+            raise NotImplementedError(f"Derived feature {feature.name} uses {type(transform).__name__}, only expressions "
+                                      f"can be evaluated at serving time.")
+        self.expr = expr
+        try:
+            tree = parse(expr)
+        except (AssertionError, ValueError) as e:
+            # The parser raises assertion and value errors on malformed expressions
+            raise RuntimeError(f"Derived feature {feature.name} has a malformed expression {expr!r}: {e}") from e
+        try:
+            self._fn = _compile(tree, self.inputs)
+        except NotImplementedError as e:
+            raise NotImplementedError(f"Derived feature {feature.name} can't be evaluated at serving time: {e}") from e
+
+    def evaluate(self, columns: Dict[str, _Column]) -> _Column:
+        with np.errstate(invalid="ignore", over="ignore"):
+            res = self._fn({alias: columns[name] for alias, name in self.inputs.items()})
+        num_rows = len(next(iter(columns.values()))) if columns else 0
+        return np.broadcast_to(np.asarray(res, dtype=np.float64), (num_rows,)).copy()
+
+
+def _compile(node, inputs: Dict[str, str]) -> _CompiledExpr:
+    if isinstance(node, AtomOp):
+        if node.token.is_number():
+            value = float(node.value)
+            return lambda columns: value
+        if node.value in inputs:
+            alias = node.value
+            return lambda columns: columns[alias]
+        raise RuntimeError(f"{node.value} is not an input feature")
+    if isinstance(node, FuncOp):
+        args = [_compile(op, inputs) for op in node.ops]
+        if node.func.token.is_operator():
+            fn = _OPERATORS.get((node.func.value, len(args)))
+            if fn is None:
+                raise NotImplementedError(f"operator {node.func.value}")
+        else:
+            fn = _FUNCTIONS.get(node.func.value.lower())
+            if fn is None:
+                raise NotImplementedError(f"function {node.func.value}")
+        return lambda columns: fn(*(arg(columns) for arg in args))
+    raise NotImplementedError(f"expression {node}")
+
+
+class OnlineDerivedFeatures:
+    """Evaluates derived features at serving time from the fetched values of their input features, instead of
+    materializing them.
+
+    Each `ExpressionTransformation` is parsed with the Feathr expression parser and compiled once into a function of
+    numpy columns, so a whole batch of keys is evaluated at once. Derived features are evaluated in dependency order,
+    and may depend on other derived features of the list. Inputs are converted to float64 with missing values as NaN,
+    and a missing input gives a missing output, like in Spark SQL.
+
+    Only numeric scalar features, arithmetic operators and the functions with a numpy equivalent (abs, sqrt, exp, log,
+    pow, round, least, greatest, if, coalesce, ...) are supported.
+
+    Attributes:
+        derived_features: the derived features that can be evaluated, by name.
+    """
+    def __init__(self, derived_features: List[DerivedFeature]):
+        self.derived_features = {feature.name: feature for feature in derived_features}
+        self._compiled = {feature.name: _CompiledFeature(feature) for feature in derived_features}
+        sorter = TopologicalSorter()
+        for feature in derived_features:
+            sorter.add(feature.name, *[f.name for f in feature.input_features if f.name in self.derived_features])
+        try:
+            self._order = list(sorter.static_order())
+        except CycleError as e:
+            raise RuntimeError(f"Derived features have a cyclic dependency: {e.args[1]}")
+
+    def required_features(self, feature_names: List[str]) -> List[str]:
+        """Get the features to fetch from the online store to evaluate `feature_names`, i.e. the requested features
+        that are not derived here plus the inputs of the requested derived features, transitively."""
+        required = []
+        visited = set()
+
+        def _visit(name: str):
+            if name in visited:
+                return
+            visited.add(name)
+            if name in self.derived_features:
+                for input_feature in self.derived_features[name].input_features:
+                    _visit(input_feature.name)
+            else:
+                required.append(name)
+
+        for feature_name in feature_names:
+            _visit(feature_name)
+        return required
+
+    def evaluate(self, columns: Dict[str, np.ndarray], feature_names: List[str],
+                 null_masks: Dict[str, np.ndarray] = None) -> Dict[str, np.ndarray]:
+        """Evaluate the requested derived features from the fetched feature columns.
+
+        Args:
+            columns: feature name -> column of fetched values, with None or NaN where the value is missing.
+            feature_names: requested features. Only the derived ones, and the derived features they depend on, are
+                evaluated.
+            null_masks (optional): feature name -> True where the value is missing, for columns that can't hold NaN
+                or None, e.g. integer columns of `OnlineFeatureColumns`.
+
+        Returns:
+            Derived feature name -> float64 column, NaN where the value is missing.
+        """
+        needed = set()
+        pending = [name for name in feature_names if name in self.derived_features]
+        while pending:
+            name = pending.pop()
+            if name not in needed:
+                needed.add(name)
+                pending.extend(f.name for f in self.derived_features[name].input_features if f.name in self.derived_features)
+
+        input_names = {f.name for name in needed for f in self.derived_features[name].input_features} - needed
+        values = {name: _to_float_column(name, columns[name]) for name in input_names}
+        for name, null_mask in (null_masks or {}).items():
+            if name in values:
+                values[name][null_mask] = np.nan
+        derived = {}
+        for name in self._order:
+            if name in needed:
+                derived[name] = values[name] = self._compiled[name].evaluate(values)
+        return derived
+
+    def evaluate_columns(self, fetched: OnlineFeatureColumns, feature_names: List[str],
+                         default_values: Dict[str, Any] = None) -> OnlineFeatureColumns:
+        """Evaluate the requested derived features from decoded feature columns, and return the requested features.
+        Default values filled in the fetched columns are used as inputs, other missing inputs are nulls."""
+        default_values = default_values or {}
+        null_masks = {name: mask for name, mask in fetched.null_masks.items() if name not in fetched.default_values}
+        derived_columns = self.evaluate(fetched.columns, feature_names, null_masks)
+        columns = {}
+        masks = {}
+        filled = {}
+        for name in feature_names:
+            if name in derived_columns:
+                column = derived_columns[name]
+                masks[name] = np.isnan(column)
+                if default_values.get(name) is not None:
+                    column[masks[name]] = filled[name] = default_values[name]
+                columns[name] = column
+            else:
+                columns[name], masks[name] = fetched.columns[name], fetched.null_masks[name]
+                if name in fetched.default_values:
+                    filled[name] = fetched.default_values[name]
+        return OnlineFeatureColumns(fetched.keys, columns, masks, filled)
+
+    def evaluate_rows(self, rows: List[List[Any]], fetched_names: List[str], feature_names: List[str]) -> List[List[Any]]:
+        """Evaluate the requested derived features from decoded feature values, one list per key ordered by
+        `fetched_names`, and return the requested features, one list per key ordered by `feature_names`."""
+        fetched_columns = {name: [row[j] for row in rows] for j, name in enumerate(fetched_names)}
+        derived_columns = self.evaluate(fetched_columns, feature_names)
+        return [[self.to_python_value(name, derived_columns[name][i]) if name in derived_columns
+                 else fetched_columns[name][i] for name in feature_names] for i in range(len(rows))]
+
+    def to_python_value(self, name: str, value: float) -> Any:
+        """Convert one evaluated value into the Python type of the derived feature, None if it's missing."""
+        if np.isnan(value):
+            return None
+        val_type = self._compiled[name].val_type
+        if val_type in (ValueType.INT32, ValueType.INT64):
+            return int(value)
+        if val_type == ValueType.BOOL:
+            return bool(value)
+        return float(value)
+
+
+def _to_float_column(name: str, column: Any) -> np.ndarray:
+    if isinstance(column, np.ndarray) and column.dtype != object:
+        if column.ndim != 1:
+            raise RuntimeError(f"Feature {name} is not a numeric scalar, so it can't be used by a derived feature at serving time.")
+        return column.astype(np.float64)
+    try:
+        return np.array([np.nan if value is None else value for value in column], dtype=np.float64)
+    except (TypeError, ValueError):
+        raise RuntimeError(f"Feature {name} is not a numeric scalar, so it can't be used by a derived feature at serving time.")
@@ -0,0 +1,318 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+from loguru import logger
+import numpy as np
+import pandas as pd
+
+from feathr.online_store._feature_value import decode_feature_value, infer_oneof_field, to_feature_value
+from feathr.protobuf.featureValue_pb2 import FeatureValue
+
+# File layout, all integers little endian:
+#   magic (8 bytes) | metadata length (u32) | metadata (JSON) | padding to 8 bytes
+#   | key hashes (u64 * num_keys, sorted) | record offsets (u64 * num_keys)
+#   | records: key length (u32) | key | value length per feature (u32, _MISSING if missing) | values
+# Values are serialized FeatureValue protobuf messages, without the base64 encoding used in Redis.
+_MAGIC = b"FEATHREO"
+_VERSION = 1
+_MISSING = 0xFFFFFFFF
+_FILE_SUFFIX = ".feathr"
+
+# Same as FeathrClient, so the keys of the results are the same as the online store's
+_COMPOSITE_KEY_SEPARATOR = "#"
+
+
+def build_embedded_online_store(source: Union[pd.DataFrame, str],
+                                output_dir: str,
+                                feature_table: str,
+                                key_columns: List[str],
+                                feature_names: Optional[List[str]] = None,
+                                data_format: str = "parquet") -> str:
+    """Build the embedded online store file of a feature table, readable with `EmbeddedOnlineStore`.
+
+    Args:
+        source: the materialized features, either a pandas DataFrame (e.g. returned by `get_result_df`) or the local
+            path of the `HdfsSink` output.
+        output_dir: directory of the embedded online store, the file is written to `<output_dir>/<feature_table>.feathr`.
+        feature_table: name of the feature table.
+        key_columns: key columns, in the order of the composite keys used at lookup time.
+        feature_names (optional): features to store. Default to all the columns but the keys.
+        data_format: format of the `HdfsSink` output if `source` is a path. Currently support `parquet`, `delta`,
+            `avro`, and `csv`.
+
+    Returns:
+        The path of the written file. It replaces the previous version atomically, so readers that still map the
+        previous version keep reading it until they reopen the store.
+    """
+    if isinstance(source, pd.DataFrame):
+        df = source
+    else:
+        # Imported here since job_utils depends on the client, which depends on this package
+        from feathr.utils.job_utils import _load_files_to_pandas_df
+        df = _load_files_to_pandas_df(source, data_format)
+    missing_columns = [column for column in key_columns if column not in df.columns]
+    if missing_columns:
+        raise RuntimeError(f"Key columns {missing_columns} are not in the materialized features of {feature_table}.")
+    if feature_names is None:
+        feature_names = [column for column in df.columns if column not in key_columns]
+    missing_columns = [name for name in feature_names if name not in df.columns]
+    if missing_columns:
+        raise RuntimeError(f"Features {missing_columns} are not in the materialized features of {feature_table}.")
+
+    keys = [_COMPOSITE_KEY_SEPARATOR.join(str(v) for v in row) for row in zip(*(df[c] for c in key_columns))]
+    # Later rows overwrite earlier ones, like successive writes to the online store
+    row_of_key = {key: i for i, key in enumerate(keys)}
+    if len(row_of_key) != len(keys):
+        logger.warning(f"{len(keys) - len(row_of_key)} duplicated keys in feature table {feature_table}, keeping the last row of each.")
+
+    encoded_columns = []
+    for feature_name in feature_names:
+        column = df[feature_name]
+        which = infer_oneof_field(column.values, column.dtype)
+        if which is None:
+            encoded_columns.append([None] * len(df))
+            continue
+        encoded_columns.append([None if fv is None else fv.SerializeToString()
+                                for fv in (to_feature_value(value, which) for value in column.values)])
+
+    unique_keys = list(row_of_key)
+    encoded_keys = [key.encode("utf-8") for key in unique_keys]
+    hashes = _hash_keys(encoded_keys)
+    # Sort by hash, then by key so the file is deterministic even with hash collisions
+    order = sorted(range(len(unique_keys)), key=lambda i: (hashes[i], encoded_keys[i]))
+
+    metadata = json.dumps({
+        "version": _VERSION,
+        "feature_table": feature_table,
+        "key_columns": key_columns,
+        "feature_names": feature_names,
+        "num_keys": len(unique_keys),
+    }).encode("utf-8")
+    header_size = _align(len(_MAGIC) + 4 + len(metadata))
+    data_offset = header_size + 16 * len(unique_keys)
+
+    records = []
+    offsets = []
+    position = data_offset
+    for i in order:
+        row = row_of_key[unique_keys[i]]
+        values = [encoded[row] for encoded in encoded_columns]
+        record = b"".join([
+            struct.pack("<I", len(encoded_keys[i])),
+            encoded_keys[i],
+            struct.pack(f"<{len(values)}I", *(_MISSING if v is None else len(v) for v in values)),
+            *(v for v in values if v is not None),
+        ])
+        offsets.append(position)
+        records.append(record)
+        position += len(record)
+
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, feature_table + _FILE_SUFFIX)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_MAGIC)
+        f.write(struct.pack("<I", len(metadata)))
+        f.write(metadata)
+        f.write(b"\0" * (header_size - len(_MAGIC) - 4 - len(metadata)))
+        f.write(np.array([hashes[i] for i in order], dtype="<u8").tobytes())
+        f.write(np.array(offsets, dtype="<u8").tobytes())
+        for record in records:
+            f.write(record)
+    os.replace(tmp_path, path)
+    logger.info(f"Embedded online store of feature table {feature_table} with {len(unique_keys)} keys written to {path}.")
+    return path
+
+
+class _EmbeddedTable:
+    """One memory-mapped feature table. The index arrays and the values read are zero-copy views of the mapped file.
+
+    The store counts the lookups reading the table in `readers`. A table dropped by `EmbeddedOnlineStore.reload` is
+    `retired`, and closed once its last reader is done.
+    """
+    def __init__(self, path: str):
+        self.readers = 0
+        self.retired = False
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        # Slicing the mapping copies the bytes, slicing a memoryview of it doesn't
+        self._view = memoryview(self._mmap)
+        if self._mmap[:len(_MAGIC)] != _MAGIC:
+            self.close()
+            raise RuntimeError(f"{path} is not an embedded online store file.")
+        metadata_length, = struct.unpack_from("<I", self._mmap, len(_MAGIC))
+        metadata_start = len(_MAGIC) + 4
+        metadata = json.loads(self._mmap[metadata_start:metadata_start + metadata_length].decode("utf-8"))
+        if metadata["version"] != _VERSION:
+            self.close()
+            raise RuntimeError(f"Unsupported version {metadata['version']} of embedded online store file {path}.")
+        self.feature_names = metadata["feature_names"]
+        self.key_columns = metadata["key_columns"]
+        self._feature_index = {name: j for j, name in enumerate(self.feature_names)}
+        num_keys = metadata["num_keys"]
+        header_size = _align(metadata_start + metadata_length)
+        self._hashes = np.frombuffer(self._mmap, dtype="<u8", count=num_keys, offset=header_size)
+        self._offsets = np.frombuffer(self._mmap, dtype="<u8", count=num_keys, offset=header_size + 8 * num_keys)
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+    def get_many(self, keys: List[str], feature_names: List[str]) -> List[List[Any]]:
+        encoded_keys = [key.encode("utf-8") for key in keys]
+        hashes = np.array(_hash_keys(encoded_keys), dtype=np.uint64)
+        positions = np.searchsorted(self._hashes, hashes)
+        feature_indices = [self._feature_index.get(name) for name in feature_names]
+        num_features = len(self.feature_names)
+        results = []
+        for encoded_key, key_hash, position in zip(encoded_keys, hashes, positions.tolist()):
+            record = self._find_record(encoded_key, key_hash, position)
+            if record is None:
+                results.append([None] * len(feature_names))
+                continue
+            lengths = np.frombuffer(self._mmap, dtype="<u4", count=num_features, offset=record).tolist()
+            value_offsets = [record + 4 * num_features]
+            for length in lengths:
+                value_offsets.append(value_offsets[-1] + (0 if length == _MISSING else length))
+            row = []
+            for j in feature_indices:
+                if j is None or lengths[j] == _MISSING:
+                    row.append(None)
+                    continue
+                # The decoded repeated fields belong to the message, so each value gets its own message
+                feature_value = FeatureValue()
+                feature_value.ParseFromString(self._view[value_offsets[j]:value_offsets[j + 1]])
+                row.append(decode_feature_value(feature_value))
+            results.append(row)
+        return results
+
+    def _find_record(self, encoded_key: bytes, key_hash: np.uint64, position: int) -> Optional[int]:
+        """Offset of the values of `encoded_key`, None if it's not in the table. Keys with the same hash are next to
+        each other in the index."""
+        while position < len(self._hashes) and self._hashes[position] == key_hash:
+            offset = int(self._offsets[position])
+            key_length, = struct.unpack_from("<I", self._mmap, offset)
+            if self._view[offset + 4:offset + 4 + key_length] == encoded_key:
+                return offset + 4 + key_length
+            position += 1
+        return None
+
+    def close(self):
+        # The index arrays and the memoryview export the mapping, they must be released before it's closed
+        self._hashes = self._offsets = None
+        self._view.release()
+        self._mmap.close()
+
+
+class EmbeddedOnlineStore:
+    """Read-only online store embedded in the process, for point lookups without a Redis hop, e.g. for edge or batch
+    scoring deployments.
+
+    Each feature table is a file built by `build_embedded_online_store` from the offline materialization output, with
+    the keys sorted by hash. The file is memory-mapped, so lookups are binary searches in the index and reads from the
+    page cache, and the same file is shared by all the worker processes of a host. The read APIs are the same as the
+    online APIs of `FeathrClient`.
+
+    Attributes:
+        path: directory of the embedded online store, holding one `<feature_table>.feathr` file per feature table.
+    """
+    def __init__(self, path: str):
+        if not os.path.isdir(path):
+            raise RuntimeError(f"Embedded online store {path} doesn't exist.")
+        self.path = path
+        self._tables: Dict[str, _EmbeddedTable] = {}
+        self._lock = threading.Lock()
+
+    def list_feature_tables(self) -> List[str]:
+        """Get the feature tables of the store."""
+        return sorted(p.name[:-len(_FILE_SUFFIX)] for p in Path(self.path).glob("*" + _FILE_SUFFIX))
+
+    def get_feature_names(self, feature_table: str) -> List[str]:
+        """Get the features stored in a feature table."""
+        with self._read_table(feature_table) as table:
+            return list(table.feature_names)
+
+    def get_online_features(self, feature_table: str, key: Any, feature_names: List[str]) -> List[Any]:
+        """Fetch feature values of one key, same as `FeathrClient.get_online_features`.
+
+        Args:
+            feature_table: the name of the feature table.
+            key: the key/composite key of the entity
+            feature_names: list of feature names to fetch
+
+        Return:
+            A list of feature values for this entity, ordered by `feature_names`. Missing values are None.
+        """
+        with self._read_table(feature_table) as table:
+            return table.get_many([_to_lookup_key(key)], feature_names)[0]
+
+    def multi_get_online_features(self, feature_table: str, keys: List[Any], feature_names: List[str]) -> Dict[Any, List[Any]]:
+        """Fetch feature values of a list of keys, same as `FeathrClient.multi_get_online_features`.
+
+        Return:
+            A dict of key -> list of feature values, ordered by `feature_names`.
+        """
+        with self._read_table(feature_table) as table:
+            values = table.get_many([_to_lookup_key(key) for key in keys], feature_names)
+        return dict(zip([_COMPOSITE_KEY_SEPARATOR.join(key) if isinstance(key, List) else key for key in keys], values))
+
+    def reload(self, feature_table: Optional[str] = None):
+        """Drop the mapping of a feature table, or of all of them, so that the next lookup maps the latest file.
+        Lookups still reading a dropped mapping finish on it, and it's closed after them."""
+        with self._lock:
+            names = [feature_table] if feature_table else list(self._tables)
+            for name in names:
+                table = self._tables.pop(name, None)
+                if table is not None:
+                    table.retired = True
+                    if table.readers == 0:
+                        table.close()
+
+    def close(self):
+        self.reload()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @contextmanager
+    def _read_table(self, feature_table: str) -> Iterator[_EmbeddedTable]:
+        """Map a feature table if it's not mapped yet, and keep its mapping open while the caller reads it."""
+        with self._lock:
+            table = self._tables.get(feature_table)
+            if table is None:
+                path = os.path.join(self.path, feature_table + _FILE_SUFFIX)
+                if not os.path.isfile(path):
+                    raise RuntimeError(f"Feature table {feature_table} is not in embedded online store {self.path}.")
+                table = self._tables[feature_table] = _EmbeddedTable(path)
+            table.readers += 1
+        try:
+            yield table
+        finally:
+            with self._lock:
+                table.readers -= 1
+                if table.retired and table.readers == 0:
+                    table.close()
+
+
+def _to_lookup_key(key: Any) -> str:
+    if isinstance(key, List):
+        return _COMPOSITE_KEY_SEPARATOR.join(str(k) for k in key)
+    return str(key)
+
+
+def _hash_keys(encoded_keys: List[bytes]) -> List[int]:
+    # Stable across processes and Python versions, unlike hash()
+    return [int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little") for key in encoded_keys]
+
+
+def _align(size: int) -> int:
+    return (size + 7) // 8 * 8
@@ -0,0 +1,178 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from feathr.definition.aggregation import Aggregation
+from feathr.definition.lookup_feature import LookupFeature
+
+# (feature table, keys, feature names), see `FeathrClient._fetch_online_features_of_tables`
+TableRequest = Tuple[str, List[Any], List[str]]
+
+
+class OnlineLookupFeatures:
+    """Resolves `LookupFeature`s at serving time, in two batched round trips to the online store.
+
+    The base features of a whole batch of keys are fetched first. Their values (a scalar, a dense array, or the indices
+    of a sparse array) are the keys of the expansion features, which are de-duplicated across the batch and fetched
+    in a second round trip. The looked up values of each key are then reduced with the `Aggregation` of the lookup
+    feature, vectorized over the batch.
+
+    The online store doesn't keep timestamps, so LATEST picks the last looked up value in the order of the base
+    feature value, and FIRST the first one. NOP returns the looked up values as a list.
+
+    Attributes:
+        lookup_features: the lookup features to resolve.
+        feature_tables: feature name -> online feature table storing it, for all the base and expansion features.
+    """
+    def __init__(self, lookup_features: List[LookupFeature], feature_tables: Dict[str, str]):
+        self.lookup_features = lookup_features
+        self.feature_tables = feature_tables
+        for lookup_feature in lookup_features:
+            for feature in (lookup_feature.base_feature, lookup_feature.expansion_feature):
+                if feature.name not in feature_tables:
+                    raise RuntimeError(f"Online feature table of feature {feature.name}, used by lookup feature "
+                                       f"{lookup_feature.name}, is not set.")
+            if lookup_feature.aggregation not in _AGGREGATIONS:
+                raise NotImplementedError(f"Aggregation {lookup_feature.aggregation.name} of lookup feature "
+                                          f"{lookup_feature.name} is not supported at serving time.")
+
+    def base_requests(self, keys: List[Any]) -> List[TableRequest]:
+        """Requests of the base features of all the lookup features, one per feature table."""
+        return _group_by_table(self.feature_tables, [(f.base_feature.name, keys) for f in self.lookup_features])
+
+    def expansion_requests(self, base_values: Dict[str, List[Any]]) -> List[TableRequest]:
+        """Requests of the expansion features, for the de-duplicated expansion keys of the whole batch.
+
+        Args:
+            base_values: base feature name -> decoded value of each key.
+        """
+        keys_by_feature = {}
+        for lookup_feature in self.lookup_features:
+            expansion_keys = keys_by_feature.setdefault(lookup_feature.expansion_feature.name, {})
+            for value in base_values[lookup_feature.base_feature.name]:
+                # dict keeps the first seen order, so the requests are deterministic
+                expansion_keys.update(dict.fromkeys(_expansion_keys(value)))
+        return _group_by_table(self.feature_tables, [(name, list(keys)) for name, keys in keys_by_feature.items()])
+
+    def aggregate(self, base_values: Dict[str, List[Any]], expansion_values: Dict[str, Dict[str, Any]]) -> List[List[Any]]:
+        """Aggregate the looked up values of each key.
+
+        Args:
+            base_values: base feature name -> decoded value of each key.
+            expansion_values: expansion feature name -> expansion key -> decoded value.
+
+        Returns:
+            One list per key, ordered by the lookup features.
+        """
+        columns = []
+        for lookup_feature in self.lookup_features:
+            looked_up = expansion_values[lookup_feature.expansion_feature.name]
+            values_per_key = [[looked_up[k] for k in _expansion_keys(value) if looked_up.get(k) is not None]
+                              for value in base_values[lookup_feature.base_feature.name]]
+            columns.append(_AGGREGATIONS[lookup_feature.aggregation](values_per_key))
+        return [list(row) for row in zip(*columns)]
+
+
+def _group_by_table(feature_tables: Dict[str, str], feature_keys: List[Tuple[str, List[Any]]]) -> List[TableRequest]:
+    # Features of the same table that are read for the same keys share one request
+    requests = []
+    for feature_name, keys in feature_keys:
+        feature_table = feature_tables[feature_name]
+        request = next((r for r in requests if r[0] == feature_table and r[1] == keys), None)
+        if request is None:
+            requests.append((feature_table, keys, [feature_name]))
+        elif feature_name not in request[2]:
+            request[2].append(feature_name)
+    return requests
+
+
+def _expansion_keys(base_value: Any) -> List[str]:
+    """Expansion keys of a decoded base feature value, stringified the same way as the online store keys."""
+    if base_value is None:
+        return []
+    if isinstance(base_value, tuple):
+        # Sparse array, the indices are the keys
+        base_value = base_value[0]
+    elif isinstance(base_value, (str, bytes, bool, int, float)):
+        base_value = [base_value]
+    return [_to_key(v) for v in base_value]
+
+
+def _to_key(value: Any) -> str:
+    if isinstance(value, float) and value.is_integer():
+        # e.g. an id stored in a float feature
+        value = int(value)
+    return str(value)
+
+
+def _reduce_scalars(ufunc: np.ufunc, mean: bool = False) -> Callable[[List[List[Any]]], List[Any]]:
+    def _reduce(values_per_key: List[List[Any]]) -> List[Any]:
+        counts = np.array([len(values) for values in values_per_key], dtype=np.int64)
+        result = [None] * len(values_per_key)
+        non_empty = np.flatnonzero(counts)
+        if len(non_empty) == 0:
+            return result
+        try:
+            flat = np.array([v for values in values_per_key for v in values], dtype=np.float64)
+        except (TypeError, ValueError):
+            raise RuntimeError("Only numeric scalar expansion features can be aggregated with AVG, MAX, MIN or SUM.")
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))[non_empty]
+        reduced = ufunc.reduceat(flat, starts)
+        if mean:
+            reduced = reduced / counts[non_empty]
+        for i, value in zip(non_empty, reduced.tolist()):
+            result[i] = value
+        return result
+    return _reduce
+
+
+def _reduce_elementwise(ufunc: np.ufunc, mean: bool = False) -> Callable[[List[List[Any]]], List[Any]]:
+    def _reduce(values_per_key: List[List[Any]]) -> List[Any]:
+        counts = np.array([len(values) for values in values_per_key], dtype=np.int64)
+        result = [None] * len(values_per_key)
+        non_empty = np.flatnonzero(counts)
+        if len(non_empty) == 0:
+            return result
+        try:
+            # One row per looked up array, so all the keys are reduced at once
+            matrix = np.array([list(v) for values in values_per_key for v in values], dtype=np.float64)
+        except (TypeError, ValueError):
+            raise RuntimeError("Only dense numeric arrays of the same length can be aggregated element-wise.")
+        if matrix.ndim != 2:
+            raise RuntimeError("Only dense numeric arrays of the same length can be aggregated element-wise.")
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))[non_empty]
+        reduced = ufunc.reduceat(matrix, starts, axis=0)
+        if mean:
+            reduced = reduced / counts[non_empty][:, None]
+        for i, value in zip(non_empty, reduced.tolist()):
+            result[i] = value
+        return result
+    return _reduce
+
+
+def _union(values_per_key: List[List[Any]]) -> List[Optional[List[Any]]]:
+    result = []
+    for values in values_per_key:
+        union = {}
+        for value in values:
+            if isinstance(value, tuple):
+                raise RuntimeError("Sparse arrays can't be aggregated with UNION.")
+            union.update(dict.fromkeys([value] if isinstance(value, (str, bytes, bool, int, float)) else value))
+        result.append(list(union) if values else None)
+    return result
+
+
+_AGGREGATIONS: Dict[Aggregation, Callable[[List[List[Any]]], List[Any]]] = {
+    Aggregation.NOP: lambda values_per_key: [values or None for values in values_per_key],
+    Aggregation.AVG: _reduce_scalars(np.add, mean=True),
+    Aggregation.MAX: _reduce_scalars(np.maximum),
+    Aggregation.MIN: _reduce_scalars(np.minimum),
+    Aggregation.SUM: _reduce_scalars(np.add),
+    Aggregation.UNION: _union,
+    Aggregation.ELEMENTWISE_AVG: _reduce_elementwise(np.add, mean=True),
+    Aggregation.ELEMENTWISE_MIN: _reduce_elementwise(np.minimum),
+    Aggregation.ELEMENTWISE_MAX: _reduce_elementwise(np.maximum),
+    Aggregation.ELEMENTWISE_SUM: _reduce_elementwise(np.add),
+    Aggregation.LATEST: lambda values_per_key: [values[-1] if values else None for values in values_per_key],
+    Aggregation.FIRST: lambda values_per_key: [values[0] if values else None for values in values_per_key],
+}
@@ -0,0 +1,122 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from loguru import logger
+
+from feathr.online_store.analyzer import scan_feature_table_keys
+
+
+class BulkOperationReport:
+    """Progress of a bulk operation on a feature table, updated after each batch.
+
+    Attributes:
+        operation: name of the operation, e.g. "drop_table".
+        feature_table: the feature table.
+        scanned_keys: number of keys returned by SCAN so far. SCAN may return a key more than once.
+        affected_keys: number of keys changed so far, e.g. unlinked keys or keys that had one of the dropped features.
+        batches: number of batches done so far.
+        elapsed_sec: time since the start of the operation.
+        done: whether the whole table has been scanned and all the batches are done.
+    """
+    def __init__(self, operation: str, feature_table: str):
+        self.operation = operation
+        self.feature_table = feature_table
+        self.scanned_keys = 0
+        self.affected_keys = 0
+        self.batches = 0
+        self.elapsed_sec = 0.0
+        self.done = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "operation": self.operation,
+            "feature_table": self.feature_table,
+            "scanned_keys": self.scanned_keys,
+            "affected_keys": self.affected_keys,
+            "batches": self.batches,
+            "elapsed_sec": self.elapsed_sec,
+            "done": self.done,
+        }
+
+
+def run_bulk_operation(redis_client,
+                       feature_table: str,
+                       operation: str,
+                       add_command: Callable[[Any, bytes], None],
+                       cluster_enabled: bool = False,
+                       max_concurrency: int = 4,
+                       scan_count: int = 1000,
+                       key_separator: str = ':',
+                       progress_callback: Optional[Callable[[BulkOperationReport], None]] = None) -> BulkOperationReport:
+    """Apply a command to every key of a feature table, without blocking Redis.
+
+    Keys are listed with SCAN, one page of at most about `scan_count` keys at a time, and each page is sent as one
+    pipeline of single-key commands, so the server never runs a long command and interleaves them with the other
+    clients' commands. At most `max_concurrency` pipelines are in flight, while the next pages are scanned.
+
+    Args:
+        redis_client: the Redis client of the online store.
+        feature_table: the feature table.
+        operation: name of the operation, for the report.
+        add_command: adds the command of one key to a pipeline. A key is counted as affected if the result of its
+            command is truthy.
+        cluster_enabled: whether the client is a Redis Cluster client, whose shards are scanned one by one.
+        max_concurrency: maximum number of pipelines in flight.
+        scan_count: COUNT hint of each SCAN call, i.e. the approximate batch size.
+        key_separator: separator between the feature table and the key in the Redis keys.
+        progress_callback (optional): called with the report after each batch.
+    """
+    report = BulkOperationReport(operation, feature_table)
+    start = time.monotonic()
+
+    def _run(keys: List[bytes]) -> int:
+        with redis_client.pipeline(transaction=False) as redis_pipeline:
+            for key in keys:
+                add_command(redis_pipeline, key)
+            return sum(1 for result in redis_pipeline.execute() if result)
+
+    def _collect(future):
+        report.affected_keys += future.result()
+        report.batches += 1
+        report.elapsed_sec = time.monotonic() - start
+        if progress_callback is not None:
+            progress_callback(report)
+
+    with ThreadPoolExecutor(max_workers=max(max_concurrency, 1), thread_name_prefix="feathr-redis-bulk") as executor:
+        in_flight = deque()
+        for keys in scan_feature_table_keys(redis_client, feature_table, cluster_enabled, scan_count, key_separator):
+            report.scanned_keys += len(keys)
+            if len(in_flight) >= max_concurrency:
+                _collect(in_flight.popleft())
+            in_flight.append(executor.submit(_run, keys))
+        while in_flight:
+            _collect(in_flight.popleft())
+    report.elapsed_sec = time.monotonic() - start
+    report.done = True
+    if progress_callback is not None:
+        progress_callback(report)
+    logger.info(f"{operation} of feature table {feature_table} done: {report.affected_keys} of {report.scanned_keys} "
+                f"scanned keys affected in {report.elapsed_sec:.1f}s.")
+    return report
+
+
+def unlink_command(redis_pipeline, key: bytes):
+    # UNLINK frees the memory in a background thread, unlike DEL
+    redis_pipeline.unlink(key)
+
+
+def hdel_command(feature_names: List[str]) -> Callable[[Any, bytes], None]:
+    def _add(redis_pipeline, key: bytes):
+        redis_pipeline.hdel(key, *feature_names)
+    return _add
+
+
+def expire_command(ttl_sec: Optional[float]) -> Callable[[Any, bytes], None]:
+    def _add(redis_pipeline, key: bytes):
+        if ttl_sec is None:
+            redis_pipeline.persist(key)
+        else:
+            redis_pipeline.expire(key, max(int(ttl_sec), 1))
+    return _add
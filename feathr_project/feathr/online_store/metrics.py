@@ -0,0 +1,130 @@
+from bisect import bisect_left
+import threading
+from typing import Callable, Dict, List, Tuple
+
+# Latency buckets in seconds, from 50us to 5s
+LATENCY_BUCKETS = [0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0]
+# Keys per call buckets
+SIZE_BUCKETS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000]
+
+# Metric name -> (type, help, histogram buckets)
+ONLINE_METRICS = {
+    "feathr_online_redis_seconds": ("histogram", "Time spent in Redis round trips of online reads.", LATENCY_BUCKETS),
+    "feathr_online_decode_seconds": ("histogram", "Time spent decoding online feature values on the client.", LATENCY_BUCKETS),
+    "feathr_online_keys_per_call": ("histogram", "Number of keys of each online read.", SIZE_BUCKETS),
+    "feathr_online_values_total": ("counter", "Number of feature values read online.", None),
+    "feathr_online_missing_values_total": ("counter", "Number of feature values read online that are missing.", None),
+    "feathr_online_bytes_read_total": ("counter", "Number of bytes of feature values read from Redis.", None),
+    "feathr_online_type_mismatches_total": ("counter", "Number of feature values read online that don't match the declared feature type.", None),
+    "feathr_online_deadline_misses_total": ("counter", "Number of online reads of a feature table that missed their deadline.", None),
+    "feathr_online_replica_reads_total": ("counter", "Number of online reads of a feature table served by a hedged read to a replica.", None),
+}
+
+
+class MetricsSink:
+    """Receives the metrics of the online read path, see `FeathrClient.enable_online_metrics`.
+
+    Metrics are the ones of `ONLINE_METRICS`, labelled by feature table. Histograms get one `observe` call per
+    observation, counters one `increment` call per read. Implementations should be cheap and thread safe, since they
+    are called on the read path.
+    """
+    def observe(self, name: str, feature_table: str, value: float):
+        """Record one observation of a histogram."""
+        raise NotImplementedError
+
+    def increment(self, name: str, feature_table: str, value: float):
+        """Increment a counter."""
+        raise NotImplementedError
+
+
+class CallbackMetricsSink(MetricsSink):
+    """Forwards every observation and counter increment to `callback(name, feature_table, value)`, e.g. to a StatsD
+    or OpenTelemetry client."""
+    def __init__(self, callback: Callable[[str, str, float], None]):
+        self.callback = callback
+
+    def observe(self, name: str, feature_table: str, value: float):
+        self.callback(name, feature_table, value)
+
+    def increment(self, name: str, feature_table: str, value: float):
+        self.callback(name, feature_table, value)
+
+
+class _Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: List[float]):
+        self.buckets = buckets
+        # One count per bucket, plus the +Inf bucket
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class PrometheusMetricsSink(MetricsSink):
+    """Aggregates the metrics in memory, and renders them in the Prometheus text exposition format with
+    `exposition()`, e.g. from the `/metrics` endpoint of `feathr serve`."""
+    def __init__(self):
+        self._histograms: Dict[Tuple[str, str], _Histogram] = {}
+        self._counters: Dict[Tuple[str, str], float] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, feature_table: str, value: float):
+        with self._lock:
+            histogram = self._histograms.get((name, feature_table))
+            if histogram is None:
+                histogram = self._histograms[(name, feature_table)] = _Histogram(ONLINE_METRICS[name][2])
+            histogram.observe(value)
+
+    def increment(self, name: str, feature_table: str, value: float):
+        with self._lock:
+            self._counters[(name, feature_table)] = self._counters.get((name, feature_table), 0) + value
+
+    def get_histogram(self, name: str, feature_table: str) -> Dict[str, float]:
+        """Get the count and sum of a histogram, e.g. {"count": 3, "sum": 0.0012}."""
+        with self._lock:
+            histogram = self._histograms.get((name, feature_table))
+            return {"count": histogram.count, "sum": histogram.sum} if histogram else {"count": 0, "sum": 0.0}
+
+    def get_counter(self, name: str, feature_table: str) -> float:
+        with self._lock:
+            return self._counters.get((name, feature_table), 0)
+
+    def exposition(self) -> str:
+        """Render all the metrics in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            for name, (metric_type, help_text, _) in ONLINE_METRICS.items():
+                series = self._histograms if metric_type == "histogram" else self._counters
+                tables = sorted(table for metric, table in series if metric == name)
+                if not tables:
+                    continue
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {metric_type}")
+                for table in tables:
+                    label = f'feature_table="{_escape_label(table)}"'
+                    if metric_type == "counter":
+                        lines.append(f"{name}{{{label}}} {_format_value(self._counters[(name, table)])}")
+                        continue
+                    histogram = self._histograms[(name, table)]
+                    cumulative = 0
+                    for bucket, count in zip(histogram.buckets + [float("inf")], histogram.counts):
+                        cumulative += count
+                        le = "+Inf" if bucket == float("inf") else _format_value(bucket)
+                        lines.append(f'{name}_bucket{{{label},le="{le}"}} {cumulative}')
+                    lines.append(f"{name}_sum{{{label}}} {_format_value(histogram.sum)}")
+                    lines.append(f"{name}_count{{{label}}} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
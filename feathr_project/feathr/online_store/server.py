@@ -0,0 +1,150 @@
+import asyncio
+import json
+from typing import Any, Dict, List, Optional, Union
+
+from aiohttp import web
+from loguru import logger
+import yaml
+
+from feathr.online_store.batcher import OnlineFeatureBatcher
+
+
+class OnlineFeatureServer:
+    """HTTP feature server on top of the online store of a FeathrClient, started by `feathr serve`.
+
+    Feature table metadata is loaded once at start up, and concurrent requests are coalesced into shared Redis
+    pipelines by an `OnlineFeatureBatcher`. Endpoints:
+        - `POST /v1/online_features` with {"feature_table": ..., "key": ... or "keys": [...], "feature_names": [...]}.
+          `feature_names` defaults to all the features of the table. Returns {"key": ..., "features": {...}} for a
+          single key, or {"results": [{"key": ..., "features": {...}}, ...]} for a list of keys.
+        - `GET /v1/feature_tables`: the served feature tables and their features.
+        - `GET /v1/stats`: the batcher counters.
+        - `GET /metrics`: the online read metrics in the Prometheus text format, see
+          `FeathrClient.enable_online_metrics`. Metrics are enabled when the server is created, unless the client
+          already has a metrics sink.
+        - `GET /health`.
+
+    Attributes:
+        client: the FeathrClient whose online store is read.
+        feature_tables: feature table -> names of the features served from it.
+        batcher: the `OnlineFeatureBatcher` shared by all the requests.
+    """
+    def __init__(self, client, feature_tables: Dict[str, List[str]], max_batch_size: int = 1000, max_wait_ms: float = 2.0):
+        if not feature_tables:
+            raise RuntimeError("At least one feature table should be served.")
+        self.client = client
+        self.feature_tables = feature_tables
+        if client.online_metrics is None:
+            client.enable_online_metrics()
+        self.batcher = OnlineFeatureBatcher(client, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+
+    def create_app(self) -> web.Application:
+        app = web.Application()
+        app.add_routes([
+            web.post("/v1/online_features", self._handle_online_features),
+            web.get("/v1/feature_tables", self._handle_feature_tables),
+            web.get("/v1/stats", self._handle_stats),
+            web.get("/metrics", self._handle_metrics),
+            web.get("/health", self._handle_health),
+        ])
+        return app
+
+    def run(self, host: str = "0.0.0.0", port: int = 8000):
+        logger.info(f"Serving online features of tables {list(self.feature_tables)} on {host}:{port}.")
+        web.run_app(self.create_app(), host=host, port=port)
+
+    async def _handle_online_features(self, request: web.Request) -> web.Response:
+        try:
+            body = await request.json()
+        except json.JSONDecodeError:
+            return _error_response("Request body should be a JSON object.")
+        if not isinstance(body, dict):
+            return _error_response("Request body should be a JSON object.")
+        feature_table = body.get("feature_table")
+        if not isinstance(feature_table, str) or feature_table not in self.feature_tables:
+            return _error_response(f"Feature table {feature_table} is not served. Served tables are {list(self.feature_tables)}.")
+        feature_names = body.get("feature_names") or self.feature_tables[feature_table]
+        if not isinstance(feature_names, list) or not all(isinstance(name, str) for name in feature_names):
+            return _error_response("'feature_names' should be a list of strings.")
+        unknown_features = set(feature_names) - set(self.feature_tables[feature_table])
+        if unknown_features:
+            return _error_response(f"Features {sorted(unknown_features)} are not served from feature table {feature_table}.")
+
+        if "keys" in body:
+            keys = body["keys"]
+            if not isinstance(keys, list):
+                return _error_response("'keys' should be a list of keys.")
+            redis_keys = [_to_online_key(key) for key in keys]
+            if any(key is None for key in redis_keys):
+                return _error_response("Each key should be a string, an integer or a list of them for composite keys.")
+            values = await asyncio.gather(*(self.batcher.get(feature_table, key, feature_names) for key in redis_keys))
+            return web.json_response({"results": [self._to_result(key, feature_names, v) for key, v in zip(keys, values)]})
+        if "key" in body:
+            key = _to_online_key(body["key"])
+            if key is None:
+                return _error_response("'key' should be a string, an integer or a list of them for composite keys.")
+            return web.json_response(self._to_result(body["key"], feature_names,
+                                                     await self.batcher.get(feature_table, key, feature_names)))
+        return _error_response("Either 'key' or 'keys' should be set.")
+
+    async def _handle_feature_tables(self, request: web.Request) -> web.Response:
+        return web.json_response(self.feature_tables)
+
+    async def _handle_stats(self, request: web.Request) -> web.Response:
+        return web.json_response(self.batcher.stats())
+
+    async def _handle_metrics(self, request: web.Request) -> web.Response:
+        metrics = self.client.online_metrics
+        if not hasattr(metrics, "exposition"):
+            return web.json_response({"error": "The metrics sink of the client can't be exported."}, status=404)
+        return web.Response(text=metrics.exposition(), content_type="text/plain")
+
+    async def _handle_health(self, request: web.Request) -> web.Response:
+        return web.json_response({"status": "ok"})
+
+    def _to_result(self, key: Any, feature_names: List[str], values: List[Any]) -> Dict[str, Any]:
+        return {"key": key, "features": {name: to_json_value(value) for name, value in zip(feature_names, values)}}
+
+
+def load_feature_tables(serving_config_path: str) -> Dict[str, List[str]]:
+    """Load the served feature tables from a YAML file like:
+
+        feature_tables:
+          nycTaxiDemoFeature:
+            - f_location_avg_fare
+            - f_location_max_fare
+    """
+    with open(serving_config_path) as f:
+        serving_config = yaml.safe_load(f) or {}
+    feature_tables = serving_config.get("feature_tables")
+    if not isinstance(feature_tables, dict) or not feature_tables:
+        raise RuntimeError(f"'feature_tables' should map feature tables to their feature names in {serving_config_path}.")
+    return {feature_table: list(feature_names) for feature_table, feature_names in feature_tables.items()}
+
+
+def to_json_value(value: Any) -> Any:
+    """Convert a decoded online feature value (see `FeathrClient.get_online_features`) into a JSON serializable one.
+    Dense arrays become lists and sparse arrays become {"indices": [...], "values": [...]}."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, tuple):
+        return {"indices": list(value[0]), "values": list(value[1])}
+    return list(value)
+
+
+def _to_online_key(key: Any) -> Optional[Union[str, List[str]]]:
+    """Convert a key of a request into a key of `FeathrClient.get_online_features`, i.e. a string or a list of strings
+    for composite keys. Returns None if the key is not a string, an integer or a list of them."""
+    if isinstance(key, list):
+        parts = [_to_online_key(part) for part in key]
+        return parts if parts and all(isinstance(part, str) for part in parts) else None
+    if isinstance(key, str):
+        return key
+    # bool is a subclass of int, but true/false are not meaningful keys
+    if isinstance(key, int) and not isinstance(key, bool):
+        return str(key)
+    return None
+
+
+def _error_response(message: str) -> web.Response:
+    return web.json_response({"error": message}, status=400)
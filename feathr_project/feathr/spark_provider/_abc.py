@@ -1,10 +1,16 @@
 from abc import ABC, abstractmethod
 from typing import Dict, List, Optional, Tuple
 
+from feathr.spark_provider.feathr_job import FeathrJob
+
 
 class SparkJobLauncher(ABC):
     """This is the abstract class for all the spark launchers. All the Spark launcher should implement those interfaces
+
+    `submit_feathr_job` returns a handle of each job, so many jobs can run at once. The other methods, e.g.
+    `wait_for_completion`, apply to the latest job, `latest_job`.
     """
+    latest_job: Optional[FeathrJob] = None
 
     @abstractmethod
     def upload_or_get_cloud_path(self, local_path_or_http_path: str):
@@ -30,6 +36,9 @@ class SparkJobLauncher(ABC):
             job_tags (str): tags of the job, for example you might want to put your user ID, or a tag with a certain information
             configuration (Dict[str, str]): Additional configs for the spark job
             properties (Dict[str, str]): Additional System Properties for the spark job
+
+        Returns:
+            FeathrJob: handle of the submitted job
         """
         pass
 
@@ -20,6 +20,7 @@ from requests.structures import CaseInsensitiveDict
 from feathr.constants import *
 from feathr.version import get_maven_artifact_fullname
 from feathr.spark_provider._abc import SparkJobLauncher
+from feathr.spark_provider.feathr_job import FeathrJob
 
 
 class _FeathrDatabricksJobLauncher(SparkJobLauncher):
@@ -271,8 +272,89 @@ class _FeathrDatabricksJobLauncher(SparkJobLauncher):
         logger.info(
             "Feathr job Submitted Successfully. View more details here: {}", self.job_url)
 
-        # return ID as the submission result
-        return self.res_job_id
+        self.latest_job = _DatabricksJob(job_name, job_tags, self.api_client, self.res_job_id, self.job_url)
+        return self.latest_job
+
+    def wait_for_completion(self, timeout_seconds: Optional[int] = 600) -> bool:
+        """Returns true if the latest job completed successfully"""
+        return self.latest_job.wait_for_completion(timeout_seconds)
+
+    def get_status(self) -> str:
+        return self.latest_job.get_status()
+
+    def get_job_result_uri(self) -> str:
+        """Get job output uri
+
+        Returns:
+            str: `output_path` field in the job tags of the latest job
+        """
+        return self.latest_job.get_job_result_uri()
+
+    def get_job_tags(self) -> Dict[str, str]:
+        """Get job tags
+
+        Returns:
+            Dict[str, str]: a dict of job tags of the latest job
+        """
+        return self.latest_job.get_job_tags()
+
+    def download_result(self, result_path: str, local_folder: str, is_file_path: bool = False):
+        """
+        Supports downloading files from the result folder. Only support paths starts with `dbfs:/` and only support downloading files in one folder (per Spark's design, everything will be in the result folder in a flat manner)
+        """
+        if not result_path.startswith("dbfs"):
+            raise RuntimeError(
+                'Currently only paths starting with dbfs is supported for downloading results from a databricks cluster. The path should start with "dbfs:" .'
+            )
+
+        recursive = True if not is_file_path else False
+        DbfsApi(self.api_client).cp(recursive=recursive, overwrite=True, src=result_path, dst=local_folder)
+        
+    def cloud_dir_exists(self, dir_path: str):
+        """
+        Check if a directory of hdfs already exists
+        """
+        if not dir_path.startswith('dbfs'):
+            raise RuntimeError(
+                'Currently only paths starting with dbfs is supported. The paths should start with \"dbfs:\" .')
+
+        try:
+            DbfsApi(self.api_client).list_files(DbfsPath(dir_path))
+            return True
+        except:
+            return False
+
+
+class _DatabricksJob(FeathrJob):
+    """Handle of a run submitted to Databricks.
+
+    Args:
+        api_client: Databricks API client
+        run_id: ID of the run
+        job_url: page of the run
+    """
+    def __init__(self, job_name: str, job_tags: Dict[str, str], api_client: ApiClient, run_id: int, job_url: str):
+        super().__init__(job_name, job_tags)
+        self.api_client = api_client
+        self.run_id = run_id
+        self.job_url = job_url
+
+    def get_status(self) -> str:
+        result = RunsApi(self.api_client).get_run(self.run_id)
+        # first try to get result state. it might not be available, and if that's the case, try to get life_cycle_state
+        # see result structure: https://docs.microsoft.com/en-us/azure/databricks/dev-tools/api/2.0/jobs#--response-structure-6
+        res_state = result["state"].get(
+            "result_state") or result["state"]["life_cycle_state"]
+        assert res_state is not None
+        return res_state
+
+    def is_done(self) -> bool:
+        # see all the status here:
+        # https://docs.microsoft.com/en-us/azure/databricks/dev-tools/api/2.0/jobs#--runlifecyclestate
+        return self.get_status() in {"SUCCESS", "INTERNAL_ERROR", "FAILED", "TIMEDOUT", "CANCELED", "SKIPPED"}
+
+    def cancel(self):
+        RunsApi(self.api_client).cancel_run(self.run_id)
 
     def wait_for_completion(self, timeout_seconds: Optional[int] = 600) -> bool:
         """Returns true if the job completed successfully"""
@@ -287,7 +369,7 @@ class _FeathrDatabricksJobLauncher(SparkJobLauncher):
                 return True
             elif status in {"INTERNAL_ERROR", "FAILED", "TIMEDOUT", "CANCELED"}:
                 result = RunsApi(self.api_client).get_run_output(
-                    self.res_job_id)
+                    self.run_id)
                 # See here for the returned fields: https://docs.microsoft.com/en-us/azure/databricks/dev-tools/api/2.0/jobs#--response-structure-8
                 # print out logs and stack trace if the job has failed
                 logger.error(
@@ -302,35 +384,14 @@ class _FeathrDatabricksJobLauncher(SparkJobLauncher):
         else:
             raise TimeoutError("Timeout waiting for Feathr job to complete")
 
-    def get_status(self) -> str:
-        assert self.res_job_id is not None
-        result = RunsApi(self.api_client).get_run(self.res_job_id)
-        # first try to get result state. it might not be available, and if that's the case, try to get life_cycle_state
-        # see result structure: https://docs.microsoft.com/en-us/azure/databricks/dev-tools/api/2.0/jobs#--response-structure-6
-        res_state = result["state"].get(
-            "result_state") or result["state"]["life_cycle_state"]
-        assert res_state is not None
-        return res_state
-
-    def get_job_result_uri(self) -> str:
-        """Get job output uri
-
-        Returns:
-            str: `output_path` field in the job tags
-        """
-        custom_tags = self.get_job_tags()
-        # in case users call this API even when there's no tags available
-        return None if custom_tags is None else custom_tags[OUTPUT_PATH_TAG]
-
     def get_job_tags(self) -> Dict[str, str]:
         """Get job tags
 
         Returns:
             Dict[str, str]: a dict of job tags
         """
-        assert self.res_job_id is not None
         # For result structure, see https://docs.microsoft.com/en-us/azure/databricks/dev-tools/api/2.0/jobs#--response-structure-6
-        result = RunsApi(self.api_client).get_run(self.res_job_id)
+        result = RunsApi(self.api_client).get_run(self.run_id)
 
         if "new_cluster" in result["cluster_spec"]:
             custom_tags = result["cluster_spec"]["new_cluster"].get(
@@ -342,29 +403,3 @@ class _FeathrDatabricksJobLauncher(SparkJobLauncher):
                 "Job tags are not available since you are using an existing Databricks cluster. Consider using 'new_cluster' in databricks configuration."
             )
             return None
-
-    def download_result(self, result_path: str, local_folder: str, is_file_path: bool = False):
-        """
-        Supports downloading files from the result folder. Only support paths starts with `dbfs:/` and only support downloading files in one folder (per Spark's design, everything will be in the result folder in a flat manner)
-        """
-        if not result_path.startswith("dbfs"):
-            raise RuntimeError(
-                'Currently only paths starting with dbfs is supported for downloading results from a databricks cluster. The path should start with "dbfs:" .'
-            )
-
-        recursive = True if not is_file_path else False
-        DbfsApi(self.api_client).cp(recursive=recursive, overwrite=True, src=result_path, dst=local_folder)
-        
-    def cloud_dir_exists(self, dir_path: str):
-        """
-        Check if a directory of hdfs already exists
-        """
-        if not dir_path.startswith('dbfs'):
-            raise RuntimeError(
-                'Currently only paths starting with dbfs is supported. The paths should start with \"dbfs:\" .')
-
-        try:
-            DbfsApi(self.api_client).list_files(DbfsPath(dir_path))
-            return True
-        except:
-            return False
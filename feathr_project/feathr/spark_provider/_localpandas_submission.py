@@ -0,0 +1,453 @@
+from datetime import datetime
+import os
+from pathlib import Path
+import re
+import time
+from typing import Dict, List, Optional, Union
+
+from loguru import logger
+import numpy as np
+import pandas as pd
+
+from feathr.definition.anchor import FeatureAnchor
+from feathr.definition.dtype import FeatureType, ValueType
+from feathr.definition.feature import Feature
+from feathr.definition.feature_derivations import DerivedFeature
+from feathr.definition.query_feature_list import FeatureQuery
+from feathr.definition.settings import ObservationSettings
+from feathr.definition.sink import HdfsSink, Sink
+from feathr.definition.source import HdfsSource, InputContext
+from feathr.definition.transformation import ExpressionTransformation, WindowAggTransformation
+from feathr.spark_provider._abc import SparkJobLauncher
+from feathr.spark_provider._pandas_expression import PandasExpression, parse_duration, parse_timestamps
+from feathr.spark_provider.feathr_job import FeathrJob
+from feathr.utils.window_aggregation import aggregate_windows
+
+# Formats of the data read and written by the local pandas runtime
+DATA_FORMATS = ("avro", "csv", "delta", "parquet")
+
+# Scalar feature types -> pandas dtype of the joined feature columns, nullable so missing features stay missing
+_FEATURE_DTYPES = {
+    ValueType.BOOL: "boolean",
+    ValueType.INT32: "Int32",
+    ValueType.INT64: "Int64",
+    ValueType.FLOAT: "float32",
+    ValueType.DOUBLE: "float64",
+}
+
+_TIMESTAMP_COLUMN = "__feathr_timestamp"
+_ROW_COLUMN = "__feathr_row"
+
+
+class _FeathrLocalPandasJobLauncher(SparkJobLauncher):
+    """Runs feature joins in process with pandas, instead of submitting a Spark job. It's intended to iterate on small
+    data, e.g. in a notebook, without the start up time of Spark. Only `get_offline_features` is supported, other jobs
+    need a Spark runtime.
+
+    Features are joined the same way as the Feathr Spark job, see `_PandasFeatureJoiner` for the supported subset, and
+    the result is written to the output path in the same layout, so `get_result_df` reads it as usual.
+
+    Args:
+        workspace_path (str): Path to the workspace
+    """
+
+    def __init__(self, workspace_path: str = None):
+        self.workspace_path = workspace_path
+        self.latest_job = None
+
+    def upload_or_get_cloud_path(self, local_path_or_http_path: str):
+        """Jobs run in process, so there is no need to upload anything."""
+        return local_path_or_http_path
+
+    def submit_feathr_job(self, job_name: str, main_jar_path: str, main_class_name: str, arguments: List[str] = None,
+                          reference_files_path: List[str] = None, job_tags: Dict[str, str] = None,
+                          configuration: Dict[str, str] = {}, properties: Dict[str, str] = None, **_):
+        raise NotImplementedError(f"Job {job_name} can't run with the local_pandas runtime, which only supports "
+                                  f"get_offline_features. Please use a Spark runtime, e.g. local, instead.")
+
+    def submit_feature_join(self,
+                            job_name: str,
+                            observation_settings: ObservationSettings,
+                            feature_queries: List[FeatureQuery],
+                            anchors: List[FeatureAnchor],
+                            derived_features: List[DerivedFeature],
+                            output_path: Union[str, Sink],
+                            output_format: str = "avro",
+                            job_tags: Dict[str, str] = None) -> "_LocalPandasJob":
+        """Join the features onto the observation data and write the result to `output_path`, in process.
+
+        Returns:
+            _LocalPandasJob: handle of the job, already completed, whose `result` is the observation data with the
+                features attached, as written to `output_path`.
+        """
+        start_time = time.time()
+        job = self.latest_job = _LocalPandasJob(job_name, job_tags)
+        joiner = _PandasFeatureJoiner(anchors, derived_features)
+        result = joiner.join(observation_settings, feature_queries)
+        write_local_data(result, output_path, output_format)
+        job.result = result
+        job.succeeded = True
+        logger.info(f"Local pandas job {job_name} joined {len(result.columns)} columns onto {len(result)} rows in "
+                    f"{time.time() - start_time:.2f} seconds.")
+        return job
+
+    def wait_for_completion(self, timeout_seconds: Optional[float] = None) -> bool:
+        """Jobs run synchronously, so the latest job is already done."""
+        return self.latest_job.wait_for_completion(timeout_seconds) if self.latest_job else False
+
+    def get_status(self) -> str:
+        return self.latest_job.get_status() if self.latest_job else None
+
+    def get_job_result_uri(self) -> str:
+        """Get job output path
+
+        Returns:
+            str: output_path
+        """
+        return self.latest_job.get_job_result_uri() if self.latest_job else None
+
+    def get_job_tags(self) -> Dict[str, str]:
+        """Get job tags
+
+        Returns:
+            Dict[str, str]: a dict of job tags
+        """
+        return self.latest_job.get_job_tags() if self.latest_job else None
+
+
+class _LocalPandasJob(FeathrJob):
+    """Handle of a feature join run in process by `_FeathrLocalPandasJobLauncher`. The join runs synchronously, so the
+    job is done as soon as it's returned.
+
+    Attributes:
+        result: the observation data with the features attached, None if the join failed
+        succeeded: whether the join succeeded
+    """
+    def __init__(self, job_name: str, job_tags: Dict[str, str] = None):
+        super().__init__(job_name, job_tags)
+        self.result: Optional[pd.DataFrame] = None
+        self.succeeded = False
+
+    def get_status(self) -> str:
+        return "SUCCEEDED" if self.succeeded else "FAILED"
+
+    def is_done(self) -> bool:
+        return True
+
+    def wait_for_completion(self, timeout_seconds: Optional[float] = None) -> bool:
+        return self.succeeded
+
+    def cancel(self):
+        """The job is already done."""
+        pass
+
+
+class _PandasFeatureJoiner:
+    """Point-in-time join of features onto observation data, with pandas.
+
+    Supports the anchored features of `HdfsSource` (local parquet, csv, avro or delta data) and `INPUT_CONTEXT`
+    defined with an `ExpressionTransformation` (see `PandasExpression`) or, for `HdfsSource`, a
+    `WindowAggTransformation` (see `aggregate_windows`), and the derived features of such features defined with an
+    expression, when all their inputs have the same key.
+
+    If both the observation data and the source have an event timestamp column, each observation row gets the features
+    of the latest source row of its key at or before its timestamp, minus the `simulate_time_delay` of the observation
+    settings (or the `override_time_delay` of the query). Otherwise, it gets the features of the last row of its key.
+    Observation rows without a matching row get missing values. Window aggregation features need both timestamps, and
+    aggregate the source rows of the window ending at the same time.
+    """
+    def __init__(self, anchors: List[FeatureAnchor], derived_features: List[DerivedFeature]):
+        self.anchors = {}
+        self.anchored_features = {}
+        for anchor in anchors:
+            for feature in anchor.features:
+                self.anchors[feature.name] = anchor
+                self.anchored_features[feature.name] = feature
+        self.derived_features = {feature.name: feature for feature in derived_features}
+        self._sources: Dict[str, pd.DataFrame] = {}
+        self._expressions: Dict[str, PandasExpression] = {}
+
+    def join(self, observation_settings: ObservationSettings, feature_queries: List[FeatureQuery]) -> pd.DataFrame:
+        observation = read_local_data(observation_settings.observation_path, observation_settings.file_format)
+        observation_timestamps = None
+        if observation_settings.event_timestamp_column is not None:
+            if observation_settings.event_timestamp_column not in observation.columns:
+                raise RuntimeError(f"Event timestamp column {observation_settings.event_timestamp_column} is not in "
+                                   f"the observation data {observation_settings.observation_path}.")
+            observation_timestamps = parse_timestamps(observation[observation_settings.event_timestamp_column],
+                                                      observation_settings.timestamp_format)
+        features = {}
+        for query in feature_queries:
+            time_delay = getattr(query, "overrideTimeDelay", None) or observation_settings.simulate_time_delay
+            timestamps = observation_timestamps
+            if timestamps is not None and time_delay:
+                timestamps = timestamps - parse_duration(time_delay)
+            columns = {}
+            for feature_name in query.feature_list:
+                self._resolve(feature_name, query, observation, timestamps, columns)
+                features[feature_name] = columns[feature_name]
+        return _attach_features(observation, features, observation_settings)
+
+    def _resolve(self, feature_name: str, query: FeatureQuery, observation: pd.DataFrame,
+                 timestamps: Optional[pd.Series], columns: Dict[str, pd.Series]):
+        """Compute the column of a feature for the observation rows into `columns`, with its dependencies."""
+        if feature_name in columns:
+            return
+        if feature_name in self.derived_features:
+            feature = self.derived_features[feature_name]
+            inputs = {}
+            for input_feature in feature.input_features:
+                if input_feature.key_alias != feature.key_alias:
+                    raise NotImplementedError(f"Derived feature {feature_name} has inputs with other keys than its own, "
+                                              f"which is not supported by the local_pandas runtime.")
+                self._resolve(input_feature.name, query, observation, timestamps, columns)
+                inputs[input_feature.feature_alias] = columns[input_feature.name]
+            expression = self._expression(feature)
+            columns[feature_name] = _cast_feature(expression.evaluate(pd.DataFrame(inputs, index=observation.index)),
+                                                  feature.feature_type)
+            return
+        if feature_name not in self.anchored_features:
+            raise RuntimeError(f"Feature {feature_name} is not defined. Please call FeathrClient.build_features() with it "
+                               f"first.")
+        anchor = self.anchors[feature_name]
+        # All the requested features of the anchor are joined at once
+        names = [name for name in query.feature_list if self.anchors.get(name) is anchor and name not in columns]
+        if feature_name not in names:
+            names.append(feature_name)
+        columns.update(self._join_anchor(anchor, [self.anchored_features[name] for name in names], query, observation,
+                                         timestamps))
+
+    def _join_anchor(self, anchor: FeatureAnchor, features: List[Feature], query: FeatureQuery,
+                     observation: pd.DataFrame, timestamps: Optional[pd.Series]) -> Dict[str, pd.Series]:
+        if isinstance(anchor.source, InputContext):
+            # Request features are computed from the observation data itself
+            return {feature.name: _cast_feature(self._expression(feature).evaluate(observation), feature.feature_type)
+                    for feature in features}
+        source = anchor.source
+        source_df = self._load_source(source)
+        query_keys = query.key or []
+        key_columns = [f"__feathr_key_{i}" for i in range(len(query_keys))]
+        for feature in features:
+            if len(feature.key) != len(query_keys):
+                raise RuntimeError(f"Feature {feature.name} has {len(feature.key)} key columns, but its query has "
+                                   f"{len(query_keys)}.")
+        feature_df = pd.DataFrame({column: _key_values(PandasExpression(typed_key.key_column).evaluate(source_df))
+                                   for column, typed_key in zip(key_columns, features[0].key)}, index=source_df.index)
+        observation_df = pd.DataFrame({column: _key_values(observation[typed_key.key_column])
+                                       for column, typed_key in zip(key_columns, query_keys)}, index=observation.index)
+        window_features = [feature for feature in features if isinstance(feature.transform, WindowAggTransformation)]
+        columns = {}
+        if window_features:
+            if timestamps is None or source.event_timestamp_column is None:
+                raise RuntimeError(f"Window aggregation features {', '.join(f.name for f in window_features)} need "
+                                   f"the event timestamp columns of both the observation data and source "
+                                   f"{source.name}.")
+            event_timestamps = parse_timestamps(source_df[source.event_timestamp_column], source.timestamp_format)
+            for feature in window_features:
+                columns[feature.name] = self._aggregate_window_feature(feature, source_df, feature_df[key_columns],
+                                                                       event_timestamps, observation_df, timestamps)
+            features = [feature for feature in features if feature not in window_features]
+            if not features:
+                return columns
+        for feature in features:
+            feature_df[feature.name] = _cast_feature(self._evaluate_anchored_feature(feature, source_df),
+                                                     feature.feature_type)
+        feature_df = feature_df.dropna(subset=key_columns)
+        feature_names = [feature.name for feature in features]
+
+        if timestamps is None or source.event_timestamp_column is None:
+            feature_df = feature_df.drop_duplicates(subset=key_columns, keep="last")
+            if key_columns:
+                joined = observation_df.merge(feature_df, how="left", on=key_columns)
+            else:
+                joined = observation_df.merge(feature_df.tail(1), how="cross")
+            columns.update({name: pd.Series(joined[name].to_numpy(), index=observation.index, dtype=joined[name].dtype)
+                            for name in feature_names})
+            return columns
+
+        feature_df[_TIMESTAMP_COLUMN] = parse_timestamps(source_df[source.event_timestamp_column], source.timestamp_format)
+        observation_df[_TIMESTAMP_COLUMN] = timestamps.to_numpy()
+        observation_df[_ROW_COLUMN] = np.arange(len(observation_df))
+        # merge_asof needs both sides sorted by timestamp. The sort is stable, so the last row of a key wins on ties.
+        left = observation_df.dropna(subset=[_TIMESTAMP_COLUMN] + key_columns).sort_values(_TIMESTAMP_COLUMN,
+                                                                                           kind="stable")
+        right = feature_df.dropna(subset=[_TIMESTAMP_COLUMN]).sort_values(_TIMESTAMP_COLUMN, kind="stable")
+        joined = pd.merge_asof(left, right, on=_TIMESTAMP_COLUMN, by=key_columns or None, direction="backward")
+        joined = joined.set_index(_ROW_COLUMN).reindex(np.arange(len(observation_df)))
+        columns.update({name: pd.Series(joined[name].to_numpy(), index=observation.index, dtype=joined[name].dtype)
+                        for name in feature_names})
+        return columns
+
+    def window_features_at(self, anchor: FeatureAnchor, cutoff_time: datetime,
+                           feature_names: Optional[List[str]] = None) -> pd.DataFrame:
+        """Window aggregation features of every key of the source of `anchor` as of `cutoff_time`, see
+        `feathr.utils.window_aggregation.compute_window_features`."""
+        features = [feature for feature in anchor.features if isinstance(feature.transform, WindowAggTransformation)
+                    and (feature_names is None or feature.name in feature_names)]
+        if not features:
+            raise RuntimeError(f"Anchor {anchor.name} has no window aggregation feature named "
+                               f"{', '.join(feature_names or [])}.")
+        source = anchor.source
+        source_df = self._load_source(source)
+        if source.event_timestamp_column is None:
+            raise RuntimeError(f"Window aggregation features need the event timestamp column of source {source.name}.")
+        key_names = [typed_key.key_column_alias for typed_key in features[0].key]
+        event_keys = pd.DataFrame({name: _key_values(PandasExpression(typed_key.key_column).evaluate(source_df))
+                                   for name, typed_key in zip(key_names, features[0].key)}, index=source_df.index)
+        keys = event_keys.dropna().drop_duplicates().reset_index(drop=True)
+        cutoff_timestamps = pd.Series(pd.Timestamp(cutoff_time), index=keys.index)
+        event_timestamps = parse_timestamps(source_df[source.event_timestamp_column], source.timestamp_format)
+        result = keys.copy()
+        for feature in features:
+            result[feature.name] = self._aggregate_window_feature(feature, source_df, event_keys, event_timestamps,
+                                                                  keys, cutoff_timestamps).to_numpy()
+        return result
+
+    def _aggregate_window_feature(self, feature: Feature, source_df: pd.DataFrame, event_keys: pd.DataFrame,
+                                  event_timestamps: pd.Series, query_keys: pd.DataFrame,
+                                  query_timestamps: pd.Series) -> pd.Series:
+        transform = feature.transform
+        if transform.filter is not None:
+            selected = PandasExpression(transform.filter).evaluate(source_df).fillna(False).astype(bool).to_numpy()
+            source_df, event_keys, event_timestamps = (source_df[selected], event_keys[selected],
+                                                       event_timestamps[selected])
+        groups = PandasExpression(transform.group_by).evaluate(source_df) if transform.group_by is not None else None
+        values = aggregate_windows(event_keys, event_timestamps, PandasExpression(transform.def_expr).evaluate(source_df),
+                                   query_keys, query_timestamps, transform.agg_func, parse_duration(transform.window),
+                                   groups=groups, limit=transform.limit)
+        # Grouped aggregates are dicts, which are left as is
+        return values if groups is not None else _cast_feature(values, feature.feature_type)
+
+    def _evaluate_anchored_feature(self, feature: Feature, source_df: pd.DataFrame) -> pd.Series:
+        return self._expression(feature).evaluate(source_df)
+
+    def _expression(self, feature: Union[Feature, DerivedFeature]) -> PandasExpression:
+        if feature.name not in self._expressions:
+            transform = feature.transform
+            if not isinstance(transform, (ExpressionTransformation, str)):
+                raise NotImplementedError(f"Feature {feature.name} uses {type(transform).__name__}, which is not "
+                                          f"supported by the local_pandas runtime. Please use a Spark runtime.")
+            self._expressions[feature.name] = PandasExpression(
+                transform.expr if isinstance(transform, ExpressionTransformation) else transform)
+        return self._expressions[feature.name]
+
+    def _load_source(self, source) -> pd.DataFrame:
+        if not isinstance(source, HdfsSource):
+            raise NotImplementedError(f"Source {source.name} is a {type(source).__name__}, only HdfsSource and "
+                                      f"INPUT_CONTEXT are supported by the local_pandas runtime.")
+        if source.preprocessing is not None or source.time_partition_pattern is not None:
+            raise NotImplementedError(f"Source {source.name} uses preprocessing or time partitions, which are not "
+                                      f"supported by the local_pandas runtime.")
+        if source.name not in self._sources:
+            self._sources[source.name] = read_local_data(source.path)
+        return self._sources[source.name]
+
+
+def _attach_features(observation: pd.DataFrame, features: Dict[str, pd.Series],
+                     observation_settings: ObservationSettings) -> pd.DataFrame:
+    """Append the feature columns to the observation data, resolving the name conflicts like the Spark job."""
+    conflicts = [name for name in features if name in observation.columns]
+    auto_correction = observation_settings.conflicts_auto_correction
+    if conflicts and auto_correction is None:
+        raise RuntimeError(f"Feature names exist conflicts with dataset column names: {','.join(conflicts)}")
+    result = observation.copy()
+    if conflicts and not auto_correction.rename_features:
+        result = result.rename(columns={name: f"{name}_{auto_correction.suffix}" for name in conflicts})
+    for name, column in features.items():
+        if name in conflicts and auto_correction.rename_features:
+            name = f"{name}_{auto_correction.suffix}"
+        result[name] = column
+    return result
+
+
+def _key_values(values: pd.Series) -> pd.Series:
+    """Normalize key values into strings, so keys of different types match like in Spark, e.g. 1, 1.0 and "1"."""
+    if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+        numeric = values.astype("float64")
+        if (numeric.dropna() % 1 == 0).all():
+            values = numeric.astype("Int64")
+    return values.astype("string").astype(object).where(values.notna(), None)
+
+
+def _cast_feature(values: pd.Series, feature_type: FeatureType) -> pd.Series:
+    """Cast a scalar feature column into the pandas dtype of its feature type. Other types are left as is."""
+    dtype = _FEATURE_DTYPES.get(feature_type.val_type) if not feature_type.dimension_type else None
+    if dtype is not None:
+        if values.dtype.kind not in "fiub":
+            values = values.map({"true": True, "false": False}) if dtype == "boolean" else pd.to_numeric(values,
+                                                                                                         errors="coerce")
+        if dtype.startswith("Int"):
+            values = np.trunc(values.astype("float64"))
+        return values.astype(dtype)
+    if feature_type.val_type == ValueType.STRING and not feature_type.dimension_type:
+        return values.astype("string").astype(object).where(values.notna(), None)
+    return values
+
+
+def _local_path(path: str) -> str:
+    if path.startswith("file:"):
+        return re.sub(r"^file:(//)?", "", path)
+    if re.match(r"^[a-zA-Z][a-zA-Z0-9+.-]*:", path) and not re.match(r"^[a-zA-Z]:[\\/]", path):
+        raise NotImplementedError(f"Path {path} is not a local path, only local paths are supported by the "
+                                  f"local_pandas runtime.")
+    return path
+
+
+def infer_data_format(path: str) -> str:
+    """Infer the format of a file, or of the files of a directory, from their extension."""
+    path = Path(path)
+    if path.is_dir():
+        if (path / "_delta_log").is_dir():
+            return "delta"
+        extensions = {f.suffix for f in path.iterdir() if f.is_file() and not f.name.startswith((".", "_"))}
+    else:
+        extensions = {path.suffix}
+    for data_format in DATA_FORMATS:
+        if f".{data_format}" in extensions:
+            return data_format
+    raise RuntimeError(f"Can't infer the format of {path}. Supported formats are {', '.join(DATA_FORMATS)}.")
+
+
+def read_local_data(path: str, data_format: Optional[str] = None) -> pd.DataFrame:
+    """Read a local file, or directory of files, in one of `DATA_FORMATS`. The format is inferred from the file
+    extension if not set."""
+    path = _local_path(path)
+    if not os.path.exists(path):
+        raise RuntimeError(f"{path} doesn't exist.")
+    data_format = (data_format or infer_data_format(path)).lower()
+    if data_format not in DATA_FORMATS:
+        raise RuntimeError(f"Format {data_format} of {path} is not supported by the local_pandas runtime. Supported "
+                           f"formats are {', '.join(DATA_FORMATS)}.")
+    # Imported here since job_utils depends on the client, which depends on this module
+    from feathr.utils.job_utils import _load_files_to_pandas_df
+    return _load_files_to_pandas_df(path, data_format).reset_index(drop=True)
+
+
+def write_local_data(df: pd.DataFrame, output_path: Union[str, Sink], data_format: str = "avro"):
+    """Write a DataFrame to a local directory, as one `part-00000` file in `data_format` like a single-partition Spark
+    output. Previous `part-*` files of the directory are replaced."""
+    if isinstance(output_path, HdfsSink):
+        output_path = output_path.output_path
+    elif isinstance(output_path, Sink):
+        raise NotImplementedError(f"{type(output_path).__name__} is not supported by the local_pandas runtime, only "
+                                  f"HdfsSink and local paths are.")
+    path = _local_path(output_path)
+    data_format = data_format.lower()
+    if data_format == "delta":
+        from deltalake import write_deltalake
+        write_deltalake(path, df, mode="overwrite")
+        return
+    if data_format not in DATA_FORMATS:
+        raise RuntimeError(f"Output format {data_format} is not supported by the local_pandas runtime. Supported "
+                           f"formats are {', '.join(DATA_FORMATS)}.")
+    os.makedirs(path, exist_ok=True)
+    for previous in Path(path).glob("part-*"):
+        previous.unlink()
+    file_path = os.path.join(path, f"part-00000.{data_format}")
+    if data_format == "avro":
+        import pandavro as pdx
+        pdx.to_avro(file_path, df)
+    elif data_format == "parquet":
+        df.to_parquet(file_path, index=False)
+    else:
+        df.to_csv(file_path, index=False)
@@ -0,0 +1,120 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import reduce
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from loguru import logger
+
+# Spark confs of the session itself, which can't change once the driver is started
+_SESSION_CONFS = ("spark.jars", "spark.jars.packages", "spark.jars.repositories", "spark.master")
+
+
+class _WarmSparkSession:
+    """A long-lived Spark driver in this process, with the Feathr jar and its dependencies loaded, which runs the main
+    entry point of the Feathr jobs (e.g. `FeatureJoinJob` or `FeatureGenJob`) through py4j.
+
+    The jobs get the running session from `SparkSession.builder.getOrCreate()`, so JVM startup, package resolution and
+    SparkContext creation are paid once by the first job instead of once per job. The confs of each job are set on the
+    SparkConf of the driver while it runs, so that the `spark.feathr.*` job parameters are seen by the job. The other
+    static confs, e.g. memory settings, only apply when the driver starts.
+
+    There is only one SparkContext per process, so the driver is shared by all the launchers, see `get_instance`, and
+    it's restarted if a job needs other jars, packages or master. Jobs run one at a time.
+    """
+    _instance: Optional["_WarmSparkSession"] = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self):
+        self._session = None
+        self._session_key: Optional[Tuple] = None
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="feathr_warm_spark")
+
+    @classmethod
+    def get_instance(cls) -> "_WarmSparkSession":
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = _WarmSparkSession()
+            return cls._instance
+
+    def submit(self, job_name: str, master: str, main_class_name: str, arguments: List[str], jars: List[str],
+               packages: str, repositories: str, configuration: Dict[str, str],
+               session_confs: Dict[str, str] = None) -> Future:
+        """Run the main function of `main_class_name` with `arguments` on the driver, started if needed.
+        `session_confs` are set when the driver starts, e.g. `spark.jars.ivy` to resolve the packages in a jar cache.
+
+        Returns:
+            Future of the job, whose result is the job duration in seconds.
+        """
+        configuration = {k: v for k, v in configuration.items() if k not in _SESSION_CONFS}
+        session_key = (master, tuple(jars), packages, repositories, tuple(sorted((session_confs or {}).items())))
+        return self._executor.submit(self._run, job_name, session_key,
+                                     main_class_name, arguments, configuration)
+
+    def cancel(self, job_name: str):
+        """Cancel the Spark jobs of a running Feathr job. The main function still returns on its own."""
+        with self._lock:
+            if self._session is not None:
+                self._session.sparkContext.cancelJobGroup(job_name)
+
+    def stop(self):
+        with self._lock:
+            if self._session is not None:
+                logger.info("Stopping the warm Spark session.")
+                self._session.stop()
+            self._session = None
+            self._session_key = None
+
+    def _run(self, job_name: str, session_key: Tuple, main_class_name: str, arguments: List[str],
+             configuration: Dict[str, str]) -> float:
+        session = self._get_or_create(session_key)
+        start = time.time()
+        spark_conf = session.sparkContext._jsc.sc().conf()
+        previous_confs = {k: spark_conf.getOption(k) for k in configuration}
+        for k, v in configuration.items():
+            spark_conf.set(k, str(v))
+        try:
+            session.sparkContext.setJobGroup(job_name, f"Feathr job {job_name}")
+            jvm = session.sparkContext._jvm
+            java_args = session.sparkContext._gateway.new_array(jvm.java.lang.String, len(arguments))
+            for i, argument in enumerate(arguments):
+                java_args[i] = str(argument)
+            logger.info(f"Running {main_class_name} of job {job_name} in the warm Spark session.")
+            reduce(getattr, main_class_name.split("."), jvm).main(java_args)
+        finally:
+            for k, previous in previous_confs.items():
+                if previous.isDefined():
+                    spark_conf.set(k, previous.get())
+                else:
+                    spark_conf.remove(k)
+        return time.time() - start
+
+    def _get_or_create(self, session_key: Tuple):
+        with self._lock:
+            if self._session is not None and self._session_key != session_key:
+                logger.info("The job needs other jars or packages than the warm Spark session, restarting it.")
+                self._session.stop()
+                self._session = None
+            if self._session is None:
+                start = time.time()
+                self._session = self._create_session(*session_key)
+                self._session_key = session_key
+                logger.info(f"Warm Spark session started in {time.time() - start:.1f} seconds.")
+            return self._session
+
+    def _create_session(self, master: str, jars: Tuple[str, ...], packages: str, repositories: str,
+                        session_confs: Tuple[Tuple[str, str], ...] = ()):
+        from pyspark.sql import SparkSession
+        builder = (SparkSession.builder
+                   .master(master)
+                   .appName("feathr_warm_session")
+                   .config("spark.jars.packages", packages)
+                   .config("spark.jars.repositories", repositories)
+                   .config("spark.hadoop.fs.wasbs.impl", "org.apache.hadoop.fs.azure.NativeAzureFileSystem")
+                   .config("spark.hadoop.fs.wasbs", "org.apache.hadoop.fs.azure.NativeAzureFileSystem"))
+        if jars:
+            builder = builder.config("spark.jars", ",".join(jars))
+        for k, v in session_confs:
+            builder = builder.config(k, v)
+        return builder.enableHiveSupport().getOrCreate()
@@ -1,4 +1,5 @@
-from copy import deepcopy
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from datetime import datetime
 import json
 import os
@@ -6,24 +7,35 @@ import pathlib
 from pathlib import Path
 from shlex import split
 from subprocess import STDOUT, Popen
+import threading
 import time
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from loguru import logger
 from pyspark import *
 
-from feathr.constants import OUTPUT_PATH_TAG
 from feathr.version import get_maven_artifact_fullname
 from feathr.spark_provider._abc import SparkJobLauncher
+from feathr.spark_provider.feathr_job import FeathrJob
+from feathr.spark_provider._localspark_session import _WarmSparkSession
+from feathr.spark_provider._spark_dependencies import CONNECTORS_CONF, _JarCache, merge_packages, resolve_packages
 
 from pyarrow import fs
 
+# Additional Maven repositories of the Feathr dependencies
+_REPOSITORIES = "https://repository.mulesoft.org/nexus/content/repositories/public/,https://linkedin.jfrog.io/artifactory/open-source/"
+
 class _FeathrLocalSparkJobLauncher(SparkJobLauncher):
     """Class to interact with local Spark. This class is not intended to be used in Production environments.
     It is intended to be used for testing and development purposes. No authentication is required to use this class.
 
     Args:
         workspace_path (str): Path to the workspace
+        warm_session (bool): Run the JAR jobs in a long-lived Spark driver of this process instead of a new
+            `spark-submit` each, see `_WarmSparkSession`. The first job starts the driver, the next ones reuse it.
+        jar_cache_dir (str): Cache the jars of the resolved Maven packages in this directory, see `_JarCache`, so the
+            next jobs with the same packages run without network.
+        dependency_jar (str): A pre-built jar with Feathr and all its dependencies, used instead of the Maven packages.
     """
 
     def __init__(
@@ -36,6 +48,9 @@ class _FeathrLocalSparkJobLauncher(SparkJobLauncher):
         retry_sec: int = 30,
         dfs_prefix: str = "",
         dfs_workspace: str = "",
+        warm_session: bool = False,
+        jar_cache_dir: str = None,
+        dependency_jar: str = None,
     ):
         """Initialize the Local Spark job launcher"""
         self.workspace_path = (workspace_path,)
@@ -46,10 +61,14 @@ class _FeathrLocalSparkJobLauncher(SparkJobLauncher):
         self.retry_sec = retry_sec
         self.packages = self._get_default_package()
         self.master = master or "local[*]"
-        self.job_tags = None
+        self.latest_job = None
+        self._lock = threading.Lock()
         self.dfs_prefix = dfs_prefix
         self.dfs_workspace = dfs_workspace
         self.dfs_tmp_path = datetime.now().strftime('%m%d%H%M%S')
+        self.warm_session = warm_session
+        self.jar_cache = _JarCache(jar_cache_dir) if jar_cache_dir else None
+        self.dependency_jar = dependency_jar
 
     def upload_or_get_cloud_path(self, local_path_or_http_path: str):
         """For Local Spark Case, no need to upload to cloud workspace."""
@@ -101,14 +120,23 @@ class _FeathrLocalSparkJobLauncher(SparkJobLauncher):
             f"Local Spark Mode only support basic params right now and should be used only for testing purpose."
         )
         self.cmd_file, self.log_path = self._get_debug_file_name(self.debug_folder, prefix=job_name)
+        cmd_file, log_path = self.cmd_file, self.log_path
 
         # Get conf and package arguments
         cfg = configuration.copy() if configuration else {}
-        maven_dependency_without_feathr = f"{cfg.pop('spark.jars.packages', self.packages)}"
-        maven_dependency = f"{cfg.pop('spark.jars.packages', self.packages)},{get_maven_artifact_fullname()}"
+        # The client can restrict the packages of a job to the connectors of its sources and sinks, and the packages
+        # set by the user are added to them
+        connectors = cfg.pop(CONNECTORS_CONF, None)
+        packages = self.packages.split(",") if connectors is None else resolve_packages(connectors.split(","))
+        maven_dependency_without_feathr = ",".join(merge_packages(packages, cfg.pop('spark.jars.packages', "").split(",")))
+        maven_dependency = f"{maven_dependency_without_feathr},{get_maven_artifact_fullname()}"
+        if self.warm_session and not python_files:
+            # PySpark jobs run their own driver script, so only the JAR jobs can run in the warm session
+            return self._submit_to_warm_session(job_name, main_jar_path, main_class_name, arguments, job_tags, cfg,
+                                                properties, maven_dependency, cmd_file)
         spark_args = self._init_args(job_name=job_name, confs=cfg)
         # Add additional repositories
-        spark_args.extend(["--repositories", "https://repository.mulesoft.org/nexus/content/repositories/public/,https://linkedin.jfrog.io/artifactory/open-source/"])
+        spark_args.extend(["--repositories", _REPOSITORIES])
 
         if not main_jar_path:
             # We don't have the main jar, use Maven
@@ -122,9 +150,9 @@ class _FeathrLocalSparkJobLauncher(SparkJobLauncher):
                 # which does nothing
                 current_dir = Path(__file__).parent.resolve()
                 main_jar_path = os.path.join(current_dir, "noop-1.0.jar")
-                spark_args.extend(["--packages", maven_dependency, "--class", main_class_name, main_jar_path])
+                spark_args.extend(self._dependency_args(maven_dependency) + ["--class", main_class_name, main_jar_path])
             else:
-                spark_args.extend(["--packages", maven_dependency])
+                spark_args.extend(self._dependency_args(maven_dependency))
                 # This is a PySpark job, no more things to
                 if python_files.__len__() > 1:
                     spark_args.extend(["--py-files", ",".join(python_files[1:])])
@@ -135,8 +163,7 @@ class _FeathrLocalSparkJobLauncher(SparkJobLauncher):
                 # This is a JAR job
                 spark_args.extend(["--class", main_class_name, main_jar_path])
             else:
-                spark_args.extend(["--jars", main_jar_path])
-                spark_args.extend(["--packages", maven_dependency_without_feathr])
+                spark_args.extend(self._dependency_args(maven_dependency_without_feathr, jars=[main_jar_path]))
                 # This is a PySpark job, no more things to
                 if python_files.__len__() > 1:
                     spark_args.extend(["--py-files", ",".join(python_files[1:])])
@@ -151,131 +178,80 @@ class _FeathrLocalSparkJobLauncher(SparkJobLauncher):
 
         cmd = " ".join(spark_args)
 
-        log_append = open(f"{self.log_path}_{self.spark_job_num}.txt", "a")
+        with self._lock:
+            job_log_file = f"{log_path}_{self.spark_job_num}.txt"
+            self.spark_job_num += 1
+        log_append = open(job_log_file, "a")
         # remove stderr=STDOUT per https://stackoverflow.com/a/40046887
         # reference code: https://github.com/lyft/airflow/blob/main/airflow/providers/apache/spark/hooks/spark_submit.py#L391
         proc = Popen(split(cmd), shell=False, stdout=log_append)
-        logger.info(f"Detail job stdout and stderr are in {self.log_path}.")
-
-        self.spark_job_num += 1
+        logger.info(f"Detail job stdout and stderr are in {log_path}.")
 
-        with open(self.cmd_file, "a") as c:
+        with open(cmd_file, "a") as c:
             c.write(" ".join(proc.args))
             c.write("\n")
 
-        self.latest_spark_proc = proc
-
         logger.info(f"Local Spark job submit with pid: {proc.pid}.")
 
-        self.job_tags = deepcopy(job_tags)
+        job = _LocalSparkJob(job_name, job_tags, proc, cmd_file, job_log_file, clean_up=self.clean_up,
+                             retry=self.retry, retry_sec=self.retry_sec)
+        self.latest_job = job
+        return job
 
-        return proc
+    def _submit_to_warm_session(self, job_name: str, main_jar_path: str, main_class_name: str, arguments: List[str],
+                                job_tags: Dict[str, str], cfg: Dict[str, str], properties: Dict[str, str],
+                                maven_dependency: str, cmd_file: str) -> "_WarmSessionJob":
+        """Run a JAR job in the warm Spark session. Like `spark-submit`, a main jar is used as is, otherwise the
+        Feathr package is resolved from Maven with its dependencies.
+        """
+        jars, packages, session_confs = [main_jar_path], "", {}
+        if not main_jar_path:
+            jars, packages, session_confs = self._resolve_dependencies(maven_dependency)
+        arguments = list(arguments or [])
+        if properties:
+            arguments.extend(["--system-properties", json.dumps(properties)])
+        with open(cmd_file, "a") as c:
+            c.write(f"# {main_class_name} in the warm Spark session of jars '{','.join(jars)}' and packages "
+                    f"'{packages}', with confs {json.dumps(cfg)}\n")
+            c.write(" ".join(arguments))
+            c.write("\n")
+        future = _WarmSparkSession.get_instance().submit(job_name, self.master, main_class_name, arguments, jars,
+                                                         packages, _REPOSITORIES, cfg, session_confs)
+        with self._lock:
+            self.spark_job_num += 1
+        job = _WarmSessionJob(job_name, job_tags, future, clean_up=self.clean_up)
+        self.latest_job = job
+        logger.info(f"Local Spark job {job_name} submitted to the warm Spark session.")
+        return job
+
+    def stop_warm_session(self):
+        """Stop the warm Spark session, e.g. to release its memory. The next job starts a new one."""
+        _WarmSparkSession.get_instance().stop()
 
-    # TODO: only pyspark or local spark will write output file
     def wait_for_completion(self, timeout_seconds: Optional[float] = 500) -> bool:
-        """This function track local spark job commands and process status.
-        Files will be write into `debug` folder under your workspace.
-        """
+        """Wait for the latest job of this launcher, see `FeathrJob.wait_for_completion` to wait for the others."""
         logger.info(f"{self.spark_job_num} local spark job(s) in this Launcher, only the latest will be monitored.")
-        logger.info(f"Please check auto generated spark command in {self.cmd_file} and detail logs in {self.log_path}.")
-
-        proc = self.latest_spark_proc
-        start_time = time.time()
-        retry = self.retry
-
-        log_read = open(f"{self.log_path}_{self.spark_job_num-1}.txt", "r")
-        while proc.poll() is None and (((timeout_seconds is None) or (time.time() - start_time < timeout_seconds))):
-            time.sleep(1)
-            try:
-                last_line = log_read.readlines()[-1]
-                if retry < 1:
-                    logger.warning(
-                        f"Spark job has hang for {self.retry * self.retry_sec} seconds. latest msg is {last_line}. \
-                            Please check {log_read.name}"
-                    )
-                    if self.clean_up:
-                        self._clean_up()
-                        proc.wait()
-                    break
-                retry = self.retry
-                if last_line == []:
-                    print("_", end="")
-                else:
-                    print(">", end="")
-                    if last_line.__contains__("Feathr Pyspark job completed"):
-                        logger.info(f"Pyspark job Completed")
-                        proc.terminate()
-            except IndexError as e:
-                print("x", end="")
-                time.sleep(self.retry_sec)
-                retry -= 1
-
-        job_duration = time.time() - start_time
-        log_read.close()
-
-        if proc.returncode == None:
-            logger.warning(
-                f"Spark job with pid {self.latest_spark_proc.pid} not completed after {timeout_seconds} sec \
-                    time out setting. Spark Logs:"
-            )
-            with open(log_read.name) as f:
-                contents = f.read()
-                logger.error(contents)
-            if self.clean_up:
-                self._clean_up()
-                proc.wait()
-                return True
-        elif proc.returncode == 1:
-            logger.warning(f"Spark job with pid {self.latest_spark_proc.pid} is not successful. Spark Logs:")
-            with open(log_read.name) as f:
-                contents = f.read()
-                logger.error(contents)
-            return False
-        elif proc.returncode == 143:
-            # Handle the return code 143 separately.
-            # Normally, the Popen method will return a handle that we can poll, and the poll result will be "None" if it's still running, and will be other values if the subprocess is finished.
-            # However when calling `Popen` with `spark-submit`, for some reason, the poll result will always return "None", and the process will hang there forever
-            # due to this issue, additional handling is needed where we detect the output logs and see if the job is finished.
-            # If the logs gives out hint that the job is finished, even the poll result is None (indicating the process is still running) we will still terminate it.
-            # by calling `proc.terminate()`
-            # if the process is terminated with this way, the return code will be 143. We assume this will still be a successful run.
-            logger.info(
-                f"Spark job with pid {self.latest_spark_proc.pid} finished in: {int(job_duration)} seconds."
-            )
-            return True
-        else:
-            logger.info(
-                f"Spark job with pid {self.latest_spark_proc.pid} finished in: {int(job_duration)} seconds \
-                    with returncode {proc.returncode}"
-            )
-            return True
-
-    def _clean_up(self, proc: Popen = None):
-        logger.warning(f"Terminate the spark job due to as clean_up is set to True.")
-        if not proc:
-            self.latest_spark_proc.terminate()
-        else:
-            proc.terminate()
+        return self.latest_job.wait_for_completion(timeout_seconds)
 
     def get_status(self) -> str:
-        """Get the status of the job, only a placeholder for local spark"""
-        return self.latest_spark_proc.returncode
+        """Get the status of the latest job, only a placeholder for local spark"""
+        return self.latest_job.get_status()
 
     def get_job_result_uri(self) -> str:
-        """Get job output path
+        """Get job output path of the latest job
 
         Returns:
             str: output_path
         """
-        return self.job_tags.get(OUTPUT_PATH_TAG, None) if self.job_tags else None
+        return self.latest_job.get_job_result_uri() if self.latest_job else None
 
     def get_job_tags(self) -> Dict[str, str]:
-        """Get job tags
+        """Get job tags of the latest job
 
         Returns:
             Dict[str, str]: a dict of job tags
         """
-        return self.job_tags
+        return self.latest_job.get_job_tags() if self.latest_job else None
 
     def _init_args(self, job_name: str, confs: Dict[str, str]) -> List[str]:
         logger.info(f"Spark job: {job_name} is running on local spark with master: {self.master}.")
@@ -312,44 +288,37 @@ class _FeathrLocalSparkJobLauncher(SparkJobLauncher):
 
         return cmd_file, log_path
 
+    def _resolve_dependencies(self, packages: str) -> Tuple[List[str], str, Dict[str, str]]:
+        """Get the dependencies of a job from the pre-built dependency jar, the jar cache, or Maven.
+
+        Returns:
+            (jars, Maven packages, Spark confs to resolve them)
+        """
+        if self.dependency_jar:
+            return [self.dependency_jar], "", {}
+        if self.jar_cache is None:
+            return [], packages, {}
+        jars, confs = self.jar_cache.resolve(packages.split(","))
+        if jars is not None:
+            return jars, "", {}
+        return [], packages, confs
+
+    def _dependency_args(self, packages: str, jars: List[str] = ()) -> List[str]:
+        """spark-submit arguments of the dependencies of a job, see `_resolve_dependencies`."""
+        dependency_jars, packages, confs = self._resolve_dependencies(packages)
+        args = []
+        for k, v in confs.items():
+            args.extend(["--conf", f"{k}={v}"])
+        if list(jars) + dependency_jars:
+            args.extend(["--jars", ",".join(list(jars) + dependency_jars)])
+        if packages:
+            args.extend(["--packages", packages])
+        return args
+
     def _get_default_package(self):
-        # default packages of Feathr Core, requires manual update when new dependency introduced or package updated.
-        # TODO: automate this process, e.g. read from pom.xml
-        # TODO: dynamical modularization: add package only when it's used in the job, e.g. data source dependencies.
-        packages = []
-        packages.append("org.apache.spark:spark-avro_2.12:3.3.0")
-        packages.append("com.microsoft.sqlserver:mssql-jdbc:10.2.0.jre8")
-        packages.append("com.microsoft.azure:spark-mssql-connector_2.12:1.2.0")
-        packages.append("org.apache.logging.log4j:log4j-core:2.17.2,com.typesafe:config:1.3.4")
-        packages.append("com.fasterxml.jackson.core:jackson-databind:2.12.6.1")
-        packages.append("org.apache.hadoop:hadoop-mapreduce-client-core:2.7.7")
-        packages.append("org.apache.hadoop:hadoop-common:2.7.7")
-        packages.append("org.apache.hadoop:hadoop-azure:3.2.0")
-        packages.append("org.apache.avro:avro:1.8.2,org.apache.xbean:xbean-asm6-shaded:4.10")
-        packages.append("org.apache.spark:spark-sql-kafka-0-10_2.12:3.1.3")
-        packages.append("com.microsoft.azure:azure-eventhubs-spark_2.12:2.3.21")
-        packages.append("org.apache.kafka:kafka-clients:3.1.0")
-        packages.append("com.google.guava:guava:31.1-jre")
-        packages.append("it.unimi.dsi:fastutil:8.1.1")
-        packages.append("org.mvel:mvel2:2.2.8.Final")
-        packages.append("com.fasterxml.jackson.module:jackson-module-scala_2.12:2.13.3")
-        packages.append("com.fasterxml.jackson.dataformat:jackson-dataformat-yaml:2.12.6")
-        packages.append("com.fasterxml.jackson.dataformat:jackson-dataformat-csv:2.12.6")
-        packages.append("com.jasonclawson:jackson-dataformat-hocon:1.1.0")
-        packages.append("com.redislabs:spark-redis_2.12:3.1.0")
-        packages.append("org.apache.xbean:xbean-asm6-shaded:4.10")
-        packages.append("com.google.protobuf:protobuf-java:3.19.4")
-        packages.append("net.snowflake:snowflake-jdbc:3.13.18")
-        packages.append("net.snowflake:spark-snowflake_2.12:2.10.0-spark_3.2")
-        packages.append("org.apache.commons:commons-lang3:3.12.0")
-        packages.append("org.xerial:sqlite-jdbc:3.36.0.3")
-        packages.append("com.github.changvvb:jackson-module-caseclass_2.12:1.1.1")
-        packages.append("com.azure.cosmos.spark:azure-cosmos-spark_3-1_2-12:4.11.1")
-        packages.append("org.eclipse.jetty:jetty-util:9.3.24.v20180605")
-        packages.append("commons-io:commons-io:2.6")
-        packages.append("org.apache.hadoop:hadoop-azure:2.7.4")
-        packages.append("com.microsoft.azure:azure-storage:8.6.4")
-        return ",".join(packages)
+        """Maven packages of Feathr core and all the connectors, used if the client doesn't set the connectors of the
+        job."""
+        return ",".join(resolve_packages())
 
     def get_full_path(self, res_url: str):
         """
@@ -380,4 +349,177 @@ class _FeathrLocalSparkJobLauncher(SparkJobLauncher):
             os.makedirs(local_dir)
         
         fs.copy_files(result_path, local_folder)
-        
\ No newline at end of file
+        
+
+
+class _LocalSparkJob(FeathrJob):
+    """Handle of a job run by `spark-submit`, whose output goes to a log file of the `debug` folder.
+
+    Args:
+        proc: the `spark-submit` process
+        cmd_file: file of the generated `spark-submit` commands
+        log_file: log file of the job
+        clean_up: terminate the job when it hangs or times out
+        retry: number of checks of the log of a hanging job before terminating it
+        retry_sec: time between two checks of the log of a hanging job
+    """
+    def __init__(self, job_name: str, job_tags: Dict[str, str], proc: Popen, cmd_file: str, log_file: str,
+                 clean_up: bool = True, retry: int = 3, retry_sec: int = 30):
+        super().__init__(job_name, job_tags)
+        self.proc = proc
+        self.cmd_file = cmd_file
+        self.log_file = log_file
+        self.clean_up = clean_up
+        self.retry = retry
+        self.retry_sec = retry_sec
+
+    def get_status(self) -> str:
+        """Get the return code of the job, None while it's running"""
+        return self.proc.returncode
+
+    def is_done(self) -> bool:
+        if self.proc.poll() is not None:
+            return True
+        # `spark-submit` of PySpark jobs may not exit on its own, see `wait_for_completion`
+        if self._pyspark_job_completed():
+            self.proc.terminate()
+            self.proc.wait()
+            return True
+        return False
+
+    def cancel(self):
+        if self.proc.poll() is None:
+            logger.warning(f"Terminate the spark job with pid {self.proc.pid}.")
+            self.proc.terminate()
+            self.proc.wait()
+
+    def wait_for_completion(self, timeout_seconds: Optional[float] = 500) -> bool:
+        """This function track local spark job commands and process status.
+        Files will be write into `debug` folder under your workspace.
+        """
+        logger.info(f"Please check auto generated spark command in {self.cmd_file} and detail logs in {self.log_file}.")
+
+        proc = self.proc
+        start_time = time.time()
+        retry = self.retry
+
+        log_read = open(self.log_file, "r")
+        while proc.poll() is None and (((timeout_seconds is None) or (time.time() - start_time < timeout_seconds))):
+            time.sleep(1)
+            try:
+                last_line = log_read.readlines()[-1]
+                if retry < 1:
+                    logger.warning(
+                        f"Spark job has hang for {self.retry * self.retry_sec} seconds. latest msg is {last_line}. \
+                            Please check {log_read.name}"
+                    )
+                    if self.clean_up:
+                        self._clean_up()
+                        proc.wait()
+                    break
+                retry = self.retry
+                if last_line == []:
+                    print("_", end="")
+                else:
+                    print(">", end="")
+                    if last_line.__contains__("Feathr Pyspark job completed"):
+                        logger.info(f"Pyspark job Completed")
+                        proc.terminate()
+            except IndexError as e:
+                print("x", end="")
+                time.sleep(self.retry_sec)
+                retry -= 1
+
+        job_duration = time.time() - start_time
+        log_read.close()
+
+        if proc.returncode == None:
+            logger.warning(
+                f"Spark job with pid {proc.pid} not completed after {timeout_seconds} sec \
+                    time out setting. Spark Logs:"
+            )
+            with open(log_read.name) as f:
+                contents = f.read()
+                logger.error(contents)
+            if self.clean_up:
+                self._clean_up()
+                proc.wait()
+                return True
+        elif proc.returncode == 1:
+            logger.warning(f"Spark job with pid {proc.pid} is not successful. Spark Logs:")
+            with open(log_read.name) as f:
+                contents = f.read()
+                logger.error(contents)
+            return False
+        elif proc.returncode == 143:
+            # Handle the return code 143 separately.
+            # Normally, the Popen method will return a handle that we can poll, and the poll result will be "None" if it's still running, and will be other values if the subprocess is finished.
+            # However when calling `Popen` with `spark-submit`, for some reason, the poll result will always return "None", and the process will hang there forever
+            # due to this issue, additional handling is needed where we detect the output logs and see if the job is finished.
+            # If the logs gives out hint that the job is finished, even the poll result is None (indicating the process is still running) we will still terminate it.
+            # by calling `proc.terminate()`
+            # if the process is terminated with this way, the return code will be 143. We assume this will still be a successful run.
+            logger.info(
+                f"Spark job with pid {proc.pid} finished in: {int(job_duration)} seconds."
+            )
+            return True
+        else:
+            logger.info(
+                f"Spark job with pid {proc.pid} finished in: {int(job_duration)} seconds \
+                    with returncode {proc.returncode}"
+            )
+            return True
+
+    def _clean_up(self):
+        logger.warning(f"Terminate the spark job due to as clean_up is set to True.")
+        self.proc.terminate()
+
+    def _pyspark_job_completed(self) -> bool:
+        try:
+            with open(self.log_file) as f:
+                lines = f.readlines()
+        except OSError:
+            return False
+        return bool(lines) and "Feathr Pyspark job completed" in lines[-1]
+
+
+class _WarmSessionJob(FeathrJob):
+    """Handle of a job run in the warm Spark session, see `_WarmSparkSession`.
+
+    Args:
+        future: future of the job, whose result is the job duration
+        clean_up: cancel the Spark jobs of the job when it times out
+    """
+    def __init__(self, job_name: str, job_tags: Dict[str, str], future: Future, clean_up: bool = True):
+        super().__init__(job_name, job_tags)
+        self.future = future
+        self.clean_up = clean_up
+
+    def get_status(self) -> str:
+        """Get the status of the job, same as the return code of a `spark-submit` process"""
+        if not self.future.done():
+            return None
+        return 0 if not self.future.cancelled() and self.future.exception() is None else 1
+
+    def is_done(self) -> bool:
+        return self.future.done()
+
+    def cancel(self):
+        # Jobs not started yet are dropped from the queue of the session
+        if not self.future.cancel():
+            _WarmSparkSession.get_instance().cancel(self.job_name)
+
+    def wait_for_completion(self, timeout_seconds: Optional[float] = 500) -> bool:
+        try:
+            job_duration = self.future.result(timeout=timeout_seconds)
+        except FutureTimeoutError:
+            logger.warning(f"Spark job {self.job_name} not completed after {timeout_seconds} sec time out setting.")
+            if self.clean_up:
+                logger.warning(f"Cancel the spark job due to as clean_up is set to True.")
+                self.cancel()
+            return False
+        except Exception as e:
+            logger.error(f"Spark job {self.job_name} is not successful: {e}")
+            return False
+        logger.info(f"Spark job {self.job_name} finished in: {int(job_duration)} seconds.")
+        return True
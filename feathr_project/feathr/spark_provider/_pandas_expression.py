@@ -0,0 +1,658 @@
+from datetime import timedelta
+import re
+from typing import Any, Callable, Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+# A compiled expression takes the input DataFrame and returns a column (aligned with its index) or a scalar
+_Value = Union[pd.Series, Any]
+_CompiledExpr = Callable[[pd.DataFrame], _Value]
+
+_TOKEN_PATTERN = re.compile(r"""
+    (?P<space>\s+)
+    | (?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+    | (?P<string>'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")
+    | (?P<quoted>`[^`]+`)
+    | (?P<identifier>[A-Za-z_][A-Za-z0-9_]*)
+    | (?P<operator>==|!=|<>|<=|>=|\|\||[-+*/%=<>(),])
+    """, re.VERBOSE)
+
+_KEYWORDS = {"AND", "OR", "NOT", "IS", "NULL", "TRUE", "FALSE", "CASE", "WHEN", "THEN", "ELSE", "END", "CAST", "AS",
+             "IN", "BETWEEN"}
+
+# SimpleDateFormat pattern letters -> strftime directives, longest first
+_DATE_PATTERNS = [("yyyy", "%Y"), ("yy", "%y"), ("MM", "%m"), ("dd", "%d"), ("HH", "%H"), ("mm", "%M"), ("ss", "%S"),
+                  ("SSS", "%f"), ("XXX", "%z"), ("Z", "%z"), ("'T'", "T"), ("EEE", "%a")]
+
+_DURATION_UNITS = {"d": "days", "h": "hours", "m": "minutes", "s": "seconds"}
+
+
+def parse_duration(duration: str) -> timedelta:
+    """Parse a Feathr duration, e.g. "7d", "5h", "3m" or "1s"."""
+    match = re.fullmatch(r"\s*(\d+)\s*([dhms])\s*", duration or "")
+    if match is None:
+        raise RuntimeError(f"Invalid duration {duration}. Supported units are d(day), h(hour), m(minute) and s(second), "
+                           f"e.g. '7d'.")
+    return timedelta(**{_DURATION_UNITS[match.group(2)]: int(match.group(1))})
+
+
+def to_strftime_format(date_format: str) -> str:
+    """Convert a SimpleDateFormat pattern, e.g. "yyyy-MM-dd HH:mm:ss", into the strftime format of pandas."""
+    res = date_format
+    for pattern, directive in _DATE_PATTERNS:
+        res = res.replace(pattern, directive)
+    return res
+
+
+def parse_timestamps(values: pd.Series, timestamp_format: Optional[str] = "epoch") -> pd.Series:
+    """Parse a timestamp column with the `timestamp_format` of the sources and the observation settings: "epoch",
+    "epoch_millis" or a SimpleDateFormat pattern. Returns naive UTC timestamps, NaT where the value can't be parsed."""
+    if pd.api.types.is_datetime64_any_dtype(values):
+        res = values
+    elif timestamp_format in (None, "epoch", "epoch_millis"):
+        res = pd.to_datetime(pd.to_numeric(values, errors="coerce"), unit="ms" if timestamp_format == "epoch_millis" else "s",
+                             utc=True)
+    else:
+        res = pd.to_datetime(values.astype("string"), format=to_strftime_format(timestamp_format), errors="coerce",
+                             utc=True)
+    if getattr(res.dt, "tz", None) is not None:
+        res = res.dt.tz_convert("UTC").dt.tz_localize(None)
+    return res
+
+
+class _Token:
+    __slots__ = ("kind", "value")
+
+    def __init__(self, kind: str, value: str):
+        self.kind = kind
+        self.value = value
+
+    def is_keyword(self, *keywords: str) -> bool:
+        return self.kind == "keyword" and self.value in keywords
+
+    def is_operator(self, *operators: str) -> bool:
+        return self.kind == "operator" and self.value in operators
+
+
+def _tokenize(expr: str) -> List[_Token]:
+    tokens = []
+    position = 0
+    while position < len(expr):
+        match = _TOKEN_PATTERN.match(expr, position)
+        if match is None:
+            raise RuntimeError(f"Invalid syntax at position {position} of expression '{expr}'")
+        position = match.end()
+        kind = match.lastgroup
+        value = match.group()
+        if kind == "space":
+            continue
+        if kind == "identifier" and value.upper() in _KEYWORDS:
+            tokens.append(_Token("keyword", value.upper()))
+        elif kind == "quoted":
+            tokens.append(_Token("identifier", value[1:-1]))
+        elif kind == "string":
+            tokens.append(_Token("string", re.sub(r"\\(.)", r"\1", value[1:-1])))
+        else:
+            tokens.append(_Token(kind, value))
+    tokens.append(_Token("eof", ""))
+    return tokens
+
+
+class _Parser:
+    """Recursive descent parser of the Spark SQL expressions, compiling each node into a function of the DataFrame.
+
+    Precedence, lowest first: OR, AND, NOT, comparisons (including IS NULL, IN and BETWEEN), + - ||, * / %, unary -.
+    """
+    def __init__(self, expr: str):
+        self.expr = expr
+        self.tokens = _tokenize(expr)
+        self.position = 0
+        self.columns = set()
+
+    @property
+    def current(self) -> _Token:
+        return self.tokens[self.position]
+
+    def forward(self) -> _Token:
+        token = self.current
+        self.position += 1
+        return token
+
+    def expect_operator(self, operator: str):
+        if not self.current.is_operator(operator):
+            self.error(f"expected '{operator}'")
+        self.forward()
+
+    def expect_keyword(self, keyword: str):
+        if not self.current.is_keyword(keyword):
+            self.error(f"expected {keyword}")
+        self.forward()
+
+    def error(self, message: str):
+        raise RuntimeError(f"Invalid expression '{self.expr}': {message}, got '{self.current.value or 'end'}'")
+
+    def parse(self) -> _CompiledExpr:
+        node = self.or_expr()
+        if self.current.kind != "eof":
+            self.error("unexpected token")
+        return node
+
+    def or_expr(self) -> _CompiledExpr:
+        node = self.and_expr()
+        while self.current.is_keyword("OR"):
+            self.forward()
+            node = _binary(_or, node, self.and_expr())
+        return node
+
+    def and_expr(self) -> _CompiledExpr:
+        node = self.not_expr()
+        while self.current.is_keyword("AND"):
+            self.forward()
+            node = _binary(_and, node, self.not_expr())
+        return node
+
+    def not_expr(self) -> _CompiledExpr:
+        if self.current.is_keyword("NOT"):
+            self.forward()
+            return _unary(_not, self.not_expr())
+        return self.comparison()
+
+    def comparison(self) -> _CompiledExpr:
+        node = self.add_expr()
+        if self.current.kind == "operator" and self.current.value in _COMPARISONS:
+            op = _COMPARISONS[self.forward().value]
+            return _binary(lambda a, b: _compare(op, a, b), node, self.add_expr())
+        if self.current.is_keyword("IS"):
+            self.forward()
+            negated = self.current.is_keyword("NOT")
+            if negated:
+                self.forward()
+            self.expect_keyword("NULL")
+            return _unary(_isnotnull if negated else _isnull, node)
+        negated = self.current.is_keyword("NOT")
+        if negated:
+            self.forward()
+        if self.current.is_keyword("IN"):
+            self.forward()
+            self.expect_operator("(")
+            values = self.arglist()
+            self.expect_operator(")")
+            res = _call(_in, [node] + values)
+        elif self.current.is_keyword("BETWEEN"):
+            self.forward()
+            low = self.add_expr()
+            self.expect_keyword("AND")
+            high = self.add_expr()
+            res = _call(lambda a, lo, hi: _and(_compare(np.greater_equal, a, lo), _compare(np.less_equal, a, hi)),
+                        [node, low, high])
+        else:
+            if negated:
+                self.error("expected IN or BETWEEN")
+            return node
+        return _unary(_not, res) if negated else res
+
+    def add_expr(self) -> _CompiledExpr:
+        node = self.mul_expr()
+        while self.current.is_operator("+", "-", "||"):
+            op = self.forward().value
+            node = _binary(_concat if op == "||" else _ARITHMETIC[op], node, self.mul_expr())
+        return node
+
+    def mul_expr(self) -> _CompiledExpr:
+        node = self.unary()
+        while self.current.is_operator("*", "/", "%"):
+            op = self.forward().value
+            node = _binary(_ARITHMETIC[op], node, self.unary())
+        return node
+
+    def unary(self) -> _CompiledExpr:
+        if self.current.is_operator("-", "+"):
+            op = self.forward().value
+            node = self.unary()
+            return _unary(lambda a: -a, node) if op == "-" else node
+        return self.primary()
+
+    def primary(self) -> _CompiledExpr:
+        token = self.forward()
+        if token.kind == "number":
+            value = float(token.value) if any(c in token.value for c in ".eE") else int(token.value)
+            return lambda df: value
+        if token.kind == "string":
+            return lambda df: token.value
+        if token.is_keyword("TRUE", "FALSE"):
+            value = token.value == "TRUE"
+            return lambda df: value
+        if token.is_keyword("NULL"):
+            return lambda df: None
+        if token.is_operator("("):
+            node = self.or_expr()
+            self.expect_operator(")")
+            return node
+        if token.is_keyword("CASE"):
+            return self.case()
+        if token.is_keyword("CAST"):
+            self.expect_operator("(")
+            node = self.or_expr()
+            self.expect_keyword("AS")
+            type_name = self.forward().value.lower()
+            self.expect_operator(")")
+            cast = _CASTS.get(type_name)
+            if cast is None:
+                raise NotImplementedError(f"cast to {type_name}")
+            return _unary(cast, node)
+        if token.kind != "identifier":
+            self.position -= 1
+            self.error("expected a column, a literal or a function")
+        if self.current.is_operator("("):
+            self.forward()
+            args = [] if self.current.is_operator(")") else self.arglist()
+            self.expect_operator(")")
+            fn = _FUNCTIONS.get(token.value.lower())
+            if fn is None:
+                raise NotImplementedError(f"function {token.value}")
+            return _call(fn, args)
+        name = token.value
+        self.columns.add(name)
+        return lambda df: df[name]
+
+    def case(self) -> _CompiledExpr:
+        # CASE [operand] WHEN condition THEN value ... [ELSE value] END
+        operand = None if self.current.is_keyword("WHEN") else self.or_expr()
+        branches = []
+        while self.current.is_keyword("WHEN"):
+            self.forward()
+            condition = self.or_expr()
+            if operand is not None:
+                condition = _binary(lambda a, b: _compare(np.equal, a, b), operand, condition)
+            self.expect_keyword("THEN")
+            branches.append((condition, self.or_expr()))
+        if not branches:
+            self.error("expected WHEN")
+        otherwise = lambda df: None
+        if self.current.is_keyword("ELSE"):
+            self.forward()
+            otherwise = self.or_expr()
+        self.expect_keyword("END")
+
+        def _case(df: pd.DataFrame) -> _Value:
+            res = _as_series(otherwise(df), df.index)
+            # Apply the branches in reverse, so the first matching one wins
+            for condition, value in reversed(branches):
+                res = _where(_as_series(condition(df), df.index), _as_series(value(df), df.index), res)
+            return res
+        return _case
+
+    def arglist(self) -> List[_CompiledExpr]:
+        args = [self.or_expr()]
+        while self.current.is_operator(","):
+            self.forward()
+            args.append(self.or_expr())
+        return args
+
+
+def _unary(fn: Callable, a: _CompiledExpr) -> _CompiledExpr:
+    return lambda df: fn(a(df))
+
+
+def _binary(fn: Callable, a: _CompiledExpr, b: _CompiledExpr) -> _CompiledExpr:
+    return lambda df: fn(a(df), b(df))
+
+
+def _call(fn: Callable, args: List[_CompiledExpr]) -> _CompiledExpr:
+    return lambda df: fn(*(arg(df) for arg in args))
+
+
+def _is_null(a: _Value) -> Union[pd.Series, bool]:
+    return a.isna() if isinstance(a, pd.Series) else a is None or (isinstance(a, float) and np.isnan(a))
+
+
+def _as_series(value: _Value, index: pd.Index) -> pd.Series:
+    return value if isinstance(value, pd.Series) else pd.Series([value] * len(index), index=index, dtype=object
+                                                                 if value is None or isinstance(value, str) else None)
+
+
+def _where(condition: pd.Series, then: pd.Series, otherwise: pd.Series) -> pd.Series:
+    selected = condition.fillna(False).astype(bool)
+    if then.dtype == otherwise.dtype:
+        return then.where(selected, otherwise)
+    return then.astype(object).where(selected, otherwise.astype(object)).infer_objects()
+
+
+def _compare(op: Callable, a: _Value, b: _Value) -> _Value:
+    if _is_null(a) is True or _is_null(b) is True:
+        return None
+    res = op(a, b)
+    if isinstance(res, pd.Series):
+        return _to_boolean(res, a, b)
+    return bool(res)
+
+
+def _to_boolean(res: pd.Series, *args: _Value) -> pd.Series:
+    res = res.astype("boolean")
+    for arg in args:
+        if isinstance(arg, pd.Series):
+            res[arg.isna().to_numpy()] = pd.NA
+    return res
+
+
+def _and(a: _Value, b: _Value) -> _Value:
+    # Three-valued logic: false and null is false
+    if not isinstance(a, pd.Series) and not isinstance(b, pd.Series):
+        if a is False or b is False:
+            return False
+        return None if a is None or b is None else bool(a and b)
+    index = a.index if isinstance(a, pd.Series) else b.index
+    return _as_series(a, index).astype("boolean") & _as_series(b, index).astype("boolean")
+
+
+def _or(a: _Value, b: _Value) -> _Value:
+    if not isinstance(a, pd.Series) and not isinstance(b, pd.Series):
+        if a is True or b is True:
+            return True
+        return None if a is None or b is None else bool(a or b)
+    index = a.index if isinstance(a, pd.Series) else b.index
+    return _as_series(a, index).astype("boolean") | _as_series(b, index).astype("boolean")
+
+
+def _not(a: _Value) -> _Value:
+    if isinstance(a, pd.Series):
+        return ~a.astype("boolean")
+    return None if a is None else not a
+
+
+def _isnull(a: _Value) -> _Value:
+    return _is_null(a)
+
+
+def _isnotnull(a: _Value) -> _Value:
+    res = _is_null(a)
+    return ~res if isinstance(res, pd.Series) else not res
+
+
+def _in(a: _Value, *values: _Value) -> _Value:
+    if isinstance(a, pd.Series):
+        return _to_boolean(a.isin(values), a)
+    return None if a is None else a in values
+
+
+def _numeric(a: _Value) -> _Value:
+    if isinstance(a, pd.Series):
+        if a.dtype.kind in "fiub":
+            return a.astype("float64") if a.dtype.kind == "b" else a
+        return pd.to_numeric(a, errors="coerce")
+    if a is None:
+        return np.nan
+    return float(a) if isinstance(a, bool) else a
+
+
+def _arithmetic(fn: Callable) -> Callable:
+    def _apply(a: _Value, b: _Value) -> _Value:
+        if _is_null(a) is True or _is_null(b) is True:
+            return None
+        return fn(_numeric(a), _numeric(b))
+    return _apply
+
+
+def _divide(a: _Value, b: _Value) -> _Value:
+    # Same as Spark SQL, dividing by zero gives null instead of inf, and the result is always a double
+    with np.errstate(divide="ignore", invalid="ignore"):
+        res = np.true_divide(a, b)
+    return _null_if_zero(res, b)
+
+
+def _mod(a: _Value, b: _Value) -> _Value:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        res = np.fmod(a, b)
+    return _null_if_zero(res, b)
+
+
+def _null_if_zero(res: _Value, divisor: _Value) -> _Value:
+    if isinstance(divisor, pd.Series):
+        return res.where(divisor != 0, np.nan)
+    if divisor != 0:
+        return res
+    return res * np.nan if isinstance(res, pd.Series) else None
+
+
+_ARITHMETIC = {
+    "+": _arithmetic(np.add),
+    "-": _arithmetic(np.subtract),
+    "*": _arithmetic(np.multiply),
+    "/": _arithmetic(_divide),
+    "%": _arithmetic(_mod),
+}
+
+_COMPARISONS = {
+    "=": np.equal,
+    "==": np.equal,
+    "!=": np.not_equal,
+    "<>": np.not_equal,
+    "<": np.less,
+    "<=": np.less_equal,
+    ">": np.greater,
+    ">=": np.greater_equal,
+}
+
+
+def _string(a: _Value) -> _Value:
+    if isinstance(a, pd.Series):
+        return a.astype("string").astype(object).where(a.notna(), None)
+    return None if a is None else str(a)
+
+
+def _concat(*args: _Value) -> _Value:
+    res = ""
+    for arg in args:
+        if _is_null(arg) is True:
+            return None
+        res = res + _string(arg)
+    return res.where(res.notna(), None) if isinstance(res, pd.Series) else res
+
+
+def _cast_number(dtype: str) -> Callable[[_Value], _Value]:
+    def _cast(a: _Value) -> _Value:
+        values = _numeric(a)
+        if dtype.startswith("Int"):
+            if isinstance(values, pd.Series):
+                return np.trunc(values.astype("float64")).astype(dtype)
+            return None if values is None or np.isnan(values) else int(values)
+        if isinstance(values, pd.Series):
+            return values.astype(dtype)
+        return None if values is None or np.isnan(values) else float(values)
+    return _cast
+
+
+def _cast_boolean(a: _Value) -> _Value:
+    if isinstance(a, pd.Series):
+        if a.dtype.kind in "fiub":
+            return _to_boolean(a != 0, a)
+        return a.astype("string").str.lower().map({"true": True, "false": False}).astype("boolean")
+    return None if a is None else bool(a)
+
+
+def _to_timestamp(a: _Value, date_format: Optional[str] = None) -> _Value:
+    if not isinstance(a, pd.Series):
+        a = pd.Series([a])
+        return parse_timestamps(a, date_format or "yyyy-MM-dd HH:mm:ss")[0]
+    if a.dtype.kind in "fiu" and date_format is None:
+        return parse_timestamps(a, "epoch")
+    return parse_timestamps(a, date_format or "yyyy-MM-dd HH:mm:ss")
+
+
+def _unix_timestamp(a: _Value, date_format: Optional[str] = None) -> _Value:
+    res = _to_timestamp(a, date_format)
+    if isinstance(res, pd.Series):
+        return (res - pd.Timestamp(0)).dt.total_seconds().floordiv(1).astype("Int64")
+    return None if pd.isna(res) else int((res - pd.Timestamp(0)).total_seconds())
+
+
+def _date_part(part: Callable[[Any], Any]) -> Callable[[_Value], _Value]:
+    def _apply(a: _Value) -> _Value:
+        res = _to_timestamp(a)
+        if isinstance(res, pd.Series):
+            return part(res.dt).astype("Int32")
+        return None if pd.isna(res) else int(part(res))
+    return _apply
+
+
+def _round(a: _Value, scale: int = 0) -> _Value:
+    # Spark SQL rounds half away from zero, while np.round rounds half to even
+    factor = 10.0 ** scale
+    values = _numeric(a)
+    return np.sign(values) * np.floor(np.abs(values) * factor + 0.5) / factor
+
+
+def _log(*args: _Value) -> _Value:
+    # log(x) is the natural logarithm, log(base, x) the logarithm of x in base `base`
+    with np.errstate(divide="ignore", invalid="ignore"):
+        res = np.log(_numeric(args[0])) if len(args) == 1 else np.log(_numeric(args[1])) / np.log(_numeric(args[0]))
+    return res.where(np.isfinite(res), np.nan) if isinstance(res, pd.Series) else res if np.isfinite(res) else None
+
+
+def _coalesce(*args: _Value) -> _Value:
+    series = [arg for arg in args if isinstance(arg, pd.Series)]
+    if not series:
+        return next((arg for arg in args if not _is_null(arg)), None)
+    res = _as_series(args[0], series[0].index)
+    for arg in args[1:]:
+        res = _where(res.notna(), res, _as_series(arg, res.index))
+    return res
+
+
+def _if(condition: _Value, then: _Value, otherwise: _Value) -> _Value:
+    if not isinstance(condition, pd.Series):
+        return then if condition else otherwise
+    return _where(condition, _as_series(then, condition.index), _as_series(otherwise, condition.index))
+
+
+def _extreme(reduce: Callable) -> Callable[..., _Value]:
+    def _apply(*args: _Value) -> _Value:
+        # Nulls are skipped, like greatest and least of Spark SQL
+        series = [arg for arg in args if isinstance(arg, pd.Series)]
+        if not series:
+            values = [arg for arg in args if not _is_null(arg)]
+            return reduce(values) if values else None
+        return pd.concat([_as_series(_numeric(arg), series[0].index) for arg in args], axis=1).agg(
+            "max" if reduce is max else "min", axis=1)
+    return _apply
+
+
+def _string_function(fn: Callable[[Any], Any]) -> Callable[..., _Value]:
+    def _apply(a: _Value, *args: _Value) -> _Value:
+        values = _string(a)
+        if isinstance(values, pd.Series):
+            return fn(values.astype("string").str, *args).astype(object).where(values.notna(), None)
+        return None if values is None else fn(pd.Series([values], dtype="string").str, *args)[0]
+    return _apply
+
+
+def _substring(accessor, position: int, length: Optional[int] = None):
+    # Positions are 1-based in Spark SQL, and negative positions count from the end
+    start = position - 1 if position > 0 else position
+    end = None if length is None else start + length
+    if start < 0 and end is not None and end >= 0:
+        end = None
+    return accessor.slice(start, end)
+
+
+_CASTS = {
+    "float": _cast_number("float32"),
+    "double": _cast_number("float64"),
+    "int": _cast_number("Int32"),
+    "integer": _cast_number("Int32"),
+    "bigint": _cast_number("Int64"),
+    "long": _cast_number("Int64"),
+    "string": _string,
+    "boolean": _cast_boolean,
+    "timestamp": _to_timestamp,
+}
+
+# Spark SQL functions, and the UDFs registered by the Feathr Spark job, that have a pandas equivalent
+_FUNCTIONS: Dict[str, Callable[..., _Value]] = {
+    "abs": lambda a: np.abs(_numeric(a)),
+    "and": _and,
+    "cast_double": _CASTS["double"],
+    "cast_float": _CASTS["float"],
+    "cast_int": _CASTS["int"],
+    "cbrt": lambda a: np.cbrt(_numeric(a)),
+    "ceil": lambda a: np.ceil(_numeric(a)),
+    "coalesce": _coalesce,
+    "concat": _concat,
+    "cos": lambda a: np.cos(_numeric(a)),
+    "day": _date_part(lambda t: t.day),
+    "dayofmonth": _date_part(lambda t: t.day),
+    # Sunday is 1 and Saturday is 7 in Spark SQL, while Monday is 0 in pandas
+    "dayofweek": _date_part(lambda t: (t.dayofweek + 1) % 7 + 1),
+    "exp": lambda a: np.exp(_numeric(a)),
+    "floor": lambda a: np.floor(_numeric(a)),
+    "greatest": _extreme(max),
+    "hour": _date_part(lambda t: t.hour),
+    "if": _if,
+    "if_else": _if,
+    "isnotnull": _isnotnull,
+    "isnull": _isnull,
+    "least": _extreme(min),
+    "length": _string_function(lambda s: s.len()),
+    "ln": _log,
+    "log": _log,
+    "log10": lambda a: _log(10.0, a),
+    "log2": lambda a: _log(2.0, a),
+    "lower": _string_function(lambda s: s.lower()),
+    "ltrim": _string_function(lambda s: s.lstrip()),
+    "minute": _date_part(lambda t: t.minute),
+    "month": _date_part(lambda t: t.month),
+    "not": _not,
+    "nvl": _coalesce,
+    "or": _or,
+    "pow": _arithmetic(np.power),
+    "power": _arithmetic(np.power),
+    "round": _round,
+    "rtrim": _string_function(lambda s: s.rstrip()),
+    "second": _date_part(lambda t: t.second),
+    "sign": lambda a: np.sign(_numeric(a)),
+    "signum": lambda a: np.sign(_numeric(a)),
+    "sin": lambda a: np.sin(_numeric(a)),
+    "sqrt": lambda a: np.sqrt(_numeric(a).where(_numeric(a) >= 0) if isinstance(a, pd.Series) else _numeric(a)),
+    "substr": _string_function(_substring),
+    "substring": _string_function(_substring),
+    "tan": lambda a: np.tan(_numeric(a)),
+    "to_timestamp": _to_timestamp,
+    "to_unix_timestamp": _unix_timestamp,
+    "trim": _string_function(lambda s: s.strip()),
+    "unix_timestamp": _unix_timestamp,
+    "upper": _string_function(lambda s: s.upper()),
+    "year": _date_part(lambda t: t.year),
+}
+
+
+class PandasExpression:
+    """A Spark SQL expression of a feature, e.g. "cast_float(trip_distance) > 30", compiled once into a function of
+    pandas DataFrames.
+
+    The supported subset is: columns, number, string and boolean literals, arithmetic and comparison operators,
+    AND/OR/NOT, IS [NOT] NULL, [NOT] IN, [NOT] BETWEEN, CASE WHEN, CAST, and the functions of `_FUNCTIONS`. Nulls
+    propagate like in Spark SQL. Other expressions raise `NotImplementedError`, and need a Spark runtime.
+
+    Attributes:
+        expr: the expression.
+        columns: the columns of the input DataFrame it reads.
+    """
+    def __init__(self, expr: str):
+        self.expr = expr
+        parser = _Parser(expr)
+        try:
+            self._fn = parser.parse()
+        except NotImplementedError as e:
+            raise NotImplementedError(f"Expression '{expr}' can't be evaluated with pandas, it uses an unsupported {e}.")
+        self.columns = parser.columns
+
+    def evaluate(self, df: pd.DataFrame) -> pd.Series:
+        """Evaluate the expression on each row of `df`."""
+        missing_columns = self.columns - set(df.columns)
+        if missing_columns:
+            raise RuntimeError(f"Expression '{self.expr}' refers to columns {sorted(missing_columns)} that don't exist. "
+                               f"Available columns are {list(df.columns)}.")
+        with np.errstate(invalid="ignore", over="ignore"):
+            res = self._fn(df)
+        return _as_series(res, df.index)
@@ -0,0 +1,278 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+import shutil
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from loguru import logger
+
+from feathr.definition.anchor import FeatureAnchor
+from feathr.definition.sink import GenericSink, HdfsSink, JdbcSink, MonitoringSqlSink, RedisSink, Sink
+from feathr.definition.source import GenericSource, HdfsSource, JdbcSource, KafKaSource, SnowflakeSource, Source
+
+# Maven packages of Feathr core, needed by every job. Requires manual update when new dependency introduced or package
+# updated.
+# TODO: automate this process, e.g. read from pom.xml
+CORE_PACKAGES = [
+    "org.apache.spark:spark-avro_2.12:3.3.0",
+    "org.apache.logging.log4j:log4j-core:2.17.2",
+    "com.typesafe:config:1.3.4",
+    "com.fasterxml.jackson.core:jackson-databind:2.12.6.1",
+    "org.apache.hadoop:hadoop-mapreduce-client-core:2.7.7",
+    "org.apache.hadoop:hadoop-common:2.7.7",
+    "org.apache.avro:avro:1.8.2",
+    "org.apache.xbean:xbean-asm6-shaded:4.10",
+    "com.google.guava:guava:31.1-jre",
+    "it.unimi.dsi:fastutil:8.1.1",
+    "org.mvel:mvel2:2.2.8.Final",
+    "com.fasterxml.jackson.module:jackson-module-scala_2.12:2.13.3",
+    "com.fasterxml.jackson.dataformat:jackson-dataformat-yaml:2.12.6",
+    "com.fasterxml.jackson.dataformat:jackson-dataformat-csv:2.12.6",
+    "com.jasonclawson:jackson-dataformat-hocon:1.1.0",
+    "com.google.protobuf:protobuf-java:3.19.4",
+    "org.apache.commons:commons-lang3:3.12.0",
+    "com.github.changvvb:jackson-module-caseclass_2.12:1.1.1",
+    "org.eclipse.jetty:jetty-util:9.3.24.v20180605",
+    "commons-io:commons-io:2.6",
+]
+
+# Connector -> Maven packages, only needed by the jobs reading or writing the matching sources, sinks or paths
+CONNECTOR_PACKAGES = {
+    "azure_storage": [
+        "org.apache.hadoop:hadoop-azure:3.2.0",
+        "org.apache.hadoop:hadoop-azure:2.7.4",
+        "com.microsoft.azure:azure-storage:8.6.4",
+    ],
+    "jdbc": [
+        "com.microsoft.sqlserver:mssql-jdbc:10.2.0.jre8",
+        "com.microsoft.azure:spark-mssql-connector_2.12:1.2.0",
+        "org.xerial:sqlite-jdbc:3.36.0.3",
+    ],
+    "kafka": [
+        "org.apache.spark:spark-sql-kafka-0-10_2.12:3.1.3",
+        "com.microsoft.azure:azure-eventhubs-spark_2.12:2.3.21",
+        "org.apache.kafka:kafka-clients:3.1.0",
+    ],
+    "redis": ["com.redislabs:spark-redis_2.12:3.1.0"],
+    "snowflake": [
+        "net.snowflake:snowflake-jdbc:3.13.18",
+        "net.snowflake:spark-snowflake_2.12:2.10.0-spark_3.2",
+    ],
+    "cosmos": ["com.azure.cosmos.spark:azure-cosmos-spark_3-1_2-12:4.11.1"],
+}
+
+# Spark conf listing the connectors of a local job, set by the client so that the job only gets their packages
+CONNECTORS_CONF = "spark.feathr.connectors"
+
+# Path scheme -> connector
+_SCHEME_CONNECTORS = {
+    "wasb": "azure_storage",
+    "wasbs": "azure_storage",
+    "abfs": "azure_storage",
+    "abfss": "azure_storage",
+    "snowflake": "snowflake",
+    "jdbc": "jdbc",
+}
+
+# Format of `GenericSource` and `GenericSink` -> connector
+_FORMAT_CONNECTORS = {
+    "cosmos.oltp": "cosmos",
+    "jdbc": "jdbc",
+    "kafka": "kafka",
+    "eventhubs": "kafka",
+    "snowflake": "snowflake",
+    "net.snowflake.spark.snowflake": "snowflake",
+    "org.apache.spark.sql.redis": "redis",
+}
+
+
+def required_connectors(anchors: Iterable[FeatureAnchor] = (), sinks: Iterable[Sink] = (),
+                        paths: Iterable[str] = ()) -> Set[str]:
+    """Connectors of `CONNECTOR_PACKAGES` needed by a job, from the sources of its anchors, its sinks, and the other
+    paths it reads or writes, e.g. the observation and output paths."""
+    connectors = set()
+    for anchor in anchors:
+        connectors |= _source_connectors(anchor.source)
+    for sink in sinks:
+        connectors |= _sink_connectors(sink)
+    for path in paths:
+        connectors |= _path_connectors(path)
+    return connectors
+
+
+def resolve_packages(connectors: Optional[Iterable[str]] = None) -> List[str]:
+    """Maven packages of Feathr core and of `connectors`, all the connectors if it's None."""
+    connectors = CONNECTOR_PACKAGES if connectors is None else set(connectors)
+    packages = list(CORE_PACKAGES)
+    for connector, connector_packages in CONNECTOR_PACKAGES.items():
+        if connector in connectors:
+            packages.extend(connector_packages)
+    return packages
+
+
+def merge_packages(*package_lists: Iterable[str]) -> List[str]:
+    """Concatenate lists of Maven packages, without the duplicates and the empty ones."""
+    packages = []
+    for package_list in package_lists:
+        for package in package_list:
+            package = package.strip()
+            if package and package not in packages:
+                packages.append(package)
+    return packages
+
+
+def _source_connectors(source: Source) -> Set[str]:
+    if isinstance(source, SnowflakeSource):
+        return {"snowflake"}
+    if isinstance(source, JdbcSource):
+        return {"jdbc"}
+    if isinstance(source, KafKaSource):
+        return {"kafka"}
+    if isinstance(source, GenericSource):
+        return _format_connectors(source.format)
+    if isinstance(source, HdfsSource):
+        return _path_connectors(source.path)
+    return set()
+
+
+def _sink_connectors(sink: Sink) -> Set[str]:
+    if isinstance(sink, RedisSink):
+        return {"redis"}
+    if isinstance(sink, (JdbcSink, MonitoringSqlSink)):
+        return {"jdbc"}
+    if isinstance(sink, GenericSink):
+        return _format_connectors(sink.format)
+    if isinstance(sink, HdfsSink):
+        return _path_connectors(sink.output_path)
+    return set()
+
+
+def _format_connectors(data_format: str) -> Set[str]:
+    connector = _FORMAT_CONNECTORS.get((data_format or "").lower())
+    return {connector} if connector else set()
+
+
+def _path_connectors(path: str) -> Set[str]:
+    scheme = (path or "").split(":", 1)[0].lower() if ":" in (path or "") else ""
+    connector = _SCHEME_CONNECTORS.get(scheme)
+    return {connector} if connector else set()
+
+
+class _JarCache:
+    """Content-addressed local cache of the jars of Maven package sets, so the jobs of a package set resolved once run
+    without network.
+
+    The first job of a package set resolves it with Ivy into its own directory, see `ivy_dir`. Once the jar of every
+    package of the set is there, the jars are stored once by sha256 under `objects/` by the next job, and listed by the
+    index of the package set. The jobs
+    then get the cached jars with `--jars` instead of `--packages`.
+
+    Attributes:
+        cache_dir: root directory of the cache.
+    """
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+
+    def resolve(self, packages: List[str]) -> Tuple[Optional[List[str]], Dict[str, str]]:
+        """Resolve a package set from the cache.
+
+        Returns:
+            (cached jars of the package set, or None if it's not cached, Spark confs to resolve and cache it)
+        """
+        key = self.package_set_key(packages)
+        jars = self._cached_jars(key)
+        if jars is None:
+            jars = self._import_ivy_jars(key, packages)
+        if jars is not None:
+            logger.info(f"Using {len(jars)} cached jars of package set {key} from {self.cache_dir}.")
+            return jars, {}
+        logger.info(f"Package set {key} is not cached yet, it will be cached after its resolution by this job.")
+        return None, {"spark.jars.ivy": self.ivy_dir(key)}
+
+    def add(self, jar_path: str) -> str:
+        """Store a jar by the sha256 of its content, and get its path in the cache."""
+        digest = _sha256(jar_path)
+        cached_path = os.path.join(self.cache_dir, "objects", f"{digest}.jar")
+        if not os.path.exists(cached_path):
+            os.makedirs(os.path.dirname(cached_path), exist_ok=True)
+            tmp_path = f"{cached_path}.{os.getpid()}.tmp"
+            shutil.copyfile(jar_path, tmp_path)
+            os.replace(tmp_path, cached_path)
+        return cached_path
+
+    def add_package_set(self, packages: List[str], jar_paths: List[str]) -> List[str]:
+        """Cache the jars resolved for a package set, e.g. downloaded with `mvn dependency:copy-dependencies` to
+        prepare a machine without network."""
+        key = self.package_set_key(packages)
+        cached_paths = [self.add(jar_path) for jar_path in jar_paths]
+        index = self._read_index()
+        index[key] = {
+            "packages": sorted(packages),
+            "jars": {Path(jar_path).name: Path(cached_path).stem
+                     for jar_path, cached_path in zip(jar_paths, cached_paths)},
+        }
+        self._write_index(index)
+        return cached_paths
+
+    def ivy_dir(self, key: str) -> str:
+        return os.path.join(self.cache_dir, "ivy", key)
+
+    @staticmethod
+    def package_set_key(packages: List[str]) -> str:
+        return hashlib.sha256(",".join(sorted(set(packages))).encode()).hexdigest()[:16]
+
+    def _cached_jars(self, key: str) -> Optional[List[str]]:
+        entry = self._read_index().get(key)
+        if entry is None:
+            return None
+        jars = [os.path.join(self.cache_dir, "objects", f"{digest}.jar") for digest in entry["jars"].values()]
+        if not all(os.path.exists(jar) for jar in jars):
+            logger.warning(f"Some cached jars of package set {key} are missing, resolving it again.")
+            return None
+        return jars
+
+    def _import_ivy_jars(self, key: str, packages: List[str]) -> Optional[List[str]]:
+        """Cache the jars resolved by Ivy for a package set by a previous job, if the resolution is complete."""
+        jars_dir = os.path.join(self.ivy_dir(key), "jars")
+        jar_paths = sorted(str(path) for path in Path(jars_dir).glob("*.jar")) if os.path.isdir(jars_dir) else []
+        if not jar_paths:
+            return None
+        # The resolution of a failed or still running job may be partial, it must not be cached for good
+        jar_names = {Path(jar_path).name for jar_path in jar_paths}
+        missing = [package for package in packages if package and _ivy_jar_name(package) not in jar_names]
+        if missing:
+            logger.info(f"Package set {key} is not completely resolved yet, missing {missing}.")
+            return None
+        cached_paths = self.add_package_set(packages, jar_paths)
+        shutil.rmtree(self.ivy_dir(key), ignore_errors=True)
+        return cached_paths
+
+    def _read_index(self) -> Dict[str, Dict]:
+        index_path = os.path.join(self.cache_dir, "index.json")
+        if not os.path.exists(index_path):
+            return {}
+        with open(index_path) as f:
+            return json.load(f)
+
+    def _write_index(self, index: Dict[str, Dict]):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        index_path = os.path.join(self.cache_dir, "index.json")
+        tmp_path = f"{index_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(index, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, index_path)
+
+
+def _ivy_jar_name(package: str) -> str:
+    """Name of the jar of a Maven package retrieved by Ivy for `spark-submit`, i.e. `group_artifact-version.jar`."""
+    group, artifact, version = package.strip().split(":")[:3]
+    return f"{group}_{artifact}-{version}.jar"
+
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
@@ -22,6 +22,7 @@ from requests import request
 from tqdm import tqdm
 
 from feathr.spark_provider._abc import SparkJobLauncher
+from feathr.spark_provider.feathr_job import FeathrJob
 from feathr.constants import *
 from feathr.version import get_maven_artifact_fullname
 
@@ -191,21 +192,83 @@ class _FeathrSynapseJobLauncher(SparkJobLauncher):
             reference_file_paths.append(
                 self._datalake.upload_file_to_workdir(file_path))
 
-        self.current_job_info = self._api.create_spark_batch_job(job_name=job_name,
-                                                                 main_file=main_jar_cloud_path,
-                                                                 class_name=main_class_name,
-                                                                 python_files=python_files,
-                                                                 arguments=arguments,
-                                                                 reference_files=reference_files_path,
-                                                                 tags=job_tags,
-                                                                 configuration=cfg)
+        job_info = self._api.create_spark_batch_job(job_name=job_name,
+                                                    main_file=main_jar_cloud_path,
+                                                    class_name=main_class_name,
+                                                    python_files=python_files,
+                                                    arguments=arguments,
+                                                    reference_files=reference_files_path,
+                                                    tags=job_tags,
+                                                    configuration=cfg)
         logger.info('See submitted job here: https://web.azuresynapse.net/en-us/monitoring/sparkapplication')
-        return self.current_job_info
+        self.current_job_info = job_info
+        self.latest_job = _SynapseJob(job_name, job_tags, self._api, job_info)
+        return self.latest_job
+
+    def wait_for_completion(self, timeout_seconds: Optional[float]) -> bool:
+        """
+        Returns true if the latest job completed successfully
+        """
+        return self.latest_job.wait_for_completion(timeout_seconds)
+
+    def get_status(self) -> str:
+        """Get current job status
+
+        Returns:
+            str: Status of the latest job
+        """
+        return self.latest_job.get_status()
+
+    def get_job_result_uri(self) -> str:
+        """Get job output uri
+
+        Returns:
+            str: `output_path` field in the job tags of the latest job
+        """
+        return self.latest_job.get_job_result_uri()
+
+    def get_job_tags(self) -> Dict[str, str]:
+        """Get job tags
+
+        Returns:
+            Dict[str, str]: a dict of job tags of the latest job
+        """
+        return self.latest_job.get_job_tags()
+
+
+class _SynapseJob(FeathrJob):
+    """Handle of a Spark batch job submitted to a Synapse spark pool.
+
+    Args:
+        api: runner of the Spark pool
+        job_info: the submitted Spark batch job
+    """
+    def __init__(self, job_name: str, job_tags: Dict[str, str], api: "_SynapseJobRunner", job_info):
+        super().__init__(job_name, job_tags)
+        self._api = api
+        self.job_info = job_info
+
+    def get_status(self) -> str:
+        """Get current job status
+
+        Returns:
+            str: Status of the current job
+        """
+        job = self._api.get_spark_batch_job(self.job_info.id)
+        assert job is not None
+        return job.state
+
+    def is_done(self) -> bool:
+        return self.get_status() in {LivyStates.SUCCESS.value, LivyStates.ERROR.value, LivyStates.DEAD.value,
+                                     LivyStates.KILLED.value}
+
+    def cancel(self):
+        self._api.cancel_spark_batch_job(self.job_info.id)
 
     def wait_for_completion(self, timeout_seconds: Optional[float]) -> bool:
         """
         Returns true if the job completed successfully
-        """          
+        """
         start_time = time.time()
         while (timeout_seconds is None) or (time.time() - start_time < timeout_seconds):
             status = self.get_status()
@@ -214,7 +277,7 @@ class _FeathrSynapseJobLauncher(SparkJobLauncher):
                 return True
             elif status in {LivyStates.ERROR.value, LivyStates.DEAD.value, LivyStates.KILLED.value}:
                 logger.error("Feathr job has failed.")
-                error_msg = self._api.get_driver_log(self.current_job_info.id).decode('utf-8')
+                error_msg = self._api.get_driver_log(self.job_info.id).decode('utf-8')
                 logger.error(error_msg)
                 logger.error("The size of the whole error log is: {}. The logs might be truncated in some cases (such as in Visual Studio Code) so only the top a few lines of the error message is displayed. If you cannot see the whole log, you may want to extend the setting for output size limit.", len(error_msg))
                 return False
@@ -223,33 +286,13 @@ class _FeathrSynapseJobLauncher(SparkJobLauncher):
         else:
             raise TimeoutError('Timeout waiting for job to complete')
 
-    def get_status(self) -> str:
-        """Get current job status
-
-        Returns:
-            str: Status of the current job
-        """
-        job = self._api.get_spark_batch_job(self.current_job_info.id)
-        assert job is not None
-        return job.state
-
-    def get_job_result_uri(self) -> str:
-        """Get job output uri
-
-        Returns:
-            str: `output_path` field in the job tags
-        """
-        tags = self._api.get_spark_batch_job(self.current_job_info.id).tags
-        # in case users call this API even when there's no tags available
-        return None if tags is None else tags[OUTPUT_PATH_TAG]
-
     def get_job_tags(self) -> Dict[str, str]:
         """Get job tags
 
         Returns:
             Dict[str, str]: a dict of job tags
         """
-        return self._api.get_spark_batch_job(self.current_job_info.id).tags
+        return self._api.get_spark_batch_job(self.job_info.id).tags
 
 class _SynapseJobRunner(object):
     """
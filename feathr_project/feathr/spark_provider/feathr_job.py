@@ -0,0 +1,113 @@
+from abc import ABC, abstractmethod
+from copy import deepcopy
+import time
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from loguru import logger
+
+from feathr.constants import OUTPUT_PATH_TAG
+
+
+class FeathrJob(ABC):
+    """Handle of a job submitted by a Spark launcher, e.g. a feature join or a materialization job.
+
+    Each submission gets its own handle, so a client can drive many jobs at once and wait for them with `wait_all` or
+    `as_completed`.
+
+    Attributes:
+        job_name: name of the job
+        job_tags: tags of the job, e.g. its output path
+    """
+    def __init__(self, job_name: str, job_tags: Dict[str, str] = None):
+        self.job_name = job_name
+        self.job_tags = deepcopy(job_tags)
+
+    @abstractmethod
+    def get_status(self) -> str:
+        """Get the current status of the job, as reported by the Spark platform."""
+        pass
+
+    @abstractmethod
+    def is_done(self) -> bool:
+        """Returns true if the job has finished, successfully or not."""
+        pass
+
+    @abstractmethod
+    def wait_for_completion(self, timeout_seconds: Optional[float] = None) -> bool:
+        """Returns true if the job completed successfully
+
+        Args:
+            timeout_seconds (Optional[float]): time out secs
+        """
+        pass
+
+    @abstractmethod
+    def cancel(self):
+        """Cancel the job if it's still running."""
+        pass
+
+    def get_job_tags(self) -> Dict[str, str]:
+        """Get job tags
+
+        Returns:
+            Dict[str, str]: a dict of job tags
+        """
+        return self.job_tags
+
+    def get_job_result_uri(self) -> str:
+        """Get job output uri
+
+        Returns:
+            str: `output_path` field in the job tags
+        """
+        tags = self.get_job_tags()
+        # in case users call this API even when there's no tags available
+        return tags.get(OUTPUT_PATH_TAG) if tags else None
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(job_name={self.job_name!r})"
+
+
+def as_completed(jobs: Iterable[FeathrJob], timeout_seconds: Optional[float] = None,
+                 poll_interval_seconds: float = 5) -> Iterator[FeathrJob]:
+    """Yield the jobs as they finish, successfully or not, like `concurrent.futures.as_completed`.
+
+    Args:
+        jobs: handles of the submitted jobs
+        timeout_seconds: raise TimeoutError if some jobs are still running after it
+        poll_interval_seconds: time between two polls of the status of the running jobs
+    """
+    pending = list(jobs)
+    start_time = time.time()
+    while pending:
+        still_pending = []
+        for job in pending:
+            if job.is_done():
+                yield job
+            else:
+                still_pending.append(job)
+        pending = still_pending
+        if not pending:
+            return
+        if timeout_seconds is not None and time.time() - start_time >= timeout_seconds:
+            raise TimeoutError(f"{len(pending)} Feathr jobs not completed after {timeout_seconds} seconds: {pending}")
+        time.sleep(poll_interval_seconds)
+
+
+def wait_all(jobs: Iterable[FeathrJob], timeout_seconds: Optional[float] = None,
+             poll_interval_seconds: float = 5) -> List[bool]:
+    """Wait for all the jobs to finish.
+
+    Args:
+        jobs: handles of the submitted jobs
+        timeout_seconds: raise TimeoutError if some jobs are still running after it
+        poll_interval_seconds: time between two polls of the status of the running jobs
+
+    Returns:
+        List[bool]: whether each job completed successfully, in the order of `jobs`
+    """
+    jobs = list(jobs)
+    for job in as_completed(jobs, timeout_seconds, poll_interval_seconds):
+        logger.info(f"Feathr job {job.job_name} finished.")
+    # The jobs are done, so this only collects their result and logs the errors
+    return [job.wait_for_completion(None) for job in jobs]
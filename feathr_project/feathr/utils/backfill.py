@@ -0,0 +1,147 @@
+from collections import deque
+from datetime import datetime
+import time
+from typing import Callable, List, Optional
+
+from loguru import logger
+
+from feathr.spark_provider.feathr_job import FeathrJob
+
+PENDING = "pending"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+class BackfillWindow:
+    """State of the materialization of a backfill cutoff time, see `BackfillScheduler`.
+
+    Attributes:
+        cutoff_time: backfill cutoff time of the window, i.e. the `endTime` of its materialization job
+        status: one of `PENDING`, `RUNNING`, `SUCCEEDED` or `FAILED`. A failed attempt which will be retried is
+            `PENDING`.
+        attempts: number of submitted jobs of the window
+        job: handle of the latest job of the window
+        error: error of the latest attempt, if it raised one
+    """
+    def __init__(self, cutoff_time: datetime):
+        self.cutoff_time = cutoff_time
+        self.status = PENDING
+        self.attempts = 0
+        self.job: Optional[FeathrJob] = None
+        self.error: Optional[Exception] = None
+
+    def __repr__(self) -> str:
+        return f"BackfillWindow(cutoff_time={self.cutoff_time}, status={self.status}, attempts={self.attempts})"
+
+
+class BackfillScheduler:
+    """Run the materialization jobs of backfill cutoff times with at most `max_concurrency` jobs at a time, retrying
+    the failed windows on their own.
+
+    Args:
+        submit_window: submit the materialization job of a cutoff time and return its handle
+        max_concurrency: maximum number of jobs running at the same time
+        max_retries: number of times a failed window is submitted again
+        poll_interval_seconds: time between two polls of the status of the running jobs. A window whose submission
+            failed is submitted again after it.
+        progress_callback: called with each window whose status changes, e.g. to report the progress elsewhere than
+            in the logs
+    """
+    def __init__(self,
+                 submit_window: Callable[[datetime], FeathrJob],
+                 max_concurrency: int = 1,
+                 max_retries: int = 0,
+                 poll_interval_seconds: float = 30,
+                 progress_callback: Optional[Callable[[BackfillWindow], None]] = None):
+        if max_concurrency < 1:
+            raise RuntimeError(f"max_concurrency must be at least 1, but got {max_concurrency}.")
+        if max_retries < 0:
+            raise RuntimeError(f"max_retries must not be negative, but got {max_retries}.")
+        self.submit_window = submit_window
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.poll_interval_seconds = poll_interval_seconds
+        self.progress_callback = progress_callback
+
+    def run(self, cutoff_times: List[datetime], timeout_seconds: Optional[float] = None) -> List[BackfillWindow]:
+        """Run the windows of `cutoff_times` until they all succeed or fail all their attempts.
+
+        Args:
+            cutoff_times: backfill cutoff times, submitted in this order
+            timeout_seconds: cancel the running jobs and raise TimeoutError if some windows are not done after it
+
+        Returns:
+            List[BackfillWindow]: the windows, in the order of `cutoff_times`
+        """
+        windows = [BackfillWindow(cutoff_time) for cutoff_time in cutoff_times]
+        pending = deque(windows)
+        running: List[BackfillWindow] = []
+        start_time = time.time()
+        while pending or running:
+            deferred = []
+            while pending and len(running) < self.max_concurrency:
+                window = pending.popleft()
+                if self._submit(window, windows):
+                    running.append(window)
+                elif window.status == PENDING:
+                    # Submitted again after the next poll, not right away
+                    deferred.append(window)
+            pending.extend(deferred)
+            still_running = []
+            for window in running:
+                if not window.job.is_done():
+                    still_running.append(window)
+                    continue
+                # The job is done, so this only gets its result and logs its errors
+                try:
+                    succeeded = window.job.wait_for_completion(None)
+                except Exception as e:
+                    window.error = e
+                    succeeded = False
+                self._finish_attempt(window, succeeded)
+                if window.status == PENDING:
+                    pending.append(window)
+                self._report(window, windows)
+            running = still_running
+            if not pending and not running:
+                break
+            if timeout_seconds is not None and time.time() - start_time >= timeout_seconds:
+                for window in running:
+                    window.job.cancel()
+                raise TimeoutError(f"Backfill not completed after {timeout_seconds} seconds, "
+                                   f"{len(running) + len(pending)} windows left: {list(running) + list(pending)}")
+            if deferred or not pending or len(running) >= self.max_concurrency:
+                time.sleep(self.poll_interval_seconds)
+        return windows
+
+    def _submit(self, window: BackfillWindow, windows: List[BackfillWindow]) -> bool:
+        window.attempts += 1
+        try:
+            window.job = self.submit_window(window.cutoff_time)
+        except Exception as e:
+            logger.error(f"Submitting the materialization job of backfill window {window.cutoff_time} failed: {e}")
+            window.error = e
+            self._finish_attempt(window, False)
+            self._report(window, windows)
+            return False
+        window.error = None
+        window.status = RUNNING
+        self._report(window, windows)
+        return True
+
+    def _finish_attempt(self, window: BackfillWindow, succeeded: bool):
+        if succeeded:
+            window.status = SUCCEEDED
+        elif window.attempts <= self.max_retries:
+            logger.warning(f"Backfill window {window.cutoff_time} failed, retry {window.attempts}/{self.max_retries}.")
+            window.status = PENDING
+        else:
+            window.status = FAILED
+
+    def _report(self, window: BackfillWindow, windows: List[BackfillWindow]):
+        done = sum(w.status in (SUCCEEDED, FAILED) for w in windows)
+        logger.info(f"Backfill window {window.cutoff_time} {window.status} after {window.attempts} attempt(s), "
+                    f"{done}/{len(windows)} windows done.")
+        if self.progress_callback is not None:
+            self.progress_callback(window)
@@ -6,7 +6,7 @@ from feathr.definition.feature import Feature
 from feathr.definition.feature_derivations import DerivedFeature
 
 from feathr.definition.transformation import ExpressionTransformation, WindowAggTransformation
-from functions import SUPPORTED_FUNCTIONS
+from feathr.utils.dsl.functions import SUPPORTED_FUNCTIONS
 
 class Token:
     def __init__(self, name, value):
@@ -10,6 +10,7 @@ from pyspark.sql import DataFrame, SparkSession
 from feathr.client import FeathrClient
 from feathr.constants import OUTPUT_FORMAT
 from feathr.utils.platform import is_databricks
+from feathr.spark_provider._localpandas_submission import _local_path
 from feathr.spark_provider._synapse_submission import _DataLakeFiler
 
 def get_result_pandas_df(
@@ -123,6 +124,10 @@ def get_result_df(
         local_cache_path = client.local_workspace_dir + client.feathr_spark_launcher.get_short_path(res_url)
         res_url = client.feathr_spark_launcher.get_full_path(res_url)
 
+    elif client.spark_runtime == "local_pandas":
+        # The result was written to a local path in process, so it's read in place
+        res_url = local_cache_path = _local_path(res_url)
+
     elif client.spark_runtime == "databricks":
         if not res_url.startswith("dbfs:"):
             logger.warning(
@@ -0,0 +1,127 @@
+from datetime import datetime
+import hashlib
+import inspect
+import json
+import os
+from typing import Dict, Iterable, List, Optional
+
+from loguru import logger
+
+from feathr.definition.anchor import FeatureAnchor
+from feathr.definition.feature_derivations import DerivedFeature
+from feathr.definition.sink import Sink
+
+
+class MaterializationLedger:
+    """Persistent record of the materialized backfill windows, so that materializing the same `BackfillTime` again
+    only runs the windows which are missing or stale.
+
+    A window is recorded per feature set (the name of the `MaterializationSettings`), sink and cutoff time once its
+    job succeeded, with a fingerprint of the definitions and source paths of the materialized features, see
+    `materialization_fingerprint`. A window is stale if the features changed since it was recorded.
+
+    The ledger is a JSON file on the local file system, e.g. next to the Feathr config.
+
+    Attributes:
+        path: path of the ledger file
+    """
+    def __init__(self, path: str):
+        self.path = path
+
+    def is_materialized(self, feature_set: str, sink_ids: Iterable[str], cutoff_time: datetime,
+                        fingerprint: str) -> bool:
+        """Returns true if the window is recorded for all the sinks with the same fingerprint."""
+        return not self.missing_windows(feature_set, sink_ids, [cutoff_time], fingerprint)
+
+    def missing_windows(self, feature_set: str, sink_ids: Iterable[str], cutoff_times: List[datetime],
+                        fingerprint: str) -> List[datetime]:
+        """Get the cutoff times of `cutoff_times` which are not recorded for all the sinks with the same fingerprint,
+        i.e. which are missing or stale."""
+        windows = self._read().get(feature_set, {})
+        sink_ids = list(sink_ids)
+        return [
+            cutoff_time for cutoff_time in cutoff_times
+            if any(windows.get(sink_id, {}).get(cutoff_time.isoformat(), {}).get("fingerprint") != fingerprint
+                   for sink_id in sink_ids)
+        ]
+
+    def record(self, feature_set: str, sink_ids: Iterable[str], cutoff_time: datetime, fingerprint: str):
+        """Record a window materialized into the sinks."""
+        ledger = self._read()
+        windows = ledger.setdefault(feature_set, {})
+        for sink_id in sink_ids:
+            windows.setdefault(sink_id, {})[cutoff_time.isoformat()] = {
+                "fingerprint": fingerprint,
+                "recorded_at": datetime.now().isoformat(),
+            }
+        self._write(ledger)
+
+    def invalidate(self, feature_set: str, cutoff_times: Optional[Iterable[datetime]] = None):
+        """Forget the windows of a feature set, all of them if `cutoff_times` is None, so they are materialized
+        again, e.g. after the source data was corrected."""
+        ledger = self._read()
+        if cutoff_times is None:
+            ledger.pop(feature_set, None)
+        else:
+            keys = {cutoff_time.isoformat() for cutoff_time in cutoff_times}
+            for windows in ledger.get(feature_set, {}).values():
+                for key in keys:
+                    windows.pop(key, None)
+        self._write(ledger)
+
+    def _read(self) -> Dict[str, Dict[str, Dict[str, Dict[str, str]]]]:
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path) as f:
+            return json.load(f)
+
+    def _write(self, ledger: Dict):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(ledger, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+
+def sink_id(sink: Sink) -> str:
+    """Identifier of a sink in the ledger, from its type and its config, e.g. the table or output path."""
+    return f"{type(sink).__name__}:{_digest(sink.to_feature_config())[:16]}"
+
+
+def materialization_fingerprint(anchors: List[FeatureAnchor], feature_names: List[str], resolution: str,
+                                derived_features: List[DerivedFeature] = ()) -> str:
+    """Fingerprint of the materialization of `feature_names`, from the definitions of their anchors, including the
+    source paths and preprocessing functions, the definitions of the derived ones, and the output resolution."""
+    parts = [resolution, ",".join(sorted(feature_names))]
+    requested = set(feature_names)
+    # Derived features depend on the definitions of their input features, which may be derived features too
+    derived = {feature.name: feature for feature in derived_features}
+    pending = [name for name in requested if name in derived]
+    while pending:
+        feature = derived[pending.pop()]
+        for input_feature in feature.input_features:
+            name = getattr(input_feature, "name", None)
+            if name is not None and name not in requested:
+                requested.add(name)
+                if name in derived:
+                    pending.append(name)
+    for name in sorted(requested.intersection(derived)):
+        parts.append(derived[name].to_feature_config())
+    for anchor in sorted(anchors, key=lambda anchor: anchor.name):
+        if not requested.intersection(feature.name for feature in anchor.features):
+            continue
+        parts.append(anchor.to_feature_config())
+        parts.append(anchor.source.to_feature_config())
+        preprocessing = getattr(anchor.source, "preprocessing", None)
+        if preprocessing is not None:
+            try:
+                parts.append(inspect.getsource(preprocessing))
+            except (OSError, TypeError):
+                logger.warning(f"Unable to get the code of the preprocessing function of source {anchor.source.name}, "
+                               f"its changes won't make the materialized windows stale.")
+    # Whitespaces of the rendered configs are not meaningful
+    return _digest("\n".join("".join(part.split()) for part in parts))
+
+
+def _digest(content: str) -> str:
+    return hashlib.sha256(content.encode()).hexdigest()
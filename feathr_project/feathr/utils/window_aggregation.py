@@ -0,0 +1,267 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from feathr.definition.anchor import FeatureAnchor
+
+# Aggregation functions of `WindowAggTransformation` supported by `aggregate_windows`
+WINDOW_AGG_FUNCS = ("SUM", "COUNT", "AVG", "MAX", "MIN", "LATEST", "MAX_POOLING", "MIN_POOLING", "AVG_POOLING")
+
+_POOLING_FUNCS = ("MAX_POOLING", "MIN_POOLING", "AVG_POOLING")
+
+# Missing timestamps in int64 nanoseconds
+_NAT = np.iinfo(np.int64).min
+
+
+def aggregate_windows(event_keys: Union[pd.Series, pd.DataFrame],
+                      event_timestamps: pd.Series,
+                      values: pd.Series,
+                      query_keys: Union[pd.Series, pd.DataFrame],
+                      query_timestamps: pd.Series,
+                      agg_func: str,
+                      window: timedelta,
+                      groups: Optional[pd.Series] = None,
+                      limit: Optional[int] = None) -> pd.Series:
+    """Sliding window aggregation of event values, like the `WindowAggTransformation` of the Spark job: each query
+    gets the aggregate of the values of the events of its key with a timestamp in `(timestamp - window, timestamp]`.
+
+    Events are sorted once by key and timestamp, and the window of every query is found with a binary search. SUM,
+    COUNT, AVG and AVG_POOLING are then answered with prefix sums, MAX, MIN and the other poolings with a sparse table,
+    and LATEST with the index of the last value, so n events and q queries take O((n + q) log n) whatever the window.
+
+    Args:
+        event_keys: key of each event, one column per key column.
+        event_timestamps: timestamp of each event.
+        values: value of each event, i.e. the evaluated `agg_expr`. Missing values are ignored, like in Spark.
+        query_keys: key of each query, with the same columns as `event_keys`.
+        query_timestamps: end of the window of each query, i.e. the observation timestamp minus the time delay.
+        agg_func: one of `WINDOW_AGG_FUNCS`.
+        window: length of the window.
+        groups (optional): group of each event, i.e. the evaluated `group_by`. Each query then gets a dict of group
+            -> aggregate, without the groups whose aggregate is missing.
+        limit (optional): with `groups`, only keep the `limit` groups with the largest aggregates.
+
+    Returns:
+        The aggregate of each query, aligned with `query_keys`, missing if its window has no value.
+    """
+    agg_func = agg_func.upper()
+    if agg_func not in WINDOW_AGG_FUNCS:
+        raise NotImplementedError(f"Aggregation {agg_func} is not supported, supported ones are "
+                                  f"{', '.join(WINDOW_AGG_FUNCS)}.")
+    event_keys, query_keys = _as_frame(event_keys), _as_frame(query_keys)
+    if len(event_keys.columns) != len(query_keys.columns):
+        raise RuntimeError(f"Events have {len(event_keys.columns)} key columns, but queries have "
+                           f"{len(query_keys.columns)}.")
+    event_codes, query_codes = _factorize_keys(event_keys, query_keys)
+    event_ts = _to_nanoseconds(event_timestamps)
+    query_ts = _to_nanoseconds(query_timestamps)
+    window_ns = int(window / timedelta(microseconds=1)) * 1000
+    if groups is None:
+        aggregates, found = _aggregate(event_codes, event_ts, _to_array(values, agg_func), query_codes, query_ts,
+                                       agg_func, window_ns)
+        return _to_series(aggregates, found, query_keys.index)
+
+    # Each (key, group) is aggregated on its own, and the queries of a key are expanded to all the groups of the key
+    group_codes, group_values = pd.factorize(pd.Series(groups).reset_index(drop=True))
+    has_group = (group_codes >= 0) & (event_codes >= 0)
+    pairs = pd.DataFrame({"key": event_codes[has_group], "group": group_codes[has_group]}).drop_duplicates()
+    pairs["sub_key"] = np.arange(len(pairs))
+    sub_keys = pd.DataFrame({"key": event_codes, "group": group_codes}).merge(pairs, how="left", on=["key", "group"])
+    expanded = pd.DataFrame({"query": np.arange(len(query_codes)), "key": query_codes}).merge(pairs, on="key")
+    aggregates, found = _aggregate(sub_keys["sub_key"].fillna(-1).to_numpy(dtype=np.int64), event_ts,
+                                   _to_array(values, agg_func), expanded["sub_key"].to_numpy(dtype=np.int64),
+                                   query_ts[expanded["query"].to_numpy()], agg_func, window_ns)
+    result: List[Optional[Dict[Any, Any]]] = [None] * len(query_codes)
+    expanded_queries, expanded_groups = expanded["query"].to_numpy(), expanded["group"].to_numpy()
+    for i in np.flatnonzero(found):
+        query = expanded_queries[i]
+        if result[query] is None:
+            result[query] = {}
+        result[query][group_values[expanded_groups[i]]] = aggregates[i]
+    if limit:
+        if agg_func in _POOLING_FUNCS:
+            raise NotImplementedError(f"limit is not supported with {agg_func}, whose aggregates are not ordered.")
+        result = [None if groups_ is None else dict(sorted(groups_.items(), key=lambda item: item[1],
+                                                           reverse=True)[:limit])
+                  for groups_ in result]
+    return pd.Series(result, index=query_keys.index, dtype=object)
+
+
+def compute_window_features(anchor: FeatureAnchor, cutoff_time: datetime,
+                            feature_names: Optional[List[str]] = None) -> pd.DataFrame:
+    """Compute the window aggregation features of an anchor for every key of its source, as of `cutoff_time`, i.e.
+    the values a materialization with `BackfillTime(end=cutoff_time)` writes to the online store. Useful to backfill
+    small local data, or to check materialized values against the ones read by `FeathrClient.get_online_features`.
+
+    The source should be a local `HdfsSource` with an event timestamp column, see the local_pandas runtime.
+
+    Returns:
+        One row per key, with one column per key column (named by its alias) and one per feature.
+    """
+    # The local pandas runtime uses this module, so it's imported late
+    from feathr.spark_provider._localpandas_submission import _PandasFeatureJoiner
+    return _PandasFeatureJoiner([anchor], []).window_features_at(anchor, cutoff_time, feature_names)
+
+
+def _aggregate(event_codes: np.ndarray, event_ts: np.ndarray, values: np.ndarray, query_codes: np.ndarray,
+               query_ts: np.ndarray, agg_func: str, window_ns: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Aggregate the values of the events of each query key in `(query_ts - window_ns, query_ts]`. Events and queries
+    with a negative key code or a missing timestamp don't match anything.
+
+    Returns:
+        (aggregate of each query, whether the aggregate is present). Missing aggregates are left undefined.
+    """
+    valid_events = (event_codes >= 0) & (event_ts != _NAT)
+    event_codes, event_ts, values = event_codes[valid_events], event_ts[valid_events], values[valid_events]
+    valid_queries = (query_codes >= 0) & (query_ts != _NAT)
+    num_events, num_queries = len(event_codes), len(query_codes)
+    # Events and window bounds are sorted together by (key, timestamp), with the events first on ties, so the number
+    # of events before a bound is its position in the sorted events, like a right sided binary search. The sort is
+    # stable, so the events of the same timestamp keep their order for LATEST.
+    codes = np.concatenate([event_codes, query_codes, query_codes])
+    timestamps = np.concatenate([event_ts, query_ts, query_ts - window_ns])
+    is_bound = np.repeat([False, True], [num_events, 2 * num_queries])
+    order = np.lexsort((is_bound, timestamps, codes))
+    sorted_bounds = is_bound[order]
+    positions = np.empty(2 * num_queries, dtype=np.int64)
+    positions[order[sorted_bounds] - num_events] = np.cumsum(~sorted_bounds)[sorted_bounds]
+    values = values[order[~sorted_bounds]]
+    hi, lo = positions[:num_queries], positions[num_queries:]
+    hi = np.where(valid_queries, hi, lo)
+
+    present = ~_is_missing(values)
+    counts = np.concatenate([[0], np.cumsum(present)])
+    num_values = counts[hi] - counts[lo]
+    found = num_values > 0
+    if agg_func == "COUNT":
+        # Like Spark, a window with events but only missing values counts 0
+        return num_values, hi > lo
+    aggregates = np.empty((num_queries,) + values.shape[1:], dtype=values.dtype if agg_func != "AVG" else np.float64)
+    if agg_func in ("SUM", "AVG", "AVG_POOLING"):
+        sums = _prefix_sums(np.where(_expand(present, values), values, 0))
+        totals = sums[hi[found]] - sums[lo[found]]
+        if agg_func != "SUM":
+            totals = totals / _expand(num_values[found], totals)
+        aggregates[found] = totals
+    elif agg_func in ("MAX", "MIN", "MAX_POOLING", "MIN_POOLING"):
+        is_max = agg_func.startswith("MAX")
+        filled = np.where(_expand(present, values), values, _identity(values.dtype, is_max))
+        aggregates[found] = _range_reduce(filled, lo[found], hi[found], np.maximum if is_max else np.minimum)
+    else:
+        # LATEST: the last present value of the window
+        last_present = np.maximum.accumulate(np.where(present, np.arange(len(values)), -1))
+        aggregates[found] = values[last_present[hi[found] - 1]]
+    return aggregates, found
+
+
+def _to_series(aggregates: np.ndarray, found: np.ndarray, index: pd.Index) -> pd.Series:
+    """Series of the aggregates, nullable for the integers, with NaN for the missing floats and None for the missing
+    objects and vectors."""
+    if aggregates.ndim == 1 and aggregates.dtype.kind == "i":
+        return pd.Series(pd.arrays.IntegerArray(aggregates.astype(np.int64), ~found), index=index)
+    if aggregates.ndim == 1 and aggregates.dtype.kind == "f":
+        return pd.Series(np.where(found, aggregates, np.nan), index=index)
+    result = np.full(len(found), None, dtype=object)
+    for i in np.flatnonzero(found):
+        result[i] = aggregates[i]
+    return pd.Series(result, index=index, dtype=object)
+
+
+def _range_reduce(values: np.ndarray, lo: np.ndarray, hi: np.ndarray, ufunc) -> np.ndarray:
+    """Reduce `values[lo:hi]` with an idempotent ufunc (max or min) for every non-empty range, with a sparse table:
+    level k holds the reduction of the 2^k values starting at each position, so a range is covered by 2 of them."""
+    if len(lo) == 0:
+        return values[:0]
+    levels = [values]
+    width = 1
+    max_width = int((hi - lo).max())
+    while width * 2 <= max_width:
+        levels.append(ufunc(levels[-1][:-width], levels[-1][width:]))
+        width *= 2
+    level = np.floor(np.log2(hi - lo)).astype(np.int64)
+    result = np.empty((len(lo),) + values.shape[1:], dtype=values.dtype)
+    for k in np.unique(level):
+        selected = level == k
+        result[selected] = ufunc(levels[k][lo[selected]], levels[k][hi[selected] - (1 << k)])
+    return result
+
+
+def _as_frame(keys: Union[pd.Series, pd.DataFrame]) -> pd.DataFrame:
+    return keys.to_frame() if isinstance(keys, pd.Series) else keys
+
+
+def _factorize_keys(event_keys: pd.DataFrame, query_keys: pd.DataFrame):
+    """Give the same int code to equal keys of events and queries, and -1 to keys with a missing column."""
+    keys = pd.concat([event_keys.set_axis(range(len(event_keys.columns)), axis=1),
+                      query_keys.set_axis(range(len(query_keys.columns)), axis=1)], ignore_index=True)
+    codes = np.full(len(keys), -1, dtype=np.int64)
+    complete = keys.notna().all(axis=1).to_numpy()
+    if complete.any():
+        codes[complete] = keys[complete].groupby(list(keys.columns), sort=False).ngroup().to_numpy()
+    return codes[:len(event_keys)], codes[len(event_keys):]
+
+
+def _to_nanoseconds(timestamps: pd.Series) -> np.ndarray:
+    """Timestamps as int64 nanoseconds, missing ones as `_NAT`."""
+    return pd.to_datetime(pd.Series(timestamps)).to_numpy(dtype="datetime64[ns]").astype(np.int64)
+
+
+def _to_array(values: pd.Series, agg_func: str) -> np.ndarray:
+    """The values as a numpy array: int64 or float64 for the numeric aggregations (with NaN for the missing floats),
+    2D float64 for the poolings, and objects for LATEST."""
+    values = pd.Series(values).reset_index(drop=True)
+    if agg_func == "LATEST":
+        return values.astype(object).where(values.notna(), None).to_numpy()
+    if agg_func == "COUNT":
+        return values.notna().to_numpy()
+    if agg_func in _POOLING_FUNCS:
+        vectors = [None if _is_missing_scalar(value) else np.asarray(value, dtype=np.float64) for value in values]
+        sizes = {len(vector) for vector in vectors if vector is not None}
+        if len(sizes) > 1:
+            raise RuntimeError(f"{agg_func} needs vectors of the same size, but got sizes {sorted(sizes)}.")
+        size = sizes.pop() if sizes else 0
+        matrix = np.full((len(vectors), size), np.nan)
+        for i, vector in enumerate(vectors):
+            if vector is not None:
+                matrix[i] = vector
+        return matrix
+    if pd.api.types.is_bool_dtype(values):
+        values = values.astype("Int64")
+    if not pd.api.types.is_numeric_dtype(values):
+        raise RuntimeError(f"{agg_func} needs numeric values, but got {values.dtype}.")
+    if pd.api.types.is_integer_dtype(values) and not values.isna().any():
+        return values.to_numpy(dtype=np.int64)
+    return values.to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def _is_missing(values: np.ndarray) -> np.ndarray:
+    if values.dtype == object:
+        return np.fromiter((_is_missing_scalar(value) for value in values), dtype=bool, count=len(values))
+    if values.dtype == bool:
+        # COUNT values are already the presence of the values
+        return ~values
+    missing = np.isnan(values) if values.dtype.kind == "f" else np.zeros(values.shape, dtype=bool)
+    # A vector is missing if it's all missing, see `_to_array`
+    return missing.all(axis=tuple(range(1, values.ndim))) if values.ndim > 1 else missing
+
+
+def _is_missing_scalar(value: Any) -> bool:
+    return value is None or (np.isscalar(value) and pd.isna(value))
+
+
+def _expand(mask: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Broadcast a per row array over the vector dimension of 2D values."""
+    return mask.reshape(mask.shape + (1,) * (values.ndim - 1))
+
+
+def _prefix_sums(values: np.ndarray) -> np.ndarray:
+    return np.concatenate([np.zeros((1,) + values.shape[1:], dtype=values.dtype), np.cumsum(values, axis=0)])
+
+
+def _identity(dtype: np.dtype, is_max: bool):
+    """Value that never wins a max (or a min) of `dtype`, for the missing values."""
+    if dtype.kind == "f":
+        return -np.inf if is_max else np.inf
+    return np.iinfo(dtype).min if is_max else np.iinfo(dtype).max
@@ -1,4 +1,5 @@
 import click
+import json
 from py4j.java_gateway import JavaGateway
 import pathlib
 import os
@@ -237,3 +238,101 @@ def test(features):
 
     click.echo('\nFeature computation completed.')
     click.echo(stack_entry_point_result)
+
+
+@cli.command()
+@click.argument('serving_config', default='feature_serving.yaml', type=click.Path(exists=True))
+@click.option('--config', 'config_path', default='feathr_config.yaml', help='Feathr config path. The online store is read from it.')
+@click.option('--host', default='0.0.0.0', help='Host to listen on.')
+@click.option('--port', default=8000, type=int, help='Port to listen on.')
+@click.option('--max-batch-size', default=1000, type=int, help='Maximum number of distinct keys in one Redis round trip.')
+@click.option('--max-wait-ms', default=2.0, type=float, help='Maximum time a request waits for others to join its batch, in milliseconds.')
+@click.option('--in-memory', 'in_memory_data', default=None, type=click.Path(exists=True),
+              help='Serve from an in-memory stand-in of Redis instead, seeded with this JSON file of '
+                   '{"<feature_table>:<key>": {"<feature_name>": "<base64 encoded FeatureValue>"}}.')
+def serve(serving_config, config_path, host, port, max_batch_size, max_wait_ms, in_memory_data):
+    """
+    Starts a local HTTP feature server for the online features listed in the serving config (a YAML file with a
+    'feature_tables' section mapping each feature table to its feature names). Concurrent requests are coalesced into
+    shared Redis round trips.
+    """
+    from feathr.online_store.server import OnlineFeatureServer, load_feature_tables
+
+    feature_tables = load_feature_tables(serving_config)
+    client = FeathrClient(config_path=config_path)
+    if in_memory_data:
+        _use_in_memory_online_store(client, in_memory_data)
+    elif not hasattr(client, 'redis_client'):
+        raise click.UsageError('Redis is not configured as online store. Set online_store.redis in the Feathr config, '
+                               'or use --in-memory.')
+    click.echo(click.style(f'Serving online features on {host}:{port}.', fg='green'))
+    OnlineFeatureServer(client, feature_tables, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms).run(host, port)
+
+
+@cli.command()
+@click.option('--config', 'config_path', default='feathr_config.yaml', help='Feathr config path. The online store is read from it.')
+@click.option('--in-memory', is_flag=True, help='Benchmark an in-memory Redis stand-in instead of the configured online store.')
+@click.option('--num-keys', default=10000, type=int, help='Number of keys of each synthetic feature table.')
+@click.option('--concurrency', 'concurrency_levels', default=[1, 8], type=int, multiple=True, help='Number of concurrent requests. Can be repeated.')
+@click.option('--batch-size', 'batch_sizes', default=[1, 100], type=int, multiple=True, help='Number of keys per request. Can be repeated.')
+@click.option('--num-requests', default=1000, type=int, help='Number of measured requests per case.')
+@click.option('--compare-encodings', is_flag=True, help='Also compare the Redis memory and decode time of the base64 and raw value encodings.')
+@click.option('--output', default=None, type=click.Path(), help='Save the results as JSON to this path, e.g. to compare releases.')
+@click.option('--keep-tables', is_flag=True, help='Keep the synthetic feature tables in the online store after the benchmark. They are deleted by default.')
+def benchmark(config_path, in_memory, num_keys, concurrency_levels, batch_sizes, num_requests, compare_encodings, output,
+              keep_tables):
+    """
+    Benchmarks the online read path. Synthetic feature tables covering scalar, dense array and sparse array features
+    are written to the online store, then read at each concurrency level and batch size. Reports throughput,
+    p50/p95/p99 latency and client CPU per decoded value, plus the cost of key construction and decoding alone.
+    The synthetic tables are deleted afterwards unless --keep-tables is set.
+    """
+    from feathr.online_store.benchmark import (benchmark_decode, benchmark_value_encodings, drop_benchmark_tables,
+                                               format_benchmark_results, populate_benchmark_tables, run_online_benchmark)
+
+    client = FeathrClient(config_path=config_path)
+    if in_memory:
+        _use_in_memory_online_store(client)
+    elif not hasattr(client, 'redis_client'):
+        raise click.UsageError('Redis is not configured as online store. Set online_store.redis in the Feathr config, '
+                               'or use --in-memory.')
+    try:
+        feature_tables = populate_benchmark_tables(client, num_keys=num_keys)
+        results = run_online_benchmark(client, feature_tables, num_keys, concurrency_levels=concurrency_levels,
+                                       batch_sizes=batch_sizes, num_requests=num_requests)
+        decode = benchmark_decode(client, feature_tables, num_keys)
+        click.echo(format_benchmark_results(results))
+        for feature_table, timings in decode.items():
+            click.echo(f'{feature_table}: {timings["key_ns"]:.0f} ns per key, {timings["decode_ns_per_value"]:.0f} ns per decoded value')
+        encodings = benchmark_value_encodings(client, num_keys=num_keys) if compare_encodings else None
+        for feature_table, by_encoding in (encodings or {}).items():
+            for value_encoding, stats in by_encoding.items():
+                click.echo(f'{feature_table} ({value_encoding}): {stats["memory_bytes"] / 1024:.0f} KB, '
+                           f'{stats["value_bytes"]:.1f} B per value, {stats["decode_ns_per_value"]:.0f} ns per decoded value, '
+                           f'{stats["columnar_decode_ns_per_value"]:.0f} ns per columnar decoded value')
+    finally:
+        if not keep_tables:
+            drop_benchmark_tables(client)
+    if output:
+        with open(output, 'w') as f:
+            json.dump({'cases': [result.to_dict() for result in results], 'decode': decode, 'encodings': encodings},
+                      f, indent=2)
+        click.echo(click.style(f'Results saved to {output}.', fg='green'))
+
+
+def _use_in_memory_online_store(client: FeathrClient, data_path: str = None):
+    """Replace the online store of the client with an in-memory Redis, seeded with the given JSON file if it's set."""
+    try:
+        import fakeredis
+    except ImportError:
+        raise click.UsageError('fakeredis is required to use an in-memory online store. Install the package using "pip install fakeredis".')
+    data = {}
+    if data_path:
+        with open(data_path) as f:
+            data = json.load(f)
+    server = fakeredis.FakeServer()
+    client.redis_client = fakeredis.FakeRedis(server=server)
+    client.async_redis_client = fakeredis.FakeAsyncRedis(server=server)
+    client.redis_cluster_enabled = False
+    for redis_key, features in data.items():
+        client.redis_client.hset(redis_key, mapping=features)
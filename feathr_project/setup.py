@@ -33,6 +33,8 @@ extras_require=dict(
         "pytest-cov",
         "pytest-xdist",
         "pytest-mock>=3.8.1",
+        "fakeredis>=2.10.0",  # in-memory Redis for online store unit tests
+        "scipy",              # sparse online features in columnar results
     ],
     notebook=[
         "azure-cli==2.37.0",
@@ -65,7 +67,7 @@ setup(
         "py4j<=0.10.9.7",
         "loguru<=0.6.0",
         "pandas",
-        "redis<=4.4.0",
+        "redis>=4.3.0,<=4.4.0",  # redis.asyncio.cluster is used by the async online APIs
         "requests<=2.28.1",
         "tqdm<=4.64.1",
         "pyapacheatlas<=0.14.0",
@@ -0,0 +1,68 @@
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import fakeredis
+
+from feathr.online_store.analyzer import OnlineStoreAnalyzer, feature_table_pattern, scan_feature_table_keys
+
+
+def _populate() -> fakeredis.FakeRedis:
+    redis_client = fakeredis.FakeRedis()
+    for i in range(30):
+        redis_client.hset(f"users:{i}", mapping={"f_small": "x", "f_large": "y" * (100 + i)})
+    redis_client.expire("users:0", 7200)
+    redis_client.hset("users_v2:1", mapping={"f_small": "x"})
+    return redis_client
+
+
+def test__feature_table_pattern():
+    assert feature_table_pattern("users") == "users:*"
+    assert feature_table_pattern("a*b[1]") == "a\\*b\\[1\\]:*"
+
+
+def test__scan_only_matches_the_feature_table():
+    keys = [key for page in scan_feature_table_keys(_populate(), "users", count=7) for key in page]
+    assert len(keys) == 30 and b"users_v2:1" not in keys
+
+
+def test__analyze():
+    report = OnlineStoreAnalyzer(_populate(), sample_size=10).analyze(["users", "users_v2"]).to_dict()
+    users, users_v2 = report["tables"]
+    assert (users["feature_table"], users["num_keys"], users["num_sampled"]) == ("users", 30, 10)
+    assert users_v2["num_keys"] == 1
+    # fakeredis doesn't support MEMORY USAGE
+    assert users["memory_estimated"]
+    assert users["mean_fields_per_key"] == 2
+    large, small = users["features"]
+    assert large["feature_name"] == "f_large" and small["feature_name"] == "f_small"
+    assert 100 <= large["p50_bytes"] < 130 and large["size_histogram"]["<=256B"] == 10
+    assert large["estimated_total_bytes"] == large["mean_bytes"] * 30
+    assert users["ttl"]["no_ttl"] + users["ttl"]["<1d"] == 10
+    assert report["total_estimated_memory_bytes"] == users["estimated_memory_bytes"] + users_v2["estimated_memory_bytes"]
+
+
+def test__analyze_cluster_shards():
+    # The cluster client sees all the keys, and each primary node a part of them
+    cluster_client = _populate()
+    shards = [fakeredis.FakeRedis(), fakeredis.FakeRedis()]
+    for key in cluster_client.keys("users:*"):
+        shards[int(key.split(b":")[1]) % 3 == 0].hset(key, "f", "v")
+    cluster_client.get_primaries = lambda: [0, 1]
+    cluster_client.get_redis_connection = lambda node: shards[node]
+
+    with ThreadPoolExecutor(2) as executor:
+        report = OnlineStoreAnalyzer(cluster_client, cluster_enabled=True, executor=executor,
+                                     sample_size=10).analyze(["users"])
+    assert (report.tables["users"].num_keys, report.tables["users"].num_sampled) == (30, 10)
+
+
+def test__merge_samples_is_uniform():
+    analyzer = OnlineStoreAnalyzer(fakeredis.FakeRedis(), sample_size=2)
+    counts = Counter()
+    for seed in range(2000):
+        analyzer.seed = seed
+        num_keys, sample = analyzer._merge_samples([(8, [b"a", b"b"]), (2, [b"c", b"d"]), (0, [])])
+        assert num_keys == 10 and len(set(sample)) == 2
+        counts.update(key in (b"c", b"d") for key in sample)
+    # 2 of the 10 keys are on the second node
+    assert abs(counts[True] / (counts[True] + counts[False]) - 0.2) < 0.03
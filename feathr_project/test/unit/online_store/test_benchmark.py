@@ -0,0 +1,38 @@
+import fakeredis
+
+from feathr import FeathrClient
+from feathr.online_store.benchmark import (BENCHMARK_TABLES, benchmark_decode, benchmark_value_encodings,
+                                           drop_benchmark_tables, format_benchmark_results, populate_benchmark_tables,
+                                           run_online_benchmark)
+
+
+def test__online_benchmark(feathr_client: FeathrClient):
+    feathr_client.redis_client = fakeredis.FakeRedis()
+    feature_tables = populate_benchmark_tables(feathr_client, num_keys=20, vector_size=4, sparse_size=2)
+    assert list(feature_tables) == list(BENCHMARK_TABLES)
+    assert all(value is not None for value in
+               feathr_client.get_online_features("feathr_bench_sparse", "3", feature_tables["feathr_bench_sparse"]))
+
+    results = run_online_benchmark(feathr_client, feature_tables, num_keys=20, concurrency_levels=[1, 2],
+                                   batch_sizes=[1, 5], num_requests=10, warmup_requests=1)
+    assert len(results) == len(feature_tables) * 4
+    summary = results[-1].to_dict()
+    assert summary["num_requests"] == 10 and summary["p50_ms"] <= summary["p99_ms"]
+    assert len(format_benchmark_results(results).splitlines()) == len(results) + 1
+
+    decode = benchmark_decode(feathr_client, feature_tables, num_keys=20, num_rows=10)
+    assert set(decode["feathr_bench_dense"]) == {"key_ns", "decode_ns_per_value"}
+
+
+def test__benchmark_value_encodings(feathr_client: FeathrClient):
+    feathr_client.redis_client = fakeredis.FakeRedis()
+    results = benchmark_value_encodings(feathr_client, num_keys=20, num_rows=10)
+    assert set(results) == set(BENCHMARK_TABLES)
+    for by_encoding in results.values():
+        assert by_encoding["raw"]["value_bytes"] < by_encoding["base64"]["value_bytes"]
+        assert by_encoding["raw"]["memory_bytes"] < by_encoding["base64"]["memory_bytes"]
+    assert feathr_client.get_online_features("feathr_bench_dense_raw", "3", ["f_int_vector"]) == \
+           feathr_client.get_online_features("feathr_bench_dense", "3", ["f_int_vector"])
+
+    drop_benchmark_tables(feathr_client)
+    assert feathr_client.redis_client.dbsize() == 0
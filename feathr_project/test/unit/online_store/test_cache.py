@@ -0,0 +1,130 @@
+import time
+from unittest.mock import MagicMock
+
+import pytest
+from redis.cluster import RedisCluster
+
+from feathr.online_store.cache import OnlineFeatureCache
+
+
+def test__online_feature_cache__hit_and_miss():
+    cache = OnlineFeatureCache()
+    cache.put_many("table", [("table:1", "f1", b"v1"), ("table:1", "f2", None)])
+
+    values, misses = cache.get_many(["table:1", "table:2"], ["f1", "f2", "f3"])
+
+    assert values == [[b"v1", None, None], [None, None, None]]
+    # Missing value of f2 is cached, f3 and key 2 are not
+    assert misses == [(0, [2]), (1, [0, 1, 2])]
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["misses"] == 4
+
+
+def test__online_feature_cache__lru_eviction():
+    cache = OnlineFeatureCache(max_size=2)
+    cache.put_many("table", [("table:1", "f", b"1"), ("table:2", "f", b"2")])
+    # Touch key 1 so key 2 becomes the least recently used
+    cache.get_many(["table:1"], ["f"])
+    cache.put_many("table", [("table:3", "f", b"3")])
+
+    _, misses = cache.get_many(["table:1", "table:2", "table:3"], ["f"])
+
+    assert misses == [(1, [0])]
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["size"] == 2
+
+
+def test__online_feature_cache__ttl(mocker):
+    now = 1000.0
+    mocker.patch("feathr.online_store.cache.time.monotonic", side_effect=lambda: now)
+    cache = OnlineFeatureCache(ttl_sec=10, table_ttl_sec={"hot": 1}, negative_ttl_sec=0)
+    cache.put_many("table", [("table:1", "f", b"1"), ("table:2", "f", None)])
+    cache.put_many("hot", [("hot:1", "f", b"1")])
+
+    now += 5
+    _, misses = cache.get_many(["table:1", "table:2", "hot:1"], ["f"])
+
+    # Negative caching is disabled and the TTL of the `hot` table has passed
+    assert misses == [(1, [0]), (2, [0])]
+    assert cache.stats()["expirations"] == 1
+
+
+def test__online_feature_cache__invalidate():
+    cache = OnlineFeatureCache()
+    cache.put_many("table", [("table:1", "f1", b"1"), ("table:1", "f2", b"2"), ("other:1", "f1", b"3")])
+
+    cache.invalidate("table:1", "f2")
+    assert cache.get_many(["table:1"], ["f1", "f2"])[1] == [(0, [1])]
+
+    cache.invalidate_table("table")
+    assert cache.get_many(["table:1", "other:1"], ["f1"])[1] == [(0, [0])]
+    assert cache.stats()["invalidations"] == 2
+
+
+def test__online_feature_cache__stale_put_dropped():
+    cache = OnlineFeatureCache(max_size=2)
+    generation = cache.generation()
+    # `table:1` is written while its old value is being fetched
+    cache.invalidate("table:1")
+    cache.put_many("table", [("table:1", "f", b"old"), ("table:2", "f", b"2")], generation)
+    assert cache.get_many(["table:1", "table:2"], ["f"])[1] == [(0, [0])]
+
+    # Puts older than the forgotten invalidations are dropped altogether
+    generation = cache.generation()
+    for key in ["table:3", "table:4", "table:5"]:
+        cache.invalidate(key)
+    cache.put_many("table", [("table:6", "f", b"6")], generation)
+    assert cache.get_many(["table:6"], ["f"])[1] == [(0, [0])]
+
+    generation = cache.generation()
+    cache.invalidate_table("other")
+    cache.put_many("table", [("table:6", "f", b"6")], generation)
+    assert cache.get_many(["table:6"], ["f"])[1] == [(0, [0])]
+
+    cache.put_many("table", [("table:6", "f", b"6")], cache.generation())
+    assert cache.get_many(["table:6"], ["f"])[1] == []
+
+
+def test__online_feature_cache__keyspace_invalidation():
+    redis_client = MagicMock()
+    pubsub = redis_client.pubsub.return_value
+    cache = OnlineFeatureCache()
+    cache.put_many("table", [("table:1", "f", b"1")])
+
+    cache.start_keyspace_invalidation(redis_client, feature_tables=["table"])
+    handlers = pubsub.psubscribe.call_args.kwargs
+    assert list(handlers) == ["__keyspace@0__:table:*"]
+
+    # Simulate a notification for an HSET on `table:1`
+    handlers["__keyspace@0__:table:*"]({"channel": b"__keyspace@0__:table:1", "data": b"hset"})
+    assert cache.stats()["size"] == 0
+
+    cache.stop_keyspace_invalidation()
+    pubsub.run_in_thread.return_value.stop.assert_called_once()
+
+
+def test__online_feature_cache__keyspace_invalidation_in_cluster_mode():
+    redis_client = MagicMock(spec=RedisCluster)
+    primaries = [MagicMock(), MagicMock()]
+    redis_client.get_primaries.return_value = ["node1", "node2"]
+    redis_client.get_redis_connection.side_effect = lambda node: primaries[["node1", "node2"].index(node)]
+    cache = OnlineFeatureCache()
+    cache.put_many("table", [("table:1", "f", b"1")])
+
+    cache.start_keyspace_invalidation(redis_client, configure_server=True)
+    # Each primary only publishes the notifications of its own keys
+    for primary in primaries:
+        primary.config_set.assert_called_once_with("notify-keyspace-events", "Khgxe")
+        assert list(primary.pubsub.return_value.psubscribe.call_args.kwargs) == ["__keyspace@0__:*"]
+    handler = primaries[1].pubsub.return_value.psubscribe.call_args.kwargs["__keyspace@0__:*"]
+    handler({"channel": b"__keyspace@0__:table:1", "data": b"hset"})
+    assert cache.stats()["size"] == 0
+
+    cache.stop_keyspace_invalidation()
+    for primary in primaries:
+        primary.pubsub.return_value.run_in_thread.return_value.stop.assert_called_once()
+
+
+def test__online_feature_cache__invalid_size():
+    with pytest.raises(RuntimeError):
+        OnlineFeatureCache(max_size=0)
@@ -0,0 +1,90 @@
+import base64
+
+import numpy as np
+import pyarrow as pa
+import pytest
+
+from feathr.online_store.columnar import OnlineFeatureColumns, decode_columns
+from feathr.protobuf.featureValue_pb2 import FeatureValue
+
+
+def _encode(**kwargs) -> bytes:
+    feature_value = FeatureValue()
+    for field, value in kwargs.items():
+        if isinstance(value, tuple):
+            # sparse array: (indices, values)
+            sparse_array = getattr(feature_value, field)
+            sparse_array.index_integers.extend(value[0])
+            values_field = [f.name for f in sparse_array.DESCRIPTOR.fields if f.name != "index_integers"][0]
+            getattr(sparse_array, values_field).extend(value[1])
+        elif isinstance(value, list):
+            dense_array = getattr(feature_value, field)
+            getattr(dense_array, dense_array.DESCRIPTOR.fields[0].name).extend(value)
+        else:
+            setattr(feature_value, field, value)
+    return base64.b64encode(feature_value.SerializeToString())
+
+
+@pytest.fixture(scope="module")
+def columns() -> OnlineFeatureColumns:
+    feature_names = ["f_double", "f_int", "f_str", "f_embedding", "f_sparse", "f_missing"]
+    pipeline_result = [
+        [_encode(double_value=1.5), _encode(int_value=3), _encode(string_value="a"),
+         _encode(float_array=[1.0, 2.0]), _encode(sparse_double_array=([0, 3], [0.5, 1.5])), None],
+        [None, None, None, None, None, None],
+        [_encode(double_value=2.5), _encode(int_value=4), _encode(string_value="b"),
+         _encode(float_array=[3.0, 4.0]), _encode(sparse_double_array=([1], [2.0])), None],
+    ]
+    return decode_columns(["k1", "k2", "k3"], pipeline_result, feature_names,
+                          default_values={"f_int": -1, "f_sparse": 0.0})
+
+
+def test__decode_columns__scalar(columns: OnlineFeatureColumns):
+    assert columns["f_double"].dtype == np.float64
+    np.testing.assert_array_equal(columns["f_double"], [1.5, np.nan, 2.5])
+    np.testing.assert_array_equal(columns.null_masks["f_double"], [False, True, False])
+    # Missing value is filled with the default value
+    np.testing.assert_array_equal(columns["f_int"], [3, -1, 4])
+    assert columns["f_int"].dtype == np.int32
+    assert list(columns["f_str"]) == ["a", None, "b"]
+    assert list(columns["f_missing"]) == [None, None, None]
+
+
+def test__decode_columns__dense_array(columns: OnlineFeatureColumns):
+    embedding = columns["f_embedding"]
+    assert embedding.shape == (3, 2)
+    assert embedding.dtype == np.float32
+    assert embedding.flags["C_CONTIGUOUS"]
+    np.testing.assert_array_equal(embedding[[0, 2]], [[1.0, 2.0], [3.0, 4.0]])
+    assert np.isnan(embedding[1]).all()
+
+
+def test__decode_columns__ragged_dense_array():
+    pipeline_result = [[_encode(double_array=[1.0, 2.0])], [_encode(double_array=[3.0])]]
+    column = decode_columns(["k1", "k2"], pipeline_result, ["f"])["f"]
+    assert column.dtype == object
+    np.testing.assert_array_equal(column[0], [1.0, 2.0])
+    np.testing.assert_array_equal(column[1], [3.0])
+
+
+def test__decode_columns__sparse_array(columns: OnlineFeatureColumns):
+    sparse = columns["f_sparse"]
+    assert sparse.shape == (3, 4)
+    np.testing.assert_array_equal(sparse.toarray(), [[0.5, 0, 0, 1.5], [0, 0, 0, 0], [0, 2.0, 0, 0]])
+
+
+def test__online_feature_columns__to_arrow(columns: OnlineFeatureColumns):
+    table = columns.to_arrow()
+    assert table.column_names == ["key", "f_double", "f_int", "f_str", "f_embedding", "f_sparse", "f_missing"]
+    assert table.column("f_double").to_pylist() == [1.5, None, 2.5]
+    assert table.column("f_int").to_pylist() == [3, -1, 4]
+    # The default value doesn't apply to sparse matrices, so their missing rows stay null
+    assert "f_sparse" not in columns.default_values
+    assert table.column("f_sparse").to_pylist()[1] is None
+    assert table.column("f_embedding").type == pa.list_(pa.float32(), 2)
+    assert table.column("f_embedding").to_pylist() == [[1.0, 2.0], None, [3.0, 4.0]]
+    assert table.column("f_sparse").to_pylist() == [
+        {"indices": [0, 3], "values": [0.5, 1.5]},
+        None,
+        {"indices": [1], "values": [2.0]},
+    ]
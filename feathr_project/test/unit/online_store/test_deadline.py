@@ -0,0 +1,84 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import time
+
+import pytest
+
+from feathr.online_store.deadline import (MISSED_DEADLINE, SERVED_BY_PRIMARY, SERVED_BY_REPLICA, HedgingPolicy,
+                                          arun_with_deadline, run_with_deadline)
+
+
+def _read(value, sleep_sec=0.0, error=None):
+    def _run():
+        time.sleep(sleep_sec)
+        if error is not None:
+            raise error
+        return value
+    return _run
+
+
+def _aread(value, sleep_sec=0.0, error=None):
+    async def _run():
+        await asyncio.sleep(sleep_sec)
+        if error is not None:
+            raise error
+        return value
+    return _run
+
+
+@pytest.fixture(scope="module")
+def executor():
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        yield executor
+
+
+def test__hedging_policy__delay():
+    policy = HedgingPolicy(None, percentile=50, min_delay_ms=2, initial_delay_ms=5, min_samples=3)
+    assert policy.delay_sec() == 0.005
+    for latency_sec in [0.01, 0.02, 0.03]:
+        policy.record(latency_sec)
+    assert policy.delay_sec() == pytest.approx(0.02)
+    for _ in range(10):
+        policy.record(0.0)
+    assert policy.delay_sec() == 0.002
+    with pytest.raises(RuntimeError):
+        HedgingPolicy(None, percentile=100)
+
+
+def test__run_with_deadline(executor):
+    results = run_with_deadline(executor, [_read("a"), _read("b", sleep_sec=1.0)], timeout_sec=0.05)
+    assert results == [("a", SERVED_BY_PRIMARY), (None, MISSED_DEADLINE)]
+    # Without deadline, everything is waited for
+    assert run_with_deadline(executor, [_read("a"), _read("b", sleep_sec=0.01)]) == \
+           [("a", SERVED_BY_PRIMARY), ("b", SERVED_BY_PRIMARY)]
+    with pytest.raises(ValueError):
+        run_with_deadline(executor, [_read("a", error=ValueError())], timeout_sec=1.0)
+
+
+def test__run_with_deadline__hedged(executor):
+    hedging = HedgingPolicy(None, initial_delay_ms=10)
+    results = run_with_deadline(executor, [_read("a"), _read("b", sleep_sec=1.0), _read("c", error=ValueError())],
+                                timeout_sec=0.5, hedging=hedging,
+                                hedges=[_read("ra"), _read("rb"), _read("rc")])
+    assert results == [("a", SERVED_BY_PRIMARY), ("rb", SERVED_BY_REPLICA), ("rc", SERVED_BY_REPLICA)]
+    assert hedging.num_hedged == 2
+    assert hedging.num_replica_wins == 2
+    # Both the primary and the hedged read failed
+    with pytest.raises(ValueError):
+        run_with_deadline(executor, [_read("a", error=ValueError())], hedging=hedging,
+                          hedges=[_read("ra", error=KeyError())])
+
+
+def test__arun_with_deadline():
+    hedging = HedgingPolicy(None, initial_delay_ms=10)
+
+    async def _run():
+        missed = await arun_with_deadline([_aread("a"), _aread("b", sleep_sec=1.0)], timeout_sec=0.05)
+        hedged = await arun_with_deadline([_aread("a", sleep_sec=1.0)], timeout_sec=0.5, hedging=hedging,
+                                          hedges=[_aread("ra")])
+        return missed, hedged
+
+    missed, hedged = asyncio.run(_run())
+    assert missed == [("a", SERVED_BY_PRIMARY), (None, MISSED_DEADLINE)]
+    assert hedged == [("ra", SERVED_BY_REPLICA)]
+    assert hedging.stats()["replica_wins"] == 1
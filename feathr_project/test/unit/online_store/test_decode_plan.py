@@ -0,0 +1,58 @@
+import base64
+
+import numpy as np
+
+from feathr import FLOAT, FLOAT_VECTOR, INT64
+from feathr.online_store._feature_value import RAW_VALUE_MARKER
+from feathr.online_store.columnar import decode_columns
+from feathr.online_store.decode_plan import OnlineDecodePlan
+from feathr.protobuf.featureValue_pb2 import FeatureValue, FloatArray, SparseStringArray
+
+
+def _encode(feature_value: FeatureValue) -> bytes:
+    return base64.b64encode(feature_value.SerializeToString())
+
+
+def test__decode_plan():
+    plan = OnlineDecodePlan(["f_float", "f_vector", "f_sparse", "f_long"],
+                            {"f_float": FLOAT, "f_vector": FLOAT_VECTOR, "f_long": INT64})
+    assert plan.expected_fields == ["float_value", "float_array", None, "long_value"]
+    rows = plan.decode_rows([
+        [_encode(FeatureValue(float_value=1.5)),
+         RAW_VALUE_MARKER + FeatureValue(float_array=FloatArray(floats=[1.0, 2.0])).SerializeToString(),
+         _encode(FeatureValue(sparse_string_array=SparseStringArray(index_integers=[3], value_strings=["a"]))),
+         None],
+        [None, None, None, _encode(FeatureValue(int_value=7))],
+    ])
+    assert rows[0][0] == 1.5 and list(rows[0][1]) == [1.0, 2.0] and rows[0][3] is None
+    assert [list(part) for part in rows[0][2]] == [[3], ["a"]]
+    assert rows[1] == [None, None, None, 7]
+    # The int value is decoded, but counted as it doesn't match the declared INT64 type
+    assert plan.type_mismatches == {"f_long": 1}
+    assert plan.num_type_mismatches == 1
+    assert plan.unknown_values == {}
+
+
+def test__decode_plan_unknown_values():
+    plan = OnlineDecodePlan(["f_float"], {"f_float": FLOAT})
+    # An empty message, i.e. a type unknown to this client version
+    assert plan.decode([RAW_VALUE_MARKER]) == [None]
+    assert plan.unknown_values == {"f_float": 1}
+    assert plan.type_mismatches == {}
+
+
+def test__decode_columns_counts_unexpected_values():
+    plan = OnlineDecodePlan(["f_float", "f_sparse"], {"f_float": FLOAT})
+    columns = decode_columns(["a", "b", "c"], [
+        [_encode(FeatureValue(int_value=7)), _encode(FeatureValue(string_value="x"))],
+        [_encode(FeatureValue(float_value=1.5)), _encode(FeatureValue(int_value=1))],
+        [RAW_VALUE_MARKER, None],
+    ], ["f_float", "f_sparse"], plan=plan)
+    # The declared FLOAT type is the column type, the int value is missing instead of deciding the column type
+    assert columns["f_float"].dtype == np.float32 and columns.null_masks["f_float"].tolist() == [True, False, True]
+    assert columns["f_float"][1] == 1.5
+    # Without a declared type, the first value decides the column type
+    assert columns["f_sparse"].tolist() == ["x", None, None]
+    assert plan.type_mismatches == {"f_float": 1, "f_sparse": 1}
+    assert plan.num_type_mismatches == 2
+    assert plan.unknown_values == {"f_float": 1}
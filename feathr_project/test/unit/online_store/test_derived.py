@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from feathr import DerivedFeature, Feature, FLOAT, INT64, TypedKey, ValueType
+from feathr.online_store.derived import OnlineDerivedFeatures
+
+KEY = TypedKey(key_column="id", key_column_type=ValueType.INT32)
+F_A = Feature(name="f_a", feature_type=FLOAT, key=KEY, transform="a")
+F_B = Feature(name="f_b", feature_type=FLOAT, key=KEY, transform="b")
+
+
+def test__evaluate_in_dependency_order():
+    f_sum = DerivedFeature(name="f_sum", feature_type=FLOAT, key=KEY, input_features=[F_A, F_B], transform="f_a + f_b * 2")
+    f_rounded = DerivedFeature(name="f_rounded", feature_type=INT64, key=KEY, input_features=[F_A, f_sum],
+                               transform="round(f_sum) - abs(f_a)")
+    derived = OnlineDerivedFeatures([f_rounded, f_sum])
+    assert derived.required_features(["f_rounded", "f_b"]) == ["f_a", "f_b"]
+
+    res = derived.evaluate({"f_a": [1.0, -2.0, None], "f_b": [0.25, 1.0, 3.0]}, ["f_rounded"])
+    np.testing.assert_array_equal(res["f_sum"], [1.5, 0.0, np.nan])
+    np.testing.assert_array_equal(res["f_rounded"], [1.0, -2.0, np.nan])
+    assert derived.to_python_value("f_rounded", res["f_rounded"][0]) == 1
+    assert derived.to_python_value("f_rounded", res["f_rounded"][2]) is None
+
+
+def test__division_by_zero_is_null():
+    f_ratio = DerivedFeature(name="f_ratio", feature_type=FLOAT, key=KEY, input_features=[F_A, F_B], transform="f_a / f_b")
+    res = OnlineDerivedFeatures([f_ratio]).evaluate({"f_a": [1.0, 1.0], "f_b": [0.0, 4.0]}, ["f_ratio"])
+    np.testing.assert_array_equal(res["f_ratio"], [np.nan, 0.25])
+
+
+def test__unsupported_expression():
+    f_udf = DerivedFeature(name="f_udf", feature_type=FLOAT, key=KEY, input_features=[F_A], transform="my_udf(f_a)")
+    with pytest.raises(NotImplementedError):
+        OnlineDerivedFeatures([f_udf])
+
+
+@pytest.mark.parametrize("expr", ["f_a +", "(f_a", "f_a f_b"])
+def test__malformed_expression(expr: str):
+    f_bad = DerivedFeature(name="f_bad", feature_type=FLOAT, key=KEY, input_features=[F_A, F_B], transform=expr)
+    with pytest.raises(RuntimeError, match="malformed expression"):
+        OnlineDerivedFeatures([f_bad])
@@ -0,0 +1,61 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from feathr.online_store.embedded import EmbeddedOnlineStore, build_embedded_online_store
+
+
+@pytest.fixture(scope="function")
+def features_df() -> pd.DataFrame:
+    return pd.DataFrame({
+        "user_id": [1, 2, 3, 2],
+        "region": ["eu", "us", "eu", "us"],
+        "f_int": np.array([1, 2, 3, 4], dtype=np.int32),
+        "f_double": [1.5, np.nan, 3.5, 4.5],
+        "f_string": ["a", "b", None, "d"],
+        "f_array": [np.array([1.0, 2.0], dtype=np.float32), None, np.array([3.0], dtype=np.float32), None],
+        "f_sparse": [{"indices0": [0, 5], "values": ["x", "y"]}, None, None, None],
+    })
+
+
+def test__embedded_online_store(tmp_path, features_df: pd.DataFrame):
+    path = build_embedded_online_store(features_df, str(tmp_path), "users", ["user_id"], ["f_int", "f_double", "f_string",
+                                                                                          "f_array", "f_sparse"])
+    assert os.path.basename(path) == "users.feathr"
+    with EmbeddedOnlineStore(str(tmp_path)) as store:
+        assert store.list_feature_tables() == ["users"]
+        assert store.get_online_features("users", "1", ["f_int", "f_double", "f_string", "f_array", "f_sparse"]) == \
+               [1, 1.5, "a", [1.0, 2.0], ([0, 5], ["x", "y"])]
+        res = store.multi_get_online_features("users", [2, "3", "404"], ["f_double", "f_unknown", "f_int", "f_string"])
+        # The last row of a duplicated key wins
+        assert res == {2: [4.5, None, 4, "d"], "3": [3.5, None, 3, None], "404": [None, None, None, None]}
+
+
+def test__embedded_online_store_composite_keys(tmp_path, features_df: pd.DataFrame):
+    parquet_dir = tmp_path / "output"
+    parquet_dir.mkdir()
+    features_df[["user_id", "region", "f_int"]].to_parquet(parquet_dir / "part-00000.parquet")
+    build_embedded_online_store(str(parquet_dir), str(tmp_path / "store"), "user_region", ["user_id", "region"])
+    store = EmbeddedOnlineStore(str(tmp_path / "store"))
+    assert store.get_feature_names("user_region") == ["f_int"]
+    assert store.multi_get_online_features("user_region", [["2", "us"], ["1", "us"]], ["f_int"]) == \
+           {"2#us": [4], "1#us": [None]}
+    with pytest.raises(RuntimeError):
+        store.get_online_features("unknown", "1", ["f_int"])
+    store.close()
+
+
+def test__embedded_online_store_reload_during_lookup(tmp_path, features_df: pd.DataFrame):
+    build_embedded_online_store(features_df, str(tmp_path), "users", ["user_id"], ["f_int"])
+    store = EmbeddedOnlineStore(str(tmp_path))
+    with store._read_table("users") as table:
+        # Reloading while a lookup reads the table doesn't close its mapping under it
+        build_embedded_online_store(features_df.assign(f_int=features_df["f_int"] * 10), str(tmp_path), "users",
+                                    ["user_id"], ["f_int"])
+        store.reload()
+        assert table.get_many(["1"], ["f_int"]) == [[1]]
+        assert store.get_online_features("users", "1", ["f_int"]) == [10]
+    assert table._mmap.closed
+    store.close()
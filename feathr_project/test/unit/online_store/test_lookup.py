@@ -0,0 +1,40 @@
+from feathr import Aggregation, Feature, FLOAT, FLOAT_VECTOR, INT32_VECTOR, LookupFeature, TypedKey, ValueType
+from feathr.online_store.lookup import OnlineLookupFeatures
+
+USER_KEY = TypedKey(key_column="user_id", key_column_type=ValueType.INT32)
+ITEM_KEY = TypedKey(key_column="item_id", key_column_type=ValueType.INT32)
+F_ITEMS = Feature(name="f_items", feature_type=INT32_VECTOR, key=USER_KEY, transform="items")
+F_PRICE = Feature(name="f_price", feature_type=FLOAT, key=ITEM_KEY, transform="price")
+F_EMBEDDING = Feature(name="f_embedding", feature_type=FLOAT_VECTOR, key=ITEM_KEY, transform="embedding")
+FEATURE_TABLES = {"f_items": "users", "f_price": "items", "f_embedding": "items"}
+
+
+def _lookup_feature(name, expansion_feature, aggregation):
+    return LookupFeature(name=name, feature_type=FLOAT, key=USER_KEY, base_feature=F_ITEMS,
+                         expansion_feature=expansion_feature, aggregation=aggregation)
+
+
+def test__expansion_keys_are_deduplicated():
+    lookup = OnlineLookupFeatures([_lookup_feature("f_avg_price", F_PRICE, Aggregation.AVG),
+                                   _lookup_feature("f_avg_embedding", F_EMBEDDING, Aggregation.ELEMENTWISE_AVG)],
+                                  FEATURE_TABLES)
+    assert lookup.base_requests(["u1", "u2"]) == [("users", ["u1", "u2"], ["f_items"])]
+    base_values = {"f_items": [[1, 2], [2, 3, 1]]}
+    assert lookup.expansion_requests(base_values) == [("items", ["1", "2", "3"], ["f_price", "f_embedding"])]
+
+
+def test__aggregate():
+    aggregations = [Aggregation.AVG, Aggregation.MAX, Aggregation.SUM, Aggregation.FIRST, Aggregation.LATEST]
+    lookup = OnlineLookupFeatures([_lookup_feature(f"f_{a.name.lower()}", F_PRICE, a) for a in aggregations]
+                                  + [_lookup_feature("f_sum_embedding", F_EMBEDDING, Aggregation.ELEMENTWISE_SUM)],
+                                  FEATURE_TABLES)
+    base_values = {"f_items": [[1, 2, 4], None, [4]]}
+    expansion_values = {
+        "f_price": {"1": 1.0, "2": 3.0, "4": None},
+        "f_embedding": {"1": [1.0, 2.0], "2": [0.5, 0.5], "4": None},
+    }
+    assert lookup.aggregate(base_values, expansion_values) == [
+        [2.0, 3.0, 4.0, 1.0, 3.0, [1.5, 2.5]],
+        [None] * 6,
+        [None] * 6,
+    ]
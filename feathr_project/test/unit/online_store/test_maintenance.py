@@ -0,0 +1,37 @@
+import fakeredis
+
+from feathr.online_store.maintenance import expire_command, hdel_command, run_bulk_operation, unlink_command
+
+
+def _populate() -> fakeredis.FakeRedis:
+    redis_client = fakeredis.FakeRedis()
+    for i in range(25):
+        redis_client.hset(f"users:{i}", mapping={"f_keep": "1", "f_retired": "2"})
+    redis_client.hset("users:only_retired", mapping={"f_retired": "2"})
+    redis_client.hset("users_v2:1", mapping={"f_retired": "2"})
+    return redis_client
+
+
+def test__drop_features_reports_progress():
+    redis_client = _populate()
+    progress = []
+    report = run_bulk_operation(redis_client, "users", "drop_features", hdel_command(["f_retired"]), max_concurrency=2,
+                                scan_count=5, progress_callback=lambda r: progress.append(r.to_dict()))
+    assert report.done and report.affected_keys == 26 and report.scanned_keys >= 26
+    assert progress[-1]["done"] and len(progress) == report.batches + 1
+    assert redis_client.hgetall("users:3") == {b"f_keep": b"1"}
+    # Redis removes the hashes left empty, and other tables are not touched
+    assert not redis_client.exists("users:only_retired")
+    assert redis_client.hexists("users_v2:1", "f_retired")
+
+
+def test__expire_and_unlink():
+    redis_client = _populate()
+    assert run_bulk_operation(redis_client, "users", "expire_table", expire_command(60)).affected_keys == 26
+    assert 0 < redis_client.ttl("users:1") <= 60
+    run_bulk_operation(redis_client, "users", "expire_table", expire_command(None))
+    assert redis_client.ttl("users:1") == -1
+
+    # Unlike Redis, fakeredis skips keys when the keys already scanned are deleted, so the table is scanned in one page
+    assert run_bulk_operation(redis_client, "users", "drop_table", unlink_command, scan_count=100).affected_keys == 26
+    assert redis_client.keys("users:*") == [] and redis_client.exists("users_v2:1")
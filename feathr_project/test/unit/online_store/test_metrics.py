@@ -0,0 +1,32 @@
+from feathr.online_store.metrics import CallbackMetricsSink, PrometheusMetricsSink
+
+
+def test__prometheus_metrics_sink():
+    sink = PrometheusMetricsSink()
+    sink.observe("feathr_online_redis_seconds", "table", 0.0003)
+    sink.observe("feathr_online_redis_seconds", "table", 2.0)
+    sink.increment("feathr_online_values_total", "table", 4)
+    sink.increment("feathr_online_values_total", 'we"ird', 1)
+
+    assert sink.get_histogram("feathr_online_redis_seconds", "table") == {"count": 2, "sum": 2.0003}
+    assert sink.get_histogram("feathr_online_decode_seconds", "table") == {"count": 0, "sum": 0.0}
+    assert sink.get_counter("feathr_online_values_total", "table") == 4
+
+    lines = sink.exposition().splitlines()
+    assert "# TYPE feathr_online_redis_seconds histogram" in lines
+    assert 'feathr_online_redis_seconds_bucket{feature_table="table",le="0.00025"} 0' in lines
+    assert 'feathr_online_redis_seconds_bucket{feature_table="table",le="0.0005"} 1' in lines
+    assert 'feathr_online_redis_seconds_bucket{feature_table="table",le="+Inf"} 2' in lines
+    assert 'feathr_online_redis_seconds_count{feature_table="table"} 2' in lines
+    assert 'feathr_online_values_total{feature_table="table"} 4' in lines
+    assert 'feathr_online_values_total{feature_table="we\\"ird"} 1' in lines
+    # Metrics without any observation are left out
+    assert not any(line.startswith("feathr_online_decode_seconds") for line in lines)
+
+
+def test__callback_metrics_sink():
+    calls = []
+    sink = CallbackMetricsSink(lambda *args: calls.append(args))
+    sink.observe("feathr_online_decode_seconds", "table", 0.1)
+    sink.increment("feathr_online_values_total", "table", 3)
+    assert calls == [("feathr_online_decode_seconds", "table", 0.1), ("feathr_online_values_total", "table", 3)]
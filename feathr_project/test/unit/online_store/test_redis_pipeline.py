@@ -0,0 +1,71 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import fakeredis
+from redis.crc import key_slot
+
+from feathr.online_store._redis_pipeline import aexecute_hmgets, chunk_indices, execute_hmgets, group_by_shard, hash_tag
+
+
+class _FakeClusterClient:
+    """Fake Redis Cluster client with two shards, splitting the hash slots in half."""
+    def __init__(self):
+        self._redis = fakeredis.FakeRedis()
+        self.pipelines = []
+
+    def keyslot(self, key):
+        return key_slot(key.encode())
+
+    @property
+    def nodes_manager(self):
+        return SimpleNamespace(get_node_from_slot=lambda slot: SimpleNamespace(name="a" if slot < 8192 else "b"))
+
+    def hset(self, *args, **kwargs):
+        return self._redis.hset(*args, **kwargs)
+
+    def pipeline(self, transaction=None):
+        self.pipelines.append(transaction)
+        return self._redis.pipeline(transaction=transaction)
+
+
+def test__hash_tag_keeps_an_entity_on_one_slot():
+    assert hash_tag("1#x") == "{1#x}"
+    assert key_slot(("t1:" + hash_tag("42")).encode()) == key_slot(("t2:" + hash_tag("42")).encode())
+
+
+def test__group_by_shard():
+    client = _FakeClusterClient()
+    requests = [(f"table:{i}", ["f"]) for i in range(20)]
+    groups = group_by_shard(client, requests)
+    assert len(groups) == 2
+    assert sorted(i for group in groups for i in group) == list(range(20))
+    for group in groups:
+        assert len({client.keyslot(requests[i][0]) < 8192 for i in group}) == 1
+
+
+def test__execute_hmgets__cluster_keeps_request_order():
+    client = _FakeClusterClient()
+    for i in range(20):
+        client.hset(f"table:{i}", mapping={"f": str(i)})
+    requests = [(f"table:{i}", ["f", "missing"]) for i in range(20)]
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        res = execute_hmgets(client, requests, cluster_enabled=True, executor=executor)
+    assert res == [[str(i).encode(), None] for i in range(20)]
+    # One non transactional pipeline per shard
+    assert client.pipelines == [False, False]
+
+
+def test__execute_hmgets__chunks_keep_request_order():
+    server = fakeredis.FakeServer()
+    redis_client = fakeredis.FakeRedis(server=server)
+    for i in range(10):
+        redis_client.hset(f"table:{i}", mapping={"f": str(i)})
+    requests = [(f"table:{i}", ["f"]) for i in range(10)]
+    assert chunk_indices(list(range(10)), 4) == [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]]
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        res = execute_hmgets(redis_client, requests, executor=executor, max_keys_per_pipeline=4)
+    assert res == [[str(i).encode()] for i in range(10)]
+    res = asyncio.run(aexecute_hmgets(fakeredis.FakeAsyncRedis(server=server), requests,
+                                      max_keys_per_pipeline=3, max_concurrency=2))
+    assert res == [[str(i).encode()] for i in range(10)]
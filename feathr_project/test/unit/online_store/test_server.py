@@ -0,0 +1,118 @@
+import asyncio
+import base64
+from unittest.mock import patch
+
+from aiohttp.test_utils import TestClient, TestServer
+import fakeredis
+import pytest
+
+from feathr import FeathrClient
+from feathr.online_store.batcher import OnlineFeatureBatcher
+from feathr.online_store.server import OnlineFeatureServer, to_json_value
+from feathr.protobuf.featureValue_pb2 import FeatureValue, FloatArray
+
+
+def _encode(feature_value: FeatureValue) -> bytes:
+    return base64.b64encode(feature_value.SerializeToString())
+
+
+@pytest.fixture(scope="function")
+def online_client(feathr_client: FeathrClient) -> FeathrClient:
+    server = fakeredis.FakeServer()
+    feathr_client.redis_client = fakeredis.FakeRedis(server=server)
+    feathr_client.async_redis_client = fakeredis.FakeAsyncRedis(server=server)
+    feathr_client.redis_client.hset("table:1", mapping={
+        "f_float": _encode(FeatureValue(float_value=1.5)),
+        "f_array": _encode(FeatureValue(float_array=FloatArray(floats=[1.0, 2.0]))),
+    })
+    feathr_client.redis_client.hset("table:2", mapping={
+        "f_float": _encode(FeatureValue(float_value=2.5)),
+    })
+    feathr_client.redis_client.hset("other:1", mapping={
+        "f_int": _encode(FeatureValue(int_value=3)),
+    })
+    return feathr_client
+
+
+def test__batcher_coalesces_and_deduplicates(online_client: FeathrClient):
+    async def _run():
+        batcher = OnlineFeatureBatcher(online_client, max_wait_ms=50)
+        with patch.object(online_client, "_afetch_online_features_of_tables",
+                          wraps=online_client._afetch_online_features_of_tables) as fetch:
+            res = await asyncio.gather(
+                batcher.get("table", "1", ["f_float"]),
+                batcher.get("table", "1", ["f_float"]),
+                batcher.get("table", "2", ["f_float", "f_array"]),
+                batcher.get("other", "1", ["f_int"]),
+            )
+        return batcher, fetch, res
+
+    batcher, fetch, res = asyncio.run(_run())
+    assert res == [[1.5], [1.5], [2.5, None], [3]]
+    # All the tables are read in one round trip
+    fetch.assert_called_once()
+    assert batcher.stats() == {"requests": 4, "batches": 1, "deduplicated": 1}
+
+
+def test__batcher_flushes_full_batches(online_client: FeathrClient):
+    async def _run():
+        batcher = OnlineFeatureBatcher(online_client, max_batch_size=1, max_wait_ms=10000)
+        return batcher, await asyncio.gather(batcher.get("table", "1", ["f_float"]), batcher.get("table", "2", ["f_float"]))
+
+    batcher, res = asyncio.run(_run())
+    assert res == [[1.5], [2.5]]
+    assert batcher.stats()["batches"] == 2
+
+
+def test__online_feature_server(online_client: FeathrClient):
+    server = OnlineFeatureServer(online_client, {"table": ["f_float", "f_array"]}, max_wait_ms=1)
+
+    async def _run():
+        async with TestClient(TestServer(server.create_app())) as http_client:
+            single = await (await http_client.post("/v1/online_features", json={"feature_table": "table", "key": "1"})).json()
+            batch = await (await http_client.post("/v1/online_features", json={
+                "feature_table": "table", "keys": ["1", "2", "3"], "feature_names": ["f_float"]})).json()
+            unknown = await http_client.post("/v1/online_features", json={"feature_table": "unknown", "key": "1"})
+            metrics = await (await http_client.get("/metrics")).text()
+            return single, batch, unknown.status, metrics
+
+    single, batch, unknown_status, metrics = asyncio.run(_run())
+    assert single == {"key": "1", "features": {"f_float": 1.5, "f_array": [1.0, 2.0]}}
+    assert batch == {"results": [
+        {"key": "1", "features": {"f_float": 1.5}},
+        {"key": "2", "features": {"f_float": 2.5}},
+        {"key": "3", "features": {"f_float": None}},
+    ]}
+    assert unknown_status == 400
+    assert 'feathr_online_values_total{feature_table="table"} 5' in metrics.splitlines()
+
+
+def test__online_feature_server__invalid_requests(online_client: FeathrClient):
+    server = OnlineFeatureServer(online_client, {"table": ["f_float", "f_array"]}, max_wait_ms=1)
+    invalid_bodies = [
+        ["table"],
+        {"feature_table": ["table"], "key": "1"},
+        {"feature_table": "table", "key": "1", "feature_names": "f_float"},
+        {"feature_table": "table", "key": "1", "feature_names": [1]},
+        {"feature_table": "table", "key": {"id": "1"}},
+        {"feature_table": "table", "key": True},
+        {"feature_table": "table", "keys": "1"},
+        {"feature_table": "table", "keys": ["1", [["2"]]]},
+    ]
+
+    async def _run():
+        async with TestClient(TestServer(server.create_app())) as http_client:
+            statuses = [(await http_client.post("/v1/online_features", json=body)).status for body in invalid_bodies]
+            # Integer keys are read like their string form
+            res = await (await http_client.post("/v1/online_features", json={"feature_table": "table", "keys": [1, 2],
+                                                                              "feature_names": ["f_float"]})).json()
+            return statuses, res
+
+    statuses, res = asyncio.run(_run())
+    assert statuses == [400] * len(invalid_bodies)
+    assert res == {"results": [{"key": 1, "features": {"f_float": 1.5}}, {"key": 2, "features": {"f_float": 2.5}}]}
+
+
+def test__to_json_value():
+    assert to_json_value(None) is None
+    assert to_json_value(([0, 3], ["a", "b"])) == {"indices": [0, 3], "values": ["a", "b"]}
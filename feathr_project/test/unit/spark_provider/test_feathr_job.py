@@ -0,0 +1,43 @@
+from typing import Optional
+
+import pytest
+
+from feathr import FeathrJob, as_completed, wait_all
+
+
+class _FakeJob(FeathrJob):
+    """Job which finishes after a given number of status polls."""
+    def __init__(self, job_name: str, polls: int, succeeded: bool = True):
+        super().__init__(job_name, {"output_path": f"{job_name}.avro"})
+        self.polls = polls
+        self.succeeded = succeeded
+
+    def get_status(self) -> str:
+        return "success" if self.succeeded else "error"
+
+    def is_done(self) -> bool:
+        self.polls -= 1
+        return self.polls < 0
+
+    def cancel(self):
+        pass
+
+    def wait_for_completion(self, timeout_seconds: Optional[float] = None) -> bool:
+        assert self.polls < 0
+        return self.succeeded
+
+
+def test__as_completed():
+    jobs = [_FakeJob("slow", polls=2), _FakeJob("fast", polls=0), _FakeJob("medium", polls=1)]
+    assert [job.job_name for job in as_completed(jobs, poll_interval_seconds=0)] == ["fast", "medium", "slow"]
+    assert jobs[0].get_job_result_uri() == "slow.avro"
+
+
+def test__as_completed__timeout():
+    with pytest.raises(TimeoutError):
+        list(as_completed([_FakeJob("stuck", polls=10**6)], timeout_seconds=0, poll_interval_seconds=0))
+
+
+def test__wait_all():
+    jobs = [_FakeJob("a", polls=1), _FakeJob("b", polls=0, succeeded=False)]
+    assert wait_all(jobs, poll_interval_seconds=0) == [True, False]
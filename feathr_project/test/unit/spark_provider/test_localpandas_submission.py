@@ -0,0 +1,169 @@
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from feathr import (BOOLEAN, FLOAT, INT32, DerivedFeature, FeathrClient, Feature, FeatureAnchor, FeatureQuery,
+                    HdfsSource, ObservationSettings, TypedKey, ValueType, WindowAggTransformation, wait_all)
+from feathr.constants import OUTPUT_FORMAT
+from feathr.definition.settings import ConflictsAutoCorrection
+from feathr.definition.source import INPUT_CONTEXT
+from feathr.utils.job_utils import get_result_df
+from feathr.utils.window_aggregation import compute_window_features
+
+
+@pytest.fixture(scope="function")
+def pandas_client(workspace_dir, monkeypatch) -> FeathrClient:
+    monkeypatch.setenv("SPARK_CONFIG__SPARK_CLUSTER", "local_pandas")
+    return FeathrClient(config_path=str(Path(workspace_dir, "feathr_config.yaml")))
+
+
+@pytest.fixture(scope="function")
+def observation_path(tmp_path) -> str:
+    path = str(tmp_path / "observation.csv")
+    pd.DataFrame({
+        "user": [1, 1, 2, 3],
+        "ts": ["2022-01-02", "2022-01-04", "2022-01-04", "2022-01-04"],
+        "amount": [10.0, 20.0, 30.0, 40.0],
+    }).to_csv(path, index=False)
+    return path
+
+
+@pytest.fixture(scope="function")
+def user_source(tmp_path) -> HdfsSource:
+    path = tmp_path / "users"
+    path.mkdir()
+    pd.DataFrame({
+        "user_id": ["1", "1", "2"],
+        "event_ts": ["2022-01-01", "2022-01-03", "2022-01-05"],
+        "age": [30, 31, 40],
+        "score": [0.5, 1.5, 2.5],
+    }).to_parquet(path / "part-0.parquet")
+    return HdfsSource(name="users", path=str(path), event_timestamp_column="event_ts", timestamp_format="yyyy-MM-dd")
+
+
+def _build(client: FeathrClient, source: HdfsSource):
+    user_key = TypedKey(key_column="user_id", key_column_type=ValueType.INT32)
+    f_age = Feature(name="f_age", feature_type=INT32, key=user_key, transform="age")
+    f_score = Feature(name="f_score", feature_type=FLOAT, key=user_key, transform="score * 2")
+    client.build_features(
+        anchor_list=[
+            FeatureAnchor(name="user_features", source=source, features=[f_age, f_score]),
+            FeatureAnchor(name="request_features", source=INPUT_CONTEXT, features=[
+                Feature(name="f_is_large", feature_type=BOOLEAN, transform="amount > 15"),
+            ]),
+        ],
+        derived_feature_list=[
+            DerivedFeature(name="f_age_score", feature_type=FLOAT, key=user_key, input_features=[f_age, f_score],
+                           transform="f_age + f_score"),
+        ])
+
+
+def test__local_pandas__get_offline_features(pandas_client: FeathrClient, observation_path: str,
+                                             user_source: HdfsSource, tmp_path):
+    _build(pandas_client, user_source)
+    output_path = str(tmp_path / "output")
+    job = pandas_client.get_offline_features(
+        observation_settings=ObservationSettings(observation_path=observation_path, event_timestamp_column="ts",
+                                                 timestamp_format="yyyy-MM-dd"),
+        feature_query=[FeatureQuery(feature_list=["f_age", "f_age_score"], key=TypedKey("user", ValueType.INT32)),
+                       FeatureQuery(feature_list=["f_is_large"])],
+        output_path=output_path)
+    res = job.result
+
+    # Each row gets the latest features at or before its timestamp
+    assert list(res.columns) == ["user", "ts", "amount", "f_age", "f_age_score", "f_is_large"]
+    assert res["f_age"].fillna(-1).tolist() == [30, 31, -1, -1]
+    assert res["f_age_score"].fillna(-1).tolist() == [31.0, 34.0, -1, -1]
+    assert res["f_is_large"].tolist() == [False, True, True, True]
+
+    # The job is already completed, and can be passed back to the client like the handles of the Spark runtimes
+    assert job.is_done() and job.get_status() == "SUCCEEDED"
+    assert pandas_client.feathr_spark_launcher.latest_job is job
+    assert pandas_client.wait_job_to_finish(job=job) is None
+    assert pandas_client.get_job_result_uri(job=job) == pandas_client.get_job_result_uri() == output_path
+    assert wait_all([job]) == [True]
+    result_df = get_result_df(pandas_client)
+    assert result_df["f_age"].fillna(-1).tolist() == [30, 31, -1, -1]
+    assert get_result_df(pandas_client, res_url=f"file://{output_path}").equals(result_df)
+
+
+def test__local_pandas__time_delay_and_conflicts(pandas_client: FeathrClient, observation_path: str,
+                                                 user_source: HdfsSource, tmp_path):
+    _build(pandas_client, user_source)
+    query = FeatureQuery(feature_list=["f_age"], key=TypedKey("user", ValueType.INT32))
+    # Without timestamps, the last row of each key is joined
+    res = pandas_client.get_offline_features(ObservationSettings(observation_path=observation_path), query,
+                                             str(tmp_path / "snapshot"),
+                                             execution_configurations={OUTPUT_FORMAT: "parquet"}).result
+    assert res["f_age"].fillna(-1).tolist() == [31, 31, 40, -1]
+    assert pd.read_parquet(tmp_path / "snapshot")["f_age"].fillna(-1).tolist() == [31, 31, 40, -1]
+
+    res = pandas_client.get_offline_features(
+        ObservationSettings(observation_path=observation_path, event_timestamp_column="ts",
+                            timestamp_format="yyyy-MM-dd", simulate_time_delay="2d"),
+        query, str(tmp_path / "delayed")).result
+    assert res["f_age"].fillna(-1).tolist() == [-1, 30, -1, -1]
+
+    amount = Feature(name="amount", feature_type=FLOAT, transform="amount * 100")
+    pandas_client.build_features(anchor_list=[FeatureAnchor(name="request", source=INPUT_CONTEXT, features=[amount])])
+    with pytest.raises(RuntimeError):
+        pandas_client.get_offline_features(ObservationSettings(observation_path=observation_path),
+                                           FeatureQuery(feature_list=["amount"]), str(tmp_path / "conflict"))
+    res = pandas_client.get_offline_features(
+        ObservationSettings(observation_path=observation_path,
+                            conflicts_auto_correction=ConflictsAutoCorrection(rename_features=True)),
+        FeatureQuery(feature_list=["amount"]), str(tmp_path / "conflict")).result
+    assert res["amount_1"].tolist() == [1000.0, 2000.0, 3000.0, 4000.0]
+
+
+def test__local_pandas__window_aggregation(pandas_client: FeathrClient, observation_path: str,
+                                           user_source: HdfsSource, tmp_path):
+    user_key = TypedKey(key_column="user_id", key_column_type=ValueType.INT32)
+    anchor = FeatureAnchor(name="agg", source=user_source, features=[
+        Feature(name="f_age_sum", feature_type=INT32, key=user_key,
+                transform=WindowAggTransformation(agg_expr="age", agg_func="SUM", window="2d")),
+        Feature(name="f_score_max", feature_type=FLOAT, key=user_key,
+                transform=WindowAggTransformation(agg_expr="score", agg_func="MAX", window="3d", filter="age < 35")),
+        Feature(name="f_age", feature_type=INT32, key=user_key, transform="age"),
+    ])
+    pandas_client.build_features(anchor_list=[anchor])
+    query = FeatureQuery(feature_list=["f_age_sum", "f_score_max", "f_age"], key=TypedKey("user", ValueType.INT32))
+    res = pandas_client.get_offline_features(
+        ObservationSettings(observation_path=observation_path, event_timestamp_column="ts",
+                            timestamp_format="yyyy-MM-dd"),
+        query, str(tmp_path / "output")).result
+    # Windows are (ts - window, ts]: the 2022-01-01 row is out of the 2 day window of 2022-01-04
+    assert res["f_age_sum"].fillna(-1).tolist() == [30, 31, -1, -1]
+    assert res["f_score_max"].fillna(-1).tolist() == [0.5, 1.5, -1, -1]
+    assert res["f_age"].fillna(-1).tolist() == [30, 31, -1, -1]
+
+    # Window aggregation needs the observation timestamps
+    with pytest.raises(RuntimeError):
+        pandas_client.get_offline_features(ObservationSettings(observation_path=observation_path), query,
+                                           str(tmp_path / "snapshot"))
+
+    # Values of a materialization as of 2022-01-05
+    values = compute_window_features(anchor, datetime(2022, 1, 5))
+    assert list(values.columns) == ["user_id", "f_age_sum", "f_score_max"]
+    assert values["user_id"].tolist() == ["1", "2"]
+    assert values["f_age_sum"].fillna(-1).tolist() == [-1, 40]
+    assert values["f_score_max"].fillna(-1).tolist() == [1.5, -1]
+
+
+def test__local_pandas__unsupported(pandas_client: FeathrClient, observation_path: str, user_source: HdfsSource,
+                                    tmp_path):
+    user_key = TypedKey(key_column="user_id", key_column_type=ValueType.INT32)
+    pandas_client.build_features(anchor_list=[FeatureAnchor(name="agg", source=user_source, features=[
+        Feature(name="f_age_distinct", feature_type=INT32, key=user_key,
+                transform=WindowAggTransformation(agg_expr="age", agg_func="COUNT_DISTINCT", window="2d")),
+    ])])
+    with pytest.raises(NotImplementedError):
+        pandas_client.get_offline_features(ObservationSettings(observation_path=observation_path,
+                                                               event_timestamp_column="ts", timestamp_format="yyyy-MM-dd"),
+                                           FeatureQuery(feature_list=["f_age_distinct"],
+                                                        key=TypedKey("user", ValueType.INT32)),
+                                           str(tmp_path / "output"))
+    with pytest.raises(NotImplementedError):
+        pandas_client.feathr_spark_launcher.submit_feathr_job("job", "", "")
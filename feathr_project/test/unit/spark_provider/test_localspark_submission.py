@@ -1,3 +1,4 @@
+from pathlib import Path
 from typing import Dict
 from unittest.mock import MagicMock
 
@@ -5,7 +6,9 @@ import pytest
 from pytest_mock import MockerFixture
 
 from feathr.constants import OUTPUT_PATH_TAG
+from feathr.spark_provider._localspark_session import _WarmSparkSession
 from feathr.spark_provider._localspark_submission import _FeathrLocalSparkJobLauncher
+from feathr.spark_provider._spark_dependencies import CONNECTORS_CONF, resolve_packages
 
 
 @pytest.fixture(scope="function")
@@ -51,6 +54,37 @@ def test__local_spark_job_launcher__submit_feathr_job(
     assert local_spark_job_launcher.get_job_result_uri() == expected_result_uri
 
 
+def test__local_spark_job_launcher__job_handles(
+    mocker: MockerFixture,
+    local_spark_job_launcher: _FeathrLocalSparkJobLauncher,
+):
+    procs = [MagicMock(args=[], pid=i, returncode=None) for i in range(2)]
+    for proc in procs:
+        proc.poll.return_value = None
+    mocker.patch("feathr.spark_provider._localspark_submission.Popen", side_effect=procs)
+
+    jobs = [
+        local_spark_job_launcher.submit_feathr_job(job_name=f"job-{i}", main_jar_path="", main_class_name="",
+                                                   job_tags={OUTPUT_PATH_TAG: f"output-{i}"})
+        for i in range(2)
+    ]
+
+    # Each job keeps its own state, the launcher only tracks the latest one
+    assert [job.get_job_result_uri() for job in jobs] == ["output-0", "output-1"]
+    assert local_spark_job_launcher.get_job_result_uri() == "output-1"
+    assert jobs[0].log_file != jobs[1].log_file
+    assert not jobs[0].is_done()
+
+    procs[0].poll.return_value = 0
+    procs[0].returncode = 0
+    assert jobs[0].is_done() and not jobs[1].is_done()
+    assert jobs[0].get_status() == 0
+
+    jobs[1].cancel()
+    procs[1].terminate.assert_called_once()
+    procs[0].terminate.assert_not_called()
+
+
 @pytest.mark.parametrize(
     "confs", [{}, {"spark.feathr.outputFormat": "parquet"}]
 )
@@ -63,3 +97,108 @@ def test__local_spark_job_launcher__init_args(
     # Assert if spark_args contains confs at the end
     for k, v in confs.items():
         assert spark_args[-1] == f"{k}={v}"
+
+
+@pytest.mark.parametrize("dependency_jar", [None, "deps.jar"])
+def test__local_spark_job_launcher__dependencies(
+    mocker: MockerFixture,
+    tmp_path,
+    dependency_jar: str,
+):
+    cache_dir = tmp_path / "jar_cache"
+    launcher = _FeathrLocalSparkJobLauncher(workspace_path=str(tmp_path), debug_folder=str(tmp_path),
+                                            jar_cache_dir=str(cache_dir), dependency_jar=dependency_jar)
+    launcher._init_args = MagicMock(side_effect=lambda **_: [])
+    mocked_popen = mocker.patch("feathr.spark_provider._localspark_submission.Popen")
+    mocked_popen.return_value.args = []
+
+    def submit():
+        launcher.submit_feathr_job(job_name="join", main_jar_path="", main_class_name="FeatureJoinJob",
+                                   configuration={"spark.jars.packages": "a:b:1.0", CONNECTORS_CONF: "redis"})
+        return mocked_popen.call_args[0][0]
+
+    spark_args = submit()
+    if dependency_jar:
+        # The pre-built jar is used instead of Maven
+        assert spark_args[spark_args.index("--jars") + 1] == "deps.jar"
+        assert "--packages" not in spark_args
+        return
+
+    # The first job resolves the packages with Maven into the cache
+    assert "--jars" not in spark_args
+    packages = spark_args[spark_args.index("--packages") + 1].split(",")
+    # The packages of the user are added to the ones of Feathr core and of the connectors of the job
+    assert packages[:-2] == resolve_packages(["redis"])
+    assert packages[-2] == "a:b:1.0"
+    ivy_conf = spark_args[spark_args.index("--conf") + 1]
+    assert ivy_conf.startswith("spark.jars.ivy=")
+    ivy_dir = Path(ivy_conf.split("=", 1)[1])
+    (ivy_dir / "jars").mkdir(parents=True)
+    for package in packages:
+        group, artifact, version = package.split(":")
+        (ivy_dir / "jars" / f"{group}_{artifact}-{version}.jar").write_bytes(package.encode())
+
+    # The next jobs get the cached jars
+    spark_args = submit()
+    assert "--packages" not in spark_args
+    jars = spark_args[spark_args.index("--jars") + 1].split(",")
+    assert sorted(Path(jar).read_bytes().decode() for jar in jars) == sorted(packages)
+
+
+@pytest.fixture(scope="function")
+def warm_session(mocker: MockerFixture) -> MagicMock:
+    # A fresh warm session whose Spark session is mocked, since there is no Spark driver in the unit tests
+    mocker.patch.object(_WarmSparkSession, "_instance", None)
+    session = MagicMock()
+    session.sparkContext._jsc.sc().conf().getOption.return_value.isDefined.return_value = False
+    mocker.patch.object(_WarmSparkSession, "_create_session", return_value=session)
+    yield session
+    _WarmSparkSession.get_instance()._executor.shutdown()
+
+
+def test__local_spark_job_launcher__warm_session(
+    mocker: MockerFixture,
+    tmp_path,
+    warm_session: MagicMock,
+):
+    launcher = _FeathrLocalSparkJobLauncher(workspace_path=str(tmp_path), debug_folder=str(tmp_path),
+                                            warm_session=True)
+    mocked_popen = mocker.patch("feathr.spark_provider._localspark_submission.Popen")
+    main_class = warm_session.sparkContext._jvm.com.linkedin.feathr.offline.job.FeatureJoinJob
+
+    for i in range(2):
+        launcher.submit_feathr_job(
+            job_name=f"join-{i}",
+            main_jar_path="feathr.jar",
+            main_class_name="com.linkedin.feathr.offline.job.FeatureJoinJob",
+            arguments=["--join-config", "join.conf"],
+            job_tags={OUTPUT_PATH_TAG: f"output-{i}"},
+            configuration={"spark.feathr.outputFormat": "parquet"},
+        )
+        assert launcher.wait_for_completion() is True
+        assert launcher.get_status() == 0
+        assert launcher.get_job_result_uri() == f"output-{i}"
+
+    # Both jobs run in the same session, without spark-submit
+    mocked_popen.assert_not_called()
+    _WarmSparkSession._create_session.assert_called_once_with(
+        "local[*]", ("feathr.jar",), "", mocker.ANY, ())
+    assert main_class.main.call_count == 2
+    spark_conf = warm_session.sparkContext._jsc.sc().conf()
+    spark_conf.set.assert_called_with("spark.feathr.outputFormat", "parquet")
+    # The job confs are removed from the session after each job
+    assert spark_conf.remove.call_count == 2
+
+    # Jobs needing other jars restart the session
+    launcher.submit_feathr_job(job_name="gen", main_jar_path="other.jar",
+                               main_class_name="com.linkedin.feathr.offline.job.FeatureGenJob")
+    assert launcher.wait_for_completion() is True
+    assert _WarmSparkSession._create_session.call_count == 2
+    warm_session.stop.assert_called_once()
+
+    # Failed jobs are reported
+    main_class.main.side_effect = RuntimeError("join failed")
+    launcher.submit_feathr_job(job_name="failed", main_jar_path="feathr.jar",
+                               main_class_name="com.linkedin.feathr.offline.job.FeatureJoinJob")
+    assert launcher.wait_for_completion() is False
+    assert launcher.get_status() == 1
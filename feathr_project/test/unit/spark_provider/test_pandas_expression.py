@@ -0,0 +1,62 @@
+from datetime import timedelta
+
+import pandas as pd
+import pytest
+
+from feathr.spark_provider._pandas_expression import PandasExpression, parse_duration, parse_timestamps
+
+
+@pytest.fixture(scope="module")
+def df() -> pd.DataFrame:
+    return pd.DataFrame({
+        "a": [1, 2, None],
+        "b": [0, 4, 1],
+        "s": ["x", "yy", None],
+        "t": ["2022-01-01 10:00:00", "2022-01-02 11:30:00", None],
+    })
+
+
+@pytest.mark.parametrize(
+    "expr,expected", [
+        ("a", [1.0, 2.0, None]),
+        ("a * 2 + 1", [3.0, 5.0, None]),
+        # Dividing by zero gives null, like Spark SQL
+        ("a / b", [None, 0.5, None]),
+        ("cast_float(a) > 1", [False, True, None]),
+        ("a IS NULL OR b = 0", [True, False, True]),
+        ("a IN (1, 3)", [True, False, None]),
+        ("CASE WHEN a > 1 THEN 'big' WHEN a IS NULL THEN 'none' ELSE 'small' END", ["small", "big", "none"]),
+        ("upper(s) || '!'", ["X!", "YY!", None]),
+        ("substring(s, 2, 1)", ["", "y", None]),
+        ("coalesce(a, 0)", [1.0, 2.0, 0.0]),
+        ("if(a > 1, 1, 0)", [0, 1, 0]),
+        ("round(b / 3, 2)", [0.0, 1.33, 0.33]),
+        ("to_unix_timestamp(t)", [1641031200, 1641123000, None]),
+        # Sunday is 1 and Saturday is 7
+        ("dayofweek(t)", [7, 1, None]),
+        ("cast(a as string)", ["1.0", "2.0", None]),
+    ]
+)
+def test__pandas_expression(df: pd.DataFrame, expr: str, expected: list):
+    res = PandasExpression(expr).evaluate(df)
+    assert len(res) == len(df)
+    assert [None if pd.isna(v) else v for v in res] == pytest.approx(expected)
+
+
+def test__pandas_expression__errors(df: pd.DataFrame):
+    assert PandasExpression("a + `b`").columns == {"a", "b"}
+    with pytest.raises(NotImplementedError):
+        PandasExpression("unknown_function(a)")
+    with pytest.raises(RuntimeError):
+        PandasExpression("a >")
+    with pytest.raises(RuntimeError):
+        PandasExpression("missing + 1").evaluate(df)
+
+
+def test__parse_timestamps():
+    assert parse_timestamps(pd.Series([1647737463, None]), "epoch").tolist()[0] == pd.Timestamp("2022-03-20 00:51:03")
+    assert parse_timestamps(pd.Series([1647737463000]), "epoch_millis")[0] == pd.Timestamp("2022-03-20 00:51:03")
+    assert parse_timestamps(pd.Series(["2022/03/01", "bad"]), "yyyy/MM/dd").tolist()[0] == pd.Timestamp("2022-03-01")
+    assert parse_duration("7d") == timedelta(days=7)
+    with pytest.raises(RuntimeError):
+        parse_duration("7w")
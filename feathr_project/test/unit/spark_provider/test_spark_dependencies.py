@@ -0,0 +1,76 @@
+from pathlib import Path
+
+from feathr import FeatureAnchor, HdfsSink, HdfsSource, INPUT_CONTEXT, RedisSink
+from feathr.definition.source import CosmosDbSource, SnowflakeSource
+from feathr.spark_provider._spark_dependencies import (
+    CONNECTOR_PACKAGES,
+    CORE_PACKAGES,
+    _JarCache,
+    merge_packages,
+    required_connectors,
+    resolve_packages,
+)
+
+
+def test__required_connectors():
+    anchors = [
+        FeatureAnchor(name="request_features", source=INPUT_CONTEXT, features=[]),
+        FeatureAnchor(name="hdfs_features", source=HdfsSource(name="hdfs", path="abfss://c@a.dfs.core.windows.net/f"),
+                      features=[]),
+        FeatureAnchor(name="local_features", source=HdfsSource(name="local", path="data/f.csv"), features=[]),
+        FeatureAnchor(name="snowflake_features", source=SnowflakeSource(name="sf", database="d", schema="s",
+                                                                        dbtable="t"), features=[]),
+    ]
+    assert required_connectors(anchors) == {"azure_storage", "snowflake"}
+    assert required_connectors(sinks=[RedisSink(table_name="t"), HdfsSink(output_path="output")]) == {"redis"}
+    assert required_connectors(paths=["wasbs://c@a.blob.core.windows.net/obs", "obs.csv"]) == {"azure_storage"}
+    cosmos = CosmosDbSource(name="cosmos", endpoint="e", database="d", container="c")
+    assert required_connectors([FeatureAnchor(name="cosmos_features", source=cosmos, features=[])]) == {"cosmos"}
+
+
+def test__resolve_packages():
+    assert resolve_packages([]) == CORE_PACKAGES
+    assert resolve_packages(["redis"]) == CORE_PACKAGES + CONNECTOR_PACKAGES["redis"]
+    all_packages = resolve_packages()
+    assert len(all_packages) == len(set(all_packages))
+    assert set(all_packages) == set(CORE_PACKAGES).union(*CONNECTOR_PACKAGES.values())
+
+
+def test__merge_packages():
+    assert merge_packages(["a:b:1.0", "c:d:2.0"], ["", "c:d:2.0", " e:f:3.0"]) == ["a:b:1.0", "c:d:2.0", "e:f:3.0"]
+
+
+def test__jar_cache(tmp_path: Path):
+    cache = _JarCache(str(tmp_path / "cache"))
+    packages = ["a:b:1.0", "c:d:2.0"]
+
+    # Not cached yet, the job resolves the packages into the ivy directory of the package set
+    jars, confs = cache.resolve(packages)
+    assert jars is None
+    ivy_dir = Path(confs["spark.jars.ivy"])
+    assert ivy_dir == Path(cache.ivy_dir(cache.package_set_key(packages)))
+    (ivy_dir / "jars").mkdir(parents=True)
+    (ivy_dir / "jars" / "a_b-1.0.jar").write_bytes(b"a")
+
+    # A partial resolution, e.g. of a failed job, is not cached
+    assert cache.resolve(packages) == (None, confs)
+    assert not (tmp_path / "cache" / "index.json").exists()
+
+    (ivy_dir / "jars" / "c_d-2.0.jar").write_bytes(b"c")
+
+    # The resolved jars are cached, in any package order
+    jars, confs = cache.resolve(list(reversed(packages)))
+    assert confs == {}
+    assert sorted(Path(jar).read_bytes() for jar in jars) == [b"a", b"c"]
+    assert not ivy_dir.exists()
+    assert cache.resolve(packages) == (jars, {})
+
+    # Jars are stored once by content
+    other_jar = tmp_path / "e_f-1.0.jar"
+    other_jar.write_bytes(b"a")
+    assert cache.add_package_set(["a:b:1.0", "e:f:1.0"], [str(other_jar)]) == [jars[0]]
+    assert len(list((tmp_path / "cache" / "objects").glob("*.jar"))) == 2
+
+    # Package sets whose cached jars are lost are resolved again
+    Path(jars[1]).unlink()
+    assert cache.resolve(packages)[0] is None
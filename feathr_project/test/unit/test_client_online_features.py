@@ -0,0 +1,373 @@
+import asyncio
+import base64
+import json
+import time
+
+import fakeredis
+import numpy as np
+import pandas as pd
+import pytest
+
+from feathr import (Aggregation, DerivedFeature, FeathrClient, Feature, FeatureAnchor, FLOAT, INT32_VECTOR, INT64,
+                    LookupFeature, OnlineFeatureColumns, TypedKey, ValueType)
+from feathr.definition.source import INPUT_CONTEXT
+from feathr.protobuf.featureValue_pb2 import FeatureValue, IntegerArray
+
+
+def _encode(feature_value: FeatureValue) -> bytes:
+    return base64.b64encode(feature_value.SerializeToString())
+
+
+@pytest.fixture(scope="function")
+def online_client(feathr_client: FeathrClient) -> FeathrClient:
+    """Feathr client whose online store is backed by an in-memory fake Redis server."""
+    server = fakeredis.FakeServer()
+    feathr_client.redis_client = fakeredis.FakeRedis(server=server)
+    feathr_client.async_redis_client = fakeredis.FakeAsyncRedis(server=server)
+    feathr_client.redis_client.hset("table:1", mapping={
+        "f_float": _encode(FeatureValue(float_value=1.5)),
+        "f_str": _encode(FeatureValue(string_value="a")),
+    })
+    feathr_client.redis_client.hset("table:2", mapping={
+        "f_float": _encode(FeatureValue(float_value=2.5)),
+    })
+    feathr_client.redis_client.hset("table:3#x", mapping={
+        "f_str": _encode(FeatureValue(string_value="composite")),
+    })
+    return feathr_client
+
+
+def test__aget_online_features(online_client: FeathrClient):
+    res = asyncio.run(online_client.aget_online_features("table", "1", ["f_float", "f_str", "f_missing"]))
+    assert res == online_client.get_online_features("table", "1", ["f_float", "f_str", "f_missing"])
+    assert res == [1.5, "a", None]
+
+
+def test__amulti_get_online_features(online_client: FeathrClient):
+    keys = ["1", "2", "4", ["3", "x"]]
+    res = asyncio.run(online_client.amulti_get_online_features("table", keys, ["f_float", "f_str"]))
+    assert res == {
+        "1": [1.5, "a"],
+        "2": [2.5, None],
+        "4": [None, None],
+        "3#x": [None, "composite"],
+    }
+    # Caller's keys are left untouched
+    assert keys[3] == ["3", "x"]
+
+
+def test__multi_get_online_features__numpy(online_client: FeathrClient):
+    res = online_client.multi_get_online_features("table", ["1", "2", ["3", "x"]], ["f_float", "f_str"],
+                                                  output_format="numpy")
+    assert isinstance(res, OnlineFeatureColumns)
+    assert res.keys == ["1", "2", "3#x"]
+    assert list(res["f_float"][:2]) == [1.5, 2.5]
+    assert list(res.null_masks["f_float"]) == [False, False, True]
+    assert list(res["f_str"]) == ["a", None, "composite"]
+
+
+def test__multi_get_online_features__arrow(online_client: FeathrClient):
+    res = online_client.multi_get_online_features("table", ["1", "2"], ["f_float", "f_str"], output_format="arrow")
+    assert res.to_pydict() == {"key": ["1", "2"], "f_float": [1.5, 2.5], "f_str": ["a", None]}
+
+
+def test__multi_get_online_features__invalid_output_format(online_client: FeathrClient):
+    with pytest.raises(RuntimeError):
+        online_client.multi_get_online_features("table", ["1"], ["f_float"], output_format="csv")
+
+
+def test__online_feature_cache__only_misses_sent_to_redis(online_client: FeathrClient, mocker):
+    cache = online_client.enable_online_feature_cache(ttl_sec=60)
+    assert online_client.multi_get_online_features("table", ["1", "2"], ["f_float"]) == {"1": [1.5], "2": [2.5]}
+
+    spy = mocker.spy(online_client.redis_client, "pipeline")
+    hmget = mocker.spy(online_client.redis_client, "hmget")
+    res = online_client.multi_get_online_features("table", ["1", "2", "4"], ["f_float", "f_str"])
+
+    assert res == {"1": [1.5, "a"], "2": [2.5, None], "4": [None, None]}
+    # Only key 4 and the `f_str` features of keys 1 and 2 are fetched
+    spy.assert_called_once()
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["misses"] == 2 + 4
+
+    # Everything is cached now, including missing values
+    online_client.get_online_features("table", "4", ["f_float", "f_str"])
+    hmget.assert_not_called()
+
+    online_client.disable_online_feature_cache()
+    assert online_client.online_feature_cache is None
+
+
+def test__online_feature_cache__keyspace_invalidation_of_all_tables(online_client: FeathrClient, mocker):
+    pubsub = mocker.patch.object(online_client.redis_client, "pubsub").return_value
+    online_client.enable_online_feature_cache(table_ttl_sec={"hot": 1}, invalidate_on_keyspace_events=True)
+    # Tables with the default TTL are invalidated too
+    assert list(pubsub.psubscribe.call_args.kwargs) == ["__keyspace@0__:*"]
+
+    online_client.enable_online_feature_cache(invalidate_on_keyspace_events=True, invalidation_tables=["table"])
+    assert list(pubsub.psubscribe.call_args.kwargs) == ["__keyspace@0__:table:*"]
+    online_client.disable_online_feature_cache()
+
+
+def test__multi_get_online_features__hash_tag(online_client: FeathrClient):
+    online_client.redis_hash_tag_enabled = True
+    online_client.redis_client.hset("table:{3#x}", mapping={
+        "f_str": _encode(FeatureValue(string_value="tagged")),
+    })
+    assert online_client._construct_redis_key("table", ["3", "x"]) == "table:{3#x}"
+    assert online_client.get_online_features("table", ["3", "x"], ["f_str"]) == ["tagged"]
+
+
+def test__multi_get_online_features__chunked(online_client: FeathrClient):
+    online_client.redis_max_keys_per_pipeline = 2
+    keys = ["1", "2", "4", ["3", "x"]]
+    res = online_client.multi_get_online_features("table", keys, ["f_float", "f_str"])
+    assert res == {
+        "1": [1.5, "a"],
+        "2": [2.5, None],
+        "4": [None, None],
+        "3#x": [None, "composite"],
+    }
+    # Caller's keys are left untouched
+    assert keys[3] == ["3", "x"]
+
+
+def test__multi_table_get_online_features(online_client: FeathrClient):
+    online_client.redis_client.hset("user_table:3", mapping={
+        "f_user": _encode(FeatureValue(int_value=7)),
+    })
+    online_client.redis_client.hset("table:4", mapping={
+        "f_float": _encode(FeatureValue(float_value=4.5)),
+    })
+    table_features = {"table": ["f_float", "f_str"], "user_table": ["f_user"]}
+    keys = [["3", "x"], ["4", "y"]]
+    res = online_client.multi_table_get_online_features(table_features, keys, key_mapping={"user_table": [0]})
+    assert res == {
+        "3#x": [None, "composite", 7],
+        "4#y": [None, None, None],
+    }
+    res = asyncio.run(online_client.amulti_table_get_online_features(
+        {"table": ["f_float"], "user_table": ["f_user"]}, keys, key_mapping={"table": [0], "user_table": [0]},
+        output_format="numpy"))
+    assert list(res.null_masks["f_float"]) == [True, False]
+    assert res["f_float"][1] == 4.5
+    assert list(res.null_masks["f_user"]) == [False, True]
+
+
+def test__multi_table_get_online_features__duplicated_feature_names(online_client: FeathrClient):
+    with pytest.raises(RuntimeError):
+        online_client.multi_table_get_online_features({"table": ["f"], "other": ["f"]}, ["1"])
+
+
+def test__multi_get_online_features__derived_features(online_client: FeathrClient):
+    key = TypedKey(key_column="id", key_column_type=ValueType.INT32)
+    f_float = Feature(name="f_float", feature_type=FLOAT, key=key, transform="x")
+    f_double = DerivedFeature(name="f_double", feature_type=FLOAT, key=key, input_features=[f_float],
+                              transform="f_float * 2")
+    res = online_client.multi_get_online_features("table", ["1", "4"], ["f_str", "f_double"],
+                                                  derived_features=[f_double])
+    assert res == {"1": ["a", 3.0], "4": [None, None]}
+    res = online_client.multi_get_online_features("table", ["1", "4"], ["f_double"], output_format="numpy",
+                                                  default_values={"f_double": 0.0}, derived_features=[f_double])
+    assert list(res["f_double"]) == [3.0, 0.0]
+    assert list(res.null_masks["f_double"]) == [False, True]
+
+
+def test__multi_get_online_lookup_features(online_client: FeathrClient):
+    user_key = TypedKey(key_column="user_id", key_column_type=ValueType.INT32)
+    item_key = TypedKey(key_column="item_id", key_column_type=ValueType.INT32)
+    f_items = Feature(name="f_items", feature_type=INT32_VECTOR, key=user_key, transform="items")
+    f_price = Feature(name="f_price", feature_type=FLOAT, key=item_key, transform="price")
+    f_avg_price = LookupFeature(name="f_avg_price", feature_type=FLOAT, key=user_key, base_feature=f_items,
+                                expansion_feature=f_price, aggregation=Aggregation.AVG)
+    online_client.redis_client.hset("users:u1", mapping={"f_items": _encode(FeatureValue(int_array=IntegerArray(integers=[1, 2])))})
+    online_client.redis_client.hset("items:1", mapping={"f_price": _encode(FeatureValue(float_value=1.0))})
+    online_client.redis_client.hset("items:2", mapping={"f_price": _encode(FeatureValue(float_value=2.0))})
+    feature_tables = {"f_items": "users", "f_price": "items"}
+    res = online_client.multi_get_online_lookup_features([f_avg_price], ["u1", "u2"], feature_tables)
+    assert res == {"u1": [1.5], "u2": [None]}
+    assert asyncio.run(online_client.amulti_get_online_lookup_features([f_avg_price], ["u1", "u2"], feature_tables)) == res
+    assert online_client.multi_get_online_lookup_features([f_avg_price], ["u2"], feature_tables) == {"u2": [None]}
+
+
+def test__push_online_features(online_client: FeathrClient):
+    df = pd.DataFrame({
+        "user_id": [1, 2, 3],
+        "region": ["eu", "us", "eu"],
+        "f_int": np.array([7, -1, 0], dtype=np.int32),
+        "f_double": [1.5, np.nan, np.nan],
+        "f_str": ["a", None, None],
+        "f_vector": [np.array([1.0, 2.0], dtype=np.float32), None, None],
+        "ttl": [60, None, None],
+    })
+    written = online_client.push_online_features("pushed", df, ["user_id", "region"], ttl_sec="ttl",
+                                                 max_keys_per_pipeline=1)
+    assert written == 3
+    res = online_client.multi_get_online_features("pushed", [["1", "eu"], ["2", "us"]],
+                                                  ["f_int", "f_double", "f_str", "f_vector", "ttl"])
+    assert res == {"1#eu": [7, 1.5, "a", [1.0, 2.0], None], "2#us": [-1, None, None, None, None]}
+    assert 0 < online_client.redis_client.ttl("pushed:1#eu") <= 60
+    assert online_client.redis_client.ttl("pushed:2#us") == -1
+
+    # Typed features are encoded with the type of the feature, e.g. FLOAT instead of DOUBLE
+    online_client.push_online_features("pushed", df, ["user_id", "region"], feature_types={"f_double": FLOAT}, ttl_sec=30)
+    raw = FeatureValue()
+    raw.ParseFromString(base64.b64decode(online_client.redis_client.hget("pushed:1#eu", "f_double")))
+    assert raw.WhichOneof("FeatureValueOneOf") == "float_value"
+    assert 0 < online_client.redis_client.ttl("pushed:1#eu") <= 30
+
+
+def test__push_online_features__raw_value_encoding(online_client: FeathrClient):
+    df = pd.DataFrame({"id": ["1", "5"], "f_float": np.array([0.5, 4.0], dtype=np.float32), "f_str": ["raw", "b"]})
+    online_client.push_online_features("table", df.iloc[:1], ["id"], value_encoding="raw")
+    online_client.push_online_features("table", df.iloc[1:], ["id"])
+    assert online_client.redis_client.hget("table:1", "f_str")[:1] == b"\x00"
+    # Raw and base64 values are read from the same table
+    res = online_client.multi_get_online_features("table", ["1", "2", "5"], ["f_float", "f_str"])
+    assert res == {"1": [0.5, "raw"], "2": [2.5, None], "5": [4.0, "b"]}
+    columns = online_client.multi_get_online_features("table", ["1", "2", "5"], ["f_float", "f_str"],
+                                                      output_format="numpy")
+    assert columns["f_float"].tolist() == [0.5, 2.5, 4.0]
+    assert online_client.analyze_online_store(["table"]).tables["table"].features["f_str"].num_raw == 1
+    with pytest.raises(RuntimeError):
+        online_client.push_online_features("table", df, ["id"], value_encoding="utf8")
+
+
+def test__analyze_online_store(online_client: FeathrClient):
+    report = online_client.analyze_online_store(["table"])
+    table = report.tables["table"].to_dict()
+    assert table["num_keys"] == 3
+    assert {f["feature_name"] for f in table["features"]} == {"f_float", "f_str"}
+    assert "table: 3 keys" in report.format()
+
+    online_client._clean_test_data("table")
+    assert online_client.analyze_online_store(["table"]).tables["table"].num_keys == 0
+
+
+def test__delete_feature_from_redis_keeps_other_features(online_client: FeathrClient):
+    online_client.delete_feature_from_redis("table", "1", "f_str")
+    assert online_client.get_online_features("table", "1", ["f_float", "f_str"]) == [1.5, None]
+    with pytest.raises(RuntimeError):
+        online_client.delete_feature_from_redis("table", "1", "f_str")
+
+
+def test__bulk_online_table_operations(online_client: FeathrClient):
+    online_client.enable_online_feature_cache()
+    assert online_client.get_online_features("table", "1", ["f_str"]) == ["a"]
+    report = online_client.drop_online_features("table", ["f_str"])
+    assert report.affected_keys == 2
+    assert online_client.get_online_features("table", "1", ["f_float", "f_str"]) == [1.5, None]
+
+    assert online_client.expire_online_feature_table("table", 60).affected_keys == 2
+    assert 0 < online_client.redis_client.ttl("table:2") <= 60
+
+    assert online_client.drop_online_feature_table("table").affected_keys == 2
+    assert online_client.get_online_features("table", "1", ["f_float"]) == [None]
+
+
+def test__online_metrics(online_client: FeathrClient):
+    metrics = online_client.enable_online_metrics()
+    online_client.multi_get_online_features("table", ["1", "2", "4"], ["f_float", "f_str"])
+    online_client.multi_get_online_features("table", ["1"], ["f_float"], output_format="numpy")
+
+    assert metrics.get_histogram("feathr_online_redis_seconds", "table")["count"] == 2
+    assert metrics.get_histogram("feathr_online_decode_seconds", "table")["count"] == 2
+    assert metrics.get_histogram("feathr_online_keys_per_call", "table")["sum"] == 4
+    assert metrics.get_counter("feathr_online_values_total", "table") == 7
+    assert metrics.get_counter("feathr_online_missing_values_total", "table") == 3
+    assert metrics.get_counter("feathr_online_bytes_read_total", "table") > 0
+
+    online_client.disable_online_metrics()
+    online_client.get_online_features("table", "1", ["f_float"])
+    assert metrics.get_counter("feathr_online_values_total", "table") == 7
+
+
+def test__online_decode_plans(online_client: FeathrClient):
+    online_client.build_features(anchor_list=[FeatureAnchor(name="request_features", source=INPUT_CONTEXT, features=[
+        Feature(name="f_float", feature_type=FLOAT, transform="a"),
+        Feature(name="f_str", feature_type=INT64, transform="b"),
+    ])])
+    metrics = online_client.enable_online_metrics()
+    # Values that don't match the declared type are still decoded, and counted
+    assert online_client.multi_get_online_features("table", ["1", "2"], ["f_float", "f_str"]) == \
+           {"1": [1.5, "a"], "2": [2.5, None]}
+    assert online_client.get_online_decode_stats() == {"type_mismatches": {"f_str": 1}, "unknown_values": {}}
+    assert metrics.get_counter("feathr_online_type_mismatches_total", "table") == 1
+    # Plans are evicted in LRU order, their counters are kept
+    online_client.online_decode_plans_max_size = 1
+    assert online_client.get_online_features("table", "1", ["f_float"]) == [1.5]
+    assert list(online_client._online_decode_plans) == [("f_float",)]
+    assert online_client.get_online_decode_stats() == {"type_mismatches": {"f_str": 1}, "unknown_values": {}}
+    # Plans are rebuilt when the features are built again
+    online_client.build_features(anchor_list=[])
+    assert online_client.get_online_features("table", "1", ["f_str"]) == ["a"]
+    assert online_client.get_online_decode_stats()["type_mismatches"] == {}
+
+
+def test__online_read_deadline(online_client: FeathrClient, mocker):
+    execute_hmgets = online_client._execute_hmgets
+
+    def _slow_user_table(requests):
+        if requests[0][0].startswith("user_table"):
+            time.sleep(1.0)
+        return execute_hmgets(requests)
+
+    mocker.patch.object(online_client, "_execute_hmgets", side_effect=_slow_user_table)
+    metrics = online_client.enable_online_metrics()
+    res = online_client.get_online_features("table", "1", ["f_float"], deadline_ms=500)
+    assert res == [1.5] and res.degraded_features == {}
+
+    table_features = {"table": ["f_float", "f_str"], "user_table": ["f_user"]}
+    with pytest.raises(TimeoutError):
+        online_client.multi_table_get_online_features(table_features, ["1", "2"], deadline_ms=50)
+    # Only the features of the table that missed the deadline are degraded
+    res = online_client.multi_table_get_online_features(table_features, ["1", "2"], deadline_ms=50,
+                                                        partial_results=True)
+    assert res == {"1": [1.5, "a", None], "2": [2.5, None, None]}
+    assert res.degraded_features == {"f_user": "deadline"}
+    res = online_client.multi_table_get_online_features(table_features, ["1"], output_format="arrow", deadline_ms=50,
+                                                        partial_results=True)
+    assert json.loads(res.schema.metadata[b"feathr.degraded_features"]) == {"f_user": "deadline"}
+    assert metrics.get_counter("feathr_online_deadline_misses_total", "user_table") == 3
+    assert metrics.get_counter("feathr_online_deadline_misses_total", "table") == 0
+
+
+def test__online_read_deadline__not_cached(online_client: FeathrClient, mocker):
+    online_client.enable_online_feature_cache()
+    execute_hmgets = online_client._execute_hmgets
+    mocker.patch.object(online_client, "_execute_hmgets", side_effect=lambda requests: time.sleep(1.0))
+    res = online_client.multi_get_online_features("table", ["1"], ["f_float"], output_format="numpy", deadline_ms=20,
+                                                  partial_results=True)
+    assert res.degraded_features == {"f_float": "deadline"}
+    assert list(res.null_masks["f_float"]) == [True]
+    # Values that missed the deadline are not cached as missing
+    mocker.patch.object(online_client, "_execute_hmgets", side_effect=execute_hmgets)
+    assert online_client.get_online_features("table", "1", ["f_float"], deadline_ms=500) == [1.5]
+
+
+def test__online_read_hedging(online_client: FeathrClient, mocker):
+    with pytest.raises(RuntimeError):
+        online_client.enable_online_hedging()
+    replica_server = fakeredis.FakeServer()
+    replica_client = fakeredis.FakeRedis(server=replica_server)
+    replica_client.hset("table:1", mapping={"f_float": _encode(FeatureValue(float_value=-1.5))})
+    hedging = online_client.enable_online_hedging(replica_client,
+                                                  fakeredis.FakeAsyncRedis(server=replica_server),
+                                                  initial_delay_ms=10)
+    metrics = online_client.enable_online_metrics()
+    # A fast primary is not hedged
+    res = online_client.get_online_features("table", "1", ["f_float"])
+    assert res == [1.5] and res.degraded_features == {}
+
+    execute_hmgets = online_client._execute_hmgets
+    mocker.patch.object(online_client, "_execute_hmgets",
+                        side_effect=lambda requests: time.sleep(1.0) or execute_hmgets(requests))
+    res = online_client.multi_get_online_features("table", ["1"], ["f_float"], deadline_ms=500)
+    assert res == {"1": [-1.5]} and res.degraded_features == {"f_float": "replica"}
+    assert hedging.num_replica_wins == 1
+    assert metrics.get_counter("feathr_online_replica_reads_total", "table") == 1
+
+    res = asyncio.run(online_client.aget_online_features("table", "1", ["f_float"]))
+    assert res == [1.5] and res.degraded_features == {}
+    online_client.disable_online_hedging()
+    assert online_client.online_hedging is None
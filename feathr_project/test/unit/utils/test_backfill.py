@@ -0,0 +1,183 @@
+from datetime import datetime, timedelta
+from pathlib import Path
+import re
+from typing import List, Optional
+
+import pytest
+
+from feathr import (BackfillTime, FeathrClient, FeathrJob, Feature, FeatureAnchor, FLOAT, HdfsSink, HdfsSource,
+                    MaterializationLedger, MaterializationSettings, TypedKey, ValueType, WindowAggTransformation)
+from feathr.utils.backfill import FAILED, PENDING, RUNNING, SUCCEEDED, BackfillScheduler, BackfillWindow
+
+
+class _FakeJob(FeathrJob):
+    """Job which finishes after a given number of status polls."""
+    def __init__(self, job_name: str, polls: int, succeeded: bool):
+        super().__init__(job_name)
+        self.polls = polls
+        self.succeeded = succeeded
+        self.cancelled = False
+
+    def get_status(self) -> str:
+        return "success" if self.succeeded else "error"
+
+    def is_done(self) -> bool:
+        self.polls -= 1
+        return self.polls < 0
+
+    def cancel(self):
+        self.cancelled = True
+
+    def wait_for_completion(self, timeout_seconds: Optional[float] = None) -> bool:
+        return self.succeeded
+
+
+class _FakeCluster:
+    """Submits fake jobs, failing the first attempts of some cutoff times, and tracks the running jobs."""
+    def __init__(self, failures: dict = None, polls: int = 1):
+        self.failures = dict(failures or {})
+        self.polls = polls
+        self.jobs: List[_FakeJob] = []
+        self.max_running = 0
+
+    def submit(self, end: datetime) -> _FakeJob:
+        running = sum(not job.cancelled and job.polls >= 0 for job in self.jobs)
+        self.max_running = max(self.max_running, running + 1)
+        failures = self.failures.get(end, 0)
+        if failures == "submit":
+            raise RuntimeError("cluster unavailable")
+        self.failures[end] = failures - 1
+        job = _FakeJob(str(end), self.polls, succeeded=failures <= 0)
+        self.jobs.append(job)
+        return job
+
+
+CUTOFF_TIMES = [datetime(2022, 3, day) for day in range(1, 8)]
+
+
+def test__backfill_scheduler__concurrency():
+    cluster = _FakeCluster()
+    windows = BackfillScheduler(cluster.submit, max_concurrency=3, poll_interval_seconds=0).run(CUTOFF_TIMES)
+    assert [window.cutoff_time for window in windows] == CUTOFF_TIMES
+    assert all(window.status == SUCCEEDED and window.attempts == 1 for window in windows)
+    assert len(cluster.jobs) == len(CUTOFF_TIMES)
+    assert cluster.max_running == 3
+
+
+def test__backfill_scheduler__retries_and_progress():
+    failures = {CUTOFF_TIMES[1]: 1, CUTOFF_TIMES[2]: 5, CUTOFF_TIMES[3]: "submit"}
+    cluster = _FakeCluster(failures)
+    progress = []
+    scheduler = BackfillScheduler(cluster.submit, max_concurrency=2, max_retries=2, poll_interval_seconds=0,
+                                  progress_callback=lambda window: progress.append((window.cutoff_time, window.status)))
+    windows = scheduler.run(CUTOFF_TIMES)
+
+    # Only the failed windows are retried, up to max_retries times
+    assert [window.attempts for window in windows] == [1, 2, 3, 3, 1, 1, 1]
+    assert [window.status for window in windows] == [SUCCEEDED, SUCCEEDED, FAILED, FAILED] + [SUCCEEDED] * 3
+    assert isinstance(windows[3].error, RuntimeError)
+    assert progress[:2] == [(CUTOFF_TIMES[0], RUNNING), (CUTOFF_TIMES[1], RUNNING)]
+    assert (CUTOFF_TIMES[1], PENDING) in progress
+    assert progress.count((CUTOFF_TIMES[2], FAILED)) == 1
+
+
+def test__backfill_scheduler__submission_retry_delay(mocker):
+    events = []
+    cluster = _FakeCluster({CUTOFF_TIMES[0]: "submit"})
+
+    def submit(end: datetime) -> _FakeJob:
+        events.append("submit")
+        return cluster.submit(end)
+
+    mocker.patch("feathr.utils.backfill.time.sleep", side_effect=lambda _: events.append("sleep"))
+    windows = BackfillScheduler(submit, max_retries=2, poll_interval_seconds=10).run(CUTOFF_TIMES[:1])
+
+    assert windows[0].status == FAILED and windows[0].attempts == 3
+    # Failed submissions are not retried without waiting for the poll interval
+    assert events == ["submit", "sleep", "submit", "sleep", "submit"]
+
+
+def test__backfill_scheduler__timeout():
+    cluster = _FakeCluster(polls=10**6)
+    with pytest.raises(TimeoutError):
+        BackfillScheduler(cluster.submit, max_concurrency=2, poll_interval_seconds=0).run(CUTOFF_TIMES, 0)
+    assert len(cluster.jobs) == 2
+    assert all(job.cancelled for job in cluster.jobs)
+
+    with pytest.raises(RuntimeError):
+        BackfillScheduler(cluster.submit, max_concurrency=0)
+
+
+def _build(client: FeathrClient, path: str, window: str = "3d"):
+    key = TypedKey(key_column="user_id", key_column_type=ValueType.INT32)
+    client.build_features(anchor_list=[FeatureAnchor(
+        name="user_agg_features",
+        source=HdfsSource(name="users", path=path, event_timestamp_column="ts", timestamp_format="yyyy-MM-dd"),
+        features=[Feature(name="f_total", feature_type=FLOAT, key=key,
+                          transform=WindowAggTransformation(agg_expr="amount", agg_func="SUM", window=window))],
+    )])
+
+
+def _mock_materialization(client: FeathrClient, cluster: _FakeCluster, mocker) -> List[str]:
+    """Submit the materialization jobs to the fake cluster, and get the configs of the submitted jobs."""
+    configs = []
+
+    def materialize(feature_gen_conf_path: str, **_):
+        config = Path(feature_gen_conf_path).read_text()
+        configs.append(config)
+        end = re.search(r'endTime: "(.*)"', config).group(1)
+        return cluster.submit(datetime.strptime(end, "%Y-%m-%d %H:%M:%S"))
+
+    mocker.patch.object(client, "_materialize_features_with_config", side_effect=materialize)
+    mocker.patch("feathr.utils.backfill.time.sleep")
+    return configs
+
+
+def test__materialize_features__backfill(feathr_client: FeathrClient, tmp_path, mocker):
+    _build(feathr_client, str(tmp_path / "users"))
+    backfill_time = BackfillTime(start=CUTOFF_TIMES[0], end=CUTOFF_TIMES[-1], step=timedelta(days=1))
+    settings = MaterializationSettings("backfill", sinks=[HdfsSink(output_path=str(tmp_path / "output"))],
+                                       feature_names=["f_total"], backfill_time=backfill_time)
+
+    cluster = _FakeCluster({CUTOFF_TIMES[2]: 1})
+    configs = _mock_materialization(feathr_client, cluster, mocker)
+    jobs = feathr_client.materialize_features(settings, max_concurrency=2, max_retries=1)
+
+    assert len(jobs) == len(CUTOFF_TIMES) and all(job.succeeded for job in jobs)
+    # Each window gets its own end time, the third one twice as it's retried
+    assert len(configs) == len(CUTOFF_TIMES) + 1
+    assert sum('endTime: "2022-03-03 00:00:00"' in config for config in configs) == 2
+    assert cluster.max_running == 2
+    # The settings of the caller are left untouched
+    assert settings.backfill_time.end == CUTOFF_TIMES[-1]
+
+    with pytest.raises(RuntimeError):
+        cluster.failures = {end: 5 for end in CUTOFF_TIMES}
+        configs.clear()
+        feathr_client.materialize_features(settings, max_concurrency=2)
+
+
+def test__materialize_features__ledger(feathr_client: FeathrClient, tmp_path, mocker):
+    _build(feathr_client, str(tmp_path / "users"))
+    backfill_time = BackfillTime(start=CUTOFF_TIMES[0], end=CUTOFF_TIMES[-1], step=timedelta(days=1))
+    settings = MaterializationSettings("backfill", sinks=[HdfsSink(output_path=str(tmp_path / "output"))],
+                                       feature_names=["f_total"], backfill_time=backfill_time,
+                                       ledger=MaterializationLedger(str(tmp_path / "ledger.json")))
+    cluster = _FakeCluster({CUTOFF_TIMES[2]: 1})
+    configs = _mock_materialization(feathr_client, cluster, mocker)
+
+    # The failed window isn't recorded, so the next run only materializes it
+    with pytest.raises(RuntimeError):
+        feathr_client.materialize_features(settings)
+    assert len(configs) == len(CUTOFF_TIMES)
+    configs.clear()
+    assert len(feathr_client.materialize_features(settings)) == 1
+    assert len(configs) == 1 and 'endTime: "2022-03-03 00:00:00"' in configs[0]
+
+    # Nothing is left to materialize, until the backfill time grows or the features change
+    configs.clear()
+    assert feathr_client.materialize_features(settings) == []
+    settings.backfill_time.end = datetime(2022, 3, 8)
+    assert len(feathr_client.materialize_features(settings)) == 1
+    _build(feathr_client, str(tmp_path / "users"), window="7d")
+    assert len(feathr_client.materialize_features(settings)) == len(CUTOFF_TIMES) + 1
@@ -0,0 +1,71 @@
+from datetime import datetime, timedelta
+
+from feathr import (BackfillTime, DerivedFeature, Feature, FeatureAnchor, FLOAT, HdfsSink, HdfsSource,
+                    MaterializationLedger, MaterializationSettings, RedisSink, TypedKey, ValueType,
+                    WindowAggTransformation)
+from feathr.utils.materialization_ledger import materialization_fingerprint, sink_id
+
+CUTOFF_TIMES = [datetime(2022, 3, day) for day in range(1, 6)]
+KEY = TypedKey(key_column="user_id", key_column_type=ValueType.INT32)
+
+
+def _anchor(path: str = "data/users", window: str = "3d") -> FeatureAnchor:
+    source = HdfsSource(name="users", path=path, event_timestamp_column="ts", timestamp_format="yyyy-MM-dd")
+    return FeatureAnchor(name="user_agg_features", source=source, features=[
+        Feature(name="f_total", feature_type=FLOAT, key=KEY,
+                transform=WindowAggTransformation(agg_expr="amount", agg_func="SUM", window=window)),
+        Feature(name="f_max", feature_type=FLOAT, key=KEY,
+                transform=WindowAggTransformation(agg_expr="amount", agg_func="MAX", window=window)),
+    ])
+
+
+def test__materialization_fingerprint():
+    fingerprint = materialization_fingerprint([_anchor()], ["f_total"], "DAILY")
+    assert materialization_fingerprint([_anchor()], ["f_total"], "DAILY") == fingerprint
+    # Changes of the features, the source path, the feature list or the resolution make the windows stale
+    assert materialization_fingerprint([_anchor(window="7d")], ["f_total"], "DAILY") != fingerprint
+    assert materialization_fingerprint([_anchor(path="data/users_v2")], ["f_total"], "DAILY") != fingerprint
+    assert materialization_fingerprint([_anchor()], ["f_total", "f_max"], "DAILY") != fingerprint
+    assert materialization_fingerprint([_anchor()], ["f_total"], "HOURLY") != fingerprint
+
+    anchor = _anchor()
+    derived = DerivedFeature(name="f_double", feature_type=FLOAT, key=KEY, input_features=[anchor.features[0]],
+                             transform="f_total * 2")
+    changed = DerivedFeature(name="f_double", feature_type=FLOAT, key=KEY, input_features=[anchor.features[0]],
+                             transform="f_total * 3")
+    fingerprint = materialization_fingerprint([anchor], ["f_double"], "DAILY", [derived])
+    # The anchor of the input feature is part of the fingerprint of the derived feature
+    assert fingerprint != materialization_fingerprint([], ["f_double"], "DAILY", [derived])
+    assert fingerprint != materialization_fingerprint([anchor], ["f_double"], "DAILY", [changed])
+
+
+def test__materialization_ledger(tmp_path):
+    ledger = MaterializationLedger(str(tmp_path / "ledger" / "materialization.json"))
+    sinks = [HdfsSink(output_path="output"), RedisSink(table_name="users")]
+    settings = MaterializationSettings("user_agg", sinks=sinks, feature_names=["f_total"], ledger=ledger,
+                                       backfill_time=BackfillTime(start=CUTOFF_TIMES[0], end=CUTOFF_TIMES[-1],
+                                                                  step=timedelta(days=1)))
+    sink_ids = [sink_id(sink) for sink in sinks]
+    assert len(set(sink_ids)) == 2
+    assert settings.get_backfill_cutoff_time("v1") == CUTOFF_TIMES
+
+    for cutoff_time in CUTOFF_TIMES[:3]:
+        ledger.record("user_agg", sink_ids, cutoff_time, "v1")
+    # Windows materialized into only one of the sinks are missing
+    ledger.record("user_agg", sink_ids[:1], CUTOFF_TIMES[3], "v1")
+
+    assert settings.get_backfill_cutoff_time("v1") == CUTOFF_TIMES[3:]
+    assert ledger.is_materialized("user_agg", sink_ids, CUTOFF_TIMES[0], "v1")
+    # All the windows are stale with another fingerprint, or without fingerprint the ledger isn't used
+    assert settings.get_backfill_cutoff_time("v2") == CUTOFF_TIMES
+    assert settings.get_backfill_cutoff_time() == CUTOFF_TIMES
+    # Other feature sets have their own windows
+    assert ledger.missing_windows("other", sink_ids, CUTOFF_TIMES, "v1") == CUTOFF_TIMES
+
+    # The ledger is persistent
+    reloaded = MaterializationLedger(ledger.path)
+    assert reloaded.missing_windows("user_agg", sink_ids, CUTOFF_TIMES, "v1") == CUTOFF_TIMES[3:]
+    reloaded.invalidate("user_agg", [CUTOFF_TIMES[0]])
+    assert ledger.missing_windows("user_agg", sink_ids, CUTOFF_TIMES, "v1") == [CUTOFF_TIMES[0]] + CUTOFF_TIMES[3:]
+    reloaded.invalidate("user_agg")
+    assert ledger.missing_windows("user_agg", sink_ids, CUTOFF_TIMES, "v1") == CUTOFF_TIMES
@@ -0,0 +1,100 @@
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from feathr.utils.window_aggregation import aggregate_windows
+
+
+@pytest.fixture(scope="module")
+def events() -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    num_events = 500
+    values = rng.integers(-50, 50, num_events).astype("float64")
+    values[rng.random(num_events) < 0.1] = np.nan
+    return pd.DataFrame({
+        "key": rng.choice(["a", "b", "c", "d"], num_events),
+        "ts": pd.Timestamp("2022-01-01") + pd.to_timedelta(rng.integers(0, 30 * 24, num_events), unit="h"),
+        "value": values,
+        "group": rng.choice(["x", "y"], num_events),
+    })
+
+
+@pytest.fixture(scope="module")
+def queries() -> pd.DataFrame:
+    rng = np.random.default_rng(1)
+    num_queries = 200
+    return pd.DataFrame({
+        "key": rng.choice(["a", "b", "c", "e"], num_queries),
+        "ts": pd.Timestamp("2022-01-01") + pd.to_timedelta(rng.integers(0, 32 * 24, num_queries), unit="h"),
+    })
+
+
+def _brute_force(events: pd.DataFrame, key: str, ts: pd.Timestamp, window: timedelta, agg_func: str):
+    in_window = events[(events["key"] == key) & (events["ts"] > ts - window) & (events["ts"] <= ts)]
+    values = in_window["value"].dropna()
+    if agg_func == "COUNT":
+        return len(values) if len(in_window) else None
+    if len(values) == 0:
+        return None
+    if agg_func == "LATEST":
+        return values.iloc[-1]
+    return {"SUM": values.sum, "AVG": values.mean, "MAX": values.max, "MIN": values.min}[agg_func]()
+
+
+@pytest.mark.parametrize("agg_func", ["SUM", "COUNT", "AVG", "MAX", "MIN", "LATEST"])
+@pytest.mark.parametrize("window", [timedelta(hours=1), timedelta(days=3), timedelta(days=60)])
+def test__aggregate_windows(events: pd.DataFrame, queries: pd.DataFrame, agg_func: str, window: timedelta):
+    # LATEST needs a deterministic order of the events of the same timestamp
+    events = events.sort_values("ts", kind="stable").drop_duplicates(subset=["key", "ts"], keep="last")
+    res = aggregate_windows(events["key"], events["ts"], events["value"], queries["key"], queries["ts"], agg_func,
+                            window)
+    assert len(res) == len(queries)
+    for value, key, ts in zip(res, queries["key"], queries["ts"]):
+        expected = _brute_force(events, key, ts, window, agg_func)
+        if expected is None:
+            assert pd.isna(value)
+        else:
+            assert value == pytest.approx(expected)
+
+
+def test__aggregate_windows__group_by(events: pd.DataFrame, queries: pd.DataFrame):
+    window = timedelta(days=5)
+    res = aggregate_windows(events["key"], events["ts"], events["value"], queries["key"], queries["ts"], "SUM",
+                            window, groups=events["group"])
+    for value, key, ts in zip(res, queries["key"], queries["ts"]):
+        expected = {group: _brute_force(events[events["group"] == group], key, ts, window, "SUM")
+                    for group in ["x", "y"]}
+        expected = {group: total for group, total in expected.items() if total is not None}
+        assert value == (pytest.approx(expected) if expected else None)
+
+    limited = aggregate_windows(events["key"], events["ts"], events["value"], queries["key"], queries["ts"], "SUM",
+                                window, groups=events["group"], limit=1)
+    for value, top in zip(res, limited):
+        assert top == (None if value is None else {max(value, key=value.get): max(value.values())})
+
+
+def test__aggregate_windows__pooling_and_composite_keys():
+    events = pd.DataFrame({
+        "k1": ["a", "a", "a", "a"],
+        "k2": [1, 1, 2, 1],
+        "ts": pd.to_datetime(["2022-01-01", "2022-01-02", "2022-01-02", "2022-01-03"]),
+        "vector": [[1.0, 5.0], [3.0, 1.0], [9.0, 9.0], None],
+    })
+    queries = pd.DataFrame({"k1": ["a", "a", "a"], "k2": [1, 2, 1],
+                            "ts": pd.to_datetime(["2022-01-03", "2022-01-03", "2022-01-01"])})
+    args = (events[["k1", "k2"]], events["ts"], events["vector"], queries[["k1", "k2"]], queries["ts"])
+    max_pooling = aggregate_windows(*args, "MAX_POOLING", timedelta(days=2))
+    assert max_pooling[0].tolist() == [3.0, 1.0]
+    assert max_pooling[1].tolist() == [9.0, 9.0]
+    # Windows include their end
+    assert max_pooling[2].tolist() == [1.0, 5.0]
+    avg_pooling = aggregate_windows(*args, "AVG_POOLING", timedelta(days=3))
+    assert avg_pooling[0].tolist() == [2.0, 3.0]
+
+    with pytest.raises(NotImplementedError):
+        aggregate_windows(*args, "COUNT_DISTINCT", timedelta(days=3))
+    with pytest.raises(RuntimeError):
+        aggregate_windows(events[["k1", "k2"]], events["ts"], pd.Series(["x"] * 4), queries[["k1", "k2"]],
+                          queries["ts"], "SUM", timedelta(days=3))